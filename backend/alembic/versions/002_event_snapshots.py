@@ -0,0 +1,34 @@
+"""Event snapshots for projection rebuilds
+
+Revision ID: 002
+Revises: 001
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "002"
+down_revision = "001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # ── event_snapshots ───────────────────────────────────────────────────────
+    op.create_table(
+        "event_snapshots",
+        sa.Column("id",              postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("aggregate_id",    sa.String(255), nullable=False),
+        sa.Column("projection",      sa.String(100), nullable=False),
+        sa.Column("sequence_number", sa.Integer, nullable=False),
+        sa.Column("state",           sa.LargeBinary, nullable=False),
+        sa.Column("created_at",      sa.DateTime, nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint(
+            "aggregate_id", "projection", "sequence_number", name="uq_event_snapshot"
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("event_snapshots")
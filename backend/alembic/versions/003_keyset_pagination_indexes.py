@@ -0,0 +1,36 @@
+"""Composite indexes for keyset pagination on (created_at, id)
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-19 00:00:00.000000
+"""
+from alembic import op
+
+revision = "003"
+down_revision = "002"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("idx_pipelines_project_created", "pipelines", ["project_id", "created_at", "id"]),
+    ("idx_artifacts_created", "artifacts", ["created_at", "id"]),
+    (
+        "idx_approval_requests_status_created",
+        "approval_requests",
+        ["status", "created_at", "id"],
+    ),
+    ("idx_audit_logs_time_id", "audit_logs", ["timestamp", "id"]),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction; it keeps the tables writable
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,42 @@
+"""Content-addressed artifact blob store reference counts
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-19 00:00:00.000000
+
+Schema only. Existing Artifact.content bodies are moved into the blob store
+by scripts/migrate_artifact_blobs.py, which runs online in small committed
+batches — doing it here would hold one transaction open across every row.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "004"
+down_revision = "003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # ── artifact_blobs ────────────────────────────────────────────────────────
+    op.create_table(
+        "artifact_blobs",
+        sa.Column("checksum",     sa.String(64), primary_key=True),
+        sa.Column("size_bytes",   sa.Integer, nullable=False),
+        sa.Column("stored_bytes", sa.Integer, nullable=False),
+        sa.Column("ref_count",    sa.Integer, nullable=False, server_default="0"),
+        sa.Column("created_at",   sa.DateTime, nullable=False, server_default=sa.func.now()),
+        sa.Column("updated_at",   sa.DateTime, server_default=sa.func.now()),
+    )
+    # Garbage collection scans for unreferenced blobs only
+    op.create_index(
+        "idx_artifact_blobs_unreferenced",
+        "artifact_blobs",
+        ["updated_at"],
+        postgresql_where=sa.text("ref_count <= 0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_artifact_blobs_unreferenced", table_name="artifact_blobs")
+    op.drop_table("artifact_blobs")
@@ -0,0 +1,48 @@
+"""Per-file index of generated source and test artifacts
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 00:00:00.000000
+
+Schema only. Artifacts saved before this revision are indexed by
+scripts/index_artifact_files.py, in small committed batches.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "005"
+down_revision = "004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # ── artifact_files ────────────────────────────────────────────────────────
+    op.create_table(
+        "artifact_files",
+        sa.Column("id",          postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("artifact_id", postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey("artifacts.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("pipeline_id", postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey("pipelines.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("path",        sa.String(500), nullable=False),
+        sa.Column("language",    sa.String(50)),
+        sa.Column("size_bytes",  sa.Integer, nullable=False, server_default="0"),
+        sa.Column("checksum",    sa.String(64), nullable=False),
+        sa.Column("content",     sa.Text),
+        sa.Column("file_path",   sa.String(500)),
+        sa.Column("created_at",  sa.DateTime, nullable=False, server_default=sa.func.now()),
+        sa.UniqueConstraint("artifact_id", "path", name="uq_artifact_file_path"),
+    )
+    # File tree listing and newest-version-of-a-path lookups
+    op.create_index(
+        "idx_artifact_files_pipeline_path",
+        "artifact_files",
+        ["pipeline_id", "path", "created_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_artifact_files_pipeline_path", table_name="artifact_files")
+    op.drop_table("artifact_files")
@@ -0,0 +1,35 @@
+"""Delta-encoded artifact versions
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 00:00:00.000000
+
+Existing blobs are all stored whole: base_checksum NULL, chain_depth 0.
+Downgrading is only safe before the first delta is written — older code
+cannot decode delta blobs.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "006"
+down_revision = "005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("artifact_blobs", sa.Column("base_checksum", sa.String(64)))
+    op.add_column(
+        "artifact_blobs",
+        sa.Column("chain_depth", sa.Integer, nullable=False, server_default="0"),
+    )
+    # Previous-version lookups when saving, and version listings
+    op.create_index(
+        "idx_artifacts_versions", "artifacts", ["pipeline_id", "artifact_type", "version"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_artifacts_versions", table_name="artifacts")
+    op.drop_column("artifact_blobs", "chain_depth")
+    op.drop_column("artifact_blobs", "base_checksum")
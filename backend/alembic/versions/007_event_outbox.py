@@ -0,0 +1,48 @@
+"""Transactional outbox for pipeline events
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19 00:00:00.000000
+
+The engine writes its events here in the same transaction as the stage /
+pipeline state they describe; app.core.outbox.OutboxRelay delivers them.
+Drain the outbox (OUTBOX_ENABLED=false, then wait for it to empty) before
+downgrading, or undelivered events are lost with the table.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "007"
+down_revision = "006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # ── event_outbox ──────────────────────────────────────────────────────────
+    op.create_table(
+        "event_outbox",
+        sa.Column("id",           sa.BigInteger, primary_key=True, autoincrement=True),
+        sa.Column("event_id",     sa.String(36), nullable=False, unique=True),
+        sa.Column("pipeline_id",  sa.String(255), nullable=False),
+        sa.Column("event_type",   sa.String(100), nullable=False),
+        sa.Column("payload",      postgresql.JSONB, nullable=False),
+        sa.Column("origin",       sa.String(255), nullable=False),
+        sa.Column("created_at",   sa.DateTime, nullable=False, server_default=sa.func.now()),
+        sa.Column("delivered_at", sa.DateTime),
+    )
+    op.create_index(
+        "idx_event_outbox_pending", "event_outbox", ["id"],
+        postgresql_where=sa.text("delivered_at IS NULL"),
+    )
+    op.create_index(
+        "idx_event_outbox_delivered", "event_outbox", ["delivered_at"],
+        postgresql_where=sa.text("delivered_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_event_outbox_delivered", table_name="event_outbox")
+    op.drop_index("idx_event_outbox_pending", table_name="event_outbox")
+    op.drop_table("event_outbox")
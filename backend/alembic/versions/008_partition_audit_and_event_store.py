@@ -0,0 +1,181 @@
+"""Monthly range partitioning of audit_logs and event_store
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19 00:00:00.000000
+
+Each table is rebuilt as a PARTITION BY RANGE parent (audit_logs on
+"timestamp", event_store on occurred_at) with one partition per month from
+its oldest row to PREMAKE_MONTHS ahead (or its newest row, if later), plus a
+DEFAULT partition, and the existing rows are copied across, none of them
+into the DEFAULT partition. The partition key joins the primary key.
+uq_event_sequence cannot span partitions, so it becomes a unique index on each
+partition. From then on app.core.partitions.PartitionMaintainer creates and
+drops partitions.
+
+The copy holds an exclusive lock on both tables: run it in a maintenance
+window, with the API stopped (audit and event writes spill or buffer).
+"""
+from datetime import date, timedelta
+
+import sqlalchemy as sa
+from alembic import op
+
+revision = "008"
+down_revision = "007"
+branch_labels = None
+depends_on = None
+
+PREMAKE_MONTHS = 3
+
+AUDIT_COLUMNS = (
+    "id, user_id, action, resource_type, resource_id, workspace_id, "
+    'ip_address, user_agent, request_id, details, "timestamp"'
+)
+EVENT_COLUMNS = (
+    "id, aggregate_id, aggregate_type, event_type, event_data, "
+    "sequence_number, occurred_at, extra"
+)
+
+
+def _next_month(month: date) -> date:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def _create_partitions(table: str, column: str, unique: str | None = None) -> None:
+    oldest, newest = op.get_bind().execute(
+        sa.text(f'SELECT min("{column}"), max("{column}") FROM {table}_heap')
+    ).one()
+    today = date.today().replace(day=1)
+    month = oldest.date().replace(day=1) if oldest else today
+    last = today
+    for _ in range(PREMAKE_MONTHS):
+        last = _next_month(last)
+    # Every copied row gets its month (future-dated ones included): rows left in
+    # the DEFAULT partition would have to be moved out before that month is created
+    if newest is not None:
+        last = max(last, newest.date().replace(day=1))
+    partitions = [(f"{table}_default", "DEFAULT")]
+    while month <= last:
+        partitions.append((
+            f"{table}_p{month:%Y%m}",
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')",
+        ))
+        month = _next_month(month)
+    for name, bounds in partitions:
+        op.execute(f"CREATE TABLE {name} PARTITION OF {table} {bounds}")
+        if unique:
+            op.execute(f"CREATE UNIQUE INDEX uq_{name}_sequence ON {name} ({unique})")
+
+
+def upgrade() -> None:
+    # ── audit_logs ────────────────────────────────────────────────────────────
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_heap")
+    op.execute("ALTER TABLE audit_logs_heap RENAME CONSTRAINT audit_logs_pkey TO audit_logs_heap_pkey")
+    for index in ("ix_audit_logs_timestamp", "idx_audit_logs_user_time",
+                  "idx_audit_logs_resource", "idx_audit_logs_time_id"):
+        op.execute(f"DROP INDEX IF EXISTS {index}")
+    op.execute("""
+        CREATE TABLE audit_logs (
+            id            UUID         NOT NULL,
+            user_id       UUID         REFERENCES users (id),
+            action        VARCHAR(50)  NOT NULL,
+            resource_type VARCHAR(100) NOT NULL,
+            resource_id   VARCHAR(255),
+            workspace_id  UUID,
+            ip_address    VARCHAR(45),
+            user_agent    VARCHAR(500),
+            request_id    VARCHAR(100),
+            details       JSONB        DEFAULT '{}',
+            "timestamp"   TIMESTAMP    NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, "timestamp")
+        ) PARTITION BY RANGE ("timestamp")
+    """)
+    # Declared on the parent, created on every partition
+    op.execute('CREATE INDEX idx_audit_logs_time_id ON audit_logs ("timestamp", id)')
+    op.execute('CREATE INDEX idx_audit_logs_user_time ON audit_logs (user_id, "timestamp")')
+    op.execute("CREATE INDEX idx_audit_logs_resource ON audit_logs (resource_type, resource_id)")
+    _create_partitions("audit_logs", "timestamp")
+    op.execute(f"INSERT INTO audit_logs ({AUDIT_COLUMNS}) SELECT {AUDIT_COLUMNS} FROM audit_logs_heap")
+    op.execute("DROP TABLE audit_logs_heap")
+
+    # ── event_store ───────────────────────────────────────────────────────────
+    op.execute("ALTER TABLE event_store RENAME TO event_store_heap")
+    op.execute("ALTER TABLE event_store_heap RENAME CONSTRAINT event_store_pkey TO event_store_heap_pkey")
+    op.execute("ALTER TABLE event_store_heap DROP CONSTRAINT uq_event_sequence")
+    op.execute("DROP INDEX IF EXISTS idx_event_store_aggregate")
+    op.execute("""
+        CREATE TABLE event_store (
+            id              UUID         NOT NULL,
+            aggregate_id    VARCHAR(255) NOT NULL,
+            aggregate_type  VARCHAR(100) NOT NULL,
+            event_type      VARCHAR(100) NOT NULL,
+            event_data      JSONB        NOT NULL,
+            sequence_number INTEGER      NOT NULL,
+            occurred_at     TIMESTAMP    NOT NULL DEFAULT now(),
+            extra           JSONB        DEFAULT '{}',
+            PRIMARY KEY (id, occurred_at)
+        ) PARTITION BY RANGE (occurred_at)
+    """)
+    _create_partitions("event_store", "occurred_at", unique="aggregate_id, sequence_number")
+    op.execute(f"INSERT INTO event_store ({EVENT_COLUMNS}) SELECT {EVENT_COLUMNS} FROM event_store_heap")
+    op.execute("DROP TABLE event_store_heap")
+
+
+def downgrade() -> None:
+    # Back to plain tables; partitions already dropped for retention stay gone
+    op.execute("ALTER TABLE audit_logs RENAME TO audit_logs_partitioned")
+    op.execute(
+        "ALTER TABLE audit_logs_partitioned RENAME CONSTRAINT audit_logs_pkey "
+        "TO audit_logs_partitioned_pkey"
+    )
+    for index in ("idx_audit_logs_time_id", "idx_audit_logs_user_time", "idx_audit_logs_resource"):
+        op.execute(f"DROP INDEX IF EXISTS {index}")
+    op.execute("""
+        CREATE TABLE audit_logs (
+            id            UUID         PRIMARY KEY,
+            user_id       UUID         REFERENCES users (id),
+            action        VARCHAR(50)  NOT NULL,
+            resource_type VARCHAR(100) NOT NULL,
+            resource_id   VARCHAR(255),
+            workspace_id  UUID,
+            ip_address    VARCHAR(45),
+            user_agent    VARCHAR(500),
+            request_id    VARCHAR(100),
+            details       JSONB        DEFAULT '{}',
+            "timestamp"   TIMESTAMP    NOT NULL DEFAULT now()
+        )
+    """)
+    op.execute(
+        f"INSERT INTO audit_logs ({AUDIT_COLUMNS}) SELECT {AUDIT_COLUMNS} FROM audit_logs_partitioned"
+    )
+    op.execute("DROP TABLE audit_logs_partitioned")
+    op.create_index("ix_audit_logs_timestamp",  "audit_logs", ["timestamp"])
+    op.create_index("idx_audit_logs_user_time", "audit_logs", ["user_id", "timestamp"])
+    op.create_index("idx_audit_logs_resource",  "audit_logs", ["resource_type", "resource_id"])
+    op.create_index("idx_audit_logs_time_id",   "audit_logs", ["timestamp", "id"])
+
+    op.execute("ALTER TABLE event_store RENAME TO event_store_partitioned")
+    op.execute(
+        "ALTER TABLE event_store_partitioned RENAME CONSTRAINT event_store_pkey "
+        "TO event_store_partitioned_pkey"
+    )
+    op.execute("""
+        CREATE TABLE event_store (
+            id              UUID         PRIMARY KEY,
+            aggregate_id    VARCHAR(255) NOT NULL,
+            aggregate_type  VARCHAR(100) NOT NULL,
+            event_type      VARCHAR(100) NOT NULL,
+            event_data      JSONB        NOT NULL,
+            sequence_number INTEGER      NOT NULL,
+            occurred_at     TIMESTAMP    NOT NULL DEFAULT now(),
+            extra           JSONB        DEFAULT '{}',
+            CONSTRAINT uq_event_sequence UNIQUE (aggregate_id, sequence_number)
+        )
+    """)
+    op.execute(
+        f"INSERT INTO event_store ({EVENT_COLUMNS}) "
+        f"SELECT {EVENT_COLUMNS} FROM event_store_partitioned"
+    )
+    op.execute("DROP TABLE event_store_partitioned")
+    op.create_index("idx_event_store_aggregate", "event_store", ["aggregate_id", "sequence_number"])
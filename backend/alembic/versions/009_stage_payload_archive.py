@@ -0,0 +1,29 @@
+"""Hot/cold tiering of pipeline stage payloads
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19 00:00:00.000000
+
+Schema only: pipelines.archived_at and pipeline_stages.payload_checksum.
+StageArchiver (services/stage_archive_service.py) moves the payloads of
+pipelines terminal for STAGE_ARCHIVE_AFTER_DAYS into the blob store, in
+small committed batches, once the API runs this revision.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "009"
+down_revision = "008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("pipelines", sa.Column("archived_at", sa.DateTime, nullable=True))
+    op.add_column("pipeline_stages", sa.Column("payload_checksum", sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    # Only once no stage is archived: the stubs are the sole pointers to those blobs
+    op.drop_column("pipeline_stages", "payload_checksum")
+    op.drop_column("pipelines", "archived_at")
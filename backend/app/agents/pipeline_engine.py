@@ -8,15 +8,21 @@ from datetime import datetime
 from typing import Any
 
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.agents.orchestrator import create_agent
+from app.agents.stage_writer import (
+    StageResult,
+    StageResultWriter,
+    StageWriteError,
+    save_stage_artifact,
+)
 from app.core.events import EventBus, PipelineEvent
 from app.core.notifications import NotificationService
+from app.core.outbox import commit_with_events
 from app.db.models import (
     AgentDomain,
     AgentLevel,
-    Artifact,
-    ArtifactType,
     Pipeline,
     PipelineStage,
     PipelineStatus,
@@ -83,6 +89,8 @@ class PipelineStateMachine:
         self.event_bus = EventBus.get_instance()
         self.notifications = NotificationService()
         self.context: dict[str, Any] = {}  # Shared context across stages
+        # Execution / review results are persisted behind the next agent call
+        self.results = StageResultWriter(pipeline_id, self.event_bus)
 
     async def run(self) -> None:
         """Execute the full pipeline"""
@@ -91,6 +99,17 @@ class PipelineStateMachine:
 
         logger.info(f"Starting pipeline {self.pipeline_id} for project {project.name}")
 
+        # Let workspace-scoped subscribers see this pipeline's events
+        self.event_bus.register_pipeline(self.pipeline_id, str(project.workspace_id))
+        # Continue this pipeline's event seq where an earlier run left off
+        await self.event_bus.replay.prime(self.pipeline_id)
+        try:
+            await self._run_stages(pipeline, project)
+        finally:
+            await self.results.close()
+            self.event_bus.release_pipeline(self.pipeline_id)
+
+    async def _run_stages(self, pipeline: Pipeline, project: Any) -> None:
         # Initialize context from project
         self.context = {
             "project_name": project.name,
@@ -114,19 +133,27 @@ class PipelineStateMachine:
             try:
                 success = await self._execute_stage(stage, pipeline)
                 if not success:
-                    await self._transition_pipeline(PipelineStatus.FAILED, pipeline)
+                    await self._transition_pipeline(
+                        PipelineStatus.FAILED, pipeline,
+                        self._pipeline_failed(
+                            stage, str(stage.rejection_reason or "Stage rejected")
+                        ),
+                    )
                     return
             except Exception as e:
                 logger.error(f"Pipeline {self.pipeline_id} failed at stage {stage.stage_type}: {e}")
                 await self._handle_stage_failure(stage, pipeline, str(e))
                 return
 
-        # All stages complete
+        # All stages complete — once their results are durable
+        try:
+            await self.results.flush()
+        except StageWriteError as e:
+            await self._handle_stage_failure(stages[-1], pipeline, str(e))
+            return
         pipeline.status = PipelineStatus.COMPLETED  # type: ignore[assignment]
         pipeline.completed_at = datetime.utcnow()  # type: ignore[assignment]
-        await self.db.commit()
-
-        await self.event_bus.publish(PipelineEvent(
+        await self._commit(PipelineEvent(
             pipeline_id=self.pipeline_id,
             event_type="pipeline_completed",
             data={"project_name": project.name}
@@ -141,9 +168,7 @@ class PipelineStateMachine:
         stage.status = PipelineStatus.RUNNING  # type: ignore[assignment]
         stage.started_at = datetime.utcnow()  # type: ignore[assignment]
         pipeline.current_stage = stage.stage_type
-        await self.db.commit()
-
-        await self.event_bus.publish(PipelineEvent(
+        await self._commit(PipelineEvent(
             pipeline_id=self.pipeline_id,
             stage_id=str(stage.id),
             event_type="stage_started",
@@ -157,43 +182,59 @@ class PipelineStateMachine:
                 agent = create_agent(stage.stage_type, self.pipeline_id, str(stage.id))  # type: ignore[arg-type]  # noqa: E501
                 output = await agent.execute(self.context)
 
-                # Store output and update context
-                stage.agent_output = output  # type: ignore[assignment]
                 self._update_context(stage.stage_type, output)  # type: ignore[arg-type]
 
-                # Handle approval stages
-                if stage.agent_level == AgentLevel.APPROVAL:
-                    approved = output.get("approved", False)
-                    if not approved:
-                        stage.status = PipelineStatus.REJECTED  # type: ignore[assignment]
-                        stage.rejection_reason = output.get(
-                            "approval_notes", "Rejected by approval agent"
-                        )
-                        await self.db.commit()
-
-                        # Notify for human intervention on rejection
-                        await self.notifications.send_rejection_alert(
-                            pipeline_id=self.pipeline_id,
-                            stage_type=str(stage.stage_type),
-                            reason=str(stage.rejection_reason) if stage.rejection_reason else None,
-                        )
-                        logger.warning(
-                            "Stage %s rejected: %s", stage.stage_type, stage.rejection_reason
-                        )
-                        return False
-
-                # Save artifact
-                await self._save_artifact(stage, output)
+                if stage.agent_level != AgentLevel.APPROVAL:
+                    # Persisted in the background while the next stage's agent runs
+                    status, completed_at = PipelineStatus.COMPLETED, datetime.utcnow()
+                    self.results.submit(StageResult(
+                        stage.id, stage.stage_type, output,  # type: ignore[arg-type]
+                        status, completed_at,
+                    ))
+                    # The writer owns the row now: update the engine's copy
+                    # without marking it dirty, so it is never written twice
+                    for key, value in (
+                        ("agent_output", output), ("status", status),
+                        ("completed_at", completed_at),
+                    ):
+                        set_committed_value(stage, key, value)
+                    return True
+
+                # Durability barrier: an approval decision is only recorded once
+                # the results it was made on are
+                await self.results.flush()
+                stage.agent_output = output  # type: ignore[assignment]
+                approved = output.get("approved", False)
+                if not approved:
+                    stage.status = PipelineStatus.REJECTED  # type: ignore[assignment]
+                    stage.rejection_reason = output.get(
+                        "approval_notes", "Rejected by approval agent"
+                    )
+                    await self._commit(PipelineEvent(
+                        pipeline_id=self.pipeline_id,
+                        stage_id=str(stage.id),
+                        event_type="stage_rejected",
+                        data={
+                            "stage_type": stage.stage_type,
+                            "reason": stage.rejection_reason,
+                        },
+                    ))
+
+                    # Notify for human intervention on rejection
+                    await self.notifications.send_rejection_alert(
+                        pipeline_id=self.pipeline_id,
+                        stage_type=str(stage.stage_type),
+                        reason=str(stage.rejection_reason) if stage.rejection_reason else None,
+                    )
+                    logger.warning(
+                        "Stage %s rejected: %s", stage.stage_type, stage.rejection_reason
+                    )
+                    return False
 
-                stage.status = (
-                    PipelineStatus.APPROVED  # type: ignore[assignment]
-                    if stage.agent_level == AgentLevel.APPROVAL
-                    else PipelineStatus.COMPLETED
-                )
+                await self._save_artifact(stage, output)
+                stage.status = PipelineStatus.APPROVED  # type: ignore[assignment]
                 stage.completed_at = datetime.utcnow()  # type: ignore[assignment]
-                await self.db.commit()
-
-                await self.event_bus.publish(PipelineEvent(
+                await self._commit(PipelineEvent(
                     pipeline_id=self.pipeline_id,
                     stage_id=str(stage.id),
                     event_type="stage_completed",
@@ -202,6 +243,8 @@ class PipelineStateMachine:
 
                 return True
 
+            except StageWriteError:
+                raise   # an earlier stage's result is lost: retrying this one won't help
             except Exception as e:
                 stage.retry_count += 1  # type: ignore[assignment]
                 logger.warning(f"Stage {stage.stage_type} attempt {attempt+1} failed: {e}")
@@ -237,41 +280,21 @@ class PipelineStateMachine:
 
     async def _save_artifact(self, stage: PipelineStage, output: dict[str, Any]) -> None:
         """Save immutable artifact for completed stage"""
-        artifact_type_mapping = {
-            StageType.ARCHITECTURE: ArtifactType.ARCHITECTURE_DOC,
-            StageType.DEVELOPMENT: ArtifactType.SOURCE_CODE,
-            StageType.TESTING: ArtifactType.TEST_SUITE,
-            StageType.SECURITY: ArtifactType.SECURITY_REPORT,
-            StageType.DEVOPS: ArtifactType.DOCKERFILE,
-        }
-        artifact_type = artifact_type_mapping.get(stage.stage_type)  # type: ignore[call-overload]
-        if not artifact_type:
-            return
+        await save_stage_artifact(self.db, stage, output)
 
-        import hashlib
-        import json
-        content = json.dumps(output)
-        checksum = hashlib.sha256(content.encode()).hexdigest()
-
-        artifact = Artifact(
-            pipeline_id=stage.pipeline_id,
-            stage_id=stage.id,
-            artifact_type=artifact_type,
-            name=f"{stage.stage_type}_{datetime.utcnow().isoformat()}",
-            content=content,
-            checksum=checksum,
-            is_immutable=stage.agent_level == AgentLevel.APPROVAL,
-        )
-        self.db.add(artifact)
-        await self.db.flush()
+    async def _commit(self, *events: PipelineEvent) -> None:
+        """Commit the session together with the events describing its changes."""
+        await commit_with_events(self.db, self.event_bus, *events)
 
-    async def _transition_pipeline(self, new_status: PipelineStatus, pipeline: Pipeline) -> None:
+    async def _transition_pipeline(
+        self, new_status: PipelineStatus, pipeline: Pipeline, *events: PipelineEvent
+    ) -> None:
         """Validate and apply state transition"""
         valid_next = self.VALID_TRANSITIONS.get(pipeline.status, [])  # type: ignore[call-overload]
         if new_status not in valid_next:
             raise ValueError(f"Invalid transition: {pipeline.status} → {new_status}")
         pipeline.status = new_status  # type: ignore[assignment]
-        await self.db.commit()
+        await self._commit(*events)
 
     async def _get_pipeline(self) -> Pipeline:
         from sqlalchemy import select
@@ -291,13 +314,21 @@ class PipelineStateMachine:
     ) -> None:
         stage.status = PipelineStatus.FAILED  # type: ignore[assignment]
         pipeline.status = PipelineStatus.FAILED  # type: ignore[assignment]
-        await self.db.commit()
+        await self._commit(self._pipeline_failed(stage, error))
         await self.notifications.send_failure_alert(
             pipeline_id=self.pipeline_id,
             stage_type=str(stage.stage_type),
             error=error,
         )
 
+    def _pipeline_failed(self, stage: PipelineStage, error: str) -> PipelineEvent:
+        return PipelineEvent(
+            pipeline_id=self.pipeline_id,
+            stage_id=str(stage.id),
+            event_type="pipeline_failed",
+            data={"stage_type": stage.stage_type, "error": error},
+        )
+
 
 async def create_pipeline_stages(
     pipeline: Pipeline, enabled_domains: list[str], deployment_enabled: bool, db: AsyncSession
@@ -0,0 +1,207 @@
+"""
+Write-behind persistence of stage results.
+
+Saving a stage's result — its artifact (JSON serialisation, SHA-256, blob
+store, file index), the stage row and the stage_completed event — used to
+happen between one agent call and the next. Stage N+1 only needs N's output
+in the engine's in-memory context, so the engine now submit()s the result to
+a StageResultWriter and starts the next agent call straight away; the writer
+persists results in submission order, in batches, on a session of its own.
+
+flush() is the durability barrier: it returns once every submitted result is
+committed, and raises StageWriteError if one could not be. The engine
+flushes before an approval decision is recorded and before the pipeline is
+marked completed, so neither can become visible ahead of the results it
+rests on. Once a write fails the writer stops; the results queued behind it
+are dropped and the pipeline fails at the next barrier.
+
+stage_completed is published when the result is durable, which may be after
+the next stage's stage_started.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+from collections import deque
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import write_session
+from app.core.events import EventBus, PipelineEvent
+from app.core.outbox import commit_with_events
+from app.db.models import (
+    AgentLevel,
+    Artifact,
+    ArtifactType,
+    PipelineStage,
+    PipelineStatus,
+    StageType,
+)
+from app.services.artifact_blob_service import ArtifactBlobService, is_blob_backed
+from app.services.artifact_file_service import ArtifactFileService
+
+logger = logging.getLogger(__name__)
+
+SessionFactory = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+
+ARTIFACT_TYPES = {
+    StageType.ARCHITECTURE: ArtifactType.ARCHITECTURE_DOC,
+    StageType.DEVELOPMENT: ArtifactType.SOURCE_CODE,
+    StageType.TESTING: ArtifactType.TEST_SUITE,
+    StageType.SECURITY: ArtifactType.SECURITY_REPORT,
+    StageType.DEVOPS: ArtifactType.DOCKERFILE,
+}
+
+
+async def save_stage_artifact(
+    db: AsyncSession, stage: PipelineStage, output: dict[str, Any]
+) -> None:
+    """Save the immutable artifact of a completed stage; the caller commits."""
+    artifact_type = ARTIFACT_TYPES.get(stage.stage_type)  # type: ignore[call-overload]
+    if not artifact_type:
+        return
+
+    content = json.dumps(output)
+    checksum = hashlib.sha256(content.encode()).hexdigest()
+
+    # Retries and re-runs are new versions of the pipeline's artifact of this type
+    result = await db.execute(
+        select(Artifact.version, Artifact.checksum, Artifact.file_path)
+        .where(
+            Artifact.pipeline_id == stage.pipeline_id,
+            Artifact.artifact_type == artifact_type,
+        )
+        .order_by(Artifact.version.desc())
+        .limit(1)
+    )
+    previous = result.first()
+
+    artifact = Artifact(
+        pipeline_id=stage.pipeline_id,
+        stage_id=stage.id,
+        artifact_type=artifact_type,
+        name=f"{stage.stage_type}_{datetime.utcnow().isoformat()}",
+        content=content,
+        checksum=checksum,
+        size_bytes=len(content.encode()),
+        version=previous.version + 1 if previous else 1,
+        is_immutable=stage.agent_level == AgentLevel.APPROVAL,
+    )
+    blobs = ArtifactBlobService(db)
+    if blobs.enabled:
+        # Body goes to the compressed, deduplicated blob store instead of the
+        # row — as a delta against the previous version where that pays off
+        base = previous.checksum if previous and is_blob_backed(previous) else None
+        ref = await blobs.store_body(content, base=base)
+        artifact.content = None  # type: ignore[assignment]
+        artifact.file_path = ref.file_path  # type: ignore[assignment]
+    db.add(artifact)
+    await db.flush()
+    # Generated source / tests: one path-addressable row per file as well
+    if await ArtifactFileService(db, blobs.store).index(artifact, output):
+        await db.flush()
+
+
+class StageWriteError(RuntimeError):
+    """An earlier stage's result could not be persisted."""
+
+
+@dataclass
+class StageResult:
+    stage_id:     UUID
+    stage_type:   StageType
+    output:       dict[str, Any]
+    status:       PipelineStatus
+    completed_at: datetime
+
+
+class StageResultWriter:
+    def __init__(
+        self,
+        pipeline_id: str,
+        bus: EventBus | None = None,
+        session_factory: SessionFactory | None = None,
+    ) -> None:
+        self.pipeline_id = pipeline_id
+        self.bus = bus or EventBus.get_instance()
+        self.written = 0
+        self._session_factory = session_factory or write_session
+        self._queue: deque[StageResult] = deque()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._task: asyncio.Task | None = None
+        self._error: Exception | None = None
+
+    @property
+    def pending(self) -> int:
+        return len(self._queue)
+
+    def submit(self, result: StageResult) -> None:
+        """Queue a result for persistence. O(1); never waits on the database."""
+        if self._error is not None:
+            raise StageWriteError(str(self._error)) from self._error
+        self._queue.append(result)
+        self._idle.clear()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def flush(self) -> None:
+        """Durability barrier: wait until every submitted result is committed."""
+        await self._idle.wait()
+        if self._error is not None:
+            raise StageWriteError(str(self._error)) from self._error
+
+    async def close(self) -> None:
+        """Flush, logging rather than raising a failed write (pipeline teardown)."""
+        try:
+            await self.flush()
+        except StageWriteError as exc:
+            logger.error("Pipeline %s: stage results lost: %s", self.pipeline_id, exc)
+
+    async def _run(self) -> None:
+        try:
+            while self._queue and self._error is None:
+                batch = list(self._queue)
+                try:
+                    await self._write(batch)
+                except Exception as exc:
+                    logger.error(
+                        "Pipeline %s: stage result write failed: %s", self.pipeline_id, exc
+                    )
+                    self._error = exc
+                    self._queue.clear()
+                    break
+                for _ in batch:
+                    self._queue.popleft()
+                self.written += len(batch)
+        finally:
+            self._idle.set()
+
+    async def _write(self, batch: list[StageResult]) -> None:
+        """Persist a batch of results and their stage_completed events in one transaction."""
+        events: list[PipelineEvent] = []
+        async with self._session_factory() as db:
+            for result in batch:
+                stage = await db.get(PipelineStage, result.stage_id)
+                if stage is None:
+                    raise LookupError(f"stage {result.stage_id} no longer exists")
+                stage.agent_output = result.output  # type: ignore[assignment]
+                await save_stage_artifact(db, stage, result.output)
+                stage.status = result.status  # type: ignore[assignment]
+                stage.completed_at = result.completed_at  # type: ignore[assignment]
+                events.append(PipelineEvent(
+                    pipeline_id=self.pipeline_id,
+                    stage_id=str(result.stage_id),
+                    event_type="stage_completed",
+                    data={"stage_type": result.stage_type, "status": result.status},
+                ))
+            await commit_with_events(db, self.bus, *events)
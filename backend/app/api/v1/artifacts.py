@@ -1,31 +1,44 @@
 """Artifacts API — /api/v1/artifacts/"""
 from __future__ import annotations
 
+import asyncio
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import PlainTextResponse
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
 
 from app.core.auth import CurrentUserID
 from app.core.database import get_read_db, get_write_db
+from app.core.downloads import serve_body
+from app.core.pagination import keyset_page
 from app.db.models import Artifact, ArtifactType
-from app.schemas.pipeline import ArtifactRead
+from app.schemas.pipeline import ArtifactList, ArtifactRead, ArtifactSummary
+from app.services.artifact_blob_service import ArtifactBlobService, is_blob_backed
+from app.services.artifact_file_service import diffable_files, unified_diff
 
 router = APIRouter()
 
 
-@router.get("", response_model=list[ArtifactRead])
+@router.get("", response_model=ArtifactList)
 async def list_all_artifacts(
     user_id: CurrentUserID,
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    size: int = Query(50, ge=1, le=200),
     db: AsyncSession = Depends(get_read_db),
 ):
-    """Return all artifacts the current user has access to (across their pipelines)."""
-    result = await db.execute(
-        select(Artifact).order_by(Artifact.created_at.desc()).limit(200)
+    """Return all artifacts the current user has access to (across their pipelines).
+
+    Newest first; when more remain, next_cursor holds the cursor for the
+    next page.
+    """
+    rows, next_cursor = await keyset_page(
+        db, select(Artifact), Artifact.created_at, Artifact.id, cursor, size
     )
-    return [ArtifactRead.model_validate(a) for a in result.scalars()]
+    items = [ArtifactSummary.model_validate(a) for a in rows]
+    return ArtifactList(items=items, size=size, next_cursor=next_cursor)
 
 
 @router.get("/{artifact_id}", response_model=ArtifactRead)
@@ -34,36 +47,50 @@ async def get_artifact(
     user_id: CurrentUserID,
     db: AsyncSession = Depends(get_read_db),
 ):
-    result = await db.execute(select(Artifact).where(Artifact.id == artifact_id))
+    result = await db.execute(
+        select(Artifact).where(Artifact.id == artifact_id).options(undefer(Artifact.content))
+    )
     artifact = result.scalar_one_or_none()
     if not artifact:
         raise HTTPException(status_code=404, detail="Artifact not found")
-    return ArtifactRead.model_validate(artifact)
+    body = await ArtifactBlobService(db).read_body(artifact)
+    return ArtifactRead.model_validate(artifact).model_copy(update={"content": body})
 
 
 @router.get("/{artifact_id}/download")
 async def download_artifact(
     artifact_id: UUID,
+    request: Request,
     user_id: CurrentUserID,
     db: AsyncSession = Depends(get_read_db),
 ):
-    """Stream artifact content or return a pre-signed URL for binary artifacts."""
-    result = await db.execute(select(Artifact).where(Artifact.id == artifact_id))
+    """Stream artifact content or return a pre-signed URL for binary artifacts.
+
+    Supports single byte ranges (resumable downloads) and conditional GETs on
+    the content checksum; locked artifacts are cacheable forever. Clients that
+    accept zstd get a locally stored blob as-is, via sendfile.
+    """
+    result = await db.execute(
+        select(Artifact).where(Artifact.id == artifact_id).options(undefer(Artifact.content))
+    )
     artifact = result.scalar_one_or_none()
     if not artifact:
         raise HTTPException(status_code=404, detail="Artifact not found")
 
-    if artifact.content:
+    if is_blob_backed(artifact) or artifact.content:
         # Text artifact — stream directly
-        content_bytes = artifact.content.encode()
-        media_type = _media_type(artifact.artifact_type)  # type: ignore[arg-type]
-        return StreamingResponse(
-            iter([content_bytes]),
-            media_type=media_type,
-            headers={
-                "Content-Disposition": f'attachment; filename="{artifact.name}"',
-                "Content-Length": str(len(content_bytes)),
-            },
+        blobs = ArtifactBlobService(db)
+        size, opener = await blobs.open_body(artifact)
+        stored = await blobs.stored_path(artifact)
+        return serve_body(
+            request,
+            size=size,
+            checksum=artifact.checksum,  # type: ignore[arg-type]
+            opener=opener,
+            media_type=_media_type(artifact.artifact_type),  # type: ignore[arg-type]
+            filename=artifact.name,  # type: ignore[arg-type]
+            immutable=bool(artifact.is_immutable),
+            encoded=(stored, "zstd") if stored else None,
         )
 
     # Binary artifact stored on object storage — return redirect URL
@@ -75,7 +102,74 @@ async def download_artifact(
     }
 
 
-@router.post("/{artifact_id}/lock", response_model=ArtifactRead)
+@router.get("/{artifact_id}/versions", response_model=list[ArtifactSummary])
+async def list_artifact_versions(
+    artifact_id: UUID,
+    user_id: CurrentUserID,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Every version of this artifact — the pipeline's artifacts of the same type."""
+    artifact = await db.get(Artifact, artifact_id)
+    if not artifact:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    result = await db.execute(
+        select(Artifact)
+        .where(
+            Artifact.pipeline_id == artifact.pipeline_id,
+            Artifact.artifact_type == artifact.artifact_type,
+        )
+        .order_by(Artifact.version)
+    )
+    return [ArtifactSummary.model_validate(a) for a in result.scalars()]
+
+
+@router.get("/{artifact_id}/diff", response_class=PlainTextResponse)
+async def diff_artifact(
+    artifact_id: UUID,
+    user_id: CurrentUserID,
+    from_version: int | None = Query(None, ge=1, description="Defaults to the previous version"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Unified diff from another version of this artifact to this one.
+
+    Generated source and test files are diffed file by file.
+    """
+    result = await db.execute(
+        select(Artifact).where(Artifact.id == artifact_id).options(undefer(Artifact.content))
+    )
+    artifact = result.scalar_one_or_none()
+    if not artifact:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+    version = from_version or artifact.version - 1
+    if version < 1:
+        raise HTTPException(status_code=404, detail="No earlier version to diff against")
+    result = await db.execute(
+        select(Artifact)
+        .where(
+            Artifact.pipeline_id == artifact.pipeline_id,
+            Artifact.artifact_type == artifact.artifact_type,
+            Artifact.version == version,
+        )
+        .options(undefer(Artifact.content))
+        .limit(1)
+    )
+    base = result.scalar_one_or_none()
+    if not base:
+        raise HTTPException(status_code=404, detail=f"Version {version} not found")
+
+    blobs = ArtifactBlobService(db)
+    old, new = await blobs.read_body(base), await blobs.read_body(artifact)
+    artifact_type = artifact.artifact_type
+    diff = await asyncio.to_thread(
+        lambda: unified_diff(
+            diffable_files(artifact_type, old or ""),  # type: ignore[arg-type]
+            diffable_files(artifact_type, new or ""),  # type: ignore[arg-type]
+        )
+    )
+    return PlainTextResponse(diff, media_type="text/x-diff")
+
+
+@router.post("/{artifact_id}/lock", response_model=ArtifactSummary)
 async def lock_artifact(
     artifact_id: UUID,
     user_id: CurrentUserID,
@@ -92,7 +186,7 @@ async def lock_artifact(
     artifact.is_immutable = True  # type: ignore[assignment]
     await db.commit()
     await db.refresh(artifact)
-    return ArtifactRead.model_validate(artifact)
+    return ArtifactSummary.model_validate(artifact)
 
 
 @router.delete("/{artifact_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -109,6 +203,7 @@ async def delete_artifact(
     if artifact.is_immutable:
         raise HTTPException(status_code=403, detail="Immutable artifacts cannot be deleted")
 
+    await ArtifactBlobService(db).release_artifact(artifact)
     await db.delete(artifact)
     await db.commit()
 
@@ -3,52 +3,85 @@ from __future__ import annotations
 
 import asyncio
 from datetime import UTC, datetime
+from typing import Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import desc, func, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.auth import CurrentUserID
-from app.core.database import get_read_db, get_write_db
+from app.core.cache import (
+    CachedView,
+    cached,
+    invalidate,
+    pipeline_scope,
+    project_pipelines_scope,
+    project_scope,
+)
+from app.core.database import get_read_db, get_write_db, reads_own_writes
+from app.core.downloads import serve_body
+from app.core.pagination import cached_total, keyset_page
 from app.db.models import (
     ApprovalRequest,
     Artifact,
     Pipeline,
+    PipelineStage,
     PipelineStatus,
     Project,
 )
 from app.schemas.pipeline import (
     ApprovalAction,
+    ApprovalList,
     ApprovalRead,
-    ArtifactRead,
+    ArtifactFileRead,
+    ArtifactSummary,
     PipelineCreate,
     PipelineList,
     PipelineRead,
+    StagePayloadRead,
 )
+from app.services.artifact_blob_service import ArtifactBlobService
+from app.services.artifact_bundle_service import ArtifactBundleService
+from app.services.artifact_file_service import ArtifactFileService, media_type
+from app.services.pipeline_service import publish_approval_event
+from app.services.stage_archive_service import StageArchiveService
 
 router = APIRouter()
 
+_PIPELINE = CachedView("pipeline", PipelineRead)
+_PIPELINES_FIRST_PAGE = CachedView("pipelines", PipelineList)
+
 
 # ── Pipelines ─────────────────────────────────────────────────────────────────
 
 @router.get("/projects/{project_id}/pipelines", response_model=PipelineList)
 async def list_pipelines(
     project_id: UUID,
-    page: int = Query(1, ge=1),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
     size: int = Query(20, ge=1, le=100),
+    include_total: bool = Query(False),
     user_id: CurrentUserID | None = None,
     db: AsyncSession = Depends(get_read_db),
+    own_writes: bool = Depends(reads_own_writes),
 ):
-    offset = (page - 1) * size
     q = select(Pipeline).where(Pipeline.project_id == project_id)
 
-    total_q = await db.execute(select(func.count()).select_from(q.subquery()))
-    total = total_q.scalar_one()
-
-    result = await db.execute(q.order_by(desc(Pipeline.created_at)).offset(offset).limit(size))
-    items = [PipelineRead.model_validate(p) for p in result.scalars()]
-    return PipelineList(items=items, total=total, page=page, size=size)
+    async def load() -> PipelineList:
+        rows, next_cursor = await keyset_page(
+            db, q, Pipeline.created_at, Pipeline.id, cursor, size
+        )
+        total = await cached_total(db, q, f"pipelines:{project_id}") if include_total else None
+        items = [PipelineRead.model_validate(p) for p in rows]
+        return PipelineList(items=items, size=size, next_cursor=next_cursor, total=total)
+
+    # Only the first page is hot (the project view polls it)
+    if cursor is not None or include_total:
+        return await load()
+    return await cached(
+        _PIPELINES_FIRST_PAGE, (project_id, size), [project_pipelines_scope(project_id)],
+        load, bypass=own_writes,
+    )
 
 
 @router.post("/projects/{project_id}/pipelines", response_model=PipelineRead, status_code=201)
@@ -71,6 +104,7 @@ async def create_pipeline(
     db.add(pipeline)
     await db.commit()
     await db.refresh(pipeline)
+    await invalidate(project_pipelines_scope(project_id), project_scope(project_id))
 
     # Kick off pipeline orchestration in background
     asyncio.create_task(_run_pipeline(str(pipeline.id)))
@@ -91,12 +125,18 @@ async def get_pipeline(
     pipeline_id: UUID,
     user_id: CurrentUserID,
     db: AsyncSession = Depends(get_read_db),
+    own_writes: bool = Depends(reads_own_writes),
 ):
-    result = await db.execute(select(Pipeline).where(Pipeline.id == pipeline_id))
-    pipeline = result.scalar_one_or_none()
-    if not pipeline:
+    async def load() -> PipelineRead | None:
+        result = await db.execute(select(Pipeline).where(Pipeline.id == pipeline_id))
+        pipeline = result.scalar_one_or_none()
+        return PipelineRead.model_validate(pipeline) if pipeline else None
+
+    read = await cached(_PIPELINE, (pipeline_id,), [pipeline_scope(pipeline_id)], load,
+                        bypass=own_writes)
+    if read is None:
         raise HTTPException(status_code=404, detail="Pipeline not found")
-    return PipelineRead.model_validate(pipeline)
+    return read
 
 
 @router.post("/{pipeline_id}/cancel", response_model=PipelineRead)
@@ -119,6 +159,7 @@ async def cancel_pipeline(
     pipeline.completed_at = datetime.now(UTC)  # type: ignore[assignment]
     await db.commit()
     await db.refresh(pipeline)
+    await invalidate(pipeline_scope(pipeline_id), project_pipelines_scope(pipeline.project_id))
     return PipelineRead.model_validate(pipeline)
 
 
@@ -128,7 +169,10 @@ async def retry_pipeline(
     user_id: CurrentUserID,
     db: AsyncSession = Depends(get_write_db),
 ):
-    result = await db.execute(select(Pipeline).where(Pipeline.id == pipeline_id))
+    # Locked: waits out an archival batch that holds this pipeline
+    result = await db.execute(
+        select(Pipeline).where(Pipeline.id == pipeline_id).with_for_update()
+    )
     pipeline = result.scalar_one_or_none()
     if not pipeline:
         raise HTTPException(status_code=404, detail="Not found")
@@ -141,25 +185,48 @@ async def retry_pipeline(
     pipeline.current_stage = None  # type: ignore[assignment]
     pipeline.started_at = None  # type: ignore[assignment]
     pipeline.completed_at = None  # type: ignore[assignment]
+    # The engine updates stages in place: bring archived payloads back first
+    await StageArchiveService(db).restore(pipeline)
     await db.commit()
     await db.refresh(pipeline)
+    await invalidate(pipeline_scope(pipeline_id), project_pipelines_scope(pipeline.project_id))
     asyncio.create_task(_run_pipeline(str(pipeline.id)))
     return PipelineRead.model_validate(pipeline)
 
 
+@router.get("/{pipeline_id}/stages/{stage_id}/payload", response_model=StagePayloadRead)
+async def get_stage_payload(
+    pipeline_id: UUID,
+    stage_id: UUID,
+    user_id: CurrentUserID,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """A stage's agent, review and approval output — from cold storage if archived."""
+    stage = await db.get(PipelineStage, stage_id)
+    if not stage or stage.pipeline_id != pipeline_id:
+        raise HTTPException(status_code=404, detail="Stage not found")
+    payload = await StageArchiveService(db).payload(stage)
+    return StagePayloadRead(
+        stage_id=stage.id, archived=stage.payload_checksum is not None, **payload
+    )
+
+
 # ── Approvals ─────────────────────────────────────────────────────────────────
 
-@router.get("/approvals/pending", response_model=list[ApprovalRead])
+@router.get("/approvals/pending", response_model=ApprovalList)
 async def list_pending_approvals(
     user_id: CurrentUserID,
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    size: int = Query(50, ge=1, le=200),
     db: AsyncSession = Depends(get_read_db),
 ):
-    result = await db.execute(
-        select(ApprovalRequest)
-        .where(ApprovalRequest.status == "pending")
-        .order_by(desc(ApprovalRequest.created_at))
+    rows, next_cursor = await keyset_page(
+        db,
+        select(ApprovalRequest).where(ApprovalRequest.status == "pending"),
+        ApprovalRequest.created_at, ApprovalRequest.id, cursor, size,
     )
-    return [ApprovalRead.model_validate(a) for a in result.scalars()]
+    items = [ApprovalRead.model_validate(a) for a in rows]
+    return ApprovalList(items=items, size=size, next_cursor=next_cursor)
 
 
 @router.post("/approvals/{approval_id}/approve", response_model=ApprovalRead)
@@ -211,12 +278,13 @@ async def _decide(
 
     await db.commit()
     await db.refresh(approval)
+    await publish_approval_event(db, approval, "approval_decided", {"decision": decision})
     return ApprovalRead.model_validate(approval)
 
 
 # ── Artifacts ─────────────────────────────────────────────────────────────────
 
-@router.get("/{pipeline_id}/artifacts", response_model=list[ArtifactRead])
+@router.get("/{pipeline_id}/artifacts", response_model=list[ArtifactSummary])
 async def list_artifacts(
     pipeline_id: UUID,
     user_id: CurrentUserID,
@@ -226,4 +294,63 @@ async def list_artifacts(
         select(Artifact).where(Artifact.pipeline_id == pipeline_id)
         .order_by(Artifact.created_at)
     )
-    return [ArtifactRead.model_validate(a) for a in result.scalars()]
+    return [ArtifactSummary.model_validate(a) for a in result.scalars()]
+
+
+@router.get("/{pipeline_id}/artifacts/bundle")
+async def download_artifact_bundle(
+    pipeline_id: UUID,
+    request: Request,
+    user_id: CurrentUserID,
+    format: Literal["zip", "tar.gz"] = Query("zip"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """All of the pipeline's artifacts as one streamed zip or tar.gz.
+
+    Generated source and test files are unpacked into a directory tree; the
+    raw artifact bodies sit alongside under _artifacts/.
+    """
+    result = await db.execute(
+        select(Artifact).where(Artifact.pipeline_id == pipeline_id)
+        .order_by(Artifact.created_at.desc(), Artifact.id.desc())
+    )
+    artifacts = result.scalars().all()
+    if not artifacts:
+        raise HTTPException(status_code=404, detail="Pipeline has no artifacts")
+    return ArtifactBundleService().response(
+        request, f"pipeline-{pipeline_id}", artifacts, format
+    )
+
+
+@router.get("/{pipeline_id}/files", response_model=list[ArtifactFileRead])
+async def list_pipeline_files(
+    pipeline_id: UUID,
+    user_id: CurrentUserID,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """The pipeline's generated source and test files (latest version of each path)."""
+    files = await ArtifactFileService(db).tree(pipeline_id)
+    return [ArtifactFileRead.model_validate(f) for f in files]
+
+
+@router.get("/{pipeline_id}/files/{path:path}")
+async def get_pipeline_file(
+    pipeline_id: UUID,
+    path: str,
+    request: Request,
+    user_id: CurrentUserID,
+    db: AsyncSession = Depends(get_read_db),
+):
+    """One generated file's body, by path. Supports Range and If-None-Match."""
+    file = await ArtifactFileService(db).get(pipeline_id, path)
+    if not file:
+        raise HTTPException(status_code=404, detail="File not found")
+    size, opener = await ArtifactBlobService(db).open_body(file)
+    return serve_body(
+        request,
+        size=size,
+        checksum=file.checksum,  # type: ignore[arg-type]
+        opener=opener,
+        media_type=media_type(path),
+        filename=path.rsplit("/", 1)[-1],
+    )
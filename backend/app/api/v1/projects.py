@@ -8,12 +8,22 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.auth import CurrentUserID
-from app.core.database import get_read_db, get_write_db
+from app.core.cache import (
+    CachedView,
+    cached,
+    invalidate,
+    project_pipelines_scope,
+    project_scope,
+    workspace_scope,
+)
+from app.core.database import get_read_db, get_write_db, reads_own_writes
 from app.db.models import Pipeline, Project, Workspace
 from app.schemas.workspace import ProjectCreate, ProjectRead
 
 router = APIRouter()
 
+_PROJECT = CachedView("project", ProjectRead)
+
 
 def _to_read(p: Project, pipeline_count: int = 0) -> ProjectRead:
     return ProjectRead(
@@ -27,20 +37,27 @@ def _to_read(p: Project, pipeline_count: int = 0) -> ProjectRead:
     )
 
 
+def _with_pipeline_count():
+    """Projects with their pipeline count in one GROUP BY query, however many rows match."""
+    return (
+        select(Project, func.count(Pipeline.id))
+        .outerjoin(Pipeline, Pipeline.project_id == Project.id)
+        .group_by(Project.id)
+    )
+
+
 @router.get("/workspaces/{workspace_id}/projects", response_model=list[ProjectRead])
 async def list_projects(
     workspace_id: UUID,
     user_id: CurrentUserID,
     db: AsyncSession = Depends(get_read_db),
 ):
-    result = await db.execute(select(Project).where(Project.workspace_id == workspace_id))
-    projects = list(result.scalars())
-
-    out = []
-    for proj in projects:
-        cnt = await db.execute(select(func.count()).where(Pipeline.project_id == proj.id))
-        out.append(_to_read(proj, cnt.scalar_one()))
-    return out
+    result = await db.execute(
+        _with_pipeline_count()
+        .where(Project.workspace_id == workspace_id)
+        .order_by(Project.created_at)
+    )
+    return [_to_read(proj, count) for proj, count in result.all()]
 
 
 @router.post("/workspaces/{workspace_id}/projects", response_model=ProjectRead, status_code=201)
@@ -65,6 +82,7 @@ async def create_project(
     db.add(proj)
     await db.commit()
     await db.refresh(proj)
+    await invalidate(workspace_scope(workspace_id))
     return _to_read(proj)
 
 
@@ -73,13 +91,18 @@ async def get_project(
     project_id: UUID,
     user_id: CurrentUserID,
     db: AsyncSession = Depends(get_read_db),
+    own_writes: bool = Depends(reads_own_writes),
 ):
-    result = await db.execute(select(Project).where(Project.id == project_id))
-    proj = result.scalar_one_or_none()
-    if not proj:
+    async def load() -> ProjectRead | None:
+        result = await db.execute(_with_pipeline_count().where(Project.id == project_id))
+        row = result.first()
+        return _to_read(*row) if row else None
+
+    read = await cached(_PROJECT, (project_id,), [project_scope(project_id)], load,
+                        bypass=own_writes)
+    if read is None:
         raise HTTPException(status_code=404, detail="Project not found")
-    cnt = await db.execute(select(func.count()).where(Pipeline.project_id == proj.id))
-    return _to_read(proj, cnt.scalar_one())
+    return read
 
 
 @router.patch("/{project_id}", response_model=ProjectRead)
@@ -98,6 +121,7 @@ async def update_project(
     proj.tech_stack = payload.tech_stack or proj.tech_stack  # type: ignore[assignment]
     await db.commit()
     await db.refresh(proj)
+    await invalidate(project_scope(project_id))
     return _to_read(proj)
 
 
@@ -111,5 +135,10 @@ async def delete_project(
     proj = result.scalar_one_or_none()
     if not proj:
         raise HTTPException(status_code=404, detail="Not found")
+    workspace_id = proj.workspace_id
     await db.delete(proj)
     await db.commit()
+    await invalidate(
+        project_scope(project_id), project_pipelines_scope(project_id),
+        workspace_scope(workspace_id),
+    )
@@ -6,14 +6,24 @@ from __future__ import annotations
 
 import uuid
 from collections.abc import AsyncGenerator
-from typing import Any
+from datetime import UTC, datetime
+from typing import Any, Literal
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel, Field
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.auth import require_roles
 from app.core.config import settings
+from app.core.pagination import keyset_page
+from app.db.models import AuditAction, AuditLog, EventStore
 from app.db.session import write_session_dep as _write_session_dep
+from app.services.export_service import (
+    AUDIT_EXPORT,
+    EVENT_EXPORT,
+    ExportService,
+)
 
 
 async def get_db() -> AsyncGenerator[AsyncSession | None, None]:
@@ -317,9 +327,100 @@ async def workspace_metrics(workspace_id: str) -> dict[str, Any]:
 
 @router.get("/metrics/audit", tags=["metrics"])
 async def audit_log(
-    limit: int = Query(default=50, le=500),
-    offset: int = Query(default=0),
-    event_type: str | None = Query(default=None),
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = Query(default=None, description="next_cursor of the previous page"),
+    event_type: AuditAction | None = Query(default=None),
+    since: datetime | None = Query(default=None, description="Oldest timestamp (UTC)"),
+    until: datetime | None = Query(default=None, description="Newest timestamp (UTC)"),
     db: AsyncSession = Depends(get_db),
 ) -> dict[str, Any]:
-    return {"events": [], "total": 0, "limit": limit, "offset": offset}
+    """Audit trail, newest first, keyset-paginated on (timestamp, id).
+
+    audit_logs is partitioned by month on timestamp: since/until (and the
+    cursor) restrict the scan to the partitions they cover.
+    """
+    if db is None:
+        return {"events": [], "limit": limit, "next_cursor": None}
+    q = select(AuditLog)
+    if event_type is not None:
+        q = q.where(AuditLog.action == event_type)
+    # audit_logs.timestamp is a naive UTC column
+    if since is not None:
+        q = q.where(AuditLog.timestamp >= _naive_utc(since))
+    if until is not None:
+        q = q.where(AuditLog.timestamp < _naive_utc(until))
+    rows, next_cursor = await keyset_page(db, q, AuditLog.timestamp, AuditLog.id, cursor, limit)
+    events = [
+        {
+            "id": str(row.id),
+            "user_id": str(row.user_id) if row.user_id else None,
+            "action": row.action,
+            "resource_type": row.resource_type,
+            "resource_id": row.resource_id,
+            "workspace_id": str(row.workspace_id) if row.workspace_id else None,
+            "details": row.details or {},
+            "timestamp": row.timestamp.isoformat(),
+        }
+        for row in rows
+    ]
+    return {"events": events, "limit": limit, "next_cursor": next_cursor}
+
+
+def _naive_utc(moment: datetime) -> datetime:
+    return moment.astimezone(UTC).replace(tzinfo=None) if moment.tzinfo else moment
+
+
+# ── Bulk exports ──────────────────────────────────────────────────────────────
+
+ExportFormat = Literal["ndjson", "csv", "parquet", "arrow"]
+
+
+async def _export(source, fmt: str, filters: list[Any], cursor: str | None):
+    return await ExportService().response(source, fmt, filters, cursor)
+
+
+@router.get("/metrics/audit/export", tags=["metrics"])
+async def export_audit_log(
+    format: ExportFormat = Query(default="ndjson"),
+    cursor: str | None = Query(default=None, description="X-Next-Cursor of the previous page"),
+    event_type: AuditAction | None = Query(default=None),
+    since: datetime | None = Query(default=None, description="Oldest timestamp (UTC)"),
+    until: datetime | None = Query(default=None, description="Newest timestamp (UTC)"),
+    user=require_roles("owner", "admin"),
+):
+    """The audit trail, oldest first, as a streamed NDJSON / CSV / Parquet / Arrow download.
+
+    One calendar month per response; pass X-Next-Cursor back as
+    `cursor` for the next page.
+    """
+    filters: list[Any] = []
+    if event_type is not None:
+        filters.append(AuditLog.action == event_type)
+    if since is not None:
+        filters.append(AuditLog.timestamp >= _naive_utc(since))
+    if until is not None:
+        filters.append(AuditLog.timestamp < _naive_utc(until))
+    return await _export(AUDIT_EXPORT, format, filters, cursor)
+
+
+@router.get("/metrics/events/export", tags=["metrics"])
+async def export_pipeline_events(
+    format: ExportFormat = Query(default="ndjson"),
+    cursor: str | None = Query(default=None, description="X-Next-Cursor of the previous page"),
+    pipeline_id: str | None = Query(default=None),
+    event_type: str | None = Query(default=None),
+    since: datetime | None = Query(default=None, description="Oldest occurred_at (UTC)"),
+    until: datetime | None = Query(default=None, description="Newest occurred_at (UTC)"),
+    user=require_roles("owner", "admin"),
+):
+    """Pipeline event history (the EventStore), oldest first, as a streamed download."""
+    filters: list[Any] = []
+    if pipeline_id is not None:
+        filters.append(EventStore.aggregate_id == pipeline_id)
+    if event_type is not None:
+        filters.append(EventStore.event_type == event_type)
+    if since is not None:
+        filters.append(EventStore.occurred_at >= _naive_utc(since))
+    if until is not None:
+        filters.append(EventStore.occurred_at < _naive_utc(until))
+    return await _export(EVENT_EXPORT, format, filters, cursor)
@@ -1,57 +1,337 @@
 """
 WebSocket API - Real-time pipeline tracking
 Broadcasts pipeline events to connected clients via WebSocket
+
+  /ws/pipeline/{id}  one socket per pipeline
+  /ws/stream         one multiplexed socket; the client sends
+                       {"op": "subscribe",   "topic": "pipeline:<id>", "last_event_id": 41}
+                       {"op": "subscribe",   "topic": "workspace:<id>"}
+                       {"op": "subscribe",   "topic": "approvals"}
+                       {"op": "unsubscribe", "topic": "pipeline:<id>"}
+                     and receives subscribed / unsubscribed / error acks, then
+                     event frames tagged with the topic's pipeline_id and seq.
+
+Pipeline and workspace topics require membership of the workspace they belong
+to; the approvals topic only delivers approvals from the user's workspaces.
 """
 import asyncio
+import json
 import logging
+from collections import Counter, deque
+from collections.abc import Callable
+from typing import Any
+from uuid import UUID
 
 from fastapi import APIRouter, Query, Response, WebSocket, WebSocketDisconnect
 from fastapi.websockets import WebSocketState
 
 from app.core.auth import verify_ws_token
-from app.core.events import EventBus, PipelineEvent
+from app.core.config import settings
+from app.core.database import read_session
+from app.core.events import (
+    APPROVALS_TOPIC,
+    EventBus,
+    OverflowPolicy,
+    PipelineEvent,
+    pipeline_topic,
+)
+from app.core.replay import event_message
+from app.services.workspace_service import WorkspaceService
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+try:
+    import orjson
+
+    def encode_frame(message: dict[str, Any]) -> str:
+        return orjson.dumps(message, default=str).decode()
+except ImportError:
+    def encode_frame(message: dict[str, Any]) -> str:
+        return json.dumps(message, separators=(",", ":"), default=str)
+
+
+HEARTBEAT_FRAME = encode_frame({"type": "heartbeat"})
+SLOW_CONSUMER_CLOSE_CODE = 1013   # "try again later" — client resumes via last_event_id
+FORBIDDEN_CLOSE_CODE = 4003
+TOPIC_PREFIXES = ("pipeline:", "workspace:")
+
+# (topic, pipeline_id, seq, frame) — topic is None for control frames
+Entry = tuple[str | None, str | None, int | None, str]
+
+
+class Connection:
+    """One client socket with a bounded outbound queue drained by its own writer task.
+
+    Frames are pre-encoded strings shared by every connection watching the same
+    topic. Flow control is two-level: a topic that falls more than
+    `topic_maxsize` frames behind overflows — `on_overflow` drops just that
+    subscription, or without a handler the connection is evicted — and a
+    connection more than `maxsize` frames behind in total is always evicted.
+    The writer also sends the connection's one heartbeat whenever it is idle.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        maxsize: int | None = None,
+        topic_maxsize: int | None = None,
+        heartbeat: float | None = None,
+    ) -> None:
+        self.websocket     = websocket
+        self.maxsize       = maxsize or settings.WS_OUTBOUND_QUEUE_SIZE
+        self.topic_maxsize = topic_maxsize or self.maxsize
+        self.heartbeat     = heartbeat or settings.WS_HEARTBEAT_SECONDS
+        self.topics: set[str] = set()
+        self.sent_seqs: dict[str, int] = {}      # pipeline_id -> last seq written
+        self.user_id: str | None = None
+        self.workspaces: set[str] = set()        # approvals are delivered for these only
+        self.on_overflow: Callable[[Connection, str], None] | None = None
+        self.closed        = False
+        self.evicted       = False
+        self._queue: deque[Entry] = deque()
+        self._pending: Counter[str] = Counter()  # queued frames per topic
+        self._held: dict[str, list[Entry]] = {}  # topics still sending their catch-up
+        self._wakeup       = asyncio.Event()
+        self._closed       = asyncio.Event()
+        self._writer: asyncio.Task | None = None
+
+    def offer(
+        self,
+        frame: str,
+        topic: str | None = None,
+        pipeline_id: str | None = None,
+        seq: int | None = None,
+    ) -> None:
+        """O(1), never blocks. Frames for a topic the connection left are ignored."""
+        if self.closed:
+            return
+        entry = (topic, pipeline_id, seq, frame)
+        if topic is not None:
+            if topic not in self.topics:
+                return
+            held = self._held.get(topic)
+            backlog = len(held) if held is not None else self._pending[topic]
+            if backlog >= self.topic_maxsize:
+                self._overflow(topic)
+                return
+            if held is not None:
+                held.append(entry)
+                return
+        self._enqueue(entry)
+
+    def hold(self, topic: str) -> None:
+        """Park live frames for `topic` until its catch-up has been queued."""
+        self._held[topic] = []
+
+    def release(
+        self,
+        topic: str,
+        catch_up: list[Entry],
+        pipeline_id: str | None = None,
+        floor: int | None = None,
+    ) -> None:
+        """Queue the catch-up, then the parked live frames; the client already has seq <= floor."""
+        held = self._held.pop(topic, [])
+        if self.closed or topic not in self.topics:
+            return
+        if pipeline_id is not None and floor is not None:
+            self.sent_seqs[pipeline_id] = max(self.sent_seqs.get(pipeline_id, -1), floor)
+        for entry in (*catch_up, *held):
+            self._enqueue(entry)
+
+    def start(self) -> None:
+        self._writer = asyncio.get_running_loop().create_task(self._write())
+
+    async def wait_closed(self) -> None:
+        await self._closed.wait()
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.clear()
+        self._held.clear()
+        self._closed.set()
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+
+    def _enqueue(self, entry: Entry) -> None:
+        if len(self._queue) >= self.maxsize:
+            logger.warning("Evicting slow WebSocket consumer (%d frames behind)", len(self._queue))
+            self.evicted = True
+            self.close()
+            return
+        self._queue.append(entry)
+        if entry[0] is not None:
+            self._pending[entry[0]] += 1
+        self._wakeup.set()
+
+    def _overflow(self, topic: str) -> None:
+        if self.on_overflow is None:
+            logger.warning("Evicting slow WebSocket consumer (topic %s overflowed)", topic)
+            self.evicted = True
+            self.close()
+        else:
+            self.on_overflow(self, topic)
+
+    async def _write(self) -> None:
+        try:
+            while True:
+                if not self._queue:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=self.heartbeat)
+                    except TimeoutError:
+                        self._queue.append((None, None, None, HEARTBEAT_FRAME))
+                    continue
+                topic, pipeline_id, seq, frame = self._queue.popleft()
+                if topic is not None:
+                    self._pending[topic] -= 1
+                    if self._pending[topic] <= 0:
+                        del self._pending[topic]
+                if seq is not None and pipeline_id is not None:
+                    if seq <= self.sent_seqs.get(pipeline_id, -1):
+                        continue   # replayed, or already sent via another topic
+                    self.sent_seqs[pipeline_id] = seq
+                await self.websocket.send_text(frame)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"WebSocket send failed, closing: {e}")
+            self.close()
+
 
 class ConnectionManager:
-    """Manages WebSocket connections per pipeline"""
+    """Manages WebSocket connections per topic.
+
+    Holds one EventBus subscription per watched topic, not one per socket:
+    each event is encoded once and the same frame is offered to every
+    connection's outbound queue, so a slow socket never delays the others.
+    """
 
     def __init__(self):
-        # pipeline_id -> set of WebSocket connections
-        self.active_connections: dict[str, set[WebSocket]] = {}
+        # topic -> set of connections
+        self.active_connections: dict[str, set[Connection]] = {}
+        self._handlers: dict[str, Any] = {}
 
-    async def connect(self, websocket: WebSocket, pipeline_id: str) -> None:
+    async def connect(self, websocket: WebSocket, **options: Any) -> Connection:
         await websocket.accept()
-        if pipeline_id not in self.active_connections:
-            self.active_connections[pipeline_id] = set()
-        self.active_connections[pipeline_id].add(websocket)
-        logger.info(f"WebSocket connected: pipeline={pipeline_id}")
-
-    def disconnect(self, websocket: WebSocket, pipeline_id: str) -> None:
-        if pipeline_id in self.active_connections:
-            self.active_connections[pipeline_id].discard(websocket)
-            if not self.active_connections[pipeline_id]:
-                del self.active_connections[pipeline_id]
-        logger.info(f"WebSocket disconnected: pipeline={pipeline_id}")
+        connection = Connection(websocket, **options)
+        connection.start()
+        logger.info("WebSocket connected")
+        return connection
+
+    def disconnect(self, connection: Connection) -> None:
+        connection.close()
+        for topic in list(connection.topics):
+            self.unsubscribe(connection, topic)
+        logger.info("WebSocket disconnected")
+
+    async def subscribe(
+        self,
+        connection: Connection,
+        topic: str,
+        last_event_id: int | None = None,
+        snapshot: bool = False,
+        ack: dict[str, Any] | None = None,
+    ) -> None:
+        """Attach `connection` to `topic`, sending any pipeline catch-up before live frames.
+
+        Live frames arriving while the catch-up is read are parked on the
+        connection, then deduplicated against it by seq — no gaps, no repeats.
+        """
+        connection.topics.add(topic)
+        connection.hold(topic)
+        self._attach(connection, topic)
+        try:
+            pipeline_id, catch_up, floor = None, [], None
+            if topic.startswith("pipeline:"):
+                pipeline_id = topic.removeprefix("pipeline:")
+                catch_up, floor = await self._catch_up(topic, pipeline_id, last_event_id, snapshot)
+        except Exception:
+            self.unsubscribe(connection, topic)
+            raise
+        if ack is not None and topic in connection.topics:
+            connection.offer(encode_frame(ack))
+        connection.release(topic, catch_up, pipeline_id, floor)
+
+    def unsubscribe(self, connection: Connection, topic: str) -> None:
+        connection.topics.discard(topic)
+        connection._held.pop(topic, None)
+        connections = self.active_connections.get(topic)
+        if connections is None:
+            return
+        connections.discard(connection)
+        if not connections:
+            del self.active_connections[topic]
+            handler = self._handlers.pop(topic, None)
+            if handler is not None:
+                EventBus.get_instance().unsubscribe(handler)
+
+    def drop_subscription(self, connection: Connection, topic: str) -> None:
+        """Overflow handler for multiplexed sockets: shed the lagging topic, keep the rest."""
+        logger.warning("Dropping lagging WebSocket subscription %s", topic)
+        self.unsubscribe(connection, topic)
+        connection.offer(encode_frame({
+            "type": "unsubscribed",
+            "topic": topic,
+            "reason": "slow_consumer",   # resubscribe with last_event_id to resume
+        }))
 
     async def broadcast_to_pipeline(self, pipeline_id: str, message: dict) -> None:
         """Send message to all clients watching a specific pipeline"""
-        if pipeline_id not in self.active_connections:
-            return
+        self._fan_out(
+            pipeline_topic(pipeline_id), pipeline_id, message.get("seq"), encode_frame(message)
+        )
+
+    @staticmethod
+    async def _catch_up(
+        topic: str, pipeline_id: str, last_event_id: int | None, snapshot: bool
+    ) -> tuple[list[Entry], int | None]:
+        """Missed events since last_event_id, else a state snapshot if one is due."""
+        replay = EventBus.get_instance().replay
+        if last_event_id is not None:
+            missed = await replay.since(pipeline_id, last_event_id)
+            if missed is not None:
+                return [
+                    (topic, pipeline_id, m["seq"], encode_frame(m)) for m in missed
+                ], last_event_id
+        if last_event_id is not None or snapshot:
+            state = await replay.snapshot(pipeline_id)
+            # A snapshot supersedes everything up to its seq and is always sent
+            return [(topic, None, None, encode_frame(state))], state["seq"]
+        return [], None
+
+    def _attach(self, connection: Connection, topic: str) -> None:
+        if topic not in self.active_connections:
+            self.active_connections[topic] = set()
+            self._subscribe(topic)
+        self.active_connections[topic].add(connection)
 
-        dead_connections = set()
-        for connection in self.active_connections[pipeline_id].copy():
-            try:
-                if connection.client_state == WebSocketState.CONNECTED:
-                    await connection.send_json(message)
-            except Exception as e:
-                logger.warning(f"Failed to send to WebSocket: {e}")
-                dead_connections.add(connection)
+    def _fan_out(
+        self,
+        topic: str,
+        pipeline_id: str,
+        seq: int | None,
+        frame: str,
+        workspace_id: str | None = None,
+    ) -> None:
+        for connection in list(self.active_connections.get(topic, ())):
+            if topic == APPROVALS_TOPIC and workspace_id not in connection.workspaces:
+                continue
+            connection.offer(frame, topic, pipeline_id, seq)
 
-        # Clean up dead connections
-        self.active_connections[pipeline_id] -= dead_connections
+    def _subscribe(self, topic: str) -> None:
+        async def handler(event: PipelineEvent) -> None:
+            self._fan_out(
+                topic, event.pipeline_id, event.seq, encode_frame(event_message(event)),
+                event.workspace_id,
+            )
+
+        self._handlers[topic] = handler
+        # Under backlog, newer events for a stage supersede older ones
+        EventBus.get_instance().subscribe(handler, topics=[topic], policy=OverflowPolicy.COALESCE)
 
 
 manager = ConnectionManager()
@@ -76,66 +356,182 @@ async def pipeline_websocket(
     websocket: WebSocket,
     pipeline_id: str,
     token: str = Query(...),
+    last_event_id: int | None = Query(None, ge=0),
+    snapshot: bool = Query(False),
 ):
-    """WebSocket endpoint for real-time pipeline tracking"""
+    """WebSocket endpoint for real-time pipeline tracking.
+
+    Every event frame carries a per-pipeline `seq`. A reconnecting client passes
+    the last seq it saw as `last_event_id` and receives only the missed events —
+    or, if the replay buffer no longer reaches back that far, a `snapshot` frame
+    with the current pipeline state. `snapshot=true` requests one on a fresh
+    connection. Live events follow without gaps or duplicates.
+    """
     # Verify JWT token
     user = await verify_ws_token(token)
     if not user:
         await websocket.close(code=4001, reason="Unauthorized")
         return
 
-    await manager.connect(websocket, pipeline_id)
-
-    # Subscribe to pipeline events
-    event_bus = EventBus.get_instance()
-    queue: asyncio.Queue[PipelineEvent] = asyncio.Queue()
-
-    async def event_handler(event: PipelineEvent):
-        if event.pipeline_id == pipeline_id:
-            await queue.put(event)
+    if await authorize_topic(user["sub"], pipeline_topic(pipeline_id)) is None:
+        await websocket.close(code=FORBIDDEN_CLOSE_CODE, reason="Forbidden")
+        return
 
-    event_bus.subscribe(event_handler)
+    connection = await manager.connect(websocket)
+    connection.user_id = user["sub"]
 
     try:
-        # Send connection confirmation
-        await websocket.send_json({
+        # Send connection confirmation before any event can reach the socket
+        connection.offer(encode_frame({
             "type": "connected",
             "pipeline_id": pipeline_id,
             "message": "Real-time pipeline tracking active"
-        })
-
-        # Process events and handle ping/pong
-        while True:
-            try:
-                # Check for events with timeout
-                event = await asyncio.wait_for(queue.get(), timeout=30.0)
-                await websocket.send_json({
-                    "type": event.event_type,
-                    "pipeline_id": event.pipeline_id,
-                    "stage_id": event.stage_id,
-                    "data": event.data,
-                    "timestamp": event.timestamp.isoformat(),
-                })
-            except TimeoutError:
-                # Send heartbeat
-                if websocket.client_state == WebSocketState.CONNECTED:
-                    await websocket.send_json({"type": "heartbeat"})
-                else:
-                    break
+        }))
+        await manager.subscribe(
+            connection, pipeline_topic(pipeline_id), last_event_id, snapshot
+        )
+
+        # Events and heartbeats are sent by the connection's writer task; wait
+        # until the client goes away or is evicted.
+        await connection.wait_closed()
+
+        if connection.evicted and websocket.client_state == WebSocketState.CONNECTED:
+            await websocket.close(code=SLOW_CONSUMER_CLOSE_CODE, reason="Slow consumer")
 
     except WebSocketDisconnect:
         logger.info(f"WebSocket client disconnected from pipeline {pipeline_id}")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
     finally:
-        event_bus.unsubscribe(event_handler)
-        manager.disconnect(websocket, pipeline_id)
+        manager.disconnect(connection)
 
 
 # Register the plural alias (/ws/pipelines/…) pointing to the same handler.
 router.add_api_websocket_route("/pipelines/{pipeline_id}", pipeline_websocket)
 
 
+@router.websocket("/stream")
+async def multiplexed_websocket(websocket: WebSocket, token: str = Query(...)):
+    """One authenticated socket for any number of pipeline, workspace and approvals topics.
+
+    Subscriptions are managed with JSON commands (see module docstring) and
+    share the connection's writer and heartbeat. Each topic has its own backlog
+    limit: a lagging topic is dropped with an `unsubscribed` frame
+    (reason "slow_consumer") while the others keep flowing.
+    """
+    user = await verify_ws_token(token)
+    if not user:
+        await websocket.close(code=4001, reason="Unauthorized")
+        return
+
+    connection = await manager.connect(
+        websocket, topic_maxsize=settings.WS_SUBSCRIPTION_QUEUE_SIZE
+    )
+    connection.user_id = user["sub"]
+    connection.on_overflow = manager.drop_subscription
+    connection.offer(encode_frame({"type": "connected", "message": "Multiplexed stream active"}))
+
+    commands = asyncio.create_task(_serve_commands(connection, websocket))
+    closed = asyncio.create_task(connection.wait_closed())
+    try:
+        await asyncio.wait({commands, closed}, return_when=asyncio.FIRST_COMPLETED)
+        commands.cancel()
+        if connection.evicted and websocket.client_state == WebSocketState.CONNECTED:
+            await websocket.close(code=SLOW_CONSUMER_CLOSE_CODE, reason="Slow consumer")
+    except Exception as e:
+        logger.error(f"WebSocket error: {e}")
+    finally:
+        commands.cancel()
+        closed.cancel()
+        manager.disconnect(connection)
+
+
+async def _serve_commands(connection: Connection, websocket: WebSocket) -> None:
+    while not connection.closed:
+        try:
+            message = await websocket.receive_json()
+        except WebSocketDisconnect:
+            return
+        except (ValueError, KeyError):
+            connection.offer(encode_frame({"type": "error", "message": "Invalid JSON"}))
+            continue
+        try:
+            reply = await handle_command(connection, message)
+        except Exception as e:
+            logger.error(f"WebSocket command failed: {e}")
+            reply = {"type": "error", "topic": message.get("topic"), "message": "Subscribe failed"}
+        if reply is not None:
+            connection.offer(encode_frame(reply))
+
+
+async def authorize_topic(user_id: str | None, topic: str) -> set[str] | None:
+    """The user's workspace ids if they may watch `topic` (a valid topic name), else None.
+
+    Pipeline and workspace topics need membership of the owning workspace.
+    Approvals are open to every user, but only those from the returned
+    workspaces are delivered.
+    """
+    if user_id is None:
+        return None
+    kind, _, key = topic.partition(":")
+    if kind in ("pipeline", "workspace"):
+        try:
+            UUID(key)
+        except ValueError:
+            return None   # not an id that can exist
+    async with read_session() as db:
+        service = WorkspaceService(db)
+        workspaces = await service.accessible_workspace_ids(user_id)
+        if kind == "pipeline":
+            key = await service.pipeline_workspace_id(key) or ""
+    if topic == APPROVALS_TOPIC or key in workspaces:
+        return workspaces
+    return None
+
+
+def _valid_topic(topic: Any) -> bool:
+    if topic == APPROVALS_TOPIC:
+        return True
+    if not isinstance(topic, str) or not topic.startswith(TOPIC_PREFIXES):
+        return False
+    return 0 < len(topic.partition(":")[2]) <= 64
+
+
+async def handle_command(connection: Connection, message: Any) -> dict[str, Any] | None:
+    """Apply one subscribe/unsubscribe command; returns the reply, or None if already queued."""
+    if not isinstance(message, dict):
+        return {"type": "error", "message": "Expected a JSON object"}
+    op, topic = message.get("op"), message.get("topic")
+    if op not in ("subscribe", "unsubscribe"):
+        return {"type": "error", "message": f"Unknown op: {op!r}"}
+    if not _valid_topic(topic):
+        return {"type": "error", "topic": topic, "message": "Invalid topic"}
+
+    if op == "unsubscribe":
+        manager.unsubscribe(connection, topic)
+        return {"type": "unsubscribed", "topic": topic}
+
+    ack = {"type": "subscribed", "topic": topic}
+    if topic in connection.topics:
+        return ack
+    if len(connection.topics) >= settings.WS_MAX_SUBSCRIPTIONS:
+        return {"type": "error", "topic": topic, "message": "Too many subscriptions"}
+    last_event_id = message.get("last_event_id")
+    if last_event_id is not None and (
+        not isinstance(last_event_id, int) or isinstance(last_event_id, bool) or last_event_id < 0
+    ):
+        return {"type": "error", "topic": topic, "message": "Invalid last_event_id"}
+    workspaces = await authorize_topic(connection.user_id, topic)
+    if workspaces is None:
+        return {"type": "error", "topic": topic, "message": "Forbidden"}
+    if topic == APPROVALS_TOPIC:
+        connection.workspaces = workspaces
+    await manager.subscribe(
+        connection, topic, last_event_id, bool(message.get("snapshot")), ack=ack
+    )
+    return None
+
+
 async def notify_pipeline_update(pipeline_id: str, event_type: str, data: dict) -> None:
     """Utility function to broadcast pipeline updates"""
     await manager.broadcast_to_pipeline(pipeline_id, {
@@ -8,12 +8,35 @@ from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.auth import CurrentUserID
-from app.core.database import get_read_db, get_write_db
+from app.core.cache import CachedView, cached, invalidate, project_scope, workspace_scope
+from app.core.database import get_read_db, get_write_db, reads_own_writes
 from app.db.models import Project, UserRole, Workspace, WorkspaceMember
 from app.schemas.workspace import WorkspaceCreate, WorkspaceRead
 
 router = APIRouter()
 
+_WORKSPACE = CachedView("workspace", WorkspaceRead)
+
+
+def _with_project_count():
+    """Workspaces with their project count in one GROUP BY query, however many rows match."""
+    return (
+        select(Workspace, func.count(Project.id))
+        .outerjoin(Project, Project.workspace_id == Workspace.id)
+        .group_by(Workspace.id)
+    )
+
+
+def _to_read(ws: Workspace, project_count: int = 0) -> WorkspaceRead:
+    return WorkspaceRead(
+        id=ws.id,  # type: ignore[arg-type]
+        name=ws.name,  # type: ignore[arg-type]
+        description=ws.description,  # type: ignore[arg-type]
+        owner_id=ws.owner_id,  # type: ignore[arg-type]
+        created_at=ws.created_at,  # type: ignore[arg-type]
+        project_count=project_count,
+    )
+
 
 @router.get("", response_model=list[WorkspaceRead])
 async def list_workspaces(
@@ -21,31 +44,13 @@ async def list_workspaces(
     db: AsyncSession = Depends(get_read_db),
 ):
     """Return all workspaces the current user owns or is a member of."""
+    member_of = select(WorkspaceMember.workspace_id).where(WorkspaceMember.user_id == user_id)
     result = await db.execute(
-        select(Workspace)
-        .join(WorkspaceMember, WorkspaceMember.workspace_id == Workspace.id, isouter=True)
-        .where(
-            (Workspace.owner_id == user_id) |
-            (WorkspaceMember.user_id == user_id)
-        )
-        .distinct()
+        _with_project_count()
+        .where((Workspace.owner_id == user_id) | Workspace.id.in_(member_of))
+        .order_by(Workspace.created_at)
     )
-    workspaces = list(result.scalars())
-
-    out = []
-    for ws in workspaces:
-        count_result = await db.execute(
-            select(func.count()).where(Project.workspace_id == ws.id)
-        )
-        out.append(WorkspaceRead(
-            id=ws.id,  # type: ignore[arg-type]
-            name=ws.name,  # type: ignore[arg-type]
-            description=ws.description,  # type: ignore[arg-type]
-            owner_id=ws.owner_id,  # type: ignore[arg-type]
-            created_at=ws.created_at,  # type: ignore[arg-type]
-            project_count=count_result.scalar_one(),
-        ))
-    return out
+    return [_to_read(ws, count) for ws, count in result.all()]
 
 
 @router.post("", response_model=WorkspaceRead, status_code=status.HTTP_201_CREATED)
@@ -75,17 +80,18 @@ async def get_workspace(
     workspace_id: UUID,
     user_id: CurrentUserID,
     db: AsyncSession = Depends(get_read_db),
+    own_writes: bool = Depends(reads_own_writes),
 ):
-    result = await db.execute(select(Workspace).where(Workspace.id == workspace_id))
-    ws = result.scalar_one_or_none()
-    if not ws:
+    async def load() -> WorkspaceRead | None:
+        result = await db.execute(_with_project_count().where(Workspace.id == workspace_id))
+        row = result.first()
+        return _to_read(*row) if row else None
+
+    read = await cached(_WORKSPACE, (workspace_id,), [workspace_scope(workspace_id)], load,
+                        bypass=own_writes)
+    if read is None:
         raise HTTPException(status_code=404, detail="Workspace not found")
-    count_result = await db.execute(select(func.count()).where(Project.workspace_id == ws.id))
-    return WorkspaceRead(
-        id=ws.id, name=ws.name, description=ws.description,  # type: ignore[arg-type]
-        owner_id=ws.owner_id, created_at=ws.created_at,  # type: ignore[arg-type]
-        project_count=count_result.scalar_one(),
-    )
+    return read
 
 
 @router.patch("/{workspace_id}", response_model=WorkspaceRead)
@@ -105,6 +111,7 @@ async def update_workspace(
     ws.description = payload.description  # type: ignore[assignment]
     await db.commit()
     await db.refresh(ws)
+    await invalidate(workspace_scope(workspace_id))
     return WorkspaceRead(
         id=ws.id, name=ws.name, description=ws.description,  # type: ignore[arg-type]
         owner_id=ws.owner_id, created_at=ws.created_at, project_count=0,  # type: ignore[arg-type]
@@ -123,5 +130,9 @@ async def delete_workspace(
         raise HTTPException(status_code=404, detail="Not found")
     if ws.owner_id != user_id:
         raise HTTPException(status_code=403, detail="Only the owner can delete this workspace")
+    # Its projects go with it
+    projects = await db.execute(select(Project.id).where(Project.workspace_id == workspace_id))
+    scopes = [project_scope(project_id) for project_id in projects.scalars()]
     await db.delete(ws)
     await db.commit()
+    await invalidate(workspace_scope(workspace_id), *scopes)
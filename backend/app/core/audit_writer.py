@@ -0,0 +1,335 @@
+"""
+Batched, append-only AuditLog writer.
+
+AuditMiddleware hands every audited request to enqueue(), a synchronous O(1)
+append to a bounded buffer — the request path never waits on the database or
+the disk. A single background task drains the buffer in batches, on size
+(AUDIT_BATCH_SIZE) or time (AUDIT_LINGER_MS), with one multi-row INSERT, or
+COPY when the engine is PostgreSQL on asyncpg.
+
+Audit records are not dropped for being inconvenient:
+
+  * when the buffer is full, entries go to a second, equally bounded overflow
+    queue that the task appends to an NDJSON spill file (fsynced);
+  * a batch the database rejects is spilled the same way. Every
+    SPILL_RETRY_SECONDS the task replays the spill file into the table, ahead
+    of newer entries; what a replay could not write stays claimed for the
+    next one (batcher.SpillFile). A spilled batch that still fails for a
+    reason other than connectivity is retried row by row, and rows that fail
+    alone are logged and dropped, so one bad row cannot stall the trail.
+
+Only when the overflow queue is full as well — the disk cannot keep up — is
+an entry lost, and counted. stop() drains the buffer to the table, or to the
+spill file if the table is unreachable.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import deque
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DisconnectionError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.batcher import BackgroundBatcher, SpillFile
+from app.core.config import settings
+from app.core.database import write_session
+from app.core.metrics import record_audit_batch, record_audit_drop, set_audit_buffer_depth
+from app.db.models import AuditAction, AuditLog
+
+logger = logging.getLogger(__name__)
+
+Row = dict[str, Any]
+
+SPILL_RETRY_SECONDS = 5.0
+
+# The database is unreachable, not the data at fault: keep the spill for later
+_TRANSIENT_ERRORS = (OperationalError, InterfaceError, DisconnectionError, OSError, TimeoutError)
+
+# Column order used for COPY
+_COLUMNS = (
+    "id", "user_id", "action", "resource_type", "resource_id", "workspace_id",
+    "ip_address", "user_agent", "request_id", "details", "timestamp",
+)
+_UUID_COLUMNS = {"id", "user_id", "workspace_id"}
+
+SessionFactory = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+
+
+def audit_row(
+    action: AuditAction,
+    resource_type: str,
+    resource_id: str | None = None,
+    *,
+    user_id: uuid.UUID | None = None,
+    workspace_id: uuid.UUID | None = None,
+    ip_address: str | None = None,
+    user_agent: str | None = None,
+    request_id: str | None = None,
+    details: dict[str, Any] | None = None,
+) -> Row:
+    return {
+        "id":            uuid.uuid4(),
+        "user_id":       user_id,
+        "action":        action,
+        "resource_type": resource_type[:100],
+        "resource_id":   resource_id[:255] if resource_id else None,
+        "workspace_id":  workspace_id,
+        "ip_address":    ip_address[:45] if ip_address else None,
+        "user_agent":    user_agent[:500] if user_agent else None,
+        "request_id":    request_id[:100] if request_id else None,
+        "details":       details or {},
+        # audit_logs.timestamp is a naive UTC column
+        "timestamp":     datetime.utcnow(),
+    }
+
+
+def _row_to_json(row: Row) -> str:
+    return json.dumps({
+        **row,
+        **{c: str(row[c]) if row[c] is not None else None for c in _UUID_COLUMNS},
+        "action":    str(row["action"]),
+        "timestamp": row["timestamp"].isoformat(),
+    }, default=str)
+
+
+def _row_from_json(line: str) -> Row:
+    row = json.loads(line)
+    for column in _UUID_COLUMNS:
+        if row.get(column):
+            row[column] = uuid.UUID(row[column])
+    row["action"] = AuditAction(row["action"])
+    row["timestamp"] = datetime.fromisoformat(row["timestamp"])
+    return row
+
+
+class AuditLogWriter(BackgroundBatcher):
+    def __init__(
+        self,
+        buffer_size: int | None = None,
+        batch_size: int | None = None,
+        linger_ms: int | None = None,
+        spill_path: str | None = None,
+        session_factory: SessionFactory | None = None,
+    ) -> None:
+        if linger_ms is None:
+            linger_ms = settings.AUDIT_LINGER_MS
+        super().__init__(batch_size or settings.AUDIT_BATCH_SIZE, linger_ms / 1000)
+        self.buffer_size = buffer_size or settings.AUDIT_BUFFER_SIZE
+        self.spill = SpillFile(
+            spill_path or settings.AUDIT_SPILL_PATH, _row_to_json, _row_from_json,
+            on_corrupt=self._count_corrupt,
+        )
+        self.written     = 0
+        self.spilled     = 0
+        self.dropped     = 0
+        self._session_factory = session_factory or write_session
+        self._buffer: deque[Row] = deque()
+        self._overflow: deque[Row] = deque()
+        self._retry_at = 0.0
+        self._has_spill = self.spill.exists()
+
+    @property
+    def depth(self) -> int:
+        return len(self._buffer) + len(self._overflow)
+
+    def enqueue(self, row: Row) -> None:
+        """O(1) and synchronous: never waits on the database or the disk."""
+        if len(self._buffer) < self.buffer_size:
+            self._buffer.append(row)
+        elif len(self._overflow) < self.buffer_size:
+            self._overflow.append(row)
+        else:
+            self.dropped += 1
+            record_audit_drop("lost")
+            return
+        set_audit_buffer_depth(self.depth)
+        self._kick()
+
+    async def stop(self) -> None:
+        """Stop the drain task and persist (or spill) everything still buffered."""
+        await self._stop_task()
+        self._retry_at = 0.0
+        await self._drain_overflow()
+        while self._buffer:
+            await self._flush_batch()
+        logger.info(
+            "Audit writer stopped (written=%d, spilled=%d, dropped=%d)",
+            self.written, self.spilled, self.dropped,
+        )
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _pending(self) -> bool:
+        return bool(self.depth)
+
+    def _idle_timeout(self) -> float | None:
+        # Come back for the spill even if no new entries arrive
+        return SPILL_RETRY_SECONDS if self._has_spill else None
+
+    async def _drain(self) -> None:
+        await self._linger(len(self._buffer))
+        await self._drain_overflow()
+        await self._flush_batch()
+
+    async def _drain_overflow(self) -> None:
+        if self._overflow:
+            rows = list(self._overflow)
+            self._overflow.clear()
+            await self._spill(rows)
+
+    async def _flush_batch(self) -> None:
+        n = min(len(self._buffer), self.batch_size)
+        rows = [self._buffer.popleft() for _ in range(n)]
+        set_audit_buffer_depth(self.depth)
+
+        # Older spilled entries go first; while the table is unreachable,
+        # queue new ones behind them
+        if self._has_spill and not await self._replay_spill():
+            await self._spill(rows)
+            return
+        if not rows:
+            return
+        try:
+            await self._write(rows)
+        except asyncio.CancelledError:
+            self._buffer.extendleft(reversed(rows))
+            raise
+        except Exception as exc:
+            logger.warning("Audit write of %d entries failed, spilling: %s", len(rows), exc)
+            await self._spill(rows)
+            self._retry_at = time.monotonic() + SPILL_RETRY_SECONDS
+
+    async def _write(self, rows: list[Row]) -> None:
+        t0 = time.perf_counter()
+        async with self._session_factory() as session:
+            await self._insert(session, rows)
+            await session.commit()
+        record_audit_batch(len(rows), time.perf_counter() - t0)
+        self.written += len(rows)
+
+    @staticmethod
+    async def _insert(session: AsyncSession, rows: list[Row]) -> None:
+        conn = await session.connection()
+        if conn.dialect.name == "postgresql" and conn.dialect.driver == "asyncpg":
+            raw = await conn.get_raw_connection()
+            records = [
+                tuple(
+                    json.dumps(row[c]) if c == "details"
+                    else row[c].name if c == "action"   # SQLEnum stores member names
+                    else row[c]
+                    for c in _COLUMNS
+                )
+                for row in rows
+            ]
+            await raw.driver_connection.copy_records_to_table(  # type: ignore[union-attr]
+                AuditLog.__tablename__, columns=_COLUMNS, records=records
+            )
+        else:
+            await session.execute(insert(AuditLog).values(rows))
+
+    # ── Spill file ────────────────────────────────────────────────────────────
+
+    async def _spill(self, rows: list[Row]) -> None:
+        if not rows:
+            return
+        try:
+            await asyncio.to_thread(self.spill.append, rows)
+            self._has_spill = True
+            self.spilled += len(rows)
+            record_audit_drop("spilled", len(rows))
+        except OSError as exc:
+            logger.error("Audit spill failed, %d entries lost: %s", len(rows), exc)
+            self.dropped += len(rows)
+            record_audit_drop("lost", len(rows))
+
+    def _count_corrupt(self) -> None:
+        self.dropped += 1
+        record_audit_drop("corrupt")
+
+    async def _replay_spill(self) -> bool:
+        """Write spilled entries to the table. Returns False if the spill is still pending."""
+        if time.monotonic() < self._retry_at:
+            return False
+        while (rows := await asyncio.to_thread(self.spill.take)) is not None:
+            if rows:
+                logger.info("Audit writer: replaying %d spilled entries", len(rows))
+            for start in range(0, len(rows), self.batch_size):
+                chunk = rows[start:start + self.batch_size]
+                try:
+                    await self._write(chunk)
+                    continue
+                except _TRANSIENT_ERRORS as exc:
+                    logger.warning("Audit spill replay failed: %s", exc)
+                    unwritten = chunk
+                except Exception:
+                    unwritten = await self._write_one_by_one(chunk)
+                if unwritten:
+                    await self._keep_claimed(unwritten + rows[start + self.batch_size:])
+                    return False
+            await asyncio.to_thread(self.spill.finish)
+        self._has_spill = False
+        return True
+
+    async def _keep_claimed(self, rows: list[Row]) -> None:
+        try:
+            await asyncio.to_thread(self.spill.keep, rows)
+        except OSError as exc:
+            # The claimed file still holds them all: written twice, not lost
+            logger.error("Audit writer could not update the spill: %s", exc)
+        self._retry_at = time.monotonic() + SPILL_RETRY_SECONDS
+
+    async def _write_one_by_one(self, rows: list[Row]) -> list[Row]:
+        """Write a failing batch row by row, dropping the rows that fail on their own.
+
+        Returns the rows left unwritten because the database became unreachable.
+        """
+        for i, row in enumerate(rows):
+            try:
+                await self._write([row])
+            except _TRANSIENT_ERRORS:
+                return rows[i:]
+            except Exception as exc:
+                if row["user_id"] is not None:
+                    # Most likely a token for a user deleted since: keep the
+                    # entry, with the id moved out of the foreign key
+                    rows[i + 1:i + 1] = [{
+                        **row, "user_id": None,
+                        "details": {**row["details"], "user_id": str(row["user_id"])},
+                    }]
+                    continue
+                self.dropped += 1
+                record_audit_drop("rejected")
+                logger.error("Audit entry rejected by the database, dropped: %s %s",
+                             _row_to_json(row), exc)
+        return []
+
+
+# ── Module-level singleton (mirrors event_store._writer) ──────────────────────
+
+_writer: AuditLogWriter | None = None
+
+
+def init_audit_writer() -> AuditLogWriter:
+    global _writer
+    _writer = AuditLogWriter()
+    return _writer
+
+
+async def close_audit_writer() -> None:
+    global _writer
+    if _writer is not None:
+        await _writer.stop()
+        _writer = None
+
+
+def get_audit_writer() -> AuditLogWriter | None:
+    return _writer
@@ -0,0 +1,190 @@
+"""
+Background batching shared by the write-behind pipelines.
+
+The Kafka forwarder, the EventStore and AuditLog writers, the outbox relay and
+the replay stream writer all work the same way: callers hand work to a buffer
+and return, and one drain task per instance — started lazily on the running
+loop — sleeps on a wakeup Event until there is work, then drains it in
+batches. BackgroundBatcher is that loop; a subclass says when there is work
+(_pending) and how to drain one batch of it (_drain).
+
+SpillFile is the on-disk overflow the forwarder and the audit writer keep
+while their sink is unreachable: fsynced NDJSON, replayed oldest first. A
+replay claims the file by renaming it to .replaying, so new spills start a
+fresh file behind it, and deletes it only once every entry went out; what is
+left is written back to the claimed file, which the next replay (even after a
+crash) returns before the spill file. Unreadable lines, such as one cut short
+by a crash mid-write, are skipped.
+
+Acks lets a caller that must know when its entry has been durably handled
+(the outbox relay) wait for it: the caller watches a key before handing the
+entry over, and the sink settles it True once the entry is written, or False
+when it drops it. Keys nobody watches cost nothing.
+"""
+from __future__ import annotations
+
+import abc
+import asyncio
+import json
+import logging
+import os
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundBatcher(abc.ABC):
+    def __init__(self, batch_size: int = 1, linger_s: float = 0.0) -> None:
+        self.batch_size = batch_size
+        self.linger_s   = linger_s
+        # Replaced by a fresh Event each time the task starts, on that loop
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+
+    @abc.abstractmethod
+    def _pending(self) -> bool:
+        """Whether there is work for the drain task."""
+
+    @abc.abstractmethod
+    async def _drain(self) -> None:
+        """Drain one batch."""
+
+    def _idle_timeout(self) -> float | None:
+        """How long to sleep with nothing pending before draining anyway; None waits."""
+        return None
+
+    def _ensure_task(self) -> None:
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run(self._wakeup))
+
+    def _kick(self) -> None:
+        """Start the drain task if it is not running and wake it. Must run on the loop."""
+        self._ensure_task()
+        self._wakeup.set()
+
+    async def _run(self, wakeup: asyncio.Event) -> None:
+        while not self._stopping:
+            if not self._pending():
+                wakeup.clear()
+                try:
+                    await asyncio.wait_for(wakeup.wait(), self._idle_timeout())
+                except TimeoutError:
+                    pass
+                if self._stopping:
+                    return   # stop() drains the rest
+            await self._drain()
+
+    async def _linger(self, queued: int) -> None:
+        """Give a batch a moment to fill unless it is already full."""
+        if queued < self.batch_size and self.linger_s:
+            await asyncio.sleep(self.linger_s)
+
+    async def _stop_task(self) -> None:
+        """Let the drain task finish the batch in hand, then wait for it to exit.
+
+        Not cancel(): the task may be mid-write with a batch already taken
+        from the buffer.
+        """
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        await asyncio.wait([self._task])
+        if not self._task.cancelled() and self._task.exception():
+            logger.error("%s drain task failed: %s", type(self).__name__, self._task.exception())
+        self._task = None
+        self._stopping = False
+
+
+class Acks:
+    """Delivery receipts by key, settled by the sink that took the entries."""
+
+    def __init__(self) -> None:
+        self._waiting: dict[str, asyncio.Future[bool]] = {}
+
+    def watch(self, key: str) -> asyncio.Future[bool]:
+        """Receipt for the next hand-over of `key`. Call before handing it over."""
+        receipt = self._waiting.get(key)
+        if receipt is None or receipt.done():
+            receipt = asyncio.get_running_loop().create_future()
+            self._waiting[key] = receipt
+        return receipt
+
+    def settle(self, keys: Iterable[str], ok: bool) -> None:
+        """Resolve the receipts of `keys`: True once stored, False when dropped."""
+        if not self._waiting:
+            return
+        for key in keys:
+            receipt = self._waiting.pop(key, None)
+            if receipt is not None and not receipt.done():
+                receipt.set_result(ok)
+
+
+class SpillFile:
+    """NDJSON overflow file. Blocking: call through asyncio.to_thread()."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        encode: Callable[[Any], str] = json.dumps,
+        decode: Callable[[str], Any] = json.loads,
+        on_corrupt: Callable[[], None] | None = None,
+    ) -> None:
+        self.path = Path(path)
+        self.claimed_path = self.path.with_suffix(".replaying")
+        self._encode = encode
+        self._decode = decode
+        self._on_corrupt = on_corrupt
+
+    def exists(self) -> bool:
+        return self.path.exists() or self.claimed_path.exists()
+
+    def append(self, entries: Iterable[Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._write(self.path, "a", entries)
+
+    def take(self) -> list[Any] | None:
+        """Claim the spill file and return its entries; None when nothing is spilled.
+
+        A claimed file left by an earlier replay is older than the spill file
+        and is returned first, on its own.
+        """
+        if not self.claimed_path.exists():
+            try:
+                self.path.rename(self.claimed_path)
+            except FileNotFoundError:
+                return None
+        entries = []
+        with self.claimed_path.open(encoding="utf-8") as fh:
+            for n, line in enumerate(fh, 1):
+                if not line.strip():
+                    continue
+                try:
+                    entries.append(self._decode(line))
+                except (ValueError, KeyError, TypeError) as exc:
+                    logger.warning("Skipping unreadable line %d of %s: %s",
+                                   n, self.claimed_path, exc)
+                    if self._on_corrupt is not None:
+                        self._on_corrupt()
+        return entries
+
+    def keep(self, entries: list[Any]) -> None:
+        """Replace the claimed file with the entries still to replay."""
+        partial = self.claimed_path.with_suffix(".partial")
+        self._write(partial, "w", entries)
+        partial.replace(self.claimed_path)
+
+    def finish(self) -> None:
+        """Every claimed entry went out: drop the claimed file."""
+        self.claimed_path.unlink(missing_ok=True)
+
+    def _write(self, path: Path, mode: str, entries: Iterable[Any]) -> None:
+        with path.open(mode, encoding="utf-8") as fh:
+            for entry in entries:
+                fh.write(self._encode(entry) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
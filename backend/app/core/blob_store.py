@@ -0,0 +1,249 @@
+"""
+Content-addressed blob store for artifact bodies.
+
+Blobs are keyed by the SHA-256 of their uncompressed content — the same
+value as Artifact.checksum — so identical bodies are stored once. Bodies are
+zstd-compressed, either on their own or as a delta: compressed with another
+body (the previous version) as a raw-content dictionary, like
+`zstd --patch-from`. Decoding a delta needs that base body back.
+
+Backends (settings.BLOB_STORE_BACKEND):
+
+  local  Sharded directories under BLOB_STORE_PATH (ab/cd/abcd…), written
+         to a temp file and renamed into place, so readers never see a
+         partial blob.
+  s3     Any S3-compatible object store (AWS, MinIO, R2, GCS interop);
+         needs the optional `boto3` package.
+  none   Disabled — artifact bodies stay inline in Artifact.content.
+
+Reference counts live in the artifact_blobs table (see
+services/artifact_blob_service.py); this module only moves bytes.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from contextlib import closing
+from pathlib import Path
+from typing import BinaryIO
+
+import zstandard
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+BLOB_PATH_PREFIX = "blob://"   # Artifact.file_path of bodies held in the blob store
+
+
+def content_checksum(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def compress(data: bytes, level: int | None = None) -> bytes:
+    level = level or settings.BLOB_COMPRESSION_LEVEL
+    return zstandard.ZstdCompressor(level=level).compress(data)
+
+
+def decompress(blob: bytes) -> bytes:
+    return zstandard.ZstdDecompressor().decompress(blob)
+
+
+def compress_delta(data: bytes, base: bytes, level: int | None = None) -> bytes:
+    """`data` compressed against `base`: near-identical versions cost a few bytes."""
+    params = zstandard.ZstdCompressionParameters.from_level(
+        level or settings.BLOB_DELTA_COMPRESSION_LEVEL,
+        source_size=len(data),
+        window_log=_window_log(len(base) + len(data)),   # all of `base` must be in reach
+    )
+    return zstandard.ZstdCompressor(
+        dict_data=_raw_dict(base), compression_params=params
+    ).compress(data)
+
+
+def decompress_delta(blob: bytes, base: bytes) -> bytes:
+    return _delta_decompressor(base).decompress(blob)
+
+
+def open_decompressed(store: BlobStore, checksum: str, base: bytes | None = None) -> BinaryIO:
+    """Blocking: a forward-only reader of the uncompressed body, in constant memory
+    (plus `base`, the decoded base body, for delta blobs)."""
+    decompressor = zstandard.ZstdDecompressor() if base is None else _delta_decompressor(base)
+    return decompressor.stream_reader(  # type: ignore[return-value]
+        store.open(checksum), closefd=True
+    )
+
+
+def _raw_dict(base: bytes) -> zstandard.ZstdCompressionDict:
+    return zstandard.ZstdCompressionDict(base, dict_type=zstandard.DICT_TYPE_RAWCONTENT)
+
+
+def _delta_decompressor(base: bytes) -> zstandard.ZstdDecompressor:
+    # Delta frames use windows as large as base + body: lift the 128 MiB default cap
+    return zstandard.ZstdDecompressor(
+        dict_data=_raw_dict(base), max_window_size=1 << zstandard.WINDOWLOG_MAX
+    )
+
+
+def _window_log(size: int) -> int:
+    return max(zstandard.WINDOWLOG_MIN, min(zstandard.WINDOWLOG_MAX, (size - 1).bit_length()))
+
+
+def blob_key(checksum: str) -> str:
+    """Two levels of 256-way sharding keep directories and S3 prefixes small."""
+    return f"{checksum[:2]}/{checksum[2:4]}/{checksum}"
+
+
+def blob_path(checksum: str) -> str:
+    return BLOB_PATH_PREFIX + blob_key(checksum)
+
+
+class BlobStore(ABC):
+    """Stores already-compressed blobs by checksum."""
+
+    @abstractmethod
+    async def put(self, checksum: str, blob: bytes) -> None: ...
+
+    @abstractmethod
+    async def get(self, checksum: str) -> bytes: ...
+
+    @abstractmethod
+    async def exists(self, checksum: str) -> bool: ...
+
+    @abstractmethod
+    async def delete(self, checksum: str) -> None: ...
+
+    @abstractmethod
+    def open(self, checksum: str) -> BinaryIO:
+        """Blocking: a readable stream of the stored (compressed) blob."""
+
+    def local_path(self, checksum: str) -> Path | None:
+        """The blob's file, for backends that have one (lets it be served zero-copy)."""
+        return None
+
+
+class LocalBlobStore(BlobStore):
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def _path(self, checksum: str) -> Path:
+        return self.root / blob_key(checksum)
+
+    async def put(self, checksum: str, blob: bytes) -> None:
+        await asyncio.to_thread(self._put_sync, self._path(checksum), blob)
+
+    @staticmethod
+    def _put_sync(path: Path, blob: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(blob)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)   # atomic on POSIX: readers see old or new, never partial
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+
+    async def get(self, checksum: str) -> bytes:
+        try:
+            return await asyncio.to_thread(self._path(checksum).read_bytes)
+        except FileNotFoundError as exc:
+            raise KeyError(checksum) from exc
+
+    async def exists(self, checksum: str) -> bool:
+        return await asyncio.to_thread(self._path(checksum).exists)
+
+    async def delete(self, checksum: str) -> None:
+        await asyncio.to_thread(self._path(checksum).unlink, True)
+
+    def open(self, checksum: str) -> BinaryIO:
+        try:
+            return self._path(checksum).open("rb")
+        except FileNotFoundError as exc:
+            raise KeyError(checksum) from exc
+
+    def local_path(self, checksum: str) -> Path | None:
+        path = self._path(checksum)
+        return path if path.is_file() else None
+
+
+class S3BlobStore(BlobStore):
+    """S3-compatible backend; boto3 calls run in the default thread pool."""
+
+    def __init__(
+        self, bucket: str, prefix: str = "", endpoint_url: str | None = None
+    ) -> None:
+        try:
+            import boto3
+        except ImportError as exc:
+            raise RuntimeError("BLOB_STORE_BACKEND=s3 requires the boto3 package") from exc
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self._client = boto3.client("s3", endpoint_url=endpoint_url or None)
+
+    def _key(self, checksum: str) -> str:
+        key = blob_key(checksum)
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    async def put(self, checksum: str, blob: bytes) -> None:
+        # Single PUTs are atomic on S3 — no temp object needed
+        await asyncio.to_thread(
+            self._client.put_object, Bucket=self.bucket, Key=self._key(checksum), Body=blob
+        )
+
+    async def get(self, checksum: str) -> bytes:
+        try:
+            response = await asyncio.to_thread(
+                self._client.get_object, Bucket=self.bucket, Key=self._key(checksum)
+            )
+        except self._client.exceptions.NoSuchKey as exc:
+            raise KeyError(checksum) from exc
+        return await asyncio.to_thread(response["Body"].read)
+
+    async def exists(self, checksum: str) -> bool:
+        try:
+            await asyncio.to_thread(
+                self._client.head_object, Bucket=self.bucket, Key=self._key(checksum)
+            )
+            return True
+        except self._client.exceptions.ClientError:
+            return False
+
+    async def delete(self, checksum: str) -> None:
+        await asyncio.to_thread(
+            self._client.delete_object, Bucket=self.bucket, Key=self._key(checksum)
+        )
+
+    def open(self, checksum: str) -> BinaryIO:
+        try:
+            response = self._client.get_object(Bucket=self.bucket, Key=self._key(checksum))
+        except self._client.exceptions.NoSuchKey as exc:
+            raise KeyError(checksum) from exc
+        return closing(response["Body"])  # type: ignore[return-value]
+
+
+# ── Module-level singleton ────────────────────────────────────────────────────
+
+_store: BlobStore | None = None
+
+
+def get_blob_store() -> BlobStore | None:
+    """The configured store, created on first use; None when BLOB_STORE_BACKEND=none."""
+    global _store
+    if _store is None and settings.BLOB_STORE_BACKEND != "none":
+        if settings.BLOB_STORE_BACKEND == "s3":
+            _store = S3BlobStore(
+                settings.BLOB_STORE_S3_BUCKET,
+                settings.BLOB_STORE_S3_PREFIX,
+                settings.BLOB_STORE_S3_ENDPOINT,
+            )
+        else:
+            _store = LocalBlobStore(settings.BLOB_STORE_PATH)
+        logger.info("Blob store ready (%s)", settings.BLOB_STORE_BACKEND)
+    return _store
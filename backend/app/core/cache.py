@@ -0,0 +1,340 @@
+"""
+Cache-aside for hot read endpoints, in Redis.
+
+A cached view (get_pipeline, get_project, get_workspace, the first page of a
+project's pipelines) is stored under one key per argument tuple, together
+with the versions of the scopes it depends on:
+
+  pipeline:{id}            the pipeline row
+  project-pipelines:{id}   which pipelines a project has, and their state
+  project:{id}             the project row and its pipeline count
+  workspace:{id}           the workspace row and its project count
+
+A scope's version is a random token under its own key. Invalidating a scope
+replaces the token — one SET, however many entries depend on it, and never a
+KEYS/SCAN walk. An entry is served only while every token it recorded is
+still current, so it goes stale the moment one of its scopes is invalidated
+and simply expires later. Versions are read before the data is loaded: an
+invalidation that lands while an entry is being filled leaves that entry
+stale rather than letting it hide the change.
+
+Pipeline state changes are invalidated from the pipeline's own events
+(CacheInvalidator subscribes to the EventBus in the process that publishes
+them); API writes without an event invalidate explicitly, after commit. With
+read replicas, a fill can still read a replica that has not replayed the
+write yet, so every invalidation is repeated CACHE_REINVALIDATE_SECONDS later.
+
+A miss is loaded once per key: concurrent misses in a process share one
+load, and across pods a short Redis lock lets one pod fill while the others
+wait up to CACHE_LOCK_WAIT_MS for the entry. Outcomes are counted per view
+in cache_requests_total{view,result} (hit, miss, coalesced, bypass, error).
+Without Redis every read simply loads.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import uuid
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from uuid import UUID
+
+from pydantic import BaseModel
+from redis.asyncio import Redis
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.events import EventBus, OverflowPolicy, PipelineEvent, instance_id
+from app.core.metrics import record_cache_request
+from app.core.redis_client import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+_ENTRY_PREFIX   = "forge:cache:"
+_VERSION_PREFIX = "forge:cache-v:"
+_LOCK_PREFIX    = "forge:cache-lock:"
+# Outlives the entries recording it; an expired version just invalidates them
+_VERSION_TTL_S  = 86_400
+_POLL_S         = 0.025
+_PROJECT_OF_MAX = 10_000
+
+
+def pipeline_scope(pipeline_id: UUID | str) -> str:
+    return f"pipeline:{pipeline_id}"
+
+
+def project_pipelines_scope(project_id: UUID | str) -> str:
+    return f"project-pipelines:{project_id}"
+
+
+def project_scope(project_id: UUID | str) -> str:
+    return f"project:{project_id}"
+
+
+def workspace_scope(workspace_id: UUID | str) -> str:
+    return f"workspace:{workspace_id}"
+
+
+@dataclass(frozen=True)
+class CachedView:
+    """One cached endpoint response: its name in keys and metrics, and its schema."""
+    name:  str
+    model: type[BaseModel]
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        ttl_seconds: int | None = None,
+        lock_timeout_ms: int | None = None,
+        lock_wait_ms: int | None = None,
+        reinvalidate_seconds: float | None = None,
+    ) -> None:
+        self.ttl_s = ttl_seconds or settings.CACHE_TTL
+        self.lock_timeout_ms = lock_timeout_ms or settings.CACHE_LOCK_TIMEOUT_MS
+        self.lock_wait_s = (lock_wait_ms or settings.CACHE_LOCK_WAIT_MS) / 1000
+        if reinvalidate_seconds is None:
+            reinvalidate_seconds = settings.CACHE_REINVALIDATE_SECONDS
+        self.reinvalidate_s = reinvalidate_seconds
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._delayed: set[asyncio.Task] = set()
+
+    async def get_or_load(
+        self,
+        view: CachedView,
+        args: Sequence[object],
+        scopes: Sequence[str],
+        load: Callable[[], Awaitable[BaseModel | None]],
+        *,
+        bypass: bool = False,
+    ) -> BaseModel | None:
+        """The cached response for `args`, else load() (None: not found, not cached).
+
+        `bypass` skips the read — for a client that must see its own recent
+        writes — but still refills the entry.
+        """
+        key = _ENTRY_PREFIX + ":".join([view.name, *map(str, args)])
+        try:
+            redis = get_redis_client()
+            raw, *versions = await redis.mget(key, *(_VERSION_PREFIX + s for s in scopes))
+        except Exception as exc:
+            logger.debug("Cache unavailable for %s: %s", view.name, exc)
+            record_cache_request(view.name, "error")
+            return await load()
+        if not bypass and (hit := _valid(view, raw, versions)) is not None:
+            record_cache_request(view.name, "hit")
+            return hit
+        record_cache_request(view.name, "bypass" if bypass else "miss")
+
+        # One load per key in this process; the others share its result
+        if (pending := self._inflight.get(key)) is not None:
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await self._fill(view, key, scopes, versions, load, redis, bypass)
+            future.set_result(value)
+            return value
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()   # retrieved: no "never retrieved" warning without waiters
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _fill(
+        self,
+        view: CachedView,
+        key: str,
+        scopes: Sequence[str],
+        versions: list[str | None],
+        load: Callable[[], Awaitable[BaseModel | None]],
+        redis: Redis,
+        bypass: bool,
+    ) -> BaseModel | None:
+        try:
+            if None in versions:
+                versions = await self._ensure_versions(redis, scopes, versions)
+            locked = await redis.set(_LOCK_PREFIX + key, instance_id(),
+                                     nx=True, px=self.lock_timeout_ms)
+            if not locked and not bypass:
+                # Another pod is filling it: wait for its entry before loading too
+                waited = 0.0
+                while waited < self.lock_wait_s:
+                    await asyncio.sleep(_POLL_S)
+                    waited += _POLL_S
+                    raw, *current = await redis.mget(
+                        key, *(_VERSION_PREFIX + s for s in scopes)
+                    )
+                    if current == versions and (hit := _valid(view, raw, current)) is not None:
+                        record_cache_request(view.name, "coalesced")
+                        return hit
+        except Exception as exc:
+            logger.debug("Cache unavailable for %s: %s", view.name, exc)
+            return await load()
+
+        value = await load()
+        if value is None:
+            return None
+        try:
+            entry = json.dumps({"v": versions, "d": value.model_dump(mode="json")})
+            await redis.set(key, entry, ex=self.ttl_s)
+            if locked:
+                await redis.delete(_LOCK_PREFIX + key)
+        except Exception as exc:
+            logger.debug("Could not cache %s: %s", view.name, exc)
+        return value
+
+    @staticmethod
+    async def _ensure_versions(
+        redis: Redis, scopes: Sequence[str], versions: list[str | None]
+    ) -> list[str | None]:
+        """Versions of `scopes`, creating the missing ones (never reusing a token)."""
+        for scope, version in zip(scopes, versions, strict=True):
+            if version is None:
+                await redis.set(_VERSION_PREFIX + scope, uuid.uuid4().hex,
+                                nx=True, ex=_VERSION_TTL_S)
+        return await redis.mget(*(_VERSION_PREFIX + s for s in scopes))
+
+    async def invalidate(self, *scopes: str) -> None:
+        """Make every entry depending on one of `scopes` stale (call after commit)."""
+        if not scopes:
+            return
+        await self._bump(scopes)
+        if self.reinvalidate_s > 0:
+            task = asyncio.get_running_loop().create_task(self._bump_later(scopes))
+            self._delayed.add(task)
+            task.add_done_callback(self._delayed.discard)
+
+    async def _bump_later(self, scopes: Sequence[str]) -> None:
+        await asyncio.sleep(self.reinvalidate_s)
+        await self._bump(scopes)
+
+    @staticmethod
+    async def _bump(scopes: Sequence[str]) -> None:
+        try:
+            redis = get_redis_client()
+            async with redis.pipeline(transaction=False) as pipe:
+                for scope in scopes:
+                    pipe.set(_VERSION_PREFIX + scope, uuid.uuid4().hex, ex=_VERSION_TTL_S)
+                await pipe.execute()
+        except Exception as exc:
+            logger.warning("Could not invalidate cache scopes %s: %s", scopes, exc)
+
+    async def close(self) -> None:
+        for task in list(self._delayed):
+            task.cancel()
+        await asyncio.gather(*self._delayed, return_exceptions=True)
+
+
+def _valid(view: CachedView, raw: str | None, versions: list[str | None]) -> BaseModel | None:
+    if raw is None or None in versions:
+        return None
+    entry = json.loads(raw)
+    if entry["v"] != versions:
+        return None
+    return view.model.model_validate(entry["d"])
+
+
+# ── Event-driven invalidation ─────────────────────────────────────────────────
+
+class CacheInvalidator:
+    """Invalidates a pipeline's scopes on its events, in the process that published them.
+
+    Events bridged in from other pods were already handled there: the
+    versions live in Redis, shared by every pod.
+    """
+
+    def __init__(self, cache: ResponseCache, bus: EventBus | None = None) -> None:
+        self.cache = cache
+        self.bus = bus or EventBus.get_instance()
+        # pipeline_id -> project_id; a pipeline never changes project
+        self._project_of: OrderedDict[str, str] = OrderedDict()
+
+    def start(self) -> None:
+        # A burst of events for one pipeline needs one invalidation
+        self.bus.subscribe(
+            self.handle, policy=OverflowPolicy.COALESCE,
+            coalesce_key=lambda event: event.pipeline_id,
+        )
+
+    def stop(self) -> None:
+        self.bus.unsubscribe(self.handle)
+
+    async def handle(self, event: PipelineEvent) -> None:
+        if event.origin is not None and event.origin != instance_id():
+            return
+        scopes = [pipeline_scope(event.pipeline_id)]
+        if (project_id := await self._project(event.pipeline_id)) is not None:
+            scopes.append(project_pipelines_scope(project_id))
+        await self.cache.invalidate(*scopes)
+
+    async def _project(self, pipeline_id: str) -> str | None:
+        if (project_id := self._project_of.get(pipeline_id)) is not None:
+            self._project_of.move_to_end(pipeline_id)
+            return project_id
+        from app.core.database import write_session
+        from app.db.models import Pipeline
+        try:
+            async with write_session() as db:
+                project_id = (await db.execute(
+                    select(Pipeline.project_id).where(Pipeline.id == UUID(pipeline_id))
+                )).scalar_one_or_none()
+        except Exception as exc:
+            logger.debug("Could not look up the project of pipeline %s: %s", pipeline_id, exc)
+            return None
+        if project_id is None:
+            return None
+        self._project_of[pipeline_id] = str(project_id)
+        while len(self._project_of) > _PROJECT_OF_MAX:
+            self._project_of.popitem(last=False)
+        return str(project_id)
+
+
+# ── Module-level singleton (mirrors event_store._writer) ──────────────────────
+
+_cache: ResponseCache | None = None
+_invalidator: CacheInvalidator | None = None
+
+
+def init_response_cache() -> ResponseCache:
+    global _cache, _invalidator
+    _cache = ResponseCache()
+    _invalidator = CacheInvalidator(_cache)
+    _invalidator.start()
+    return _cache
+
+
+async def close_response_cache() -> None:
+    global _cache, _invalidator
+    if _invalidator is not None:
+        _invalidator.stop()
+        _invalidator = None
+    if _cache is not None:
+        await _cache.close()
+        _cache = None
+
+
+def get_response_cache() -> ResponseCache | None:
+    return _cache
+
+
+async def cached(
+    view: CachedView,
+    args: Sequence[object],
+    scopes: Sequence[str],
+    load: Callable[[], Awaitable[BaseModel | None]],
+    *,
+    bypass: bool = False,
+) -> BaseModel | None:
+    """ResponseCache.get_or_load(), or just load() while the cache is disabled."""
+    if _cache is None:
+        return await load()
+    return await _cache.get_or_load(view, args, scopes, load, bypass=bypass)
+
+
+async def invalidate(*scopes: str) -> None:
+    if _cache is not None:
+        await _cache.invalidate(*scopes)
@@ -2,6 +2,10 @@
 Async SQLAlchemy engine + session factories.
 Provides write (primary) and read (replica) sessions with CQRS split.
 Called once at application startup via init_db().
+
+With read replicas configured (DATABASE_URL_REPLICA, DATABASE_URL_REPLICAS)
+reads are spread across them by core.replicas.ReplicaRouter, which keeps a
+client's reads consistent with its own writes.
 """
 from __future__ import annotations
 
@@ -9,13 +13,16 @@ import logging
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from starlette.requests import HTTPConnection
 
 from app.core.config import settings
+from app.core.replicas import Replica, ReplicaRouter, consistency_key
 
 logger = logging.getLogger(__name__)
 
@@ -25,11 +32,30 @@ _engine_write = None
 _engine_read  = None
 _WriteSession: async_sessionmaker | None = None
 _ReadSession:  async_sessionmaker | None = None
+_engines_replica: list = []
+_router: ReplicaRouter | None = None
+
+_WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+
+def _replica_urls() -> list[str]:
+    urls = [settings.DATABASE_URL_REPLICA, *settings.DATABASE_URL_REPLICAS]
+    return list(dict.fromkeys(url for url in urls if url))
+
+
+def _read_engine(url: str):
+    return create_async_engine(
+        url,
+        pool_size=max(5, settings.DB_POOL_SIZE // 2),
+        max_overflow=5,
+        pool_pre_ping=True,
+        echo=False,
+    )
 
 
 async def init_db() -> None:
     """Create engine pools and verify connectivity."""
-    global _engine_write, _engine_read, _WriteSession, _ReadSession
+    global _engine_write, _engine_read, _WriteSession, _ReadSession, _engines_replica, _router
 
     _engine_write = create_async_engine(
         settings.DATABASE_URL,
@@ -39,13 +65,10 @@ async def init_db() -> None:
         pool_pre_ping=True,
         echo=settings.DEBUG,
     )
-    _engine_read = create_async_engine(
-        settings.DATABASE_URL_REPLICA or settings.DATABASE_URL,
-        pool_size=max(5, settings.DB_POOL_SIZE // 2),
-        max_overflow=5,
-        pool_pre_ping=True,
-        echo=False,
-    )
+    replica_urls = _replica_urls()
+    _engines_replica = [_read_engine(url) for url in replica_urls]
+    # Without replicas, reads still get a pool of their own on the primary
+    _engine_read = _engines_replica[0] if _engines_replica else _read_engine(settings.DATABASE_URL)
 
     _WriteSession = async_sessionmaker(_engine_write, class_=AsyncSession, expire_on_commit=False)
     _ReadSession  = async_sessionmaker(_engine_read,  class_=AsyncSession, expire_on_commit=False)
@@ -53,20 +76,39 @@ async def init_db() -> None:
     # Verify connectivity
     async with _engine_write.connect() as conn:
         await conn.execute(__import__("sqlalchemy").text("SELECT 1"))
-    logger.info("Database connections established (primary + replica)")
+
+    if _engines_replica:
+        # Reads that no replica can serve fall back to the primary's pool
+        _router = ReplicaRouter(
+            _WriteSession,
+            [
+                Replica(
+                    make_url(url).render_as_string(hide_password=True),
+                    async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False),
+                )
+                for url, engine in zip(replica_urls, _engines_replica, strict=True)
+            ],
+        )
+        await _router.probe()
+        _router.start()
+    logger.info("Database connections established (primary + %d replicas)", len(replica_urls))
 
 
 async def close_db() -> None:
+    global _router
+    if _router is not None:
+        await _router.stop()
+        _router = None
     if _engine_write:
         await _engine_write.dispose()
-    if _engine_read:
-        await _engine_read.dispose()
+    for engine in {_engine_read, *_engines_replica} - {None}:
+        await engine.dispose()
     logger.info("Database connections closed")
 
 
 # ── Session dependency helpers ────────────────────────────────────────────────
 
-async def get_write_db() -> AsyncGenerator[AsyncSession, None]:
+async def get_write_db(conn: HTTPConnection) -> AsyncGenerator[AsyncSession, None]:
     """FastAPI dependency — write session (primary DB)."""
     async with _WriteSession() as session:  # type: ignore[misc]
         try:
@@ -75,18 +117,58 @@ async def get_write_db() -> AsyncGenerator[AsyncSession, None]:
         except Exception:
             await session.rollback()
             raise
-
-
-async def get_read_db() -> AsyncGenerator[AsyncSession, None]:
-    """FastAPI dependency — read-only session (replica DB)."""
+        if _router is not None and conn.scope.get("method") in _WRITE_METHODS:
+            await _pin_reads(conn, session)
+
+
+async def _pin_reads(conn: HTTPConnection, session: AsyncSession) -> None:
+    """Keep the client's next reads from a replica that has not seen this write."""
+    if (key := consistency_key(conn)) is None:
+        return
+    try:
+        await _router.record_write(key, session)  # type: ignore[union-attr]
+    except Exception as exc:   # the write is committed: never fail the request now
+        logger.warning("Could not pin reads after a write: %s", exc)
+
+
+async def get_read_db(conn: HTTPConnection) -> AsyncGenerator[AsyncSession, None]:
+    """FastAPI dependency — read-only session (a replica that has seen the client's writes)."""
+    if _router is not None:
+        key = consistency_key(conn)
+        conn.state.write_pin = pin = await _router.pin_for(key) if key else None
+        async with _router.sessionmaker_for(pin)() as session:
+            yield session
+        return
     async with _ReadSession() as session:  # type: ignore[misc]
         yield session
 
 
+def reads_own_writes(conn: HTTPConnection) -> bool:
+    """Whether get_read_db pinned this request to data its client has just written.
+
+    Usable as a dependency; declare it after the get_read_db session it reports on.
+    """
+    return getattr(conn.state, "write_pin", None) is not None
+
+
 # Alias for backward-compat (routes that import get_db)
 get_db = get_write_db
 
 
+@asynccontextmanager
+async def read_session() -> AsyncGenerator[AsyncSession, None]:
+    """Read-only counterpart of write_session() (replica DB)."""
+    async with read_sessionmaker()() as session:
+        yield session
+
+
+def read_sessionmaker() -> async_sessionmaker:
+    """Sessions on one replica, for work whose sessions must agree on how far it has replayed."""
+    if _router is not None:
+        return _router.sessionmaker_for()
+    return _ReadSession  # type: ignore[return-value]
+
+
 @asynccontextmanager
 async def write_session() -> AsyncGenerator[AsyncSession, None]:
     """Context manager for non-FastAPI code (workers, tasks)."""
@@ -0,0 +1,167 @@
+"""
+Conditional and ranged file downloads.
+
+serve_body() turns "a body of N bytes that can be opened as a stream" into
+the right response for the request:
+
+  304  If-None-Match matches the strong ETag (the content checksum)
+  206  a single satisfiable `Range: bytes=…`, honouring If-Range
+  416  a range that starts past the end
+  200  everything else — including multi-range requests, which are legal
+       to answer with the whole body and which no download client needs
+
+Bodies are streamed in CHUNK_SIZE pieces from a blocking reader that
+StreamingResponse drives in the thread pool, so memory stays flat however
+large the artifact. Readers may be forward-only (a zstd stream): ranges are
+reached by seeking when the reader can, otherwise by reading past the prefix.
+
+When the caller has the body on local disk already encoded in a form the
+client accepts, it is handed to FileResponse instead — sendfile, no copy
+through Python at all.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import BinaryIO
+
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response, StreamingResponse
+
+CHUNK_SIZE = 64 * 1024
+
+IMMUTABLE_CACHE_CONTROL  = "private, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+class RangeNotSatisfiableError(Exception):
+    pass
+
+
+def parse_range(header: str | None, size: int) -> tuple[int, int] | None:
+    """The inclusive (start, end) of a single byte range, or None for the whole body.
+
+    Malformed headers, other units and multi-range requests are ignored, as
+    RFC 9110 allows. Raises RangeNotSatisfiableError when the range lies past the end.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = spec.strip().partition("-")
+    if not sep:
+        return None
+    try:
+        if not first:   # suffix range: the last N bytes
+            length = int(last)
+            if length <= 0 or size == 0:
+                raise RangeNotSatisfiableError
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiableError
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    """If-None-Match comparison (weak, per RFC 9110 §13.1.2)."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def iter_body(
+    opener: Callable[[], BinaryIO],
+    start: int = 0,
+    length: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Blocking generator over `length` bytes of the body from `start`."""
+    with opener() as reader:
+        if start and reader.seekable():
+            reader.seek(start)
+            start = 0
+        while start > 0:   # forward-only reader: read past the prefix
+            skipped = len(reader.read(min(chunk_size, start)))
+            if not skipped:
+                return
+            start -= skipped
+        remaining = length
+        while remaining is None or remaining > 0:
+            data = reader.read(chunk_size if remaining is None else min(chunk_size, remaining))
+            if not data:
+                return
+            if remaining is not None:
+                remaining -= len(data)
+            yield data
+
+
+def serve_body(
+    request: Request,
+    *,
+    size: int,
+    checksum: str,
+    opener: Callable[[], BinaryIO],
+    media_type: str,
+    filename: str,
+    immutable: bool = False,
+    encoded: tuple[Path, str] | None = None,
+) -> Response:
+    """Respond with the body identified by `checksum` (see the module docstring).
+
+    `encoded` is an optional (path, content-coding) of the same body stored on
+    local disk, served as-is to clients that accept that coding and ask for
+    the whole body.
+    """
+    headers = {
+        "Cache-Control": IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL,
+        "Accept-Ranges": "bytes",
+    }
+    range_header = request.headers.get("range")
+    if encoded is not None:
+        headers["Vary"] = "Accept-Encoding"
+        path, coding = encoded
+        accepted = request.headers.get("accept-encoding", "")
+        if not range_header and coding in [c.split(";")[0].strip() for c in accepted.split(",")]:
+            # Each representation needs its own strong validator
+            headers["ETag"] = f'"{checksum}.{coding}"'
+            if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+                return Response(status_code=304, headers=headers)
+            headers["Content-Encoding"] = coding
+            return FileResponse(
+                path, media_type=media_type, filename=filename, headers=headers,
+                content_disposition_type="attachment",
+            )
+
+    etag = headers["ETag"] = f'"{checksum}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if_range = request.headers.get("if-range")
+    if if_range and if_range.strip() != etag:
+        range_header = None   # the client's partial copy is stale — send it all
+    try:
+        byte_range = parse_range(range_header, size)
+    except RangeNotSatisfiableError:
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+
+    headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        return StreamingResponse(iter_body(opener), media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    length = end - start + 1
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(length)
+    return StreamingResponse(
+        iter_body(opener, start, length), status_code=206, media_type=media_type, headers=headers,
+    )
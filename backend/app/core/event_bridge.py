@@ -0,0 +1,228 @@
+"""
+Cross-pod EventBus bridge.
+
+EventBus is in-process, so a browser connected to API pod A would never see
+events from a pipeline running on worker pod B. The bridge closes that gap by
+feeding remote events into the local bus; WebSocket clients need no sticky
+sessions.
+
+Two backends (settings.EVENT_BRIDGE_BACKEND):
+
+  kafka  Consume the pipeline-events topic with a per-process consumer group
+         (every pod sees every event) and drop events for pipelines and
+         workspaces nobody here is watching.
+  redis  Lighter: each local event is PUBLISHed to per-pipeline,
+         per-workspace and (for approval_* events) approvals channels, and
+         this pod SUBSCRIBEs only to channels for topics that currently have
+         local watchers.
+
+Either way, events carry their origin's instance_id(): the bridge ignores its
+own events (loop prevention), and a bounded LRU of event_ids drops duplicates.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any
+
+from app.core.config import settings
+from app.core.events import (
+    WILDCARD,
+    EventBus,
+    PipelineEvent,
+    event_topics,
+    instance_id,
+)
+
+logger = logging.getLogger(__name__)
+
+REDIS_CHANNEL_PREFIX = "forge:events:"
+
+
+def _channel(topic: str) -> str:
+    return REDIS_CHANNEL_PREFIX + topic
+
+
+class EventBridge:
+    def __init__(self, bus: EventBus | None = None, backend: str | None = None) -> None:
+        self.bus       = bus or EventBus.get_instance()
+        self.backend   = (backend or settings.EVENT_BRIDGE_BACKEND).lower()
+        self.bridged   = 0
+        self.skipped   = 0
+        self._seen: OrderedDict[str, None] = OrderedDict()
+        self._task: asyncio.Task | None = None
+        # Redis backend: pending (topic, active) changes applied by the listen loop
+        self._topic_changes: asyncio.Queue[tuple[str, bool]] = asyncio.Queue()
+
+    # ── Lifecycle ─────────────────────────────────────────────────────────────
+
+    async def start(self) -> None:
+        if self.backend == "kafka":
+            self._task = asyncio.create_task(self._run_kafka(), name="event-bridge-kafka")
+        elif self.backend == "redis":
+            self.bus.subscribe(self._publish_local, topics=[WILDCARD])
+            self.bus.add_topic_listener(self._on_topic_change)
+            for topic in self.bus.active_topics():
+                self._on_topic_change(topic, True)
+            self._task = asyncio.create_task(self._run_redis(), name="event-bridge-redis")
+        else:
+            logger.info("Event bridge disabled (backend=%s)", self.backend)
+            return
+        logger.info("Event bridge started (backend=%s, instance=%s)", self.backend, instance_id())
+
+    async def stop(self) -> None:
+        if self.backend == "redis":
+            self.bus.unsubscribe(self._publish_local)
+            self.bus.remove_topic_listener(self._on_topic_change)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # ── Inbound: remote payload → local bus ───────────────────────────────────
+
+    def accept(self, payload: dict[str, Any]) -> PipelineEvent | None:
+        """Return the event to re-publish locally, or None if it must be skipped."""
+        event_id = payload.get("event_id")
+        origin = payload.get("origin")
+        pipeline_id = payload.get("pipeline_id")
+        # Commands such as pipeline_queued carry no event_id — not bus events
+        if not event_id or not pipeline_id or origin == instance_id():
+            return None
+        workspace_id = payload.get("workspace_id")
+        event_type = payload.get("event_type", "unknown")
+        watched = any(
+            self.bus.has_subscribers(topic)
+            for topic in event_topics(pipeline_id, workspace_id, event_type)
+        )
+        if not watched or event_id in self._seen:
+            self.skipped += 1
+            return None
+        self._seen[event_id] = None
+        if len(self._seen) > settings.EVENT_BRIDGE_DEDUP_SIZE:
+            self._seen.popitem(last=False)
+
+        data = dict(payload.get("data") or {})
+        stage_id = data.pop("stage_id", None)
+        timestamp = payload.get("timestamp")
+        event = PipelineEvent(
+            pipeline_id=pipeline_id,
+            event_type=event_type,
+            data=data,
+            stage_id=stage_id,
+            event_id=event_id,
+            workspace_id=workspace_id,
+            origin=origin,
+            seq=payload.get("seq"),
+        )
+        if timestamp:
+            event.timestamp = datetime.fromisoformat(timestamp)
+        return event
+
+    async def _deliver(self, payload: dict[str, Any]) -> None:
+        event = self.accept(payload)
+        if event is not None:
+            self.bridged += 1
+            await self.bus.publish(event)
+
+    # ── Kafka backend ─────────────────────────────────────────────────────────
+
+    async def _run_kafka(self) -> None:
+        from app.core.kafka_client import make_consumer
+
+        consumer = make_consumer(
+            [settings.KAFKA_TOPIC_PIPELINE_EVENTS],
+            # Unique group per process: every pod must see every event
+            group_id=f"{settings.KAFKA_CONSUMER_GROUP}-bridge-{instance_id()}",
+            auto_offset_reset="latest",
+        )
+        try:
+            await consumer.start()
+            async for message in consumer:
+                try:
+                    await self._deliver(message.value)
+                except Exception as exc:
+                    logger.warning("Event bridge: bad message skipped: %s", exc)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.error("Event bridge (kafka) stopped: %s", exc)
+        finally:
+            await consumer.stop()
+
+    # ── Redis backend ─────────────────────────────────────────────────────────
+
+    async def _publish_local(self, event: PipelineEvent) -> None:
+        """Bus handler: share events that originated here with the other pods."""
+        if event.origin != instance_id():
+            return
+        from app.core.event_forwarder import event_to_record
+        from app.core.redis_client import get_redis_client
+
+        message = json.dumps(event_to_record(event)["value"])
+        redis = get_redis_client()
+        for topic in event_topics(event.pipeline_id, event.workspace_id, event.event_type):
+            await redis.publish(_channel(topic), message)
+
+    def _on_topic_change(self, topic: str, active: bool) -> None:
+        if topic != WILDCARD:
+            self._topic_changes.put_nowait((topic, active))
+
+    async def _run_redis(self) -> None:
+        from app.core.redis_client import get_redis_client
+
+        pubsub = get_redis_client().pubsub()
+        try:
+            while True:
+                if not pubsub.subscribed:
+                    # Nothing watched locally — block until something is
+                    await self._apply_topic_change(pubsub, await self._topic_changes.get())
+                while not self._topic_changes.empty():
+                    await self._apply_topic_change(pubsub, self._topic_changes.get_nowait())
+                if not pubsub.subscribed:
+                    continue
+                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=0.25)
+                if message and message.get("type") == "message":
+                    try:
+                        await self._deliver(json.loads(message["data"]))
+                    except Exception as exc:
+                        logger.warning("Event bridge: bad message skipped: %s", exc)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.error("Event bridge (redis) stopped: %s", exc)
+        finally:
+            await pubsub.aclose()
+
+    @staticmethod
+    async def _apply_topic_change(pubsub: Any, change: tuple[str, bool]) -> None:
+        topic, active = change
+        if active:
+            await pubsub.subscribe(_channel(topic))
+        else:
+            await pubsub.unsubscribe(_channel(topic))
+
+
+# ── Module-level singleton ────────────────────────────────────────────────────
+
+_bridge: EventBridge | None = None
+
+
+async def init_event_bridge() -> EventBridge:
+    global _bridge
+    _bridge = EventBridge()
+    await _bridge.start()
+    return _bridge
+
+
+async def close_event_bridge() -> None:
+    global _bridge
+    if _bridge is not None:
+        await _bridge.stop()
+        _bridge = None
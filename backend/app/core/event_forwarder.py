@@ -0,0 +1,244 @@
+"""
+Batched EventBus → Kafka forwarder.
+
+EventBus.publish() hands every event to enqueue(), which appends to a bounded
+ring buffer and returns. A single background task drains the buffer in
+batches, groups each batch by key (pipeline_id) so per-pipeline order is kept,
+and uses the producer's non-blocking send(); delivery futures are awaited once
+per batch instead of one broker round-trip per event.
+
+When the broker is unreachable, undeliverable records are appended to a local
+NDJSON spill file (batcher.SpillFile). While a spill exists new batches are
+appended behind it, and every SPILL_RETRY_SECONDS the file is replayed ahead
+of them, so per-pipeline order survives an outage; what a replay could not
+send stays claimed for the next one. Unreadable lines, such as one cut short
+by a crash mid-write, are skipped and counted as dropped.
+
+stop() lets the drain task finish the batch it is sending, then flushes
+whatever is still buffered (sending or spilling it). A batch whose send is
+cancelled outright is put back at the head of the buffer, so delivery stays
+at-least-once.
+
+`acks` receipts are settled per event_id: True once Kafka acknowledged the
+record or it was fsynced to the spill (which is replayed in order and
+survives a restart), False when it was dropped from the ring or lost with a
+failed spill write.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from itertools import groupby
+from typing import TYPE_CHECKING, Any
+
+from app.core.batcher import Acks, BackgroundBatcher, SpillFile
+from app.core.config import settings
+from app.core.metrics import (
+    record_kafka_forward_batch,
+    record_kafka_forward_drop,
+    set_kafka_forward_buffer_depth,
+)
+
+if TYPE_CHECKING:
+    from app.core.events import PipelineEvent
+
+logger = logging.getLogger(__name__)
+
+Record = dict[str, Any]   # {"topic": str, "key": str | None, "value": dict}
+
+SPILL_RETRY_SECONDS = 5.0
+
+
+def event_to_record(event: PipelineEvent) -> Record:
+    return {
+        "topic": settings.KAFKA_TOPIC_PIPELINE_EVENTS,
+        "key":   event.pipeline_id,
+        "value": {
+            "pipeline_id":  event.pipeline_id,
+            "event_type":   event.event_type,
+            "data":         {"stage_id": event.stage_id, **event.data},
+            "event_id":     event.event_id,
+            "timestamp":    event.timestamp.isoformat(),
+            "workspace_id": event.workspace_id,
+            "origin":       event.origin,
+            "seq":          event.seq,
+        },
+    }
+
+
+class KafkaEventForwarder(BackgroundBatcher):
+    def __init__(
+        self,
+        buffer_size: int | None = None,
+        batch_size: int | None = None,
+        linger_ms: int | None = None,
+        spill_path: str | None = None,
+    ) -> None:
+        if linger_ms is None:
+            linger_ms = settings.KAFKA_FORWARD_LINGER_MS
+        super().__init__(batch_size or settings.KAFKA_FORWARD_BATCH_SIZE, linger_ms / 1000)
+        self.buffer_size = buffer_size or settings.KAFKA_FORWARD_BUFFER_SIZE
+        self.spill = SpillFile(
+            spill_path or settings.KAFKA_SPILL_PATH,
+            on_corrupt=lambda: record_kafka_forward_drop("corrupt"),
+        )
+        self.dropped     = 0
+        self.acks        = Acks()
+        self._buffer: deque[PipelineEvent] = deque()
+        self._has_spill = self.spill.exists()
+        self._retry_at  = 0.0
+
+    @property
+    def depth(self) -> int:
+        return len(self._buffer)
+
+    def enqueue(self, event: PipelineEvent) -> None:
+        """O(1), never blocks. Drops the oldest buffered event when full."""
+        if len(self._buffer) >= self.buffer_size:
+            dropped = self._buffer.popleft()
+            self.dropped += 1
+            record_kafka_forward_drop("buffer_full")
+            self.acks.settle([dropped.event_id], False)
+        self._buffer.append(event)
+        set_kafka_forward_buffer_depth(len(self._buffer))
+        self._kick()
+
+    async def stop(self) -> None:
+        """Stop the drain task and flush everything still buffered."""
+        await self._stop_task()
+        while self._buffer:
+            await self._flush_batch()
+        logger.info("Kafka forwarder stopped (dropped=%d)", self.dropped)
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _pending(self) -> bool:
+        return bool(self._buffer)
+
+    async def _drain(self) -> None:
+        await self._linger(len(self._buffer))
+        await self._flush_batch()
+
+    async def _flush_batch(self) -> None:
+        n = min(len(self._buffer), self.batch_size)
+        events = [self._buffer.popleft() for _ in range(n)]
+        set_kafka_forward_buffer_depth(len(self._buffer))
+        if not events:
+            return
+
+        lag = max(time.time() - e.timestamp.timestamp() for e in events)
+        record_kafka_forward_batch(len(events), lag)
+        records = [event_to_record(e) for e in events]
+
+        try:
+            # Older spilled events go first; while the broker is still down,
+            # queue new ones behind them rather than overtaking.
+            if self._has_spill and not await self._replay_spill():
+                await self._spill(records)
+                return
+
+            failed = await self._send(records)
+            if failed:
+                await self._spill(failed)
+                self._retry_at = time.monotonic() + SPILL_RETRY_SECONDS
+        except asyncio.CancelledError:
+            # Part of the batch may already be out; resending it is the
+            # at-least-once trade-off, losing it is not an option.
+            self._buffer.extendleft(reversed(events))
+            set_kafka_forward_buffer_depth(len(self._buffer))
+            raise
+
+    async def _send(self, records: list[Record]) -> list[Record]:
+        """Send records; return the ones that could not be delivered."""
+        try:
+            from app.core.kafka_client import get_producer
+            producer = get_producer()
+        except RuntimeError:
+            return records
+
+        # Stable sort by key keeps each pipeline's events in publish order
+        ordered = sorted(records, key=lambda r: r["key"] or "")
+        sent: list[tuple[Record, asyncio.Future]] = []
+        failed: list[Record] = []
+        for _, group in groupby(ordered, key=lambda r: r["key"]):
+            group_list = list(group)
+            for i, record in enumerate(group_list):
+                try:
+                    fut = await producer.send(
+                        record["topic"], value=record["value"], key=record["key"]
+                    )
+                except Exception as exc:
+                    logger.warning("Kafka forward send failed: %s", exc)
+                    failed.extend(group_list[i:])
+                    break
+                sent.append((record, fut))
+
+        results = await asyncio.gather(*(f for _, f in sent), return_exceptions=True)
+        acked = []
+        for (record, _), result in zip(sent, results, strict=True):
+            if isinstance(result, Exception):
+                failed.append(record)
+            else:
+                acked.append(record["value"].get("event_id"))
+        self.acks.settle(acked, True)
+        if failed:
+            logger.warning("Kafka forward: %d/%d records undelivered", len(failed), len(records))
+        return failed
+
+    async def _spill(self, records: list[Record]) -> None:
+        try:
+            await asyncio.to_thread(self.spill.append, records)
+            self._has_spill = True
+            record_kafka_forward_drop("spilled", len(records))
+            ok = True
+        except OSError as exc:
+            logger.error("Kafka forward spill failed, %d events lost: %s", len(records), exc)
+            record_kafka_forward_drop("lost", len(records))
+            ok = False
+        self.acks.settle((r["value"].get("event_id") for r in records), ok)
+
+    async def _replay_spill(self) -> bool:
+        """Resend spilled records. Returns False if the spill is still pending."""
+        if time.monotonic() < self._retry_at:
+            return False
+        while (records := await asyncio.to_thread(self.spill.take)) is not None:
+            if records:
+                logger.info("Kafka forward: replaying %d spilled events", len(records))
+            for start in range(0, len(records), self.batch_size):
+                failed = await self._send(records[start:start + self.batch_size])
+                if failed:
+                    rest = failed + records[start + self.batch_size:]
+                    try:
+                        await asyncio.to_thread(self.spill.keep, rest)
+                    except OSError as exc:
+                        # The claimed file still holds them all: resent, not lost
+                        logger.error("Kafka forward could not update the spill: %s", exc)
+                    self._retry_at = time.monotonic() + SPILL_RETRY_SECONDS
+                    return False
+            await asyncio.to_thread(self.spill.finish)
+        self._has_spill = False
+        return True
+
+
+# ── Module-level singleton (mirrors kafka_client._producer) ───────────────────
+
+_forwarder: KafkaEventForwarder | None = None
+
+
+def init_event_forwarder() -> KafkaEventForwarder:
+    global _forwarder
+    _forwarder = KafkaEventForwarder()
+    return _forwarder
+
+
+async def close_event_forwarder() -> None:
+    global _forwarder
+    if _forwarder is not None:
+        await _forwarder.stop()
+        _forwarder = None
+
+
+def get_event_forwarder() -> KafkaEventForwarder | None:
+    return _forwarder
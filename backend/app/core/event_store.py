@@ -0,0 +1,354 @@
+"""
+Batched, append-only EventStore writer.
+
+EventBus.publish() hands every locally originated event to append(), which is
+an O(1) buffer append while the database keeps up. A single background task
+drains the buffer in batches and persists each one in a single transaction:
+
+  * sequence numbers are gap-free per aggregate (pipeline_id). The next value
+    for each aggregate is cached in memory, so only aggregates the writer has
+    not seen yet cost one grouped MAX() query per batch — never a round-trip
+    per event;
+  * rows go in with one multi-row INSERT, or COPY when the engine is
+    PostgreSQL on asyncpg.
+
+If the database falls behind and the buffer fills, append() waits for room
+(up to EVENT_STORE_BACKPRESSURE_TIMEOUT) so publishers slow down instead of
+memory growing without bound; only then is the oldest buffered event dropped.
+A unique-constraint clash means another writer advanced an aggregate: the
+cached sequences are discarded and the batch is retried.
+
+Connectivity errors are retried for as long as they last. Any other error
+(e.g. a value the driver cannot serialise) is retried EVENT_STORE_MAX_ATTEMPTS
+times; the batch is then written one event at a time, and events that still
+fail go to an NDJSON dead-letter file, so one bad row cannot stall the
+stream. stop() lets the drain task finish its current batch; a batch whose
+write is cancelled is put back at the head of the buffer.
+
+`acks` receipts are settled per event_id: True once the event is written (or
+dead-lettered, which is final), False when backpressure or shutdown drops
+it. An event that is still buffered for a retry stays unsettled.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict, deque
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import DisconnectionError, IntegrityError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.batcher import Acks, BackgroundBatcher
+from app.core.config import settings
+from app.core.database import write_session
+from app.core.metrics import (
+    record_event_store_batch,
+    record_event_store_drop,
+    set_event_store_buffer_depth,
+)
+from app.db.models import EventStore
+
+if TYPE_CHECKING:
+    from app.core.events import PipelineEvent
+
+logger = logging.getLogger(__name__)
+
+AGGREGATE_TYPE = "pipeline"
+RETRY_SECONDS = 1.0
+SEQUENCE_CACHE_SIZE = 10_000
+
+# Worth retrying indefinitely: the database is unreachable, not the data at fault
+_TRANSIENT_ERRORS = (OperationalError, InterfaceError, DisconnectionError, OSError, TimeoutError)
+
+# Column order used for COPY
+_COLUMNS = (
+    "id", "aggregate_id", "aggregate_type", "event_type",
+    "event_data", "sequence_number", "occurred_at", "extra",
+)
+_JSON_COLUMNS = {"event_data", "extra"}
+
+SessionFactory = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+
+
+def event_to_row(event: PipelineEvent, sequence_number: int) -> dict[str, Any]:
+    return {
+        "id":              uuid.uuid4(),
+        "aggregate_id":    event.pipeline_id,
+        "aggregate_type":  AGGREGATE_TYPE,
+        "event_type":      event.event_type,
+        "event_data":      {"stage_id": event.stage_id, **event.data},
+        "sequence_number": sequence_number,
+        # event_store.occurred_at is a naive UTC column
+        "occurred_at":     event.timestamp.astimezone(UTC).replace(tzinfo=None),
+        "extra": {
+            "event_id":     event.event_id,
+            "workspace_id": event.workspace_id,
+            "origin":       event.origin,
+            "seq":          event.seq,
+        },
+    }
+
+
+class EventStoreWriter(BackgroundBatcher):
+    def __init__(
+        self,
+        buffer_size: int | None = None,
+        batch_size: int | None = None,
+        linger_ms: int | None = None,
+        backpressure_timeout: float | None = None,
+        session_factory: SessionFactory | None = None,
+        max_attempts: int | None = None,
+        dead_letter_path: str | None = None,
+    ) -> None:
+        if linger_ms is None:
+            linger_ms = settings.EVENT_STORE_LINGER_MS
+        super().__init__(batch_size or settings.EVENT_STORE_BATCH_SIZE, linger_ms / 1000)
+        self.buffer_size = buffer_size or settings.EVENT_STORE_BUFFER_SIZE
+        if backpressure_timeout is None:
+            backpressure_timeout = settings.EVENT_STORE_BACKPRESSURE_TIMEOUT
+        self.backpressure_timeout = backpressure_timeout
+        self.max_attempts = max_attempts or settings.EVENT_STORE_MAX_ATTEMPTS
+        self.dead_letter_path = Path(dead_letter_path or settings.EVENT_STORE_DEAD_LETTER_PATH)
+        self.written     = 0
+        self.dropped     = 0
+        self.dead_lettered = 0
+        self.acks        = Acks()
+        self._session_factory = session_factory or write_session
+        self._buffer: deque[PipelineEvent] = deque()
+        self._sequences: OrderedDict[str, int] = OrderedDict()   # aggregate → next seq
+        self._space = asyncio.Event()
+        self._space.set()
+        self._failures = 0   # consecutive non-transient failures of the head batch
+
+    @property
+    def depth(self) -> int:
+        return len(self._buffer)
+
+    async def append(self, event: PipelineEvent) -> None:
+        """O(1) while the DB keeps up; waits for room (backpressure) when the buffer is full."""
+        if len(self._buffer) >= self.buffer_size:
+            await self._wait_for_space()
+        self._buffer.append(event)
+        set_event_store_buffer_depth(len(self._buffer))
+        self._kick()
+
+    async def stop(self) -> None:
+        """Stop the drain task and persist everything still buffered."""
+        await self._stop_task()
+        while self._buffer:
+            # A non-transient failure counts towards dead-lettering: go again
+            if not await self._flush_batch() and not self._failures:
+                lost = len(self._buffer)
+                self.acks.settle((e.event_id for e in self._buffer), False)
+                self._buffer.clear()
+                record_event_store_drop("lost", lost)
+                logger.error("EventStore: %d events lost on shutdown", lost)
+        self._space.set()
+        logger.info(
+            "EventStore writer stopped (written=%d, dropped=%d, dead-lettered=%d)",
+            self.written, self.dropped, self.dead_lettered,
+        )
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    async def _wait_for_space(self) -> None:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.backpressure_timeout
+        while len(self._buffer) >= self.buffer_size:
+            self._space.clear()
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                dropped = self._buffer.popleft()
+                self.dropped += 1
+                record_event_store_drop("backpressure_timeout")
+                self.acks.settle([dropped.event_id], False)
+                return
+            try:
+                await asyncio.wait_for(self._space.wait(), timeout=remaining)
+            except TimeoutError:
+                pass
+
+    def _pending(self) -> bool:
+        return bool(self._buffer)
+
+    async def _drain(self) -> None:
+        await self._linger(len(self._buffer))
+        if not await self._flush_batch():
+            await asyncio.sleep(RETRY_SECONDS)
+
+    async def _flush_batch(self) -> bool:
+        """Persist the next batch. On failure the batch is put back and False returned."""
+        n = min(len(self._buffer), self.batch_size)
+        events = [self._buffer.popleft() for _ in range(n)]
+        if not events:
+            return True
+
+        t0 = time.perf_counter()
+        try:
+            await self._write_batch(events)
+        except asyncio.CancelledError:
+            self._buffer.extendleft(reversed(events))
+            raise
+        except _TRANSIENT_ERRORS as exc:
+            logger.warning("EventStore write of %d events failed: %s", len(events), exc)
+            self._failures = 0
+            self._buffer.extendleft(reversed(events))
+            return False
+        except Exception as exc:
+            self._failures += 1
+            logger.warning(
+                "EventStore write of %d events failed (attempt %d/%d): %s",
+                len(events), self._failures, self.max_attempts, exc,
+            )
+            if self._failures < self.max_attempts:
+                self._buffer.extendleft(reversed(events))
+                return False
+            self._failures = 0
+            return await self._write_one_by_one(events)
+
+        self._failures = 0
+        record_event_store_batch(len(events), time.perf_counter() - t0)
+        self.written += len(events)
+        self.acks.settle((e.event_id for e in events), True)
+        self._on_drained()
+        return True
+
+    def _on_drained(self) -> None:
+        set_event_store_buffer_depth(len(self._buffer))
+        if len(self._buffer) < self.buffer_size:
+            self._space.set()
+
+    async def _write_one_by_one(self, events: list[PipelineEvent]) -> bool:
+        """Write a repeatedly failing batch event by event, dead-lettering the bad ones."""
+        for i, event in enumerate(events):
+            try:
+                await self._write_batch([event])
+            except asyncio.CancelledError:
+                self._buffer.extendleft(reversed(events[i:]))
+                raise
+            except _TRANSIENT_ERRORS:
+                self._buffer.extendleft(reversed(events[i:]))
+                return False
+            except Exception as exc:
+                await self._dead_letter(event, exc)
+            else:
+                self.written += 1
+            self.acks.settle([event.event_id], True)
+        self._on_drained()
+        return True
+
+    async def _dead_letter(self, event: PipelineEvent, exc: Exception) -> None:
+        self.dead_lettered += 1
+        record_event_store_drop("dead_letter")
+        logger.error("EventStore: event %s dead-lettered: %s", event.event_id, exc)
+        entry = {
+            "failed_at":   datetime.now(UTC).isoformat(),
+            "error":       repr(exc),
+            "pipeline_id": event.pipeline_id,
+            "event_type":  event.event_type,
+            "stage_id":    event.stage_id,
+            "data":        event.data,
+            "event_id":    event.event_id,
+            "timestamp":   event.timestamp.isoformat(),
+            "seq":         event.seq,
+        }
+        try:
+            await asyncio.to_thread(self._append_dead_letter, entry)
+        except OSError as write_exc:
+            logger.error("EventStore dead-letter write failed, event lost: %s", write_exc)
+
+    def _append_dead_letter(self, entry: dict[str, Any]) -> None:
+        self.dead_letter_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.dead_letter_path.open("a", encoding="utf-8") as fh:
+            # default=str: the data that could not be stored may not be JSON-clean
+            fh.write(json.dumps(entry, default=str) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    async def _write_batch(self, events: list[PipelineEvent]) -> None:
+        try:
+            await self._write(events)
+        except IntegrityError:
+            # Another writer appended to one of these aggregates — re-read and retry
+            for event in events:
+                self._sequences.pop(event.pipeline_id, None)
+            await self._write(events)
+
+    async def _write(self, events: list[PipelineEvent]) -> None:
+        async with self._session_factory() as session:
+            next_seq = await self._next_sequences(session, {e.pipeline_id for e in events})
+            rows = []
+            for event in events:
+                seq = next_seq[event.pipeline_id]
+                next_seq[event.pipeline_id] = seq + 1
+                rows.append(event_to_row(event, seq))
+            await self._insert(session, rows)
+        # Only trust the new sequences once the transaction has committed
+        for aggregate_id, seq in next_seq.items():
+            self._sequences[aggregate_id] = seq
+            self._sequences.move_to_end(aggregate_id)
+        while len(self._sequences) > SEQUENCE_CACHE_SIZE:
+            self._sequences.popitem(last=False)
+
+    async def _next_sequences(
+        self, session: AsyncSession, aggregate_ids: set[str]
+    ) -> dict[str, int]:
+        next_seq = {a: self._sequences[a] for a in aggregate_ids if a in self._sequences}
+        missing = aggregate_ids - next_seq.keys()
+        if missing:
+            result = await session.execute(
+                select(EventStore.aggregate_id, func.max(EventStore.sequence_number))
+                .where(EventStore.aggregate_id.in_(missing))
+                .group_by(EventStore.aggregate_id)
+            )
+            last = dict(result.all())
+            for aggregate_id in missing:
+                next_seq[aggregate_id] = (last.get(aggregate_id) or 0) + 1
+        return next_seq
+
+    @staticmethod
+    async def _insert(session: AsyncSession, rows: list[dict[str, Any]]) -> None:
+        conn = await session.connection()
+        if conn.dialect.name == "postgresql" and conn.dialect.driver == "asyncpg":
+            raw = await conn.get_raw_connection()
+            records = [
+                tuple(json.dumps(row[c]) if c in _JSON_COLUMNS else row[c] for c in _COLUMNS)
+                for row in rows
+            ]
+            await raw.driver_connection.copy_records_to_table(  # type: ignore[union-attr]
+                EventStore.__tablename__, columns=_COLUMNS, records=records
+            )
+        else:
+            await session.execute(insert(EventStore).values(rows))
+
+
+# ── Module-level singleton (mirrors event_forwarder._forwarder) ───────────────
+
+_writer: EventStoreWriter | None = None
+
+
+def init_event_store() -> EventStoreWriter:
+    global _writer
+    _writer = EventStoreWriter()
+    return _writer
+
+
+async def close_event_store() -> None:
+    global _writer
+    if _writer is not None:
+        await _writer.stop()
+        _writer = None
+
+
+def get_event_store() -> EventStoreWriter | None:
+    return _writer
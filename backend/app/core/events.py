@@ -1,21 +1,42 @@
 """
 In-process event bus.
 WebSocket handlers subscribe to pipeline events; the pipeline engine publishes them.
-Events are also forwarded to Kafka for cross-process fan-out.
+Events are also forwarded to Kafka for cross-process fan-out (see event_forwarder).
+
+Publishing never waits on subscribers: publish() appends to a bounded dispatch
+queue and returns. A dispatcher task hands each event to every subscription's
+own bounded queue, and each subscription has a drain task that awaits its handler.
+A slow WebSocket therefore only ever backs up its own queue.
+
+Subscriptions are scoped to topics — one pipeline, one workspace, or the
+wildcard — and the dispatcher looks subscribers up through a topic index, so
+an event only touches the subscribers that asked for it.
 """
 from __future__ import annotations
 
 import asyncio
+import itertools
 import logging
-from collections.abc import Callable, Coroutine
+import os
+import socket
+from collections import OrderedDict, deque
+from collections.abc import Callable, Coroutine, Hashable, Iterable
 from dataclasses import dataclass, field
 from datetime import UTC, datetime
+from enum import StrEnum
 from typing import Any
 from uuid import uuid4
 
+from app.core.config import settings
+from app.core.event_forwarder import get_event_forwarder
+from app.core.event_store import get_event_store
+from app.core.metrics import inc_eventbus_queue_depth, record_eventbus_drop
+from app.core.replay import ReplayBuffer
+
 logger = logging.getLogger(__name__)
 
 Handler = Callable[["PipelineEvent"], Coroutine[Any, Any, None]]
+CoalesceKey = Callable[["PipelineEvent"], Hashable]
 
 
 @dataclass
@@ -26,22 +47,215 @@ class PipelineEvent:
     stage_id:    str | None = None
     timestamp:   datetime   = field(default_factory=lambda: datetime.now(UTC))
     event_id:    str        = field(default_factory=lambda: str(uuid4()))
+    workspace_id: str | None = None
+    origin:      str | None = None   # instance_id() of the publishing process
+    seq:         int | None = None   # per-pipeline, monotonically increasing (see replay.py)
+    # False for side-channel events (e.g. approvals) published by a process that
+    # is not running the pipeline: its seq counter would collide with the engine's
+    sequenced:   bool       = True
+
+
+_instance_id: tuple[int, str] | None = None
+
+
+def instance_id() -> str:
+    """Identifier of this process, used to tag and de-loop bridged events.
+
+    Recomputed after fork so pre-forked workers never share an id.
+    """
+    global _instance_id
+    pid = os.getpid()
+    if _instance_id is None or _instance_id[0] != pid:
+        _instance_id = (pid, f"{socket.gethostname()}-{pid}-{uuid4().hex[:8]}")
+    return _instance_id[1]
+
+
+# ── Topics ────────────────────────────────────────────────────────────────────
+
+WILDCARD = "*"
+
+
+def pipeline_topic(pipeline_id: str) -> str:
+    return f"pipeline:{pipeline_id}"
+
+
+def workspace_topic(workspace_id: str) -> str:
+    return f"workspace:{workspace_id}"
+
+
+APPROVALS_TOPIC = "approvals"   # approval_* events — the inbox; filtered per workspace on delivery
+
+
+def event_topics(
+    pipeline_id: str, workspace_id: str | None = None, event_type: str = ""
+) -> list[str]:
+    """The specific (non-wildcard) topics an event is routed to."""
+    topics = [pipeline_topic(pipeline_id)]
+    if workspace_id:
+        topics.append(workspace_topic(workspace_id))
+    if event_type.startswith("approval_"):
+        topics.append(APPROVALS_TOPIC)
+    return topics
+
+
+class OverflowPolicy(StrEnum):
+    """What a subscription does when its queue is full."""
+    DROP_OLDEST = "drop_oldest"   # evict the oldest queued event
+    COALESCE    = "coalesce"      # replace a queued event with the same key, else drop oldest
+    DISCONNECT  = "disconnect"    # close the subscription
+
+
+def default_coalesce_key(event: PipelineEvent) -> Hashable:
+    """Newer events of the same type for the same stage supersede older ones."""
+    return (event.pipeline_id, event.stage_id, event.event_type)
+
+
+class Subscription:
+    """
+    A single subscriber: a bounded FIFO drained by a dedicated task.
+
+    The buffer is an OrderedDict so all three overflow policies are O(1):
+    COALESCE keys entries by coalesce_key(event), the other policies by a
+    monotonically increasing counter.
+    """
+
+    def __init__(
+        self,
+        handler: Handler,
+        maxsize: int,
+        policy: OverflowPolicy,
+        coalesce_key: CoalesceKey | None = None,
+        on_close: Callable[[Subscription], None] | None = None,
+        topics: tuple[str, ...] = (WILDCARD,),
+    ) -> None:
+        self.handler      = handler
+        self.topics       = topics
+        self.maxsize      = max(1, maxsize)
+        self.policy       = policy
+        self.coalesce_key = coalesce_key or default_coalesce_key
+        self.dropped      = 0
+        self.closed       = False
+        self._busy        = False
+        self._on_close    = on_close
+        self._buffer: OrderedDict[Hashable, PipelineEvent] = OrderedDict()
+        self._counter     = itertools.count()
+        # Replaced by a fresh Event each time the drain task starts, on that loop
+        self._wakeup = asyncio.Event()
+        self._closed_event: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def depth(self) -> int:
+        return len(self._buffer)
+
+    def offer(self, event: PipelineEvent) -> None:
+        """Enqueue without blocking, applying the overflow policy. Must run on the loop."""
+        if self.closed:
+            return
+        self._ensure_task()
+
+        if self.policy == OverflowPolicy.COALESCE:
+            key = self.coalesce_key(event)
+            if key in self._buffer:
+                self._buffer[key] = event          # keeps the original queue position
+                self._drop()
+                return
+        else:
+            key = next(self._counter)
+
+        if len(self._buffer) >= self.maxsize:
+            if self.policy == OverflowPolicy.DISCONNECT:
+                logger.warning("EventBus: subscriber queue full (%d) — disconnecting", self.maxsize)
+                self._drop()
+                self.close()
+                return
+            self._buffer.popitem(last=False)
+            self._drop()
+            inc_eventbus_queue_depth(-1)
+
+        self._buffer[key] = event
+        inc_eventbus_queue_depth(1)
+        self._wakeup.set()
+
+    async def wait_closed(self) -> None:
+        """Resolve once the subscription has been closed (unsubscribed or evicted)."""
+        if self.closed:
+            return
+        if self._closed_event is None:
+            self._closed_event = asyncio.Event()
+        await self._closed_event.wait()
+
+    async def join(self) -> None:
+        """Wait until every queued event has been handled."""
+        while (self._buffer or self._busy) and not self.closed:
+            await asyncio.sleep(0.01)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        inc_eventbus_queue_depth(-len(self._buffer))
+        self._buffer.clear()
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+        if self._closed_event is not None:
+            self._closed_event.set()
+        if self._on_close is not None:
+            self._on_close(self)
+
+    def _drop(self) -> None:
+        self.dropped += 1
+        record_eventbus_drop(self.policy.value)
+
+    def _ensure_task(self) -> None:
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._drain(self._wakeup))
+
+    async def _drain(self, wakeup: asyncio.Event) -> None:
+        while not self.closed:
+            if not self._buffer:
+                wakeup.clear()
+                await wakeup.wait()
+                continue
+            _, event = self._buffer.popitem(last=False)
+            inc_eventbus_queue_depth(-1)
+            self._busy = True
+            try:
+                await self.handler(event)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning("EventBus handler raised: %s", exc)
+            finally:
+                self._busy = False
 
 
 class EventBus:
     """
     Singleton in-process pub/sub bus.
 
-    Subscribers receive every event; filter by pipeline_id inside your handler.
-    Events that fail to deliver to a handler are logged and silently dropped
-    (one subscriber crash must not affect others).
+    Subscribers choose topics (pipeline_topic(), workspace_topic() or WILDCARD)
+    and only receive matching events. Subscribe, unsubscribe and per-event
+    lookup are O(1) in the number of subscribers. Events that fail to deliver
+    to a handler are logged and silently dropped (one subscriber crash must
+    not affect others).
     """
 
     _instance: EventBus | None = None
 
     def __init__(self) -> None:
-        self._handlers: list[Handler] = []
-        self._lock = asyncio.Lock()
+        self._subscriptions: dict[Handler, Subscription] = {}
+        # topic -> subscriptions; inner dicts give O(1) removal with stable order
+        self._topics: dict[str, dict[Handler, Subscription]] = {}
+        # pipeline_id -> workspace_id, for events published without a workspace_id
+        self._pipeline_workspaces: dict[str, str] = {}
+        # Called with (topic, active) when a topic gains its first / loses its last subscriber
+        self._topic_listeners: list[Callable[[str, bool], None]] = []
+        self._pending: deque[PipelineEvent] = deque()
+        self._dispatch_wakeup = asyncio.Event()
+        self._dispatcher: asyncio.Task | None = None
+        self.replay = ReplayBuffer()
 
     @classmethod
     def get_instance(cls) -> EventBus:
@@ -49,50 +263,180 @@ class EventBus:
             cls._instance = cls()
         return cls._instance
 
-    def subscribe(self, handler: Handler) -> None:
-        if handler not in self._handlers:
-            self._handlers.append(handler)
-            logger.debug("EventBus: subscriber added (%d total)", len(self._handlers))
+    def subscribe(
+        self,
+        handler: Handler,
+        *,
+        topics: Iterable[str] = (WILDCARD,),
+        maxsize: int | None = None,
+        policy: OverflowPolicy = OverflowPolicy.DROP_OLDEST,
+        coalesce_key: CoalesceKey | None = None,
+    ) -> Subscription:
+        existing = self._subscriptions.get(handler)
+        if existing is not None:
+            return existing
+        subscription = Subscription(
+            handler,
+            maxsize=maxsize or settings.EVENT_BUS_SUBSCRIBER_QUEUE_SIZE,
+            policy=policy,
+            coalesce_key=coalesce_key,
+            on_close=self._forget,
+            topics=tuple(dict.fromkeys(topics)),
+        )
+        self._subscriptions[handler] = subscription
+        for topic in subscription.topics:
+            bucket = self._topics.get(topic)
+            if bucket is None:
+                bucket = self._topics[topic] = {}
+                self._notify_topic(topic, True)
+            bucket[handler] = subscription
+        logger.debug("EventBus: subscriber added (%d total)", len(self._subscriptions))
+        return subscription
 
     def unsubscribe(self, handler: Handler) -> None:
-        try:
-            self._handlers.remove(handler)
-            logger.debug("EventBus: subscriber removed (%d total)", len(self._handlers))
-        except ValueError:
-            pass
-
-    async def publish(self, event: PipelineEvent) -> None:
-        """Fan-out event to all subscribers concurrently."""
-        if not self._handlers:
-            return
+        subscription = self._subscriptions.get(handler)
+        if subscription is not None:
+            subscription.close()
 
-        results = await asyncio.gather(
-            *(self._safe_call(h, event) for h in list(self._handlers)),
-            return_exceptions=True,
-        )
+    def _forget(self, subscription: Subscription) -> None:
+        if self._subscriptions.get(subscription.handler) is subscription:
+            del self._subscriptions[subscription.handler]
+            for topic in subscription.topics:
+                bucket = self._topics.get(topic)
+                if bucket is not None:
+                    bucket.pop(subscription.handler, None)
+                    if not bucket:
+                        del self._topics[topic]
+                        self._notify_topic(topic, False)
+            logger.debug("EventBus: subscriber removed (%d total)", len(self._subscriptions))
+
+    def register_pipeline(self, pipeline_id: str, workspace_id: str) -> None:
+        """Route this pipeline's events to workspace_topic(workspace_id) subscribers too.
+
+        A run of it starts here, so its replay history is kept until release_pipeline().
+        """
+        self._pipeline_workspaces[pipeline_id] = workspace_id
+        self.replay.hold(pipeline_id)
+
+    def release_pipeline(self, pipeline_id: str) -> None:
+        self._pipeline_workspaces.pop(pipeline_id, None)
+        self.replay.release(pipeline_id)
+
+    def has_subscribers(self, topic: str) -> bool:
+        return topic in self._topics
 
-        for result in results:
-            if isinstance(result, Exception):
-                logger.warning("EventBus handler raised: %s", result)
-
-        # Also forward to Kafka (non-blocking)
-        asyncio.create_task(self._forward_kafka(event))
-
-    @staticmethod
-    async def _safe_call(handler: Handler, event: PipelineEvent) -> None:
-        try:
-            await handler(event)
-        except Exception as exc:
-            raise exc
-
-    @staticmethod
-    async def _forward_kafka(event: PipelineEvent) -> None:
-        try:
-            from app.core.kafka_client import publish_pipeline_event
-            await publish_pipeline_event(
-                event.pipeline_id,
-                event.event_type,
-                {"stage_id": event.stage_id, **event.data},
+    def active_topics(self) -> list[str]:
+        return list(self._topics)
+
+    def add_topic_listener(self, listener: Callable[[str, bool], None]) -> None:
+        """Register listener(topic, active) for topics gaining/losing their last subscriber."""
+        self._topic_listeners.append(listener)
+
+    def remove_topic_listener(self, listener: Callable[[str, bool], None]) -> None:
+        if listener in self._topic_listeners:
+            self._topic_listeners.remove(listener)
+
+    def _notify_topic(self, topic: str, active: bool) -> None:
+        for listener in self._topic_listeners:
+            try:
+                listener(topic, active)
+            except Exception as exc:
+                logger.warning("EventBus topic listener raised: %s", exc)
+
+    def workspace_of(self, pipeline_id: str) -> str | None:
+        return self._pipeline_workspaces.get(pipeline_id)
+
+    def stamp(self, event: PipelineEvent) -> bool:
+        """Fill in workspace, origin and seq, and record the event for replay.
+
+        Idempotent. Returns whether the event originated in this process.
+        """
+        if event.workspace_id is None:
+            event.workspace_id = self._pipeline_workspaces.get(event.pipeline_id)
+        if event.origin is None:
+            event.origin = instance_id()
+        local = event.origin == instance_id()
+        if event.seq is None and local and event.sequenced:
+            event.seq = self.replay.next_seq(event.pipeline_id)
+        self.replay.record(event, local)
+        return local
+
+    async def publish(self, event: PipelineEvent, forward: bool = True) -> None:
+        """Enqueue event for fan-out. O(1): never waits on, or iterates, subscribers.
+
+        forward=False keeps it off Kafka and the EventStore: the outbox relay
+        hands its events to those itself, to await their receipts.
+        """
+        local = self.stamp(event)
+        if len(self._pending) >= settings.EVENT_BUS_DISPATCH_QUEUE_SIZE:
+            self._pending.popleft()
+            record_eventbus_drop("dispatch")
+        self._pending.append(event)
+        self._ensure_dispatcher()
+        self._dispatch_wakeup.set()
+
+        # Also forward to Kafka: O(1) append to the batching forwarder's buffer.
+        # Events bridged in from other pods are already on Kafka — never echo them.
+        forwarder = get_event_forwarder()
+        if forwarder is not None and local and forward:
+            forwarder.enqueue(event)
+
+        # Persist to the EventStore. Usually an O(1) append; awaits only when the
+        # writer's buffer is full, which pushes back on publishers while the DB lags.
+        store = get_event_store()
+        if store is not None and local and forward:
+            await store.append(event)
+
+    async def join(self) -> None:
+        """Wait until every published event has reached every subscriber's handler."""
+        while self._pending:
+            await asyncio.sleep(0.01)
+        for subscription in list(self._subscriptions.values()):
+            await subscription.join()
+
+    async def close(self) -> None:
+        """Close every subscription and stop the dispatcher (app shutdown)."""
+        for subscription in list(self._subscriptions.values()):
+            subscription.close()
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher = None
+        self._pending.clear()
+        await self.replay.close()
+
+    def _ensure_dispatcher(self) -> None:
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatch_wakeup = asyncio.Event()
+            self._dispatcher = asyncio.get_running_loop().create_task(
+                self._dispatch(self._dispatch_wakeup)
             )
-        except Exception as exc:
-            logger.debug("Kafka forward skipped: %s", exc)
+
+    async def _dispatch(self, wakeup: asyncio.Event) -> None:
+        while True:
+            if not self._pending:
+                wakeup.clear()
+                await wakeup.wait()
+                continue
+            self._route(self._pending.popleft())
+            # Yield between events so a publish burst can't starve the drain tasks
+            await asyncio.sleep(0)
+
+    def _route(self, event: PipelineEvent) -> None:
+        topics = [*event_topics(event.pipeline_id, event.workspace_id, event.event_type), WILDCARD]
+
+        buckets = [list(b.values()) for t in topics if (b := self._topics.get(t))]
+        if len(buckets) == 1:
+            for subscription in buckets[0]:
+                subscription.offer(event)
+            return
+        # A subscription may listen on several matching topics — deliver once
+        seen: set[int] = set()
+        for bucket in buckets:
+            for subscription in bucket:
+                if id(subscription) not in seen:
+                    seen.add(id(subscription))
+                    subscription.offer(event)
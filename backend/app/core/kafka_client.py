@@ -79,13 +79,17 @@ async def publish_notification(user_id: str, notification: dict) -> None:
 
 # ── Consumer factory ──────────────────────────────────────────────────────────
 
-def make_consumer(topics: list[str], group_id: str | None = None) -> AIOKafkaConsumer:
+def make_consumer(
+    topics: list[str],
+    group_id: str | None = None,
+    auto_offset_reset: str = "earliest",
+) -> AIOKafkaConsumer:
     return AIOKafkaConsumer(
         *topics,
         bootstrap_servers=settings.KAFKA_BOOTSTRAP_SERVERS,
         group_id=group_id or settings.KAFKA_CONSUMER_GROUP,
         value_deserializer=lambda v: json.loads(v.decode()),
-        auto_offset_reset="earliest",
+        auto_offset_reset=auto_offset_reset,
         enable_auto_commit=False,
         session_timeout_ms=30_000,
         heartbeat_interval_ms=10_000,
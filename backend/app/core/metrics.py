@@ -3,7 +3,8 @@ Prometheus metrics for Forge backend.
 
 Exposes /metrics in Prometheus text format.
 Tracks HTTP request counts, latency histograms, active WebSocket connections,
-pipeline throughput, agent task queue depth, and DB pool utilization.
+pipeline throughput, agent task queue depth, EventBus subscriber queues,
+and DB pool utilization.
 
 Usage in main.py:
     from app.core.metrics import setup_metrics, metrics_router
@@ -37,6 +38,26 @@ _agent_tasks_total = None
 _agent_task_duration_seconds = None
 _db_pool_size = None
 _db_pool_checked_out = None
+_eventbus_queue_depth = None
+_eventbus_dropped_total = None
+_kafka_forward_batch_size = None
+_kafka_forward_lag_seconds = None
+_kafka_forward_buffer_depth = None
+_kafka_forward_dropped_total = None
+_event_store_batch_size = None
+_event_store_write_seconds = None
+_event_store_buffer_depth = None
+_event_store_dropped_total = None
+_outbox_relay_batch_size = None
+_outbox_relay_lag_seconds = None
+_audit_batch_size = None
+_audit_write_seconds = None
+_audit_buffer_depth = None
+_audit_dropped_total = None
+_db_reads_total = None
+_db_replica_healthy = None
+_db_replica_lag_seconds = None
+_cache_requests_total = None
 
 
 def _init_prometheus() -> bool:
@@ -44,6 +65,15 @@ def _init_prometheus() -> bool:
     global _http_requests_total, _http_request_duration_seconds, _http_requests_in_progress
     global _ws_connections_active, _pipeline_runs_total, _agent_tasks_total
     global _agent_task_duration_seconds, _db_pool_size, _db_pool_checked_out
+    global _eventbus_queue_depth, _eventbus_dropped_total
+    global _kafka_forward_batch_size, _kafka_forward_lag_seconds
+    global _kafka_forward_buffer_depth, _kafka_forward_dropped_total
+    global _event_store_batch_size, _event_store_write_seconds
+    global _event_store_buffer_depth, _event_store_dropped_total
+    global _outbox_relay_batch_size, _outbox_relay_lag_seconds
+    global _audit_batch_size, _audit_write_seconds, _audit_buffer_depth, _audit_dropped_total
+    global _db_reads_total, _db_replica_healthy, _db_replica_lag_seconds
+    global _cache_requests_total
 
     try:
         from prometheus_client import (
@@ -93,6 +123,102 @@ def _init_prometheus() -> bool:
             "db_pool_checked_out",
             "Database connections currently checked out",
         )
+        _eventbus_queue_depth = Gauge(
+            "eventbus_queue_depth",
+            "Events queued across all EventBus subscriber queues",
+        )
+        _eventbus_dropped_total = Counter(
+            "eventbus_events_dropped_total",
+            "Events dropped by EventBus overflow handling",
+            ["policy"],
+        )
+        _kafka_forward_batch_size = Histogram(
+            "kafka_forward_batch_size",
+            "Events per EventBus → Kafka forward batch",
+            buckets=[1, 5, 10, 25, 50, 100, 250, 500],
+        )
+        _kafka_forward_lag_seconds = Histogram(
+            "kafka_forward_lag_seconds",
+            "Age of the oldest event in a Kafka forward batch when it is sent",
+            buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1, 5, 30, 300],
+        )
+        _kafka_forward_buffer_depth = Gauge(
+            "kafka_forward_buffer_depth",
+            "Events waiting in the Kafka forwarder ring buffer",
+        )
+        _kafka_forward_dropped_total = Counter(
+            "kafka_forward_dropped_total",
+            "Events not delivered to Kafka directly (buffer_full, spilled, lost)",
+            ["reason"],
+        )
+        _event_store_batch_size = Histogram(
+            "event_store_batch_size",
+            "Events per EventStore batch write",
+            buckets=[1, 5, 10, 25, 50, 100, 250, 500, 1000],
+        )
+        _event_store_write_seconds = Histogram(
+            "event_store_write_seconds",
+            "Duration of an EventStore batch write",
+            buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5],
+        )
+        _event_store_buffer_depth = Gauge(
+            "event_store_buffer_depth",
+            "Events waiting to be persisted to the EventStore",
+        )
+        _event_store_dropped_total = Counter(
+            "event_store_dropped_total",
+            "Events never persisted to the EventStore (backpressure_timeout, lost)",
+            ["reason"],
+        )
+        _outbox_relay_batch_size = Histogram(
+            "outbox_relay_batch_size",
+            "Outbox rows delivered per relay batch",
+            buckets=[1, 5, 10, 25, 50, 100, 250, 500, 1000],
+        )
+        _outbox_relay_lag_seconds = Histogram(
+            "outbox_relay_lag_seconds",
+            "Age of the oldest event in an outbox relay batch",
+            buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5, 30],
+        )
+        _audit_batch_size = Histogram(
+            "audit_batch_size",
+            "Entries per AuditLog batch write",
+            buckets=[1, 5, 10, 25, 50, 100, 250, 500, 1000],
+        )
+        _audit_write_seconds = Histogram(
+            "audit_write_seconds",
+            "Duration of an AuditLog batch write",
+            buckets=[0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5],
+        )
+        _audit_buffer_depth = Gauge(
+            "audit_buffer_depth",
+            "Audit entries waiting to be written",
+        )
+        _audit_dropped_total = Counter(
+            "audit_dropped_total",
+            "Audit entries not written to the table directly (spilled, rejected, lost)",
+            ["reason"],
+        )
+        _db_reads_total = Counter(
+            "db_reads_total",
+            "Read sessions opened, by the database serving them",
+            ["target"],
+        )
+        _db_replica_healthy = Gauge(
+            "db_replica_healthy",
+            "1 while a read replica receives reads, 0 while it is ejected",
+            ["replica"],
+        )
+        _db_replica_lag_seconds = Gauge(
+            "db_replica_lag_seconds",
+            "Replication lag of a read replica at its last probe",
+            ["replica"],
+        )
+        _cache_requests_total = Counter(
+            "cache_requests_total",
+            "Cached endpoint reads by outcome (hit, miss, coalesced, bypass, error)",
+            ["view", "result"],
+        )
 
         _METRICS_AVAILABLE = True
         logger.info("Prometheus metrics initialized")
@@ -201,6 +327,96 @@ def dec_ws_connections() -> None:
         _ws_connections_active.dec()
 
 
+def inc_eventbus_queue_depth(delta: int) -> None:
+    if _METRICS_AVAILABLE and _eventbus_queue_depth:
+        _eventbus_queue_depth.inc(delta)
+
+
+def record_eventbus_drop(policy: str) -> None:
+    if _METRICS_AVAILABLE and _eventbus_dropped_total:
+        _eventbus_dropped_total.labels(policy=policy).inc()
+
+
+def record_kafka_forward_batch(size: int, lag_seconds: float) -> None:
+    if _METRICS_AVAILABLE:
+        if _kafka_forward_batch_size:
+            _kafka_forward_batch_size.observe(size)
+        if _kafka_forward_lag_seconds:
+            _kafka_forward_lag_seconds.observe(lag_seconds)
+
+
+def set_kafka_forward_buffer_depth(depth: int) -> None:
+    if _METRICS_AVAILABLE and _kafka_forward_buffer_depth:
+        _kafka_forward_buffer_depth.set(depth)
+
+
+def record_kafka_forward_drop(reason: str, count: int = 1) -> None:
+    if _METRICS_AVAILABLE and _kafka_forward_dropped_total:
+        _kafka_forward_dropped_total.labels(reason=reason).inc(count)
+
+
+def record_event_store_batch(size: int, seconds: float) -> None:
+    if _METRICS_AVAILABLE:
+        if _event_store_batch_size:
+            _event_store_batch_size.observe(size)
+        if _event_store_write_seconds:
+            _event_store_write_seconds.observe(seconds)
+
+
+def set_event_store_buffer_depth(depth: int) -> None:
+    if _METRICS_AVAILABLE and _event_store_buffer_depth:
+        _event_store_buffer_depth.set(depth)
+
+
+def record_event_store_drop(reason: str, count: int = 1) -> None:
+    if _METRICS_AVAILABLE and _event_store_dropped_total:
+        _event_store_dropped_total.labels(reason=reason).inc(count)
+
+
+def record_outbox_relay_batch(size: int, lag_seconds: float) -> None:
+    if _METRICS_AVAILABLE:
+        if _outbox_relay_batch_size:
+            _outbox_relay_batch_size.observe(size)
+        if _outbox_relay_lag_seconds:
+            _outbox_relay_lag_seconds.observe(lag_seconds)
+
+
+def record_audit_batch(size: int, seconds: float) -> None:
+    if _METRICS_AVAILABLE:
+        if _audit_batch_size:
+            _audit_batch_size.observe(size)
+        if _audit_write_seconds:
+            _audit_write_seconds.observe(seconds)
+
+
+def set_audit_buffer_depth(depth: int) -> None:
+    if _METRICS_AVAILABLE and _audit_buffer_depth:
+        _audit_buffer_depth.set(depth)
+
+
+def record_audit_drop(reason: str, count: int = 1) -> None:
+    if _METRICS_AVAILABLE and _audit_dropped_total:
+        _audit_dropped_total.labels(reason=reason).inc(count)
+
+
+def record_db_read(target: str) -> None:
+    if _METRICS_AVAILABLE and _db_reads_total:
+        _db_reads_total.labels(target=target).inc()
+
+
+def set_replica_state(replica: str, healthy: bool, lag_seconds: float) -> None:
+    if _METRICS_AVAILABLE:
+        if _db_replica_healthy:
+            _db_replica_healthy.labels(replica=replica).set(1 if healthy else 0)
+        if _db_replica_lag_seconds:
+            _db_replica_lag_seconds.labels(replica=replica).set(lag_seconds)
+
+
+def record_cache_request(view: str, result: str) -> None:
+    if _METRICS_AVAILABLE and _cache_requests_total:
+        _cache_requests_total.labels(view=view, result=result).inc()
+
+
 # ─────────────────────────────────────────────────────────────────────────────
 # Setup entry point
 # ─────────────────────────────────────────────────────────────────────────────
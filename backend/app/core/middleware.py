@@ -25,7 +25,7 @@ class SecurityMiddleware(BaseHTTPMiddleware):
     - Strict-Transport-Security
     - Referrer-Policy
     - Permissions-Policy
-    - Cache-Control  (for API responses only)
+    - Cache-Control  (for API responses that do not set their own)
     """
 
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
@@ -40,8 +40,8 @@ class SecurityMiddleware(BaseHTTPMiddleware):
             "max-age=63072000; includeSubDomains; preload"
         )
 
-        # Disable caching for API responses
-        if request.url.path.startswith("/api/"):
+        # Disable caching for API responses, unless the endpoint chose a policy
+        if request.url.path.startswith("/api/") and "cache-control" not in response.headers:
             response.headers["Cache-Control"] = "no-store, no-cache, must-revalidate, private"
             response.headers["Pragma"]        = "no-cache"
 
@@ -0,0 +1,336 @@
+"""
+Transactional outbox for pipeline events.
+
+The engine used to commit a state change and then publish the event that
+describes it: two steps, so a crash in between lost the event, and stage
+execution waited on the bus (and, under backpressure, on the EventStore)
+after every commit.
+
+Instead, stage_event() adds the event to the `event_outbox` table in the
+caller's transaction — the event exists if and only if the state change
+committed. An OutboxRelay per process then delivers committed rows in
+batches: it fans each event out locally through EventBus.publish(), hands it
+to the Kafka forwarder and the EventStore itself, and waits (up to
+OUTBOX_ACK_TIMEOUT_SECONDS) for their receipts — the forwarder's once Kafka
+acknowledged the record or it was fsynced to the spill, the EventStore's once
+the row is written. Only rows every sink acknowledged are marked delivered,
+in the same transaction that claimed them. A row a sink dropped (a full ring
+or buffer) or that is still unacknowledged is claimed again by the next
+batch; it is handed again only to the sinks that dropped it, and local
+subscribers never see it twice.
+
+A commit that staged events stamps their seq right away (an after_commit
+hook), so seqs follow commit order even when the engine publishes its next
+agent_* event before the relay has run, and wakes the local relay; the relay
+also polls every OUTBOX_POLL_INTERVAL_MS. Each relay delivers the rows its
+own process staged and adopts rows another process left undelivered for
+OUTBOX_ORPHAN_SECONDS (it crashed). On PostgreSQL claims use FOR UPDATE SKIP
+LOCKED, so two relays never deliver the same row.
+
+Every row is marked delivered exactly once. A relay that dies after handing
+a batch over but before its commit delivers the batch again on restart, with
+the same event_ids, so Kafka and EventStore consumers see at-least-once
+delivery and can de-duplicate on event_id.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import delete, event, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.batcher import BackgroundBatcher
+from app.core.config import settings
+from app.core.database import write_session
+from app.core.event_forwarder import get_event_forwarder
+from app.core.event_store import get_event_store
+from app.core.events import EventBus, PipelineEvent, instance_id
+from app.core.metrics import record_outbox_relay_batch
+from app.db.models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+PRUNE_INTERVAL_SECONDS = 60.0
+_STAGED = "outbox_staged"   # Session.info key: events this transaction added to the outbox
+
+SessionFactory = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+
+
+def event_to_payload(event: PipelineEvent) -> dict[str, Any]:
+    return {
+        "pipeline_id":  event.pipeline_id,
+        "event_type":   event.event_type,
+        "data":         event.data,
+        "stage_id":     event.stage_id,
+        "timestamp":    event.timestamp.isoformat(),
+        "event_id":     event.event_id,
+        "workspace_id": event.workspace_id,
+        "sequenced":    event.sequenced,
+    }
+
+
+def event_from_payload(payload: dict[str, Any]) -> PipelineEvent:
+    """The staged event, without origin or seq: publish() stamps those on delivery."""
+    return PipelineEvent(
+        pipeline_id=payload["pipeline_id"],
+        event_type=payload["event_type"],
+        data=payload.get("data") or {},
+        stage_id=payload.get("stage_id"),
+        timestamp=datetime.fromisoformat(payload["timestamp"]),
+        event_id=payload["event_id"],
+        workspace_id=payload.get("workspace_id"),
+        sequenced=payload.get("sequenced", True),
+    )
+
+
+def stage_event(db: AsyncSession, pipeline_event: PipelineEvent) -> OutboxEvent:
+    """Add `pipeline_event` to the outbox in db's transaction; the caller commits.
+
+    Nothing is published until that commit: a rolled-back transaction
+    takes its events with it.
+    """
+    if pipeline_event.workspace_id is None:
+        pipeline_event.workspace_id = EventBus.get_instance().workspace_of(
+            pipeline_event.pipeline_id
+        )
+    row = OutboxEvent(
+        event_id=pipeline_event.event_id,
+        pipeline_id=pipeline_event.pipeline_id,
+        event_type=pipeline_event.event_type,
+        payload=event_to_payload(pipeline_event),
+        origin=instance_id(),
+        created_at=pipeline_event.timestamp.astimezone(UTC).replace(tzinfo=None),
+    )
+    db.add(row)
+    db.info.setdefault(_STAGED, []).append(pipeline_event)
+    return row
+
+
+async def commit_with_events(db: AsyncSession, bus: EventBus, *events: PipelineEvent) -> None:
+    """Commit db together with the events describing its changes.
+
+    With an outbox relay running the events are written to the outbox in the
+    same transaction and delivered by the relay; otherwise they are published
+    once the commit has succeeded.
+    """
+    if _relay is None:
+        await db.commit()
+        for pipeline_event in events:
+            await bus.publish(pipeline_event)
+        return
+    for pipeline_event in events:
+        stage_event(db, pipeline_event)
+    await db.commit()
+
+
+@event.listens_for(Session, "after_commit")
+def _relay_committed(session: Session) -> None:
+    staged = session.info.pop(_STAGED, None)
+    if staged and _relay is not None:
+        _relay.committed(staged)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_staged(session: Session) -> None:
+    session.info.pop(_STAGED, None)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# OutboxRelay
+# ─────────────────────────────────────────────────────────────────────────────
+
+class _Delivery:
+    """A claimed event already fanned out locally, and its receipts per sink."""
+    __slots__ = ("event", "receipts")
+
+    def __init__(self, event: PipelineEvent) -> None:
+        self.event = event
+        self.receipts: dict[str, asyncio.Future[bool]] = {}
+
+    def owes(self, sink: str) -> bool:
+        """Whether the sink has yet to take the event, or dropped it."""
+        receipt = self.receipts.get(sink)
+        return receipt is None or (receipt.done() and not receipt.result())
+
+    def pending(self) -> list[asyncio.Future[bool]]:
+        return [r for r in self.receipts.values() if not r.done()]
+
+    def acked(self) -> bool:
+        return all(r.done() and r.result() for r in self.receipts.values())
+
+
+class OutboxRelay(BackgroundBatcher):
+    def __init__(
+        self,
+        bus: EventBus | None = None,
+        session_factory: SessionFactory | None = None,
+        batch_size: int | None = None,
+        poll_interval_ms: int | None = None,
+        orphan_seconds: int | None = None,
+        retention_seconds: int | None = None,
+        ack_timeout_seconds: float | None = None,
+    ) -> None:
+        super().__init__(batch_size or settings.OUTBOX_BATCH_SIZE)
+        self.bus = bus or EventBus.get_instance()
+        if poll_interval_ms is None:
+            poll_interval_ms = settings.OUTBOX_POLL_INTERVAL_MS
+        self.poll_interval_s = poll_interval_ms / 1000
+        if orphan_seconds is None:
+            orphan_seconds = settings.OUTBOX_ORPHAN_SECONDS
+        self.orphan_seconds = orphan_seconds
+        if retention_seconds is None:
+            retention_seconds = settings.OUTBOX_RETENTION_SECONDS
+        self.retention_seconds = retention_seconds
+        if ack_timeout_seconds is None:
+            ack_timeout_seconds = settings.OUTBOX_ACK_TIMEOUT_SECONDS
+        self.ack_timeout_s = ack_timeout_seconds
+        self.delivered = 0
+        self._session_factory = session_factory or write_session
+        self._more = True   # the last batch was full, or nothing was claimed yet
+        self._next_prune = 0.0
+        # event_id -> event stamped at commit, awaiting delivery by this relay
+        self._stamped: dict[str, PipelineEvent] = {}
+        # event_id -> claimed event whose receipts are not all in yet
+        self._inflight: dict[str, _Delivery] = {}
+
+    def start(self) -> None:
+        self._more = True
+        self._ensure_task()
+
+    def wake(self) -> None:
+        """Deliver without waiting for the next poll. Must run on the loop."""
+        self._wakeup.set()
+
+    def committed(self, events: list[PipelineEvent]) -> None:
+        """Events this process just committed to the outbox: stamp them now, deliver soon."""
+        for pipeline_event in events:
+            self.bus.stamp(pipeline_event)
+            self._stamped[pipeline_event.event_id] = pipeline_event
+        self.wake()
+
+    async def stop(self) -> None:
+        """Stop the relay task, then deliver what this process committed meanwhile."""
+        await self._stop_task()
+        try:
+            while await self.relay_once() >= self.batch_size:
+                pass
+        except Exception as exc:
+            logger.warning("Outbox relay: final drain failed, rows stay queued: %s", exc)
+
+    def _pending(self) -> bool:
+        return self._more
+
+    def _idle_timeout(self) -> float | None:
+        return self.poll_interval_s
+
+    async def _drain(self) -> None:
+        try:
+            delivered = await self.relay_once()
+            if time.monotonic() >= self._next_prune:
+                self._next_prune = time.monotonic() + PRUNE_INTERVAL_SECONDS
+                await self.prune()
+        except Exception as exc:
+            # Database unreachable or similar: the rows are still there
+            logger.warning("Outbox relay failed, retrying: %s", exc)
+            delivered = 0
+        self._more = delivered >= self.batch_size
+
+    async def relay_once(self) -> int:
+        """Claim and deliver one batch. Returns how many rows were acknowledged."""
+        async with self._session_factory() as db:
+            cutoff = datetime.utcnow() - timedelta(seconds=self.orphan_seconds)
+            query = (
+                select(OutboxEvent)
+                .where(
+                    OutboxEvent.delivered_at.is_(None),
+                    or_(OutboxEvent.origin == instance_id(), OutboxEvent.created_at < cutoff),
+                )
+                .order_by(OutboxEvent.id)
+                .limit(self.batch_size)
+            )
+            if db.bind.dialect.name == "postgresql":
+                query = query.with_for_update(skip_locked=True)
+            rows = (await db.execute(query)).scalars().all()
+            if not rows:
+                return 0
+
+            now = datetime.utcnow()
+            record_outbox_relay_batch(len(rows), (now - rows[0].created_at).total_seconds())
+            pending: list[asyncio.Future[bool]] = []
+            for row in rows:
+                delivery = self._inflight.get(row.event_id)  # type: ignore[call-overload]
+                if delivery is None:
+                    pipeline_event = self._stamped.pop(row.event_id, None)  # type: ignore[call-overload]
+                    if pipeline_event is None:
+                        pipeline_event = event_from_payload(row.payload)  # type: ignore[arg-type]
+                    if row.origin != instance_id():
+                        # Adopted from a dead process: continue its seq from the stream tail
+                        await self.bus.replay.prime(pipeline_event.pipeline_id)
+                    await self.bus.publish(pipeline_event, forward=False)
+                    delivery = self._inflight[row.event_id] = _Delivery(pipeline_event)  # type: ignore[index]
+                await self._hand_over(delivery)
+                pending += delivery.pending()
+            if pending:
+                await asyncio.wait(pending, timeout=self.ack_timeout_s)
+
+            delivered = [row for row in rows if self._inflight[row.event_id].acked()]  # type: ignore[index]
+            for row in delivered:
+                row.delivered_at = now  # type: ignore[assignment]
+            await db.commit()
+            for row in delivered:
+                del self._inflight[row.event_id]  # type: ignore[arg-type]
+            self.delivered += len(delivered)
+            return len(delivered)
+
+    @staticmethod
+    async def _hand_over(delivery: _Delivery) -> None:
+        """Hand the event to each sink that has not taken it yet, watching for its receipt."""
+        event_id = delivery.event.event_id
+        forwarder = get_event_forwarder()
+        if forwarder is not None and delivery.owes("kafka"):
+            delivery.receipts["kafka"] = forwarder.acks.watch(event_id)
+            forwarder.enqueue(delivery.event)
+        store = get_event_store()
+        if store is not None and delivery.owes("event_store"):
+            delivery.receipts["event_store"] = store.acks.watch(event_id)
+            await store.append(delivery.event)
+
+    async def prune(self) -> int:
+        """Delete rows delivered more than retention_seconds ago."""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.retention_seconds)
+        async with self._session_factory() as db:
+            result = await db.execute(
+                delete(OutboxEvent).where(OutboxEvent.delivered_at < cutoff)
+            )
+            await db.commit()
+            return result.rowcount or 0  # type: ignore[attr-defined]
+
+
+# ── Module-level singleton (mirrors event_forwarder._forwarder) ───────────────
+
+_relay: OutboxRelay | None = None
+
+
+def init_outbox_relay() -> OutboxRelay:
+    global _relay
+    _relay = OutboxRelay()
+    _relay.start()
+    return _relay
+
+
+async def close_outbox_relay() -> None:
+    global _relay
+    if _relay is not None:
+        await _relay.stop()
+        _relay = None
+
+
+def get_outbox_relay() -> OutboxRelay | None:
+    return _relay
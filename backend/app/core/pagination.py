@@ -0,0 +1,110 @@
+"""
+Keyset (cursor) pagination.
+
+Listings are ordered newest-first on (timestamp, id) and each page continues
+strictly after the last row of the previous one:
+
+    WHERE (created_at, id) < (:last_created_at, :last_id)
+    ORDER BY created_at DESC, id DESC
+    LIMIT :size + 1
+
+With a composite index on the same columns every page is an index range scan
+of `size` rows, so page 500 costs what page 1 does — unlike OFFSET, which
+reads and discards every earlier row. The extra row only tells us whether a
+next page exists.
+
+Cursors are opaque to clients: url-safe base64 of the last row's key.
+Every listing returns its rows as {"items" | "events": [...], "next_cursor"}
+in the body; only streamed exports, whose body is the file, announce the
+cursor in the X-Next-Cursor header instead.
+Totals are optional; when asked for, they are cached briefly in Redis and so
+may lag behind by up to PAGINATION_TOTAL_CACHE_TTL seconds.
+"""
+from __future__ import annotations
+
+import base64
+import json
+import logging
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from fastapi import HTTPException
+from sqlalchemy import Select, func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"   # streamed exports only
+
+
+def encode_cursor(timestamp: datetime, row_id: UUID) -> str:
+    raw = json.dumps([timestamp.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Inverse of encode_cursor; a malformed cursor is a client error (400)."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(timestamp), UUID(row_id)
+    except (ValueError, TypeError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+async def keyset_page(
+    db: AsyncSession,
+    query: Select,
+    timestamp_col: InstrumentedAttribute,
+    id_col: InstrumentedAttribute,
+    cursor: str | None,
+    size: int,
+) -> tuple[Sequence[Any], str | None]:
+    """Fetch one newest-first page of `query`; returns (rows, next_cursor)."""
+    if cursor:
+        timestamp, row_id = decode_cursor(cursor)
+        # Typed binds, so values are rendered exactly as the columns store them
+        after = tuple_(literal(timestamp, timestamp_col.type), literal(row_id, id_col.type))
+        # The plain bound is implied by the row comparison, but only it lets
+        # PostgreSQL prune the partitions of partitioned tables (audit_logs)
+        query = query.where(
+            timestamp_col <= literal(timestamp, timestamp_col.type),
+            tuple_(timestamp_col, id_col) < after,
+        )
+    result = await db.execute(
+        query.order_by(timestamp_col.desc(), id_col.desc()).limit(size + 1)
+    )
+    rows = result.scalars().all()
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, timestamp_col.key), getattr(last, id_col.key))
+
+
+async def cached_total(db: AsyncSession, query: Select, cache_key: str) -> int:
+    """COUNT(*) of `query`, cached in Redis; falls back to counting when Redis is unavailable."""
+    from app.core.redis_client import get_redis_client
+
+    key = f"forge:total:{cache_key}"
+    try:
+        redis = get_redis_client()
+        cached = await redis.get(key)
+        if cached is not None:
+            return int(cached)
+    except Exception:
+        redis = None
+
+    result = await db.execute(select(func.count()).select_from(query.order_by(None).subquery()))
+    total = result.scalar_one()
+    if redis is not None:
+        try:
+            await redis.set(key, total, ex=settings.PAGINATION_TOTAL_CACHE_TTL)
+        except Exception as exc:
+            logger.debug("Could not cache total for %s: %s", cache_key, exc)
+    return total
@@ -0,0 +1,277 @@
+"""
+Monthly range partitions of the append-only tables.
+
+On PostgreSQL `audit_logs` (by `timestamp`) and `event_store` (by
+`occurred_at`) are declaratively range-partitioned by calendar month
+(alembic revision 008), so:
+
+  * retention is DETACH + DROP of whole months instead of DELETEs that leave
+    vacuum work behind;
+  * a query bounded on the partition key only touches the months it covers,
+    and every partition carries its own (timestamp, id) index for keyset
+    pagination.
+
+PartitionMaintainer keeps the partitions in step with the clock: every
+PARTITION_MAINTENANCE_INTERVAL_SECONDS it creates the current month and the
+next PARTITION_PREMAKE_MONTHS if missing, and drops months that ended more
+than the table's retention ago (AUDIT_RETENTION_DAYS, EVENT_STORE_RETENTION_DAYS;
+0 keeps everything). Rows outside every range land in a DEFAULT partition,
+so an insert never fails because the job is late. PostgreSQL refuses to
+create a month the DEFAULT partition already holds rows of, so the job then
+detaches the default, creates the month, moves those rows into it and
+attaches the default again. A transaction-level advisory lock keeps pods
+from maintaining the same tables concurrently.
+
+A partitioned table cannot carry a unique constraint that omits the partition
+key, so uq_event_sequence (aggregate_id, sequence_number) is a unique index on
+each partition instead: two writers racing on an aggregate still clash,
+unless their events fall either side of a month boundary.
+
+Elsewhere (SQLite in tests and local runs) the tables are plain heaps and the
+job applies the same retention with a DELETE.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import delete, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import write_session
+from app.db.models import AuditLog, Base, EventStore
+
+logger = logging.getLogger(__name__)
+
+# pg_try_advisory_xact_lock key: one maintainer at a time across pods
+_LOCK_KEY = 0x46_4F_52_47_45_50   # "FORGEP"
+
+SessionFactory = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+
+
+@dataclass(frozen=True)
+class PartitionedTable:
+    model:          type[Base]
+    column:         str
+    retention_days: Callable[[], int]
+    # Unique per partition (cannot be unique across the partitioned table)
+    unique_columns: tuple[str, ...] = ()
+
+    @property
+    def name(self) -> str:
+        return self.model.__tablename__
+
+
+PARTITIONED_TABLES = (
+    PartitionedTable(AuditLog, "timestamp", lambda: settings.AUDIT_RETENTION_DAYS),
+    PartitionedTable(
+        EventStore, "occurred_at", lambda: settings.EVENT_STORE_RETENTION_DAYS,
+        unique_columns=("aggregate_id", "sequence_number"),
+    ),
+)
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def next_month(month: date) -> date:
+    return (month.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def partition_month(table: str, name: str) -> date | None:
+    """Month a partition of `table` covers, from its name; None for the default partition."""
+    match = re.fullmatch(rf"{re.escape(table)}_p(\d{{4}})(\d{{2}})", name)
+    return date(int(match[1]), int(match[2]), 1) if match else None
+
+
+def partition_ddl(table: PartitionedTable, month: date | None) -> list[str]:
+    """CREATE statements of one monthly partition (or, for month=None, the default one)."""
+    if month is None:
+        name, bounds = default_partition_name(table.name), "DEFAULT"
+    else:
+        name = partition_name(table.name, month)
+        bounds = f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+    statements = [f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table.name} {bounds}"]
+    if table.unique_columns:
+        statements.append(
+            f"CREATE UNIQUE INDEX IF NOT EXISTS uq_{name}_sequence "
+            f"ON {name} ({', '.join(table.unique_columns)})"
+        )
+    return statements
+
+
+def expired_months(partitions: list[str], table: PartitionedTable, today: date) -> list[date]:
+    """Months of `partitions` that ended more than the table's retention ago."""
+    retention = table.retention_days()
+    if retention <= 0:
+        return []
+    cutoff = today - timedelta(days=retention)
+    months = (partition_month(table.name, name) for name in partitions)
+    return sorted(m for m in months if m is not None and next_month(m) <= cutoff)
+
+
+class PartitionMaintainer:
+    def __init__(
+        self,
+        session_factory: SessionFactory | None = None,
+        premake_months: int | None = None,
+        interval_seconds: int | None = None,
+    ) -> None:
+        if premake_months is None:
+            premake_months = settings.PARTITION_PREMAKE_MONTHS
+        self.premake_months = premake_months
+        self.interval_s = interval_seconds or settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS
+        self._session_factory = session_factory or write_session
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception as exc:
+                logger.warning("Partition maintenance failed, retrying later: %s", exc)
+            await asyncio.sleep(self.interval_s)
+
+    async def run_once(self, today: date | None = None) -> dict[str, int]:
+        """Create upcoming and drop expired partitions.
+
+        Returns what was dropped per table: partitions on PostgreSQL, rows elsewhere.
+        """
+        today = today or datetime.utcnow().date()
+        async with self._session_factory() as db:
+            if db.bind.dialect.name != "postgresql":
+                dropped = {t.name: await self._delete_expired(db, t, today)
+                           for t in PARTITIONED_TABLES}
+                await db.commit()
+                return dropped
+            if not (await db.execute(
+                text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _LOCK_KEY}
+            )).scalar():
+                return {}   # another pod is on it
+            dropped = {}
+            for table in PARTITIONED_TABLES:
+                await self._create_upcoming(db, table, today)
+                dropped[table.name] = await self._drop_expired(db, table, today)
+            await db.commit()
+            return dropped
+
+    async def _create_upcoming(self, db: AsyncSession, table: PartitionedTable,
+                               today: date) -> None:
+        for statement in partition_ddl(table, None):
+            await db.execute(text(statement))
+        existing = set(await self._partitions(db, table))
+        month = month_start(today)
+        for _ in range(self.premake_months + 1):
+            if partition_name(table.name, month) not in existing:
+                await self._create_partition(db, table, month)
+            month = next_month(month)
+
+    @staticmethod
+    async def _create_partition(db: AsyncSession, table: PartitionedTable,
+                                month: date) -> None:
+        # Identifiers come from PARTITIONED_TABLES; the bounds are bind parameters
+        default = default_partition_name(table.name)
+        in_range = f'"{table.column}" >= :start AND "{table.column}" < :end'
+        bounds = {
+            "start": datetime.combine(month, time()),
+            "end": datetime.combine(next_month(month), time()),
+        }
+        stranded = (await db.execute(
+            text(f"SELECT 1 FROM {default} WHERE {in_range} LIMIT 1"),  # noqa: S608  # nosec B608
+            bounds,
+        )).first() is not None
+        if stranded:
+            # Written while the month was missing: the CREATE would fail on them
+            await db.execute(text(f"ALTER TABLE {table.name} DETACH PARTITION {default}"))
+        for statement in partition_ddl(table, month):
+            await db.execute(text(statement))
+        if stranded:
+            name = partition_name(table.name, month)
+            moved = await db.execute(text(
+                f"WITH moved AS (DELETE FROM {default} WHERE {in_range} RETURNING *) "  # noqa: S608  # nosec B608
+                f"INSERT INTO {name} SELECT * FROM moved"
+            ), bounds)
+            await db.execute(text(f"ALTER TABLE {table.name} ATTACH PARTITION {default} DEFAULT"))
+            logger.warning("Moved %d rows from %s into the late partition %s",
+                           moved.rowcount, default, name)  # type: ignore[attr-defined]
+
+    async def _drop_expired(self, db: AsyncSession, table: PartitionedTable,
+                            today: date) -> int:
+        expired = expired_months(await self._partitions(db, table), table, today)
+        for month in expired:
+            name = partition_name(table.name, month)
+            await db.execute(text(f"ALTER TABLE {table.name} DETACH PARTITION {name}"))
+            await db.execute(text(f"DROP TABLE {name}"))
+            logger.info("Dropped expired partition %s", name)
+        return len(expired)
+
+    @staticmethod
+    async def _partitions(db: AsyncSession, table: PartitionedTable) -> list[str]:
+        result = await db.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "JOIN pg_class p ON p.oid = i.inhparent "
+                "WHERE p.relname = :table"
+            ),
+            {"table": table.name},
+        )
+        return [name for (name,) in result.all()]
+
+    @staticmethod
+    async def _delete_expired(db: AsyncSession, table: PartitionedTable, today: date) -> int:
+        retention = table.retention_days()
+        if retention <= 0:
+            return 0
+        column = getattr(table.model, table.column)
+        cutoff = datetime.combine(today - timedelta(days=retention), datetime.min.time())
+        result = await db.execute(delete(table.model).where(column < cutoff))
+        return result.rowcount or 0  # type: ignore[attr-defined]
+
+
+# ── Module-level singleton (mirrors outbox._relay) ────────────────────────────
+
+_maintainer: PartitionMaintainer | None = None
+
+
+def init_partition_maintainer() -> PartitionMaintainer:
+    global _maintainer
+    _maintainer = PartitionMaintainer()
+    _maintainer.start()
+    return _maintainer
+
+
+async def close_partition_maintainer() -> None:
+    global _maintainer
+    if _maintainer is not None:
+        await _maintainer.stop()
+        _maintainer = None
+
+
+def get_partition_maintainer() -> PartitionMaintainer | None:
+    return _maintainer
@@ -0,0 +1,252 @@
+"""
+EventStore snapshots and projection rebuilds.
+
+A projection folds an aggregate's events (EventStore rows, in sequence order)
+into a read-model dict. Replaying from sequence 1 every time gets slow for
+long-lived pipelines, so the engine keeps snapshots in event_snapshots: the
+folded state of one aggregate/projection as of a sequence number, stored as
+zlib-compressed JSON. Loading a projection is then
+
+    latest snapshot  +  events with sequence_number > snapshot.sequence_number
+
+and whenever that tail reaches EVENT_SNAPSHOT_INTERVAL events a fresh snapshot
+replaces the old one.
+
+rebuild_all() refreshes every aggregate in batches: each batch costs one
+snapshot query and one tail query regardless of its size, and up to
+PROJECTION_REBUILD_CONCURRENCY batches run in parallel on separate sessions.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import time
+import zlib
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy import and_, delete, func, or_, select
+
+from app.core.config import settings
+from app.core.database import write_session
+from app.core.event_store import SessionFactory
+from app.db.models import EventSnapshot, EventStore
+
+logger = logging.getLogger(__name__)
+
+State = dict[str, Any]
+
+
+def encode_state(state: State) -> bytes:
+    return zlib.compress(json.dumps(state, separators=(",", ":"), default=str).encode())
+
+
+def decode_state(blob: bytes) -> State:
+    return json.loads(zlib.decompress(blob))
+
+
+# ── Projections ───────────────────────────────────────────────────────────────
+
+class Projection(ABC):
+    """Pure fold over one aggregate's events. Must not touch the database."""
+
+    name: str
+
+    @abstractmethod
+    def initial(self) -> State:
+        """State before the aggregate's first event."""
+
+    @abstractmethod
+    def apply(self, state: State, event: Any) -> State:
+        """Fold one EventStore row (event_type, event_data, occurred_at) into state."""
+
+
+class PipelineStateProjection(Projection):
+    """Pipeline status, per-stage progress and agent counters."""
+
+    name = "pipeline_state"
+
+    def initial(self) -> State:
+        return {
+            "status":         "pending",
+            "current_stage":  None,
+            "stages":         {},
+            "agent_runs":     0,
+            "agent_failures": 0,
+            "completed_at":   None,
+            "error":          None,
+        }
+
+    def apply(self, state: State, event: Any) -> State:
+        data = event.event_data or {}
+        stage_id = data.get("stage_id")
+        kind = event.event_type
+        if kind == "stage_started":
+            state["status"] = "running"
+            state["current_stage"] = data.get("stage_type")
+            stage = state["stages"].setdefault(stage_id, {"attempts": 0})
+            stage.update(stage_type=data.get("stage_type"), status="running")
+            stage["attempts"] += 1
+        elif kind == "stage_completed":
+            stage = state["stages"].setdefault(stage_id, {"attempts": 0})
+            stage["status"] = data.get("status", "completed")
+        elif kind == "stage_rejected":
+            stage = state["stages"].setdefault(stage_id, {"attempts": 0})
+            stage.update(status="rejected", reason=data.get("reason"))
+        elif kind == "agent_started":
+            state["agent_runs"] += 1
+        elif kind == "agent_failed":
+            state["agent_failures"] += 1
+        elif kind == "pipeline_completed":
+            state["status"] = "completed"
+            state["current_stage"] = None
+            state["completed_at"] = event.occurred_at.isoformat()
+        elif kind == "pipeline_failed":
+            state["status"] = "failed"
+            state["error"] = data.get("error")
+            state["completed_at"] = event.occurred_at.isoformat()
+            if stage_id in state["stages"] and state["stages"][stage_id]["status"] == "running":
+                state["stages"][stage_id]["status"] = "failed"
+        return state
+
+
+# ── Engine ────────────────────────────────────────────────────────────────────
+
+@dataclass
+class RebuildStats:
+    aggregates: int = 0
+    events:     int = 0
+    snapshots:  int = 0
+    seconds:    float = 0.0
+
+    @property
+    def events_per_second(self) -> float:
+        return self.events / self.seconds if self.seconds else 0.0
+
+
+class ProjectionEngine:
+    def __init__(
+        self,
+        projections: list[Projection] | None = None,
+        session_factory: SessionFactory | None = None,
+        snapshot_every: int | None = None,
+    ) -> None:
+        self.projections = {p.name: p for p in projections or [PipelineStateProjection()]}
+        self.snapshot_every = snapshot_every or settings.EVENT_SNAPSHOT_INTERVAL
+        self._session_factory = session_factory or write_session
+
+    async def load(
+        self, aggregate_id: str, projection: str = PipelineStateProjection.name
+    ) -> tuple[State, int]:
+        """Current (state, last sequence_number) of one aggregate."""
+        folded = await self._fold_batch([aggregate_id], self.projections[projection])
+        return folded[aggregate_id]
+
+    async def rebuild_all(
+        self, batch_size: int | None = None, concurrency: int | None = None
+    ) -> RebuildStats:
+        """Bring every projection of every aggregate up to date, snapshotting as needed."""
+        batch_size = batch_size or settings.PROJECTION_REBUILD_BATCH_SIZE
+        semaphore = asyncio.Semaphore(concurrency or settings.PROJECTION_REBUILD_CONCURRENCY)
+        stats = RebuildStats()
+        t0 = time.perf_counter()
+
+        async with self._session_factory() as session:
+            result = await session.execute(select(EventStore.aggregate_id).distinct())
+            aggregate_ids = sorted(result.scalars())
+        stats.aggregates = len(aggregate_ids)
+
+        async def run(batch: list[str]) -> None:
+            async with semaphore:
+                for projection in self.projections.values():
+                    await self._fold_batch(batch, projection, stats)
+
+        await asyncio.gather(*(
+            run(aggregate_ids[i:i + batch_size])
+            for i in range(0, len(aggregate_ids), batch_size)
+        ))
+        stats.seconds = time.perf_counter() - t0
+        logger.info(
+            "Rebuilt projections for %d aggregates: %d events in %.2fs (%.0f events/s)",
+            stats.aggregates, stats.events, stats.seconds, stats.events_per_second,
+        )
+        return stats
+
+    async def _fold_batch(
+        self,
+        aggregate_ids: list[str],
+        projection: Projection,
+        stats: RebuildStats | None = None,
+    ) -> dict[str, tuple[State, int]]:
+        async with self._session_factory() as session:
+            # Latest snapshot per aggregate — one query for the whole batch
+            latest = (
+                select(
+                    EventSnapshot.aggregate_id,
+                    func.max(EventSnapshot.sequence_number).label("seq"),
+                )
+                .where(
+                    EventSnapshot.projection == projection.name,
+                    EventSnapshot.aggregate_id.in_(aggregate_ids),
+                )
+                .group_by(EventSnapshot.aggregate_id)
+                .subquery()
+            )
+            result = await session.execute(
+                select(EventSnapshot.aggregate_id, EventSnapshot.sequence_number,
+                       EventSnapshot.state)
+                .join(latest, and_(
+                    EventSnapshot.aggregate_id == latest.c.aggregate_id,
+                    EventSnapshot.sequence_number == latest.c.seq,
+                ))
+                .where(EventSnapshot.projection == projection.name)
+            )
+            folded: dict[str, tuple[State, int]] = {
+                a: (projection.initial(), 0) for a in aggregate_ids
+            }
+            for aggregate_id, seq, blob in result.all():
+                folded[aggregate_id] = (decode_state(blob), seq)
+
+            # Tail of every aggregate past its snapshot — again one query
+            result = await session.execute(
+                select(EventStore.aggregate_id, EventStore.sequence_number,
+                       EventStore.event_type, EventStore.event_data, EventStore.occurred_at)
+                .where(or_(*(
+                    and_(EventStore.aggregate_id == a, EventStore.sequence_number > seq)
+                    for a, (_, seq) in folded.items()
+                )))
+                .order_by(EventStore.aggregate_id, EventStore.sequence_number)
+            )
+            tail_lengths: dict[str, int] = {}
+            for event in result.all():
+                state, _ = folded[event.aggregate_id]
+                folded[event.aggregate_id] = (
+                    projection.apply(state, event), event.sequence_number
+                )
+                tail_lengths[event.aggregate_id] = tail_lengths.get(event.aggregate_id, 0) + 1
+
+            due = [a for a, n in tail_lengths.items() if n >= self.snapshot_every]
+            if due:
+                # Only the newest snapshot is ever read — drop the ones being superseded
+                await session.execute(
+                    delete(EventSnapshot).where(
+                        EventSnapshot.projection == projection.name,
+                        EventSnapshot.aggregate_id.in_(due),
+                    )
+                )
+                session.add_all([
+                    EventSnapshot(
+                        aggregate_id=aggregate_id,
+                        projection=projection.name,
+                        sequence_number=folded[aggregate_id][1],
+                        state=encode_state(folded[aggregate_id][0]),
+                    )
+                    for aggregate_id in due
+                ])
+
+        if stats is not None:
+            stats.events += sum(tail_lengths.values())
+            stats.snapshots += len(due)
+        return folded
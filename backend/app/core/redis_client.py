@@ -70,11 +70,20 @@ async def cache_delete(key: str) -> None:
         await _redis.delete(key)
 
 
-async def cache_delete_pattern(pattern: str) -> int:
-    """Delete all keys matching pattern. Returns count deleted."""
+async def cache_delete_pattern(pattern: str, batch_size: int = 500) -> int:
+    """Delete all keys matching pattern. Returns count deleted.
+
+    Walks the keyspace with SCAN and UNLINKs a batch at a time: unlike KEYS,
+    never blocks Redis for the length of the walk.
+    """
     if not _redis:
         return 0
-    keys = await _redis.keys(pattern)
-    if keys:
-        return await _redis.delete(*keys)
-    return 0
+    deleted, batch = 0, []
+    async for key in _redis.scan_iter(match=pattern, count=batch_size):
+        batch.append(key)
+        if len(batch) >= batch_size:
+            deleted += await _redis.unlink(*batch)
+            batch.clear()
+    if batch:
+        deleted += await _redis.unlink(*batch)
+    return deleted
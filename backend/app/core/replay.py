@@ -0,0 +1,254 @@
+"""
+Per-pipeline replay buffer for WebSocket resume.
+
+EventBus.publish() stamps every locally originated event with a per-pipeline,
+monotonically increasing `seq` and records it here — an O(1) append to a
+bounded in-memory deque plus an incremental fold into a compact state
+snapshot (PipelineStateProjection). Events bridged in from other pods already
+carry their origin's seq and are recorded the same way.
+
+Local events are also XADDed, in batches by a background task, to a Redis
+Stream per pipeline (entry id "<seq>-0", MAXLEN ~ WS_REPLAY_BUFFER_SIZE), so a
+client reconnecting to a different pod can still resume. A reconnecting client
+sends the last seq it saw and gets:
+
+  * since()   — only the missed events, if the buffer still reaches back; or
+  * snapshot() — the folded pipeline state, when it does not.
+
+The counter for a pipeline is seeded from its stream tail by prime() when a
+run starts, so seqs keep increasing across process restarts. At most
+WS_REPLAY_MAX_PIPELINES histories are kept, least recently used first out —
+except those of pipelines running here (hold() … release()): evicting one
+would restart its counter at 1 mid-run.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from app.core.batcher import BackgroundBatcher
+from app.core.config import settings
+from app.core.projections import PipelineStateProjection, ProjectionEngine, State
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from app.core.events import PipelineEvent
+
+logger = logging.getLogger(__name__)
+
+STREAM_PREFIX = "forge:replay:pipeline:"
+
+Message = dict[str, Any]
+
+
+def event_message(event: PipelineEvent) -> Message:
+    """WebSocket frame for an event."""
+    return {
+        "type":        event.event_type,
+        "pipeline_id": event.pipeline_id,
+        "stage_id":    event.stage_id,
+        "data":        event.data,
+        "timestamp":   event.timestamp.isoformat(),
+        "seq":         event.seq,
+    }
+
+
+class _Folded(NamedTuple):
+    """Shape PipelineStateProjection.apply() expects (an EventStore row)."""
+    event_type:  str
+    event_data:  dict[str, Any]
+    occurred_at: datetime
+
+
+class _PipelineHistory:
+    __slots__ = ("messages", "state", "complete", "last_seq")
+
+    def __init__(self, maxlen: int, state: State, last_seq: int) -> None:
+        self.messages: deque[Message] = deque(maxlen=maxlen)
+        self.state = state
+        # The folded state is only trustworthy if every event since seq 1 was seen
+        self.complete = last_seq == 0
+        self.last_seq = last_seq
+
+
+class ReplayBuffer(BackgroundBatcher):
+    def __init__(
+        self,
+        maxlen: int | None = None,
+        max_pipelines: int | None = None,
+    ) -> None:
+        super().__init__()
+        self.maxlen        = maxlen or settings.WS_REPLAY_BUFFER_SIZE
+        self.max_pipelines = max_pipelines or settings.WS_REPLAY_MAX_PIPELINES
+        self.projection    = PipelineStateProjection()
+        self._pipelines: OrderedDict[str, _PipelineHistory] = OrderedDict()
+        self._held: dict[str, int] = {}   # pipeline_id -> runs sequencing it here
+        self._outbox: deque[tuple[str, int, str]] = deque()
+
+    # ── Hot path (called from EventBus.publish) ───────────────────────────────
+
+    def next_seq(self, pipeline_id: str) -> int:
+        return self._history(pipeline_id).last_seq + 1
+
+    def record(self, event: PipelineEvent, local: bool) -> None:
+        """O(1): remember the event and fold it into the pipeline's snapshot."""
+        if event.seq is None:
+            return
+        history = self._history(event.pipeline_id)
+        if event.seq <= history.last_seq and history.messages:
+            return   # duplicate or out of order — already covered
+        if event.seq != history.last_seq + 1:
+            history.complete = False
+        message = event_message(event)
+        history.messages.append(message)
+        history.last_seq = event.seq
+        history.state = self.projection.apply(history.state, _Folded(
+            event.event_type, {"stage_id": event.stage_id, **event.data}, event.timestamp,
+        ))
+        if local:
+            self._outbox.append((event.pipeline_id, event.seq, json.dumps(message)))
+            self._kick()
+
+    def hold(self, pipeline_id: str) -> None:
+        """Keep the pipeline's history (and seq counter) while it runs in this process."""
+        self._held[pipeline_id] = self._held.get(pipeline_id, 0) + 1
+
+    def release(self, pipeline_id: str) -> None:
+        if (count := self._held.get(pipeline_id, 0)) > 1:
+            self._held[pipeline_id] = count - 1
+        else:
+            self._held.pop(pipeline_id, None)
+
+    # ── Resume ────────────────────────────────────────────────────────────────
+
+    def last_seq(self, pipeline_id: str) -> int:
+        history = self._pipelines.get(pipeline_id)
+        return history.last_seq if history else 0
+
+    async def since(self, pipeline_id: str, last_seq: int) -> list[Message] | None:
+        """Events after last_seq, or None if the buffer no longer reaches back that far."""
+        history = self._pipelines.get(pipeline_id)
+        if history is not None and history.messages:
+            if last_seq >= history.last_seq:
+                return []
+            if history.messages[0]["seq"] <= last_seq + 1:
+                return [m for m in history.messages if m["seq"] > last_seq]
+
+        key = STREAM_PREFIX + pipeline_id
+        try:
+            from app.core.redis_client import get_redis_client
+            # One MULTI round-trip, so the tail matches the range read beside it
+            pipe = get_redis_client().pipeline(transaction=True)
+            pipe.xrange(key, min=f"{last_seq + 1}-0", count=self.maxlen)
+            pipe.xrevrange(key, count=1)
+            entries, tail = await pipe.execute()
+        except Exception as exc:
+            logger.debug("Replay stream unavailable for %s: %s", pipeline_id, exc)
+            return None
+        if not tail:
+            # Stream expired or never written: only trust an up-to-date local view
+            if history is not None and last_seq >= history.last_seq:
+                return []
+            return None
+        tail_seq = int(tail[0][0].split("-")[0])
+        if tail_seq <= last_seq:
+            return []
+        messages = [json.loads(fields["m"]) for _, fields in entries]
+        seqs = [m["seq"] for m in messages]
+        # MAXLEN ~ trims lazily, so the stream can hold more than `count`
+        # entries: a range that stops short of the tail is a gap, not the end.
+        if seqs and seqs == list(range(last_seq + 1, tail_seq + 1)):
+            return messages
+        return None
+
+    async def snapshot(self, pipeline_id: str) -> Message:
+        """Compact current state; live events with a higher seq follow it."""
+        history = self._pipelines.get(pipeline_id)
+        if history is not None and history.complete:
+            state, seq = history.state, history.last_seq
+        else:
+            # Not witnessed from the start here — fold it from the EventStore instead
+            seq = await self.prime(pipeline_id)
+            try:
+                state, _ = await ProjectionEngine().load(pipeline_id)
+            except Exception as exc:
+                logger.warning("Snapshot projection failed for %s: %s", pipeline_id, exc)
+                state = None
+        return {"type": "snapshot", "pipeline_id": pipeline_id, "seq": seq, "state": state}
+
+    async def prime(self, pipeline_id: str) -> int:
+        """Seed the seq counter from the pipeline's stream tail. Returns the last seq."""
+        history = self._history(pipeline_id)
+        if history.last_seq:
+            return history.last_seq
+        try:
+            from app.core.redis_client import get_redis_client
+            tail = await get_redis_client().xrevrange(STREAM_PREFIX + pipeline_id, count=1)
+        except Exception as exc:
+            logger.debug("Replay stream unavailable for %s: %s", pipeline_id, exc)
+            return 0
+        if tail and not history.last_seq:
+            history.last_seq = int(tail[0][0].split("-")[0])
+            history.complete = False
+        return history.last_seq
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._flush()
+
+    # ── Internals ─────────────────────────────────────────────────────────────
+
+    def _history(self, pipeline_id: str) -> _PipelineHistory:
+        history = self._pipelines.get(pipeline_id)
+        if history is None:
+            history = _PipelineHistory(self.maxlen, self.projection.initial(), 0)
+            self._pipelines[pipeline_id] = history
+            self._evict()
+        else:
+            self._pipelines.move_to_end(pipeline_id)
+        return history
+
+    def _evict(self) -> None:
+        """Drop the least recently used histories over max_pipelines, never held ones."""
+        excess = len(self._pipelines) - self.max_pipelines
+        if excess > 0:
+            unheld = (p for p in self._pipelines if p not in self._held)
+            for pipeline_id in list(islice(unheld, excess)):
+                del self._pipelines[pipeline_id]
+
+    def _pending(self) -> bool:
+        return bool(self._outbox)
+
+    async def _drain(self) -> None:
+        await self._flush()
+
+    async def _flush(self) -> None:
+        """XADD everything queued in one Redis round-trip. Best effort."""
+        batch = list(self._outbox)
+        self._outbox.clear()
+        if not batch:
+            return
+        try:
+            from app.core.redis_client import get_redis_client
+            pipe = get_redis_client().pipeline(transaction=False)
+        except RuntimeError:
+            return   # Redis not configured: in-memory replay only
+        for pipeline_id, seq, message in batch:
+            key = STREAM_PREFIX + pipeline_id
+            pipe.xadd(key, {"m": message}, id=f"{seq}-0", maxlen=self.maxlen, approximate=True)
+            pipe.expire(key, settings.WS_REPLAY_TTL_SECONDS)
+        try:
+            await pipe.execute(raise_on_error=False)
+        except Exception as exc:
+            logger.warning("Replay stream write of %d events failed: %s", len(batch), exc)
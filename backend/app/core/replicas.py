@@ -0,0 +1,219 @@
+"""
+Read routing across several replicas, with read-your-writes consistency.
+
+Each read session goes to one healthy replica, picked at random weighted by
+1 / ((1 + replication lag) * check-out latency): a replica that keeps up and
+answers fast gets most of the reads, a slower one still gets its share.
+A probe every REPLICA_PROBE_INTERVAL_SECONDS checks a connection out of each
+replica's pool and reads its replay position; it measures both. A replica is
+ejected after REPLICA_EJECT_AFTER_FAILURES failed probes in a row, or while
+it lags more than REPLICA_MAX_LAG_SECONDS, and re-admitted by the first
+probe that finds it well again. With no replica available reads go to the
+primary.
+
+Read-your-writes: once a request has written, its client's reads are pinned
+for READ_YOUR_WRITES_SECONDS. A pinned read only goes to a replica that has
+replayed up to the primary's WAL position as of the write, and to the
+primary if none has. Clients are told apart by their bearer token. Pins are
+kept in-process and mirrored to Redis, so the pod that serves the next read
+need not be the one that took the write.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import math
+import random
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from starlette.requests import HTTPConnection
+
+from app.core.config import settings
+from app.core.metrics import record_db_read, set_replica_state
+from app.core.redis_client import cache_get, cache_set
+
+logger = logging.getLogger(__name__)
+
+# Replay position (bytes into the WAL) and seconds behind the primary. An idle
+# primary sends nothing to replay: fully replayed is no lag at all.
+_REPLICA_STATE_SQL = text(
+    "SELECT pg_last_wal_replay_lsn() - '0/0'::pg_lsn, "
+    "CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+_PRIMARY_LSN_SQL = text("SELECT pg_current_wal_lsn() - '0/0'::pg_lsn")
+
+_PIN_PREFIX = "rw:"
+_PIN_MAX_KEYS = 10_000
+# Latencies below this are noise, not a reason to send a replica more reads
+_LATENCY_FLOOR_S = 0.001
+_LATENCY_SMOOTHING = 0.3
+
+
+@dataclass(eq=False)
+class Replica:
+    name:         str
+    sessionmaker: async_sessionmaker
+    healthy:      bool = True
+    lag_s:        float = 0.0
+    latency_s:    float = 0.0         # smoothed probe check-out + query time
+    replay_lsn:   int | None = None   # None: unknown (not PostgreSQL, or not probed yet)
+    failures:     int = 0
+
+    @property
+    def weight(self) -> float:
+        return 1.0 / ((1.0 + self.lag_s) * max(self.latency_s, _LATENCY_FLOOR_S))
+
+    def caught_up(self, lsn: int | None) -> bool:
+        return lsn is not None and self.replay_lsn is not None and self.replay_lsn >= lsn
+
+
+@dataclass(frozen=True)
+class WritePin:
+    lsn:     int | None   # primary WAL position after the write; None: primary only
+    expires: float        # time.monotonic()
+
+
+def consistency_key(conn: HTTPConnection) -> str | None:
+    """Who a request reads for: a digest of its bearer token, None when anonymous."""
+    auth = conn.headers.get("authorization", "")
+    if not auth.startswith("Bearer "):
+        return None
+    return hashlib.sha256(auth[7:].encode()).hexdigest()[:32]
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        primary: async_sessionmaker,
+        replicas: Sequence[Replica],
+        *,
+        max_lag_s: float | None = None,
+        eject_after: int | None = None,
+        probe_interval_s: float | None = None,
+        probe_timeout_s: float | None = None,
+        pin_seconds: int | None = None,
+    ) -> None:
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.max_lag_s = max_lag_s or settings.REPLICA_MAX_LAG_SECONDS
+        self.eject_after = eject_after or settings.REPLICA_EJECT_AFTER_FAILURES
+        self.probe_interval_s = probe_interval_s or settings.REPLICA_PROBE_INTERVAL_SECONDS
+        self.probe_timeout_s = probe_timeout_s or settings.REPLICA_PROBE_TIMEOUT_SECONDS
+        self.pin_s = pin_seconds or settings.READ_YOUR_WRITES_SECONDS
+        self._pins: OrderedDict[str, WritePin] = OrderedDict()
+        self._task: asyncio.Task | None = None
+
+    # ── Routing ───────────────────────────────────────────────────────────────
+
+    def choose(self, pin: WritePin | None = None) -> Replica | None:
+        """A replica for one read session; None means the primary."""
+        candidates = [r for r in self.replicas if r.healthy]
+        if pin is not None:
+            candidates = [r for r in candidates if r.caught_up(pin.lsn)]
+        if len(candidates) <= 1:
+            return candidates[0] if candidates else None
+        return random.choices(candidates, weights=[r.weight for r in candidates])[0]  # noqa: S311  # nosec B311
+
+    def sessionmaker_for(self, pin: WritePin | None = None) -> async_sessionmaker:
+        replica = self.choose(pin)
+        record_db_read("primary" if replica is None else replica.name)
+        return self.primary if replica is None else replica.sessionmaker
+
+    # ── Read-your-writes pins ─────────────────────────────────────────────────
+
+    async def record_write(self, key: str, db: AsyncSession) -> None:
+        """Pin `key`'s reads after `db` committed a write."""
+        lsn = None
+        if db.bind.dialect.name == "postgresql":
+            lsn = int((await db.execute(_PRIMARY_LSN_SQL)).scalar_one())
+        self._remember(key, WritePin(lsn, time.monotonic() + self.pin_s))
+        try:
+            await cache_set(_PIN_PREFIX + key, "" if lsn is None else str(lsn),
+                            ttl=math.ceil(self.pin_s))
+        except Exception as exc:
+            logger.debug("Could not share read-your-writes pin: %s", exc)
+
+    async def pin_for(self, key: str) -> WritePin | None:
+        pin = self._pins.get(key)
+        if pin is not None:
+            if pin.expires > time.monotonic():
+                return pin
+            del self._pins[key]
+        try:
+            shared = await cache_get(_PIN_PREFIX + key)
+        except Exception as exc:
+            logger.debug("Could not read read-your-writes pin: %s", exc)
+            return None
+        if shared is None:
+            return None
+        return WritePin(int(shared) if shared else None, time.monotonic() + self.pin_s)
+
+    def _remember(self, key: str, pin: WritePin) -> None:
+        self._pins[key] = pin
+        self._pins.move_to_end(key)
+        while len(self._pins) > _PIN_MAX_KEYS:
+            self._pins.popitem(last=False)
+
+    # ── Health probes ─────────────────────────────────────────────────────────
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await self.probe()
+            await asyncio.sleep(self.probe_interval_s)
+
+    async def probe(self) -> None:
+        await asyncio.gather(*(self._probe(replica) for replica in self.replicas))
+
+    async def _probe(self, replica: Replica) -> None:
+        start = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.probe_timeout_s):
+                async with replica.sessionmaker() as db:
+                    lsn, lag = await self._replication_state(db)
+        except Exception as exc:
+            replica.failures += 1
+            if replica.failures >= self.eject_after:
+                self._set_health(replica, False, f"{replica.failures} failed probes: {exc!r}")
+            return
+        latency = time.perf_counter() - start
+        replica.latency_s = latency if not replica.latency_s else (
+            (1 - _LATENCY_SMOOTHING) * replica.latency_s + _LATENCY_SMOOTHING * latency
+        )
+        replica.failures = 0
+        replica.replay_lsn, replica.lag_s = lsn, lag
+        self._set_health(replica, lag <= self.max_lag_s, f"{lag:.1f}s behind")
+
+    @staticmethod
+    async def _replication_state(db: AsyncSession) -> tuple[int | None, float]:
+        if db.bind.dialect.name != "postgresql":
+            await db.execute(text("SELECT 1"))
+            return None, 0.0
+        lsn, lag = (await db.execute(_REPLICA_STATE_SQL)).one()
+        return (int(lsn) if lsn is not None else None), float(lag)
+
+    @staticmethod
+    def _set_health(replica: Replica, healthy: bool, reason: str) -> None:
+        if healthy != replica.healthy:
+            if healthy:
+                logger.info("Replica %s re-admitted (%s)", replica.name, reason)
+            else:
+                logger.warning("Replica %s ejected (%s)", replica.name, reason)
+        replica.healthy = healthy
+        set_replica_state(replica.name, healthy, replica.lag_s)
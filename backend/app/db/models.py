@@ -10,20 +10,23 @@ from datetime import datetime
 from enum import StrEnum
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     Column,
     DateTime,
     ForeignKey,
     Index,
     Integer,
+    LargeBinary,
     String,
     Text,
     UniqueConstraint,
+    text,
 )
 from sqlalchemy import (
     Enum as SQLEnum,
 )
-from sqlalchemy.orm import DeclarativeBase, relationship
+from sqlalchemy.orm import DeclarativeBase, deferred, relationship
 
 # ── Dialect-agnostic type aliases ─────────────────────────────────────────────
 # Use native PostgreSQL types against a real PG database; fall back to portable
@@ -298,6 +301,8 @@ class Pipeline(Base):
     config        = Column(JSONB, default={})
     extra         = Column(JSONB, default={})
     created_at    = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Set once its stages' payloads have moved to cold storage (StageArchiveService)
+    archived_at   = Column(DateTime, nullable=True)
 
     project   = relationship("Project", back_populates="pipelines")
     stages    = relationship(
@@ -307,6 +312,7 @@ class Pipeline(Base):
 
     __table_args__ = (
         Index("idx_pipelines_project_status", "project_id", "status"),
+        Index("idx_pipelines_project_created", "project_id", "created_at", "id"),
     )
 
 
@@ -332,6 +338,9 @@ class PipelineStage(Base):
     retry_count     = Column(Integer, default=0)
     input_data      = Column(JSONB, default={})
     output_data     = Column(JSONB, default={})
+    # Blob holding the five payload columns above once archived (they are then
+    # NULL); read them through StageArchiveService.payload(), never directly.
+    payload_checksum = Column(String(64), nullable=True)
 
     pipeline = relationship("Pipeline", back_populates="stages")
     approver = relationship("User", foreign_keys=[approved_by])
@@ -347,7 +356,9 @@ class Artifact(Base):
     stage_id      = Column(UUID(as_uuid=True), ForeignKey("pipeline_stages.id"), nullable=False)  # type: ignore[var-annotated]
     artifact_type = Column(SQLEnum(ArtifactType), nullable=False)  # type: ignore[var-annotated]
     name          = Column(String(255), nullable=False)
-    content       = Column(Text, nullable=True)
+    # Bodies can be megabytes: never SELECTed unless a query asks for them
+    # with undefer(), and touching an unloaded body raises instead of lazy-loading.
+    content       = deferred(Column(Text, nullable=True), raiseload=True)
     file_path     = Column(String(500), nullable=True)
     checksum      = Column(String(64), nullable=True)
     version       = Column(Integer, default=1)
@@ -361,6 +372,56 @@ class Artifact(Base):
 
     __table_args__ = (
         Index("idx_artifacts_pipeline", "pipeline_id"),
+        Index("idx_artifacts_created", "created_at", "id"),
+        Index("idx_artifacts_versions", "pipeline_id", "artifact_type", "version"),
+    )
+
+
+class ArtifactFile(Base):
+    """One generated file of a SOURCE_CODE / TEST_SUITE artifact, addressable by path."""
+    __tablename__ = "artifact_files"
+
+    id          = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)  # type: ignore[var-annotated]
+    artifact_id = Column(  # type: ignore[var-annotated]
+        UUID(as_uuid=True), ForeignKey("artifacts.id", ondelete="CASCADE"), nullable=False
+    )
+    pipeline_id = Column(  # type: ignore[var-annotated]
+        UUID(as_uuid=True), ForeignKey("pipelines.id", ondelete="CASCADE"), nullable=False
+    )
+    path        = Column(String(500), nullable=False)
+    language    = Column(String(50), nullable=True)
+    size_bytes  = Column(Integer, nullable=False, default=0)
+    checksum    = Column(String(64), nullable=False)                # sha256 of the file body
+    # Body: in the blob store (file_path = blob://…), or inline when it is disabled
+    content     = deferred(Column(Text, nullable=True), raiseload=True)
+    file_path   = Column(String(500), nullable=True)
+    created_at  = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("artifact_id", "path", name="uq_artifact_file_path"),
+        Index("idx_artifact_files_pipeline_path", "pipeline_id", "path", "created_at"),
+    )
+
+
+class ArtifactBlob(Base):
+    """A compressed artifact body in the blob store, shared by every artifact with its checksum."""
+    __tablename__ = "artifact_blobs"
+
+    checksum     = Column(String(64), primary_key=True)        # sha256 of the uncompressed body
+    size_bytes   = Column(Integer, nullable=False)             # uncompressed
+    stored_bytes = Column(Integer, nullable=False)             # compressed, as held by the store
+    ref_count    = Column(Integer, nullable=False, default=0)
+    # Delta blobs decode against their base blob, which they hold a reference on
+    base_checksum = Column(String(64), nullable=True)
+    chain_depth   = Column(Integer, nullable=False, default=0)  # deltas back to a full blob
+    created_at   = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at   = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index(
+            "idx_artifact_blobs_unreferenced", "updated_at",
+            postgresql_where=text("ref_count <= 0"),
+        ),
     )
 
 
@@ -385,11 +446,17 @@ class ApprovalRequest(Base):
     stage    = relationship("PipelineStage")
     pipeline = relationship("Pipeline")
 
+    __table_args__ = (
+        Index("idx_approval_requests_status_created", "status", "created_at", "id"),
+    )
+
 # Alias so code that imports "Approval" still works
 Approval = ApprovalRequest
 
 
 class AuditLog(Base):
+    """Append-only audit trail; on PostgreSQL range-partitioned by month on timestamp
+    (app.core.partitions), hence timestamp in the primary key."""
     __tablename__ = "audit_logs"
 
     id            = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)  # type: ignore[var-annotated]
@@ -402,18 +469,24 @@ class AuditLog(Base):
     user_agent    = Column(String(500), nullable=True)
     request_id    = Column(String(100), nullable=True)
     details       = Column(JSONB, default={})
-    timestamp     = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    timestamp     = Column(DateTime, default=datetime.utcnow, nullable=False, primary_key=True)
 
     user = relationship("User", back_populates="audit_logs")
 
     __table_args__ = (
         Index("idx_audit_logs_user_time", "user_id", "timestamp"),
         Index("idx_audit_logs_resource",  "resource_type", "resource_id"),
+        Index("idx_audit_logs_time_id",   "timestamp", "id"),
     )
 
 
 class EventStore(Base):
-    """Immutable event log for event sourcing."""
+    """Immutable event log for event sourcing.
+
+    On PostgreSQL range-partitioned by month on occurred_at (app.core.partitions),
+    hence occurred_at in the primary key; uq_event_sequence is enforced there by a
+    unique index on each partition.
+    """
     __tablename__ = "event_store"
 
     id              = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)  # type: ignore[var-annotated]
@@ -422,7 +495,7 @@ class EventStore(Base):
     event_type      = Column(String(100), nullable=False)
     event_data      = Column(JSONB, nullable=False)
     sequence_number = Column(Integer, nullable=False)
-    occurred_at     = Column(DateTime, default=datetime.utcnow, nullable=False)
+    occurred_at     = Column(DateTime, default=datetime.utcnow, nullable=False, primary_key=True)
     extra           = Column(JSONB, default={})
 
     __table_args__ = (
@@ -431,5 +504,54 @@ class EventStore(Base):
     )
 
 
+class EventSnapshot(Base):
+    """Projection state of one aggregate as of sequence_number (zlib-compressed JSON)."""
+    __tablename__ = "event_snapshots"
+
+    id              = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)  # type: ignore[var-annotated]
+    aggregate_id    = Column(String(255), nullable=False)
+    projection      = Column(String(100), nullable=False)
+    sequence_number = Column(Integer, nullable=False)
+    state           = Column(LargeBinary, nullable=False)
+    created_at      = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint(
+            "aggregate_id", "projection", "sequence_number", name="uq_event_snapshot"
+        ),
+    )
+
+
+class OutboxEvent(Base):
+    """A PipelineEvent committed with the state change it describes, awaiting relay.
+
+    Rows are written in the engine's transaction and delivered to the bus,
+    Kafka and the EventStore by app.core.outbox.OutboxRelay.
+    """
+    __tablename__ = "event_outbox"
+
+    id           = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)  # type: ignore[var-annotated]
+    event_id     = Column(String(36), nullable=False, unique=True)
+    pipeline_id  = Column(String(255), nullable=False)
+    event_type   = Column(String(100), nullable=False)
+    payload      = Column(JSONB, nullable=False)
+    origin       = Column(String(255), nullable=False)   # instance_id() of the staging process
+    created_at   = Column(DateTime, default=datetime.utcnow, nullable=False)
+    delivered_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Relay claims: undelivered rows in commit order
+        Index(
+            "idx_event_outbox_pending", "id",
+            postgresql_where=text("delivered_at IS NULL"),
+        ),
+        # Pruning of delivered rows
+        Index(
+            "idx_event_outbox_delivered", "delivered_at",
+            postgresql_where=text("delivered_at IS NOT NULL"),
+        ),
+    )
+
+
 # ── Backward-compat shims ─────────────────────────────────────────────────────
 from app.core.database import get_db, get_read_db, get_write_db  # noqa: F401, E402
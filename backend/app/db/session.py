@@ -27,13 +27,13 @@ def _get_write_session_factory():
 
 
 def _get_read_session_factory():
-    from app.core.database import _ReadSession  # noqa: PLC0415
-    if _ReadSession is None:
+    from app.core.database import read_sessionmaker  # noqa: PLC0415
+    if (factory := read_sessionmaker()) is None:
         raise RuntimeError(
             "Database not initialised — ensure init_db() ran in app lifespan before "
             "the first request reaches a DB dependency."
         )
-    return _ReadSession
+    return factory
 
 
 async def write_session_dep() -> AsyncGenerator[AsyncSession, None]:
@@ -20,14 +20,24 @@ from fastapi.responses import JSONResponse
 from app.api.v1 import agents, artifacts, auth, pipelines, projects, websocket, workspaces
 from app.api.v1.health import router as health_router
 from app.api.v1.routes import router as v1_router
+from app.core.audit_writer import close_audit_writer, init_audit_writer
+from app.core.blob_store import get_blob_store
+from app.core.cache import close_response_cache, init_response_cache
 from app.core.config import settings
 from app.core.database import init_db
-from app.core.kafka_client import init_kafka
+from app.core.event_bridge import close_event_bridge, init_event_bridge
+from app.core.event_forwarder import close_event_forwarder, init_event_forwarder
+from app.core.event_store import close_event_store, init_event_store
+from app.core.events import EventBus
+from app.core.kafka_client import close_kafka, init_kafka
 from app.core.logging import configure_logging, get_logger, new_request_id
 from app.core.metrics import metrics_router, setup_metrics
 from app.core.middleware import AuditMiddleware, RateLimitMiddleware, SecurityMiddleware
+from app.core.outbox import close_outbox_relay, init_outbox_relay
+from app.core.partitions import close_partition_maintainer, init_partition_maintainer
 from app.core.redis_client import init_redis
 from app.core.telemetry import setup_tracing
+from app.services.stage_archive_service import close_stage_archiver, init_stage_archiver
 from app.workers.pipeline_worker import start_pipeline_worker
 
 # Initialise structured logging before anything else
@@ -45,11 +55,25 @@ async def lifespan(app: FastAPI):
     await init_db()
     await init_redis()
     await init_kafka()
+    init_event_forwarder()
+    if settings.EVENT_STORE_ENABLED:
+        init_event_store()
+    if settings.AUDIT_LOG_ENABLED:
+        init_audit_writer()
+    if settings.CACHE_ENABLED:
+        init_response_cache()
     # Skip the Kafka-backed pipeline worker in test environments — it has no
     # broker to connect to and will block the process indefinitely.
     worker_task: asyncio.Task | None = None
     if not settings.TESTING:
+        if settings.OUTBOX_ENABLED:
+            init_outbox_relay()
+        if settings.PARTITION_MAINTENANCE_ENABLED:
+            init_partition_maintainer()
+        if settings.STAGE_ARCHIVE_AFTER_DAYS > 0 and get_blob_store() is not None:
+            init_stage_archiver()
         worker_task = asyncio.create_task(start_pipeline_worker())
+        await init_event_bridge()
     elapsed = round((time.perf_counter() - t0) * 1000, 1)
     logger.info("All systems operational", extra={"startup_ms": elapsed})
     yield
@@ -60,6 +84,17 @@ async def lifespan(app: FastAPI):
             await asyncio.wait_for(asyncio.shield(worker_task), timeout=5.0)
         except (asyncio.CancelledError, TimeoutError):
             pass
+    # Before the bridge, bus and forwarder close: the relay's final drain goes through them
+    await close_outbox_relay()
+    await close_partition_maintainer()
+    await close_stage_archiver()
+    await close_event_bridge()
+    await close_response_cache()
+    await EventBus.get_instance().close()
+    await close_event_forwarder()
+    await close_event_store()
+    await close_audit_writer()
+    await close_kafka()
 
 
 app = FastAPI(
@@ -151,5 +186,6 @@ if __name__ == "__main__":
         reload=settings.DEBUG,
         workers=1 if settings.DEBUG else 4,
         loop="uvloop",
+        ws_per_message_deflate=settings.WS_PER_MESSAGE_DEFLATE,
         access_log=False,
     )
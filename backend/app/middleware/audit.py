@@ -1,22 +1,51 @@
 """
 Immutable audit logging middleware.
 Every state-changing request (POST, PUT, PATCH, DELETE) is recorded
-as an append-only event in the audit_events table.
+as an append-only row in the audit_logs table.
+
+The row is handed to the AuditLogWriter (core/audit_writer.py), which
+batches it into the table in the background: the request path pays for
+a dict and a deque append, never for a database round trip or a disk write.
 """
 from __future__ import annotations
 
-import json
 import time
 import uuid
 from collections.abc import Callable
 
 from fastapi import Request
+from jose import JWTError
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response
 
+from app.core.audit_writer import audit_row, get_audit_writer
+from app.core.logging import request_id_var
+from app.core.security import decode_token
+from app.db.models import AuditAction
+from app.middleware.logging import _client_ip
+
 WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
 SKIP_PATHS = {"/api/v1/health", "/api/docs", "/api/openapi.json", "/ws"}
 
+_API_PREFIX = "/api/v1/"
+
+_METHOD_ACTIONS = {
+    "POST":   AuditAction.CREATE,
+    "PUT":    AuditAction.UPDATE,
+    "PATCH":  AuditAction.UPDATE,
+    "DELETE": AuditAction.DELETE,
+}
+# Trailing path segments that name the action rather than a resource
+_VERB_ACTIONS = {
+    "approve": AuditAction.APPROVE,
+    "reject":  AuditAction.REJECT,
+    "login":   AuditAction.LOGIN,
+    "logout":  AuditAction.LOGOUT,
+    "deploy":  AuditAction.DEPLOY,
+}
+# POST /{collection}/{id}/{operation}: an update of that resource
+_OPERATIONS = frozenset({"cancel", "retry", "lock", "decide"})
+
 
 class AuditMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next: Callable) -> Response:
@@ -27,18 +56,76 @@ class AuditMiddleware(BaseHTTPMiddleware):
         response = await call_next(request)
         duration_ms = round((time.perf_counter() - start) * 1000, 2)
 
-        event = {
-            "id": str(uuid.uuid4()),
-            "method": request.method,
-            "path": str(request.url.path),
-            "status_code": response.status_code,
-            "duration_ms": duration_ms,
-            "ip": request.client.host if request.client else "unknown",
-            "user_agent": request.headers.get("user-agent", ""),
-        }
+        request_id = request_id_var.get("") or str(uuid.uuid4())
+        writer = get_audit_writer()
+        if writer is not None:
+            path = request.url.path
+            action, resource_type, resource_id, workspace_id = _describe(request.method, path)
+            writer.enqueue(audit_row(
+                action,
+                resource_type,
+                resource_id,
+                user_id=_verified_user_id(request),
+                workspace_id=workspace_id,
+                ip_address=_client_ip(request),
+                user_agent=request.headers.get("user-agent"),
+                request_id=request_id,
+                details={
+                    "method":      request.method,
+                    "path":        path,
+                    "status_code": response.status_code,
+                    "duration_ms": duration_ms,
+                },
+            ))
 
-        # In production, write to DB + Kafka. Here we just log to stdout.
-        print(f"[AUDIT] {json.dumps(event)}")
-
-        response.headers["X-Request-Id"] = event["id"]
+        response.headers["X-Request-Id"] = request_id
         return response
+
+
+# ── Helpers ────────────────────────────────────────────────────────────────────
+
+def _as_uuid(segment: str) -> uuid.UUID | None:
+    try:
+        return uuid.UUID(segment)
+    except ValueError:
+        return None
+
+
+def _describe(
+    method: str, path: str
+) -> tuple[AuditAction, str, str | None, uuid.UUID | None]:
+    """(action, resource_type, resource_id, workspace_id) of a write request's path.
+
+    /api/v1/workspaces/{id}/projects        -> CREATE  projects   -          {id}
+    /api/v1/approvals/{id}/approve          -> APPROVE approvals  {id}       -
+    /api/v1/pipelines/{id}/cancel           -> UPDATE  pipelines  {id}       -
+    """
+    rest = path[len(_API_PREFIX):] if path.startswith(_API_PREFIX) else path.lstrip("/")
+    segments = [s for s in rest.split("/") if s]
+    action = _METHOD_ACTIONS[method]
+    if segments and segments[-1] in _VERB_ACTIONS:
+        action = _VERB_ACTIONS[segments.pop()]
+    elif segments and segments[-1] in _OPERATIONS:
+        segments.pop()
+        action = AuditAction.UPDATE
+
+    resource_type, resource_id, workspace_id = "unknown", None, None
+    for segment in segments:
+        if (ident := _as_uuid(segment)) is not None:
+            resource_id = segment
+            if resource_type == "workspaces":
+                workspace_id = ident
+        else:
+            resource_type, resource_id = segment, None
+    return action, resource_type, resource_id, workspace_id
+
+
+def _verified_user_id(request: Request) -> uuid.UUID | None:
+    """``sub`` of a valid Bearer JWT; unverifiable claims are not recorded as the actor."""
+    auth = request.headers.get("Authorization", "")
+    if not auth.startswith("Bearer "):
+        return None
+    try:
+        return _as_uuid(str(decode_token(auth[7:]).get("sub", "")))
+    except JWTError:
+        return None
@@ -1,6 +1,8 @@
 from .pipeline import (
     ApprovalAction,
+    ArtifactList,
     ArtifactRead,
+    ArtifactSummary,
     PipelineCreate,
     PipelineList,
     PipelineRead,
@@ -10,7 +12,7 @@ from .workspace import ProjectCreate, ProjectRead, WorkspaceCreate, WorkspaceRea
 
 __all__ = [
     "PipelineCreate", "PipelineRead", "PipelineList",
-    "ApprovalAction", "ArtifactRead",
+    "ApprovalAction", "ArtifactList", "ArtifactRead", "ArtifactSummary",
     "WorkspaceCreate", "WorkspaceRead",
     "ProjectCreate", "ProjectRead",
     "UserRead", "UserUpdate", "LoginRequest", "TokenResponse",
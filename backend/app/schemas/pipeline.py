@@ -30,10 +30,10 @@ class PipelineRead(BaseModel):
 
 
 class PipelineList(BaseModel):
-    items: list[PipelineRead]
-    total: int
-    page:  int
-    size:  int
+    items:       list[PipelineRead]
+    size:        int
+    next_cursor: str | None = None   # pass back as ?cursor= for the next page
+    total:       int | None = None   # only with ?include_total=true; cached, may lag briefly
 
 
 class ApprovalRead(BaseModel):
@@ -52,11 +52,18 @@ class ApprovalRead(BaseModel):
     created_at:    datetime
 
 
+class ApprovalList(BaseModel):
+    items:       list[ApprovalRead]
+    size:        int
+    next_cursor: str | None = None   # pass back as ?cursor= for the next page
+
+
 class ApprovalAction(BaseModel):
     comment: str | None = None
 
 
-class ArtifactRead(BaseModel):
+class ArtifactSummary(BaseModel):
+    """List view — metadata only; fetch the body via GET /artifacts/{id} or /download."""
     model_config = ConfigDict(from_attributes=True)
 
     id:            UUID
@@ -64,9 +71,41 @@ class ArtifactRead(BaseModel):
     stage_id:      UUID | None = None
     artifact_type: str
     name:          str
-    content:       str | None = None
     checksum:      str | None = None
     version:       int = 1
     is_immutable:  bool
     size_bytes:    int
     created_at:    datetime
+
+
+class ArtifactList(BaseModel):
+    items:       list[ArtifactSummary]
+    size:        int
+    next_cursor: str | None = None   # pass back as ?cursor= for the next page
+
+
+class ArtifactRead(ArtifactSummary):
+    content:       str | None = None
+
+
+class ArtifactFileRead(BaseModel):
+    """One generated file; fetch its body via GET /pipelines/{id}/files/{path}."""
+    model_config = ConfigDict(from_attributes=True)
+
+    path:          str
+    language:      str | None = None
+    size_bytes:    int
+    checksum:      str
+    artifact_id:   UUID
+    created_at:    datetime
+
+
+class StagePayloadRead(BaseModel):
+    """A stage's agent / review / approval payloads, rehydrated if archived."""
+    stage_id:        UUID
+    archived:        bool
+    agent_output:    Any = None
+    review_output:   Any = None
+    approval_output: Any = None
+    input_data:      Any = None
+    output_data:     Any = None
@@ -0,0 +1,322 @@
+"""Artifact body storage — blob store I/O plus reference counting."""
+from __future__ import annotations
+
+import asyncio
+import io
+import logging
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, BinaryIO
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
+
+from app.core.blob_store import (
+    BLOB_PATH_PREFIX,
+    BlobStore,
+    blob_path,
+    compress,
+    compress_delta,
+    content_checksum,
+    decompress,
+    decompress_delta,
+    get_blob_store,
+    open_decompressed,
+)
+from app.core.config import settings
+from app.db.models import Artifact, ArtifactBlob, ArtifactFile
+
+logger = logging.getLogger(__name__)
+
+# Below this many bytes in total, hashing/compressing inline beats a thread hop
+PARALLEL_ENCODE_MIN_BYTES = 256 * 1024
+# A delta must beat a standalone blob by this much to be worth depending on a base
+DELTA_MAX_RATIO = 0.8
+
+
+@dataclass(frozen=True)
+class BlobRef:
+    checksum:   str
+    file_path:  str
+    size_bytes: int
+
+
+def is_blob_backed(artifact: Artifact | ArtifactFile) -> bool:
+    return (artifact.file_path or "").startswith(BLOB_PATH_PREFIX)
+
+
+async def map_in_pool(fn: Callable[[bytes], Any], items: Sequence[bytes]) -> list[Any]:
+    """fn over items — concurrently in the default thread pool when there is enough
+    data to be worth it. hashlib and zstd release the GIL, so this really is parallel."""
+    if sum(map(len, items)) < PARALLEL_ENCODE_MIN_BYTES:
+        return [fn(item) for item in items]
+    return list(await asyncio.gather(*(asyncio.to_thread(fn, item) for item in items)))
+
+
+def _encode(raw: bytes) -> tuple[str, bytes]:
+    return content_checksum(raw), compress(raw)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ArtifactBlobService
+# ─────────────────────────────────────────────────────────────────────────────
+
+class ArtifactBlobService:
+    """Moves artifact bodies in and out of the blob store.
+
+    Reference counts are changed in the caller's transaction, so they commit or
+    roll back with the Artifact rows that hold the references. Blobs whose
+    count drops to zero are removed later by collect_garbage(), never inline:
+    a rolled-back release must not have deleted anything.
+
+    A delta blob holds a reference on its base, so bases outlive their
+    deltas. Chains are at most BLOB_DELTA_KEYFRAME_INTERVAL - 1 deltas long,
+    which bounds the work to reconstruct any version.
+    """
+
+    def __init__(self, db: AsyncSession, store: BlobStore | None = None):
+        self.db = db
+        self.store = store or get_blob_store()
+
+    @property
+    def enabled(self) -> bool:
+        return self.store is not None
+
+    def _require_store(self) -> BlobStore:
+        if self.store is None:
+            raise RuntimeError("blob store disabled (BLOB_STORE_BACKEND=none)")
+        return self.store
+
+    async def store_body(self, content: str, base: str | None = None) -> BlobRef:
+        """Store `content` (deduplicated by checksum) and take a reference to it.
+
+        `base` is the checksum of the previous version of the same artifact: a
+        new blob is then stored as a delta against it, unless that saves too
+        little or the base's chain is due a keyframe.
+        """
+        raw = content.encode()
+        if base is None:
+            return await self._store_encoded(raw, *_encode(raw))
+        store = self._require_store()
+        checksum = content_checksum(raw)
+        await self._upsert_ref(checksum, len(raw), 0)   # see _store_encoded()
+        if not await store.exists(checksum):
+            blob, chain_depth = await self._encode_against(raw, base)
+            await store.put(checksum, blob)
+            if chain_depth:
+                await self._retain(base)
+            await self.db.execute(
+                update(ArtifactBlob)
+                .where(ArtifactBlob.checksum == checksum)
+                .values(
+                    stored_bytes=len(blob),
+                    base_checksum=base if chain_depth else None,
+                    chain_depth=chain_depth,
+                )
+            )
+        return BlobRef(checksum=checksum, file_path=blob_path(checksum), size_bytes=len(raw))
+
+    async def _encode_against(self, raw: bytes, base: str) -> tuple[bytes, int]:
+        """(blob, chain depth): a delta against `base` when worthwhile, else (full, 0)."""
+        meta = await self._blob_meta(base)
+        if meta is None or meta[1] + 1 >= settings.BLOB_DELTA_KEYFRAME_INTERVAL:
+            return await asyncio.to_thread(compress, raw), 0
+        base_raw = await self._read_raw(base)
+        full, delta = await asyncio.to_thread(
+            lambda: (compress(raw), compress_delta(raw, base_raw))
+        )
+        if len(delta) >= len(full) * DELTA_MAX_RATIO:
+            return full, 0
+        return delta, meta[1] + 1
+
+    async def store_bodies(self, contents: Sequence[str]) -> list[BlobRef]:
+        """store_body() for many bodies, hashed and compressed in the thread pool."""
+        raws = [content.encode() for content in contents]
+        encoded = await map_in_pool(_encode, raws)
+        return [
+            await self._store_encoded(raw, checksum, blob)
+            for raw, (checksum, blob) in zip(raws, encoded, strict=True)
+        ]
+
+    async def _store_encoded(self, raw: bytes, checksum: str, blob: bytes) -> BlobRef:
+        store = self._require_store()
+        # Reference first: in PostgreSQL the upsert row-locks the blob until
+        # commit, so a concurrent collect_garbage() cannot delete it under us.
+        await self._upsert_ref(checksum, len(raw), len(blob))
+        if not await store.exists(checksum):
+            await store.put(checksum, blob)
+        return BlobRef(checksum=checksum, file_path=blob_path(checksum), size_bytes=len(raw))
+
+    async def read_body(self, artifact: Artifact | ArtifactFile) -> str | None:
+        """The artifact's body — from the blob store when it has been moved out,
+        otherwise Artifact.content (which the caller must have undeferred)."""
+        if not is_blob_backed(artifact):
+            return artifact.content  # type: ignore[return-value]
+        if self.store is None:
+            raise RuntimeError(f"artifact {artifact.id} is in the blob store, which is disabled")
+        return (await self._read_raw(artifact.checksum)).decode()  # type: ignore[arg-type]
+
+    async def read_text(self, checksum: str) -> str:
+        """A blob's body by checksum, for holders of a reference other than an artifact."""
+        if self.store is None:
+            raise RuntimeError(f"blob {checksum} is in the blob store, which is disabled")
+        return (await self._read_raw(checksum)).decode()
+
+    async def _read_raw(self, checksum: str) -> bytes:
+        """A blob's uncompressed bytes, applying its delta chain from the keyframe up."""
+        store = self._require_store()
+        chain = [checksum]
+        while (meta := await self._blob_meta(chain[-1])) is not None and meta[0]:
+            chain.append(meta[0])
+        blobs = [await store.get(c) for c in reversed(chain)]
+
+        def decode() -> bytes:
+            raw = decompress(blobs[0])
+            for blob in blobs[1:]:
+                raw = decompress_delta(blob, raw)
+            return raw
+
+        return await asyncio.to_thread(decode) if len(blobs) > 1 else decode()
+
+    async def _blob_meta(self, checksum: str) -> tuple[str | None, int] | None:
+        """(base_checksum, chain_depth), read fresh — not from the identity map."""
+        result = await self.db.execute(
+            select(ArtifactBlob.base_checksum, ArtifactBlob.chain_depth)
+            .where(ArtifactBlob.checksum == checksum)
+        )
+        row = result.first()
+        return (row.base_checksum, row.chain_depth) if row else None
+
+    async def open_body(
+        self, artifact: Artifact | ArtifactFile
+    ) -> tuple[int, Callable[[], BinaryIO]]:
+        """(size, opener) for streaming the artifact's uncompressed body.
+
+        The opener blocks — call it from a worker thread. Sizes come from the
+        artifact_blobs row, which describes exactly the bytes the stream yields.
+        """
+        if not is_blob_backed(artifact):
+            raw = (artifact.content or "").encode()
+            return len(raw), lambda: io.BytesIO(raw)
+        if self.store is None:
+            raise RuntimeError(f"artifact {artifact.id} is in the blob store, which is disabled")
+        result = await self.db.execute(
+            select(ArtifactBlob.size_bytes, ArtifactBlob.base_checksum)
+            .where(ArtifactBlob.checksum == artifact.checksum)
+        )
+        blob = result.first()
+        if blob is None:
+            raise KeyError(artifact.checksum)
+        store, checksum = self.store, artifact.checksum
+        base = await self._read_raw(blob.base_checksum) if blob.base_checksum else None
+        return blob.size_bytes, lambda: open_decompressed(store, checksum, base)  # type: ignore[arg-type]
+
+    async def stored_path(self, artifact: Artifact) -> Path | None:
+        """The blob on local disk when it is a standalone zstd frame (not a delta)."""
+        if self.store is None or not is_blob_backed(artifact):
+            return None
+        meta = await self._blob_meta(artifact.checksum)  # type: ignore[arg-type]
+        if meta is None or meta[0]:
+            return None
+        return self.store.local_path(artifact.checksum)  # type: ignore[arg-type]
+
+    async def release_artifact(self, artifact: Artifact) -> None:
+        """Drop the blob references of the artifact and its indexed files; call
+        alongside deleting the row (its ArtifactFile rows go with it by cascade)."""
+        if is_blob_backed(artifact):
+            await self.release(artifact.checksum)  # type: ignore[arg-type]
+        result = await self.db.execute(
+            select(ArtifactFile.checksum).where(
+                ArtifactFile.artifact_id == artifact.id,
+                ArtifactFile.file_path.startswith(BLOB_PATH_PREFIX),
+            )
+        )
+        for checksum in result.scalars().all():
+            await self.release(checksum)
+
+    async def release(self, checksum: str) -> None:
+        await self.db.execute(
+            update(ArtifactBlob)
+            .where(ArtifactBlob.checksum == checksum)
+            .values(ref_count=ArtifactBlob.ref_count - 1, updated_at=datetime.utcnow())
+        )
+
+    async def _retain(self, checksum: str) -> None:
+        await self.db.execute(
+            update(ArtifactBlob)
+            .where(ArtifactBlob.checksum == checksum)
+            .values(ref_count=ArtifactBlob.ref_count + 1, updated_at=datetime.utcnow())
+        )
+
+    async def collect_garbage(self, grace: timedelta = timedelta(hours=1)) -> int:
+        """Delete unreferenced blobs released more than `grace` ago; returns how many."""
+        cutoff = datetime.utcnow() - grace
+        result = await self.db.execute(
+            select(ArtifactBlob.checksum, ArtifactBlob.base_checksum)
+            .where(ArtifactBlob.ref_count <= 0, ArtifactBlob.updated_at < cutoff)
+        )
+        removed = 0
+        for checksum, base in result.all():
+            # Re-checked per row: a store_body() may have revived it meanwhile.
+            # The blob goes while the row is still locked by the DELETE, so a
+            # concurrent store_body() waits and then rewrites it.
+            deleted = await self.db.execute(
+                delete(ArtifactBlob)
+                .where(ArtifactBlob.checksum == checksum, ArtifactBlob.ref_count <= 0)
+            )
+            if deleted.rowcount and self.store is not None:
+                await self.store.delete(checksum)
+                removed += 1
+                if base:   # a later pass collects the base once nothing else needs it
+                    await self.release(base)
+            await self.db.commit()
+        return removed
+
+    async def move_inline_bodies(self, batch_size: int = 500) -> int:
+        """Move one batch of inline Artifact.content bodies into the blob store.
+
+        Returns how many artifacts were moved; 0 once none are left. Each batch
+        commits on its own, so the backfill can be stopped and resumed at will
+        and never holds long row locks. In PostgreSQL, SKIP LOCKED lets several
+        workers run side by side.
+        """
+        self._require_store()
+        query = (
+            select(Artifact)
+            .where(Artifact.content.is_not(None))
+            .options(undefer(Artifact.content))
+            .limit(batch_size)
+        )
+        if self.db.bind.dialect.name == "postgresql":
+            query = query.with_for_update(skip_locked=True)
+        artifacts = (await self.db.execute(query)).scalars().all()
+        for artifact in artifacts:
+            ref = await self.store_body(artifact.content)  # type: ignore[arg-type]
+            # Checksums predating the blob store were taken over the same
+            # json.dumps() text, but recompute rather than trust them.
+            artifact.checksum = ref.checksum  # type: ignore[assignment]
+            artifact.size_bytes = ref.size_bytes  # type: ignore[assignment]
+            artifact.file_path = ref.file_path  # type: ignore[assignment]
+            artifact.content = None  # type: ignore[assignment]
+        await self.db.commit()
+        return len(artifacts)
+
+    async def _upsert_ref(self, checksum: str, size_bytes: int, stored_bytes: int) -> None:
+        insert = pg_insert if self.db.bind.dialect.name == "postgresql" else sqlite_insert
+        stmt = insert(ArtifactBlob).values(
+            checksum=checksum,
+            size_bytes=size_bytes,
+            stored_bytes=stored_bytes,
+            ref_count=1,
+            created_at=datetime.utcnow(),
+            updated_at=datetime.utcnow(),
+        )
+        await self.db.execute(stmt.on_conflict_do_update(
+            index_elements=[ArtifactBlob.checksum],
+            set_={"ref_count": ArtifactBlob.ref_count + 1, "updated_at": datetime.utcnow()},
+        ))
@@ -0,0 +1,287 @@
+"""Pipeline artifact bundles — every artifact of a pipeline as one zip / tar.gz.
+
+Bundles are built on the fly and streamed: each artifact body is fetched,
+written into the archive and flushed to the client before the next one is
+read, so memory is bounded by the largest single artifact, not the bundle.
+
+Layout, under a top-level directory named after the pipeline:
+
+  <path>                     every file of the SOURCE_CODE / TEST_SUITE
+                             outputs (`files` / `test_files`), as a real tree
+  _artifacts/<name>.json     the raw body of every artifact
+
+Artifacts are written newest first and a path already written is skipped,
+so when a stage ran more than once its latest output wins.
+
+Artifacts never change after they are written, so a bundle is fully
+determined by its artifacts' checksums and names. Finished bundles are kept
+in BUNDLE_CACHE_PATH under that key and served from disk next time; the
+least recently used are evicted past BUNDLE_CACHE_MAX_BYTES.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import os
+import tarfile
+import tempfile
+import zipfile
+from collections.abc import AsyncIterator, Callable, Sequence
+from contextlib import AbstractAsyncContextManager
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
+from starlette.requests import Request
+from starlette.responses import FileResponse, Response, StreamingResponse
+
+from app.core.config import settings
+from app.core.database import read_session
+from app.core.downloads import REVALIDATE_CACHE_CONTROL, etag_matches
+from app.db.models import Artifact
+from app.services.artifact_blob_service import ArtifactBlobService
+from app.services.artifact_file_service import (
+    GENERATED_FILE_FIELDS,
+    generated_files,
+    safe_relative_path,
+)
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_FORMATS = {
+    "zip":    ("application/zip", ".zip"),
+    "tar.gz": ("application/gzip", ".tar.gz"),
+}
+BUNDLE_LAYOUT_VERSION = 1   # bump when the layout changes, to invalidate cached bundles
+
+SessionFactory = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+
+
+def bundle_key(artifacts: Sequence[Artifact], fmt: str) -> str:
+    """Cache key / ETag: the layout version, format and every (checksum, name)."""
+    digest = hashlib.sha256(f"v{BUNDLE_LAYOUT_VERSION}:{fmt}".encode())
+    for checksum, name in sorted((a.checksum or "", a.name or "") for a in artifacts):
+        digest.update(f"\n{checksum}:{name}".encode())
+    return digest.hexdigest()
+
+
+# ── Archive writing ───────────────────────────────────────────────────────────
+
+class _Sink(io.RawIOBase):
+    """Unseekable write target that hands back whatever was written since the last drain."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class BundleWriter:
+    """Incremental zip / tar.gz writer: add() returns the archive bytes produced so far.
+
+    zipfile and tarfile both write to unseekable streams (zip via data
+    descriptors, tar in `w|gz` stream mode), so nothing is ever rewound.
+    """
+
+    def __init__(self, fmt: str) -> None:
+        self._sink = _Sink()
+        if fmt == "zip":
+            self._zip: zipfile.ZipFile | None = zipfile.ZipFile(
+                self._sink, "w", compression=zipfile.ZIP_DEFLATED
+            )
+            self._tar: tarfile.TarFile | None = None
+        else:
+            self._zip = None
+            self._tar = tarfile.open(fileobj=self._sink, mode="w|gz")  # type: ignore[call-overload]
+
+    def add(self, files: Sequence[tuple[str, bytes]], mtime: float) -> bytes:
+        for name, data in files:
+            if self._zip is not None:
+                info = zipfile.ZipInfo(name, date_time=_zip_time(mtime))
+                info.compress_type = zipfile.ZIP_DEFLATED
+                self._zip.writestr(info, data)
+            else:
+                info = tarfile.TarInfo(name)
+                info.size, info.mtime, info.mode = len(data), int(mtime), 0o644
+                self._tar.addfile(info, io.BytesIO(data))  # type: ignore[union-attr]
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        (self._zip or self._tar).close()  # type: ignore[union-attr]
+        return self._sink.drain()
+
+
+def _zip_time(mtime: float) -> tuple[int, int, int, int, int, int]:
+    t = datetime.fromtimestamp(max(mtime, 315532800), UTC)   # zip can't go before 1980
+    return t.year, t.month, t.day, t.hour, t.minute, t.second
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ArtifactBundleService
+# ─────────────────────────────────────────────────────────────────────────────
+
+class ArtifactBundleService:
+    """Builds, streams and caches pipeline artifact bundles.
+
+    Bodies are read through `session_factory` sessions of their own: the
+    request's session is closed before a streamed response starts.
+    """
+
+    def __init__(
+        self,
+        session_factory: SessionFactory | None = None,
+        cache_dir: str | Path | None = None,
+        max_cache_bytes: int | None = None,
+    ) -> None:
+        self.session_factory = session_factory or read_session
+        cache_dir = settings.BUNDLE_CACHE_PATH if cache_dir is None else cache_dir
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.max_cache_bytes = max_cache_bytes or settings.BUNDLE_CACHE_MAX_BYTES
+
+    def response(
+        self, request: Request, root: str, artifacts: Sequence[Artifact], fmt: str
+    ) -> Response:
+        """The bundle of `artifacts` (newest first) — from the cache, or streamed."""
+        media_type, suffix = BUNDLE_FORMATS[fmt]
+        key = bundle_key(artifacts, fmt)
+        headers = {"ETag": f'"{key}"', "Cache-Control": REVALIDATE_CACHE_CONTROL}
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+
+        filename = f"{root}{suffix}"
+        cached = self._cache_path(key, suffix)
+        if cached is not None and cached.is_file():
+            os.utime(cached)   # recency for LRU eviction
+            return FileResponse(cached, media_type=media_type, filename=filename, headers=headers)
+
+        headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return StreamingResponse(
+            self.stream(root, artifacts, fmt, cached), media_type=media_type, headers=headers
+        )
+
+    async def stream(
+        self,
+        root: str,
+        artifacts: Sequence[Artifact],
+        fmt: str,
+        cache_path: Path | None = None,
+    ) -> AsyncIterator[bytes]:
+        """Yield the archive chunk by chunk; on completion keep a copy at `cache_path`."""
+        writer = BundleWriter(fmt)
+        tee = _CacheFile(cache_path) if cache_path is not None else None
+        written: set[str] = set()
+        try:
+            async with self.session_factory() as db:
+                for artifact in artifacts:
+                    files = await self._artifact_files(db, artifact, root, written)
+                    created = artifact.created_at
+                    mtime = created.replace(tzinfo=UTC).timestamp() if created else 0
+                    chunk = await asyncio.to_thread(writer.add, files, mtime)
+                    if chunk:
+                        if tee:
+                            await asyncio.to_thread(tee.write, chunk)
+                        yield chunk
+            chunk = await asyncio.to_thread(writer.close)
+            if tee:
+                await asyncio.to_thread(tee.write, chunk)
+                await asyncio.to_thread(tee.commit)
+                await asyncio.to_thread(self._evict)
+            yield chunk
+        finally:
+            if tee:
+                tee.discard()
+
+    async def _artifact_files(
+        self, db: AsyncSession, artifact: Artifact, root: str, written: set[str]
+    ) -> list[tuple[str, bytes]]:
+        result = await db.execute(
+            select(Artifact).where(Artifact.id == artifact.id).options(undefer(Artifact.content))
+        )
+        row = result.scalar_one_or_none()
+        if row is None:   # deleted since the listing
+            return []
+        body = await ArtifactBlobService(db).read_body(row) or ""
+        db.expunge(row)
+
+        files: list[tuple[str, bytes]] = []
+        candidates: list[tuple[str, str]] = [
+            (f"_artifacts/{safe_relative_path(row.name) or row.id}.json", body)
+        ]
+        if row.artifact_type in GENERATED_FILE_FIELDS:
+            try:
+                output = json.loads(body)
+            except ValueError:
+                output = None
+            candidates += [(f["path"], f["content"])
+                           for f in generated_files(row.artifact_type, output)]  # type: ignore[arg-type]
+        for path, content in candidates:
+            if path not in written:
+                written.add(path)
+                files.append((f"{root}/{path}", content.encode()))
+        return files
+
+    # ── cache ─────────────────────────────────────────────────────────────────
+
+    def _cache_path(self, key: str, suffix: str) -> Path | None:
+        return self.cache_dir / f"{key}{suffix}" if self.cache_dir else None
+
+    def _evict(self) -> None:
+        """Drop least recently used bundles until the cache fits its budget."""
+        if self.cache_dir is None:
+            return
+        entries = []
+        for path in self.cache_dir.iterdir():
+            if path.name.startswith("."):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_cache_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+
+
+class _CacheFile:
+    """A bundle being written to the cache: a temp file renamed into place on commit."""
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        self.path, self._tmp = path, Path(tmp)
+        self._file: io.BufferedWriter | None = os.fdopen(fd, "wb")
+
+    def write(self, data: bytes) -> None:
+        self._file.write(data)  # type: ignore[union-attr]
+
+    def commit(self) -> None:
+        self._file.close()  # type: ignore[union-attr]
+        self._file = None
+        os.replace(self._tmp, self.path)
+
+    def discard(self) -> None:
+        """No-op after commit(); otherwise the partial bundle is thrown away."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._tmp.unlink(missing_ok=True)
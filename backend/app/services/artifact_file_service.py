@@ -0,0 +1,227 @@
+"""Per-file index of generated source and test artifacts.
+
+DeveloperAgent and TesterAgent outputs list whole codebases in one JSON body
+(`files` / `test_files`). Each of those files also gets an ArtifactFile row
+with its path, language, size and checksum, and its body stored on its own
+— in the blob store, where files unchanged between runs are shared, or
+inline when the store is disabled. A viewer can then list a pipeline's file
+tree and fetch one file without touching the artifact body.
+
+A path can appear in several artifacts of a pipeline (a stage that ran
+more than once); the newest artifact's version is the current one.
+"""
+from __future__ import annotations
+
+import difflib
+import json
+import mimetypes
+from collections.abc import Iterator
+from pathlib import PurePosixPath
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
+
+from app.core.blob_store import BlobStore, content_checksum
+from app.db.models import Artifact, ArtifactFile, ArtifactType
+from app.services.artifact_blob_service import ArtifactBlobService, map_in_pool
+
+# Artifact types whose JSON output lists generated files, and the list's key
+GENERATED_FILE_FIELDS = {
+    ArtifactType.SOURCE_CODE: "files",
+    ArtifactType.TEST_SUITE:  "test_files",
+}
+
+_LANGUAGES = {
+    ".py": "python", ".pyi": "python", ".js": "javascript", ".jsx": "javascript",
+    ".mjs": "javascript", ".ts": "typescript", ".tsx": "typescript", ".go": "go",
+    ".rs": "rust", ".java": "java", ".kt": "kotlin", ".rb": "ruby", ".php": "php",
+    ".cs": "csharp", ".c": "c", ".h": "c", ".cpp": "cpp", ".hpp": "cpp",
+    ".swift": "swift", ".sql": "sql", ".sh": "shell", ".md": "markdown",
+    ".json": "json", ".yaml": "yaml", ".yml": "yaml", ".toml": "toml",
+    ".html": "html", ".css": "css", ".scss": "scss", ".tf": "hcl", ".xml": "xml",
+}
+_FILENAME_LANGUAGES = {"dockerfile": "dockerfile", "makefile": "makefile"}
+
+
+def safe_relative_path(path: Any) -> str | None:
+    """`path` as a relative POSIX path that cannot escape its root, or None."""
+    if not isinstance(path, str):
+        return None
+    parts = [p for p in PurePosixPath(path.replace("\\", "/")).parts
+             if p not in ("", ".", "..", "/")]
+    return "/".join(parts) or None
+
+
+def generated_files(artifact_type: ArtifactType, output: Any) -> Iterator[dict[str, Any]]:
+    """The {path, content, …} entries of a SOURCE_CODE / TEST_SUITE output.
+
+    Paths are normalised with safe_relative_path(); entries without a usable
+    path or string content are skipped.
+    """
+    field = GENERATED_FILE_FIELDS.get(artifact_type)
+    entries = output.get(field) if field and isinstance(output, dict) else None
+    if not isinstance(entries, list):
+        return
+    for entry in entries:
+        if not isinstance(entry, dict) or not isinstance(entry.get("content"), str):
+            continue
+        path = safe_relative_path(entry.get("path"))
+        if path:
+            yield {**entry, "path": path}
+
+
+def guess_language(path: str, declared: Any = None) -> str | None:
+    """The agent's declared language when it gave a single one, else from the file name."""
+    if isinstance(declared, str) and declared and "|" not in declared:
+        return declared.lower()[:50]
+    name = PurePosixPath(path).name.lower()
+    return _FILENAME_LANGUAGES.get(name) or _LANGUAGES.get(PurePosixPath(name).suffix)
+
+
+def media_type(path: str) -> str:
+    guessed, _ = mimetypes.guess_type(path)
+    return guessed if guessed and guessed.startswith("text/") else "text/plain"
+
+
+def diffable_files(artifact_type: ArtifactType, body: str) -> dict[str, str]:
+    """An artifact body as {path: text} for line diffs.
+
+    Bodies are single-line JSON, so as-is they diff as one changed line.
+    Generated files become files of their own; the rest of the output is
+    pretty-printed as artifact.json.
+    """
+    try:
+        output = json.loads(body)
+    except ValueError:
+        return {"artifact.txt": body}
+    files = {f["path"]: f["content"] for f in generated_files(artifact_type, output)}
+    field = GENERATED_FILE_FIELDS.get(artifact_type)
+    if isinstance(output, dict) and field:
+        output = {key: value for key, value in output.items() if key != field}
+    files["artifact.json"] = json.dumps(output, indent=2, sort_keys=True) + "\n"
+    return files
+
+
+def unified_diff(old: dict[str, str], new: dict[str, str]) -> str:
+    """A git-style unified diff between two diffable_files() trees."""
+    chunks: list[str] = []
+    for path in sorted(old.keys() | new.keys()):
+        if old.get(path) == new.get(path):
+            continue
+        chunks.extend(difflib.unified_diff(
+            _lines(old.get(path, "")),
+            _lines(new.get(path, "")),
+            fromfile=f"a/{path}" if path in old else "/dev/null",
+            tofile=f"b/{path}" if path in new else "/dev/null",
+        ))
+    return "".join(chunks)
+
+
+def _lines(text: str) -> list[str]:
+    lines = text.splitlines(keepends=True)
+    if lines and not lines[-1].endswith("\n"):
+        lines[-1] += "\n\\ No newline at end of file\n"
+    return lines
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# ArtifactFileService
+# ─────────────────────────────────────────────────────────────────────────────
+
+class ArtifactFileService:
+    def __init__(self, db: AsyncSession, store: BlobStore | None = None):
+        self.db = db
+        self.blobs = ArtifactBlobService(db, store)
+
+    async def index(self, artifact: Artifact, output: Any) -> list[ArtifactFile]:
+        """Add ArtifactFile rows for the files in `output`; the caller commits.
+
+        Artifacts that list no files get none. Bodies are hashed (and
+        compressed) in the thread pool when the output is large.
+        """
+        files = {f["path"]: f for f in generated_files(artifact.artifact_type, output)}  # type: ignore[arg-type]
+        if not files:
+            return []
+        contents = [f["content"] for f in files.values()]
+        if self.blobs.enabled:
+            refs = await self.blobs.store_bodies(contents)
+            bodies = [(ref.checksum, ref.size_bytes, None, ref.file_path) for ref in refs]
+        else:
+            raws = [content.encode() for content in contents]
+            checksums = await map_in_pool(content_checksum, raws)
+            bodies = [
+                (checksum, len(raw), content, None)
+                for checksum, raw, content in zip(checksums, raws, contents, strict=True)
+            ]
+        rows = [
+            ArtifactFile(
+                artifact_id=artifact.id,
+                pipeline_id=artifact.pipeline_id,
+                path=path,
+                language=guess_language(path, entry.get("language")),
+                size_bytes=size,
+                checksum=checksum,
+                content=content,
+                file_path=file_path,
+                created_at=artifact.created_at,
+            )
+            for (path, entry), (checksum, size, content, file_path)
+            in zip(files.items(), bodies, strict=True)
+        ]
+        self.db.add_all(rows)
+        return rows
+
+    async def tree(self, pipeline_id: UUID) -> list[ArtifactFile]:
+        """The current version of every file path in the pipeline, sorted by path."""
+        result = await self.db.execute(
+            select(ArtifactFile)
+            .where(ArtifactFile.pipeline_id == pipeline_id)
+            .order_by(ArtifactFile.path, ArtifactFile.created_at.desc())
+        )
+        current: dict[str, ArtifactFile] = {}
+        for row in result.scalars():
+            current.setdefault(row.path, row)  # type: ignore[arg-type]
+        return list(current.values())
+
+    async def get(self, pipeline_id: UUID, path: str) -> ArtifactFile | None:
+        """The current version of one file, with its inline body (if any) loaded."""
+        result = await self.db.execute(
+            select(ArtifactFile)
+            .where(ArtifactFile.pipeline_id == pipeline_id, ArtifactFile.path == path)
+            .order_by(ArtifactFile.created_at.desc(), ArtifactFile.id.desc())
+            .options(undefer(ArtifactFile.content))
+            .limit(1)
+        )
+        return result.scalar_one_or_none()
+
+    async def index_unindexed(self, batch_size: int = 100) -> int:
+        """Index one batch of SOURCE_CODE / TEST_SUITE artifacts saved before the
+        index existed; returns how many artifacts were processed (0 when done)."""
+        indexed = select(ArtifactFile.artifact_id).where(ArtifactFile.artifact_id == Artifact.id)
+        query = (
+            select(Artifact)
+            .where(
+                Artifact.artifact_type.in_(list(GENERATED_FILE_FIELDS)),
+                ~indexed.exists(),
+                Artifact.extra["files_indexed"].as_boolean().is_not(True),
+            )
+            .options(undefer(Artifact.content))
+            .limit(batch_size)
+        )
+        if self.db.bind.dialect.name == "postgresql":
+            query = query.with_for_update(skip_locked=True)
+        artifacts = (await self.db.execute(query)).scalars().all()
+        for artifact in artifacts:
+            body = await self.blobs.read_body(artifact)
+            try:
+                output = json.loads(body or "null")
+            except ValueError:
+                output = None
+            await self.index(artifact, output)
+            # Outputs listing no files would otherwise be picked up again and again
+            artifact.extra = {**(artifact.extra or {}), "files_indexed": True}  # type: ignore[assignment]
+        await self.db.commit()
+        return len(artifacts)
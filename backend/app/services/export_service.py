@@ -0,0 +1,296 @@
+"""Bulk exports of the audit trail and pipeline event history.
+
+Exports are streamed oldest first, straight off a server-side cursor
+(AsyncSession.stream with yield_per), and encoded in a worker thread one
+EXPORT_BATCH_ROWS batch at a time, so a pod holds one batch however long the
+export:
+
+  ndjson    one JSON object per line
+  csv       header row, then one row per record (JSON columns as JSON text)
+  parquet   one row group per batch
+  arrow     Arrow IPC stream, one record batch per batch
+
+A single response carries one calendar month: the month of the first row
+after the cursor, which on PostgreSQL is exactly one partition of
+audit_logs / event_store. Where it stops is settled before streaming
+begins — two LIMIT 1 probes on the (timestamp, id) index, for the first row
+of the page and for any row past its month — so the response can announce
+the resume token in X-Next-Cursor, like every keyset-paginated listing; a
+50M-row export is then a series of bounded requests, each resumable on its
+own, and no request walks rows it does not send.
+"""
+from __future__ import annotations
+
+import abc
+import asyncio
+import csv
+import io
+import json
+from collections.abc import AsyncIterator, Callable, Iterable, Sequence
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass
+from datetime import datetime, time
+from typing import Any
+from uuid import UUID
+
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet
+from sqlalchemy import Select, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+from starlette.responses import StreamingResponse
+
+from app.core.config import settings
+from app.core.database import read_sessionmaker
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+from app.core.partitions import month_start, next_month
+from app.db.models import AuditLog, EventStore
+
+EXPORT_FORMATS = {
+    "ndjson":  ("application/x-ndjson", ".ndjson"),
+    "csv":     ("text/csv; charset=utf-8", ".csv"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+    "arrow":   ("application/vnd.apache.arrow.stream", ".arrows"),
+}
+_COLUMNAR = {"parquet", "arrow"}
+
+SessionFactory = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+
+# Sorts before every real row id: a cursor of (month start, nil UUID) resumes
+# at the first row of that month
+_BEFORE_ANY_ID = UUID(int=0)
+
+
+@dataclass(frozen=True)
+class ExportSource:
+    """What one export reads: a model, its (timestamp, id) keys and its columns."""
+    name:      str
+    model:     type
+    timestamp: InstrumentedAttribute
+    id:        InstrumentedAttribute
+    # (column, kind) — kind is one of str, int, datetime, json
+    columns:   tuple[tuple[str, str], ...]
+
+
+AUDIT_EXPORT = ExportSource(
+    "audit", AuditLog, AuditLog.timestamp, AuditLog.id,
+    (
+        ("id", "str"), ("timestamp", "datetime"), ("user_id", "str"), ("action", "str"),
+        ("resource_type", "str"), ("resource_id", "str"), ("workspace_id", "str"),
+        ("ip_address", "str"), ("user_agent", "str"), ("request_id", "str"),
+        ("details", "json"),
+    ),
+)
+EVENT_EXPORT = ExportSource(
+    "events", EventStore, EventStore.occurred_at, EventStore.id,
+    (
+        ("id", "str"), ("occurred_at", "datetime"), ("aggregate_id", "str"),
+        ("aggregate_type", "str"), ("event_type", "str"), ("sequence_number", "int"),
+        ("event_data", "json"), ("extra", "json"),
+    ),
+)
+
+
+def _cell(value: Any, kind: str) -> Any:
+    """A column value as it is exported: text, int, naive-UTC datetime or JSON text."""
+    if value is None:
+        return None
+    if kind == "json":
+        return json.dumps(value, default=str, separators=(",", ":"))
+    if kind == "str":
+        return str(value)
+    return value
+
+
+# ── Encoders: rows in, bytes out, one batch at a time ─────────────────────────
+
+class _Sink(io.RawIOBase):
+    """Unseekable write target that hands back whatever was written since the last drain."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:  # type: ignore[override]
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+class _Encoder(abc.ABC):
+    def __init__(self, columns: Sequence[tuple[str, str]]) -> None:
+        self.columns = columns
+        self.names = [name for name, _ in columns]
+
+    def header(self) -> bytes:
+        return b""
+
+    @abc.abstractmethod
+    def batch(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        """Encoded bytes of one batch of exported cells."""
+
+    def close(self) -> bytes:
+        return b""
+
+
+class _NdjsonEncoder(_Encoder):
+    def batch(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        lines = []
+        for row in rows:
+            record = {}
+            for (name, kind), value in zip(self.columns, row, strict=True):
+                if kind == "json" and value is not None:
+                    record[name] = json.loads(value)   # nested, not a string, in NDJSON
+                elif kind == "datetime" and value is not None:
+                    record[name] = value.isoformat()
+                else:
+                    record[name] = value
+            lines.append(json.dumps(record, default=str, separators=(",", ":")))
+        return ("\n".join(lines) + "\n").encode()
+
+
+class _CsvEncoder(_Encoder):
+    def _rows(self, rows: Iterable[Sequence[Any]]) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
+
+    def header(self) -> bytes:
+        return self._rows([self.names])
+
+    def batch(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        return self._rows(
+            [v.isoformat() if isinstance(v, datetime) else v for v in row] for row in rows
+        )
+
+
+class _ArrowEncoder(_Encoder):
+    """Parquet (one row group per batch) or an Arrow IPC stream (one record batch per batch)."""
+
+    def __init__(self, columns: Sequence[tuple[str, str]], fmt: str) -> None:
+        super().__init__(columns)
+        types = {"str": pa.string(), "json": pa.string(), "int": pa.int64(),
+                 "datetime": pa.timestamp("us")}
+        self.schema = pa.schema([(name, types[kind]) for name, kind in columns])
+        self._sink = _Sink()
+        if fmt == "parquet":
+            self._writer = pyarrow.parquet.ParquetWriter(
+                self._sink, self.schema, compression="zstd"
+            )
+        else:
+            self._writer = pyarrow.ipc.new_stream(self._sink, self.schema)
+
+    def batch(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        table = pa.Table.from_pylist(
+            [dict(zip(self.names, row, strict=True)) for row in rows], schema=self.schema
+        )
+        self._writer.write_table(table)
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+def encoder_for(fmt: str, columns: Sequence[tuple[str, str]]) -> _Encoder:
+    if fmt in _COLUMNAR:
+        return _ArrowEncoder(columns, fmt)
+    return {"ndjson": _NdjsonEncoder, "csv": _CsvEncoder}[fmt](columns)
+
+
+# ── Export service ────────────────────────────────────────────────────────────
+
+class ExportService:
+    """Streams one page of an export through a session of its own.
+
+    The request's session is closed before a streamed response starts, so
+    rows are read through `session_factory`: by default one read replica,
+    the same for the page-bound probes and the stream, so both see the same rows.
+    """
+
+    def __init__(
+        self,
+        session_factory: SessionFactory | None = None,
+        batch_rows: int | None = None,
+    ) -> None:
+        self.session_factory = session_factory or read_sessionmaker()
+        self.batch_rows = batch_rows or settings.EXPORT_BATCH_ROWS
+
+    async def response(
+        self,
+        source: ExportSource,
+        fmt: str,
+        filters: Sequence[Any] = (),
+        cursor: str | None = None,
+    ) -> StreamingResponse:
+        """One page of `source` as a streamed download; X-Next-Cursor resumes after it."""
+        encoder = encoder_for(fmt, source.columns)   # fail before any byte is sent
+        query = self._query(source, filters, cursor)
+        async with self.session_factory() as db:
+            end, more = await self._page_end(db, source, query)
+        if end is not None:
+            query = query.where(source.timestamp < literal(end, source.timestamp.type))
+        media_type, suffix = EXPORT_FORMATS[fmt]
+        headers = {
+            "Content-Disposition": f'attachment; filename="{source.name}-export{suffix}"',
+            "Cache-Control": "no-store",
+        }
+        if more and end is not None:
+            headers[NEXT_CURSOR_HEADER] = encode_cursor(end, _BEFORE_ANY_ID)
+        body = self.stream(source, encoder, query if end is not None else None)
+        return StreamingResponse(body, media_type=media_type, headers=headers)
+
+    async def stream(
+        self, source: ExportSource, encoder: _Encoder, query: Select | None
+    ) -> AsyncIterator[bytes]:
+        """Yield the encoded page batch by batch; `query` None is an empty export."""
+        if chunk := encoder.header():
+            yield chunk
+        kinds = source.columns
+        if query is not None:
+            async with self.session_factory() as db:
+                rows = await db.stream(query.execution_options(yield_per=self.batch_rows))
+                async for batch in rows.partitions():
+                    cells = [
+                        [_cell(value, kind) for value, (_, kind) in zip(row, kinds, strict=True)]
+                        for row in batch
+                    ]
+                    yield await asyncio.to_thread(encoder.batch, cells)
+        if chunk := await asyncio.to_thread(encoder.close):
+            yield chunk
+
+    def _query(self, source: ExportSource, filters: Sequence[Any], cursor: str | None) -> Select:
+        columns = [getattr(source.model, name) for name, _ in source.columns]
+        query = select(*columns).where(*filters)
+        if cursor:
+            timestamp, row_id = decode_cursor(cursor)
+            after = tuple_(literal(timestamp, source.timestamp.type),
+                           literal(row_id, source.id.type))
+            # The plain bound lets PostgreSQL prune partitions; the row comparison is exact
+            query = query.where(
+                source.timestamp >= literal(timestamp, source.timestamp.type),
+                tuple_(source.timestamp, source.id) > after,
+            )
+        return query.order_by(source.timestamp, source.id)
+
+    async def _page_end(
+        self, db: AsyncSession, source: ExportSource, query: Select
+    ) -> tuple[datetime | None, bool]:
+        """(where this page ends, whether rows follow it); None for an empty page.
+
+        The page runs to the end of its first row's month. Both probes read one
+        index entry each, however many rows the page holds.
+        """
+        probe = query.with_only_columns(source.timestamp).limit(1)
+        first = (await db.execute(probe)).scalar()
+        if first is None:
+            return None, False
+        end = datetime.combine(next_month(month_start(first.date())), time())
+        beyond = probe.where(source.timestamp >= literal(end, source.timestamp.type))
+        return end, (await db.execute(beyond)).first() is not None
@@ -3,13 +3,35 @@ from __future__ import annotations
 
 import asyncio
 from datetime import datetime
+from typing import Any
 from uuid import UUID
 
 from fastapi import HTTPException
 from sqlalchemy import desc, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.events import EventBus, PipelineEvent
 from app.db.models import ApprovalRequest, Artifact, Pipeline, PipelineStatus
+from app.services.workspace_service import WorkspaceService
+
+
+async def publish_approval_event(
+    db: AsyncSession, approval: ApprovalRequest, event_type: str, data: dict[str, Any]
+) -> None:
+    """Feed the approvals inbox topic of multiplexed WebSocket clients.
+
+    Tagged with the pipeline's workspace, which scopes delivery. Unsequenced:
+    the caller is usually not the process running the pipeline.
+    """
+    workspace_id = await WorkspaceService(db).pipeline_workspace_id(approval.pipeline_id)
+    await EventBus.get_instance().publish(PipelineEvent(
+        pipeline_id=str(approval.pipeline_id),
+        event_type=event_type,
+        stage_id=str(approval.stage_id),
+        workspace_id=workspace_id,
+        sequenced=False,
+        data={"approval_id": str(approval.id), **data},
+    ))
 
 
 class PipelineService:
@@ -154,6 +176,7 @@ class PipelineService:
 
         await self.db.commit()
         await self.db.refresh(approval)
+        await publish_approval_event(self.db, approval, "approval_decided", {"decision": decision})
         return approval
 
     # ── Artifacts ─────────────────────────────────────────────────────────────
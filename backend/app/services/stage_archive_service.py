@@ -0,0 +1,201 @@
+"""Hot/cold tiering of pipeline stage payloads.
+
+A stage's agent_output, review_output, approval_output, input_data and
+output_data are only needed while its pipeline runs — afterwards they are
+read rarely, if ever, but stay inline in pipeline_stages, which the /agents
+status queries scan. Once a pipeline has been terminal for
+STAGE_ARCHIVE_AFTER_DAYS, StageArchiver moves each stage's payload columns,
+as one JSON document, into the artifact blob store: zstd-compressed,
+deduplicated by checksum and reference counted like artifact bodies. The
+columns are set to NULL and payload_checksum left behind as the stub.
+
+Readers go through StageArchiveService.payload(), which rehydrates an
+archived payload from the blob store on access without writing it back.
+Retrying a failed or rejected pipeline restores its stages first, since the
+engine updates them in place.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+from datetime import datetime, timedelta
+from typing import Any
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.core.blob_store import BlobStore, get_blob_store
+from app.core.config import settings
+from app.core.database import write_session
+from app.db.models import Pipeline, PipelineStage, PipelineStatus
+from app.services.artifact_blob_service import ArtifactBlobService
+
+logger = logging.getLogger(__name__)
+
+STAGE_PAYLOAD_COLUMNS = (
+    "agent_output", "review_output", "approval_output", "input_data", "output_data",
+)
+# Pipelines the engine will not touch again (FAILED / REJECTED only on retry,
+# which restores first)
+TERMINAL_STATUSES = (
+    PipelineStatus.COMPLETED, PipelineStatus.CANCELLED,
+    PipelineStatus.FAILED, PipelineStatus.REJECTED,
+)
+
+SessionFactory = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+
+
+class StageArchiveService:
+    def __init__(self, db: AsyncSession, store: BlobStore | None = None):
+        self.db = db
+        self.blobs = ArtifactBlobService(db, store or get_blob_store())
+
+    @property
+    def enabled(self) -> bool:
+        return self.blobs.enabled
+
+    async def archive_batch(self, older_than_days: int, batch_size: int = 100) -> int:
+        """Archive the stages of one batch of pipelines terminal for `older_than_days`.
+
+        Returns how many pipelines were archived; 0 once none are due. Each
+        batch commits on its own. The pipeline rows are locked (SKIP LOCKED in
+        PostgreSQL), so a concurrent retry waits for the batch and then finds
+        the stages archived, and several workers can run side by side.
+        """
+        if not self.enabled:
+            raise RuntimeError("blob store disabled (BLOB_STORE_BACKEND=none)")
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        query = (
+            select(Pipeline)
+            .where(
+                Pipeline.archived_at.is_(None),
+                Pipeline.status.in_(TERMINAL_STATUSES),
+                # Engine failures leave completed_at unset
+                func.coalesce(Pipeline.completed_at, Pipeline.created_at) < cutoff,
+            )
+            .options(selectinload(Pipeline.stages))
+            .limit(batch_size)
+        )
+        if self.db.bind.dialect.name == "postgresql":
+            query = query.with_for_update(of=Pipeline, skip_locked=True)
+        pipelines = (await self.db.execute(query)).scalars().all()
+        now = datetime.utcnow()
+        for pipeline in pipelines:
+            for stage in pipeline.stages:
+                await self._archive(stage)
+            pipeline.archived_at = now  # type: ignore[assignment]
+        await self.db.commit()
+        return len(pipelines)
+
+    async def _archive(self, stage: PipelineStage) -> None:
+        if stage.payload_checksum is not None:
+            return
+        payload = {column: getattr(stage, column) for column in STAGE_PAYLOAD_COLUMNS}
+        if not any(payload.values()):
+            return   # nothing worth a blob
+        ref = await self.blobs.store_body(
+            json.dumps(payload, default=str, separators=(",", ":"), sort_keys=True)
+        )
+        stage.payload_checksum = ref.checksum  # type: ignore[assignment]
+        for column in STAGE_PAYLOAD_COLUMNS:
+            setattr(stage, column, None)
+
+    async def payload(self, stage: PipelineStage) -> dict[str, Any]:
+        """The stage's payload columns — rehydrated from the blob store if archived."""
+        if stage.payload_checksum is None:
+            return {column: getattr(stage, column) for column in STAGE_PAYLOAD_COLUMNS}
+        return json.loads(await self.blobs.read_text(stage.payload_checksum))  # type: ignore[arg-type]
+
+    async def restore(self, pipeline: Pipeline) -> None:
+        """Move the pipeline's archived payloads back inline, in the caller's transaction."""
+        if pipeline.archived_at is None:
+            return
+        result = await self.db.execute(
+            select(PipelineStage).where(
+                PipelineStage.pipeline_id == pipeline.id,
+                PipelineStage.payload_checksum.is_not(None),
+            )
+        )
+        for stage in result.scalars().all():
+            payload = await self.payload(stage)
+            for column in STAGE_PAYLOAD_COLUMNS:
+                setattr(stage, column, payload.get(column))
+            await self.blobs.release(stage.payload_checksum)  # type: ignore[arg-type]
+            stage.payload_checksum = None  # type: ignore[assignment]
+        pipeline.archived_at = None  # type: ignore[assignment]
+
+
+class StageArchiver:
+    """Every STAGE_ARCHIVE_INTERVAL_SECONDS, archives batches until none are due."""
+
+    def __init__(
+        self,
+        session_factory: SessionFactory | None = None,
+        after_days: int | None = None,
+        batch_size: int | None = None,
+        interval_seconds: int | None = None,
+    ) -> None:
+        self.after_days = after_days or settings.STAGE_ARCHIVE_AFTER_DAYS
+        self.batch_size = batch_size or settings.STAGE_ARCHIVE_BATCH_SIZE
+        self.interval_s = interval_seconds or settings.STAGE_ARCHIVE_INTERVAL_SECONDS
+        self._session_factory = session_factory or write_session
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                archived = await self.run_once()
+                if archived:
+                    logger.info("Archived the stage payloads of %d pipelines", archived)
+            except Exception as exc:
+                logger.warning("Stage archival failed, retrying later: %s", exc)
+            await asyncio.sleep(self.interval_s)
+
+    async def run_once(self) -> int:
+        """Archive every pipeline that is due; returns how many were."""
+        total = 0
+        while True:
+            async with self._session_factory() as db:
+                archived = await StageArchiveService(db).archive_batch(
+                    self.after_days, self.batch_size
+                )
+            total += archived
+            if archived < self.batch_size:
+                return total
+
+
+# ── Module-level singleton (mirrors partitions._maintainer) ───────────────────
+
+_archiver: StageArchiver | None = None
+
+
+def init_stage_archiver() -> StageArchiver:
+    global _archiver
+    _archiver = StageArchiver()
+    _archiver.start()
+    return _archiver
+
+
+async def close_stage_archiver() -> None:
+    global _archiver
+    if _archiver is not None:
+        await _archiver.stop()
+        _archiver = None
+
+
+def get_stage_archiver() -> StageArchiver | None:
+    return _archiver
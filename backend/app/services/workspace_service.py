@@ -8,7 +8,7 @@ from fastapi import HTTPException
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import Project, UserRole, Workspace, WorkspaceMember
+from app.db.models import Pipeline, Project, UserRole, Workspace, WorkspaceMember
 from app.schemas.workspace import ProjectCreate, WorkspaceCreate
 
 # ─────────────────────────────────────────────────────────────────────────────
@@ -27,6 +27,26 @@ class WorkspaceService:
             raise HTTPException(status_code=404, detail="Workspace not found")
         return ws
 
+    # ── access ────────────────────────────────────────────────────────────────
+
+    async def accessible_workspace_ids(self, user_id: str | UUID) -> set[str]:
+        """Workspaces the user owns or is a member of."""
+        member_of = select(WorkspaceMember.workspace_id).where(WorkspaceMember.user_id == user_id)
+        result = await self.db.execute(
+            select(Workspace.id)
+            .where((Workspace.owner_id == user_id) | Workspace.id.in_(member_of))
+        )
+        return {str(ws_id) for ws_id in result.scalars()}
+
+    async def pipeline_workspace_id(self, pipeline_id: str | UUID) -> str | None:
+        result = await self.db.execute(
+            select(Project.workspace_id)
+            .join(Pipeline, Pipeline.project_id == Project.id)
+            .where(Pipeline.id == pipeline_id)
+        )
+        ws_id = result.scalar_one_or_none()
+        return str(ws_id) if ws_id else None
+
     # ── public ────────────────────────────────────────────────────────────────
 
     async def list_all(self, owner_id: str | UUID) -> list[Workspace]:
@@ -9,9 +9,13 @@ auth state and must be able to test unauthenticated flows.
 from __future__ import annotations
 
 import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
 
 from app.core.auth import _resolve_user_id
 from app.main import app
@@ -29,3 +33,49 @@ def override_auth():
     app.dependency_overrides[_resolve_user_id] = _override_user_id
     yield
     app.dependency_overrides.pop(_resolve_user_id, None)
+
+
+class QueryCounter:
+    """Counts SQL statements executed on an engine."""
+
+    def __init__(self) -> None:
+        self.statements: list[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries(engine: AsyncEngine) -> Iterator[QueryCounter]:
+    counter = QueryCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", counter)
+
+
+@pytest.fixture
+def assert_no_n_plus_one():
+    """N+1 detector: fails when a call's query count grows with its result size.
+
+    `seed(n)` creates n rows the call will return; the call is measured at two
+    sizes and must issue the same number of statements both times.
+    """
+    async def check(engine: AsyncEngine, seed, call, sizes: tuple[int, int] = (1, 10)) -> int:
+        counts = []
+        for n in sizes:
+            await seed(n)
+            with count_queries(engine) as counter:
+                await call()
+            counts.append(counter.count)
+        assert counts[0] == counts[1], (
+            f"N+1 query pattern: {counts[0]} statements for {sizes[0]} rows, "
+            f"{counts[1]} for {sizes[1]}"
+        )
+        return counts[0]
+    return check
@@ -0,0 +1,173 @@
+"""
+Unit tests for streamed pipeline artifact bundles (services/artifact_bundle_service.py).
+"""
+from __future__ import annotations
+
+import io
+import json
+import os
+import tarfile
+import uuid
+import zipfile
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from starlette.requests import Request
+from starlette.responses import FileResponse, StreamingResponse
+
+from app.core.blob_store import LocalBlobStore
+from app.db.models import Artifact, ArtifactType, Base
+from app.services.artifact_blob_service import ArtifactBlobService
+from app.services.artifact_bundle_service import ArtifactBundleService, bundle_key
+
+PIPELINE_ID = uuid.uuid4()
+
+SOURCE_V1 = {"files": [{"path": "app/main.py", "content": "v1\n", "language": "python"}]}
+SOURCE_V2 = {"files": [
+    {"path": "app/main.py", "content": "v2\n", "language": "python"},
+    {"path": "../../etc/passwd", "content": "nope"},
+    {"path": "README.md", "content": "# hi\n"},
+]}
+TESTS = {"test_files": [{"path": "tests/test_main.py", "content": "def test(): pass\n"}]}
+REPORT = {"findings": []}
+
+
+def _request(**headers: str) -> Request:
+    raw = [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]
+    return Request({"type": "http", "method": "GET", "headers": raw})
+
+
+async def _read(response) -> bytes:
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def sessions(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.core.blob_store._store", LocalBlobStore(tmp_path / "blobs"))
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def session():
+        async with factory() as db:
+            yield db
+
+    yield session
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def artifacts(sessions):
+    async with sessions() as db:
+        blobs = ArtifactBlobService(db)
+        rows = [
+            (ArtifactType.SOURCE_CODE, "development_1", SOURCE_V1, True),
+            (ArtifactType.TEST_SUITE, "testing_1", TESTS, False),
+            (ArtifactType.SOURCE_CODE, "development_2", SOURCE_V2, True),
+            (ArtifactType.SECURITY_REPORT, "security_1", REPORT, False),
+        ]
+        for minute, (artifact_type, name, output, in_blob_store) in enumerate(rows):
+            body = json.dumps(output)
+            artifact = Artifact(
+                pipeline_id=PIPELINE_ID, stage_id=uuid.uuid4(), artifact_type=artifact_type,
+                name=name, content=body, size_bytes=len(body),
+                created_at=datetime(2026, 1, 1, 12, minute),
+            )
+            if in_blob_store:
+                ref = await blobs.store_body(body)
+                artifact.checksum, artifact.file_path, artifact.content = (
+                    ref.checksum, ref.file_path, None
+                )
+            else:
+                artifact.checksum = f"{minute}" * 64
+            db.add(artifact)
+        await db.commit()
+        result = await db.execute(
+            select(Artifact).where(Artifact.pipeline_id == PIPELINE_ID)
+            .order_by(Artifact.created_at.desc())
+        )
+        return result.scalars().all()
+
+
+def _service(sessions, tmp_path, **kwargs) -> ArtifactBundleService:
+    return ArtifactBundleService(sessions, cache_dir=tmp_path / "bundles", **kwargs)
+
+
+# ── Bundles ───────────────────────────────────────────────────────────────────
+
+class TestBundles:
+    @pytest.mark.asyncio
+    async def test_zip_explodes_generated_files_and_latest_output_wins(
+        self, sessions, artifacts, tmp_path
+    ):
+        response = _service(sessions, tmp_path).response(_request(), "p", artifacts, "zip")
+        assert isinstance(response, StreamingResponse)
+        with zipfile.ZipFile(io.BytesIO(await _read(response))) as zf:
+            names = set(zf.namelist())
+            assert names == {
+                "p/app/main.py", "p/etc/passwd", "p/README.md", "p/tests/test_main.py",
+                "p/_artifacts/development_1.json", "p/_artifacts/development_2.json",
+                "p/_artifacts/testing_1.json", "p/_artifacts/security_1.json",
+            }
+            assert zf.read("p/app/main.py") == b"v2\n"
+            assert json.loads(zf.read("p/_artifacts/security_1.json")) == REPORT
+            assert zf.getinfo("p/README.md").date_time == (2026, 1, 1, 12, 2, 0)
+
+    @pytest.mark.asyncio
+    async def test_tar_gz(self, sessions, artifacts, tmp_path):
+        response = _service(sessions, tmp_path).response(_request(), "p", artifacts, "tar.gz")
+        with tarfile.open(fileobj=io.BytesIO(await _read(response)), mode="r:gz") as tf:
+            assert tf.extractfile("p/tests/test_main.py").read() == b"def test(): pass\n"
+            assert tf.extractfile("p/app/main.py").read() == b"v2\n"
+
+    @pytest.mark.asyncio
+    async def test_archive_is_streamed_per_artifact(self, sessions, artifacts, tmp_path):
+        response = _service(sessions, tmp_path).response(_request(), "p", artifacts, "zip")
+        chunks = [chunk async for chunk in response.body_iterator]
+        assert len(chunks) == len(artifacts) + 1   # one per artifact, then the directory
+
+    @pytest.mark.asyncio
+    async def test_finished_bundles_are_cached_by_checksums(
+        self, sessions, artifacts, tmp_path
+    ):
+        service = _service(sessions, tmp_path)
+        body = await _read(service.response(_request(), "p", artifacts, "zip"))
+
+        cached = service.response(_request(), "p", artifacts, "zip")
+        assert isinstance(cached, FileResponse)
+        assert cached.path.read_bytes() == body
+        assert cached.headers["etag"] == f'"{bundle_key(artifacts, "zip")}"'
+        assert list((tmp_path / "bundles").iterdir()) == [cached.path]
+
+        etag = cached.headers["etag"]
+        assert service.response(_request(if_none_match=etag), "p", artifacts, "zip") \
+            .status_code == 304
+        # A different set of artifacts is a different bundle
+        assert bundle_key(artifacts[1:], "zip") != bundle_key(artifacts, "zip")
+        assert bundle_key(artifacts, "tar.gz") != bundle_key(artifacts, "zip")
+
+    @pytest.mark.asyncio
+    async def test_abandoned_stream_leaves_no_cache_entry(self, sessions, artifacts, tmp_path):
+        service = _service(sessions, tmp_path)
+        stream = service.response(_request(), "p", artifacts, "zip").body_iterator
+        await stream.__anext__()
+        await stream.aclose()
+        assert list((tmp_path / "bundles").iterdir()) == []
+        assert isinstance(service.response(_request(), "p", artifacts, "zip"), StreamingResponse)
+
+    @pytest.mark.asyncio
+    async def test_cache_evicts_least_recently_used(self, sessions, artifacts, tmp_path):
+        service = _service(sessions, tmp_path)
+        await _read(service.response(_request(), "p", artifacts, "zip"))
+        [old] = (tmp_path / "bundles").iterdir()
+        os.utime(old, (0, 0))
+        service.max_cache_bytes = old.stat().st_size + 1
+        await _read(service.response(_request(), "p", artifacts[1:], "zip"))
+        [kept] = (tmp_path / "bundles").iterdir()
+        assert kept.name.startswith(bundle_key(artifacts[1:], "zip"))
@@ -0,0 +1,247 @@
+"""
+Unit tests for the per-file index of generated artifacts (services/artifact_file_service.py).
+"""
+from __future__ import annotations
+
+import json
+import uuid
+from datetime import timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from starlette.requests import Request
+
+from app.core.blob_store import LocalBlobStore, content_checksum
+from app.db.models import (
+    AgentDomain,
+    AgentLevel,
+    Artifact,
+    ArtifactBlob,
+    ArtifactFile,
+    ArtifactType,
+    Base,
+    PipelineStage,
+    StageType,
+)
+from app.services import artifact_blob_service
+from app.services.artifact_blob_service import ArtifactBlobService
+from app.services.artifact_file_service import (
+    ArtifactFileService,
+    generated_files,
+    guess_language,
+    safe_relative_path,
+)
+
+OUTPUT_V1 = {"files": [
+    {"path": "app/main.py", "content": "print(1)\n", "language": "python"},
+    {"path": "app/util.py", "content": "X = 1\n", "language": "python"},
+]}
+OUTPUT_V2 = {"files": [
+    {"path": "app/main.py", "content": "print(2)\n", "language": "python"},
+    {"path": "app/util.py", "content": "X = 1\n", "language": "python"},   # unchanged
+    {"path": "Dockerfile", "content": "FROM python:3.12\n"},
+]}
+
+
+def _request(**headers: str) -> Request:
+    raw = [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]
+    return Request({"type": "http", "method": "GET", "headers": raw})
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = LocalBlobStore(tmp_path / "blobs")
+    monkeypatch.setattr("app.core.blob_store._store", store)
+    return store
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def stage(db):
+    stage = PipelineStage(
+        pipeline_id=uuid.uuid4(), stage_type=StageType.DEVELOPMENT,
+        agent_domain=AgentDomain.DEVELOPMENT, agent_level=AgentLevel.EXECUTION,
+        sequence=4,
+    )
+    db.add(stage)
+    await db.flush()
+    return stage
+
+
+async def _save_twice(db, stage):
+    from app.agents.pipeline_engine import PipelineStateMachine
+
+    engine = PipelineStateMachine(str(stage.pipeline_id), db)
+    await engine._save_artifact(stage, OUTPUT_V1)
+    await db.commit()
+    # The rerun is saved a moment later
+    for artifact in (await db.execute(select(Artifact))).scalars():
+        artifact.created_at -= timedelta(minutes=1)
+    for row in (await db.execute(select(ArtifactFile))).scalars():
+        row.created_at -= timedelta(minutes=1)
+    await engine._save_artifact(stage, OUTPUT_V2)
+    await db.commit()
+
+
+# ── Helpers ───────────────────────────────────────────────────────────────────
+
+class TestPaths:
+    @pytest.mark.parametrize("path, expected", [
+        ("src/app.py", "src/app.py"),
+        ("/abs/path.py", "abs/path.py"),
+        ("../../etc/passwd", "etc/passwd"),
+        ("win\\style.py", "win/style.py"),
+        ("..", None),
+        (None, None),
+    ])
+    def test_safe_relative_path(self, path, expected):
+        assert safe_relative_path(path) == expected
+
+    def test_generated_files_skips_unusable_entries(self):
+        output = {"files": [{"path": "a.py", "content": "x"}, {"path": "b.py"}, "junk",
+                            {"content": "no path"}]}
+        assert [f["path"] for f in generated_files(ArtifactType.SOURCE_CODE, output)] == ["a.py"]
+        assert list(generated_files(ArtifactType.SECURITY_REPORT, output)) == []
+        assert list(generated_files(ArtifactType.SOURCE_CODE, "not json")) == []
+
+    @pytest.mark.parametrize("path, declared, expected", [
+        ("a.py", "Python", "python"),
+        ("a.ts", "python|typescript|etc", "typescript"),   # the prompt's placeholder
+        ("deploy/Dockerfile", None, "dockerfile"),
+        ("notes.unknown", None, None),
+    ])
+    def test_guess_language(self, path, declared, expected):
+        assert guess_language(path, declared) == expected
+
+
+# ── Indexing ──────────────────────────────────────────────────────────────────
+
+class TestIndex:
+    @pytest.mark.asyncio
+    async def test_save_artifact_indexes_files_into_the_blob_store(self, db, stage, store):
+        await _save_twice(db, stage)
+
+        rows = (await db.execute(select(ArtifactFile))).scalars().all()
+        assert len(rows) == 5
+        mains = [r for r in rows if r.path == "app/main.py"]
+        assert {r.checksum for r in mains} == {
+            content_checksum(b"print(1)\n"), content_checksum(b"print(2)\n")
+        }
+        assert {(r.language, r.size_bytes) for r in mains} == {("python", 9)}
+        assert all(r.file_path.startswith("blob://") for r in rows)
+        # app/util.py did not change between the runs: one blob, two references
+        util = await db.get(ArtifactBlob, content_checksum(b"X = 1\n"))
+        assert util.ref_count == 2
+
+    @pytest.mark.asyncio
+    async def test_inline_bodies_when_the_blob_store_is_disabled(self, db, stage, monkeypatch):
+        monkeypatch.setattr("app.core.blob_store._store", None)
+        monkeypatch.setattr("app.core.config.settings.BLOB_STORE_BACKEND", "none")
+        service = ArtifactFileService(db)
+        artifact = Artifact(
+            id=uuid.uuid4(), pipeline_id=stage.pipeline_id, artifact_type=ArtifactType.SOURCE_CODE,
+        )
+        rows = await service.index(artifact, OUTPUT_V1)
+        assert [r.content for r in rows] == ["print(1)\n", "X = 1\n"]
+        assert rows[0].checksum == content_checksum(b"print(1)\n")
+        assert rows[0].file_path is None
+
+    @pytest.mark.asyncio
+    async def test_large_outputs_are_hashed_in_the_thread_pool(self, db, store, monkeypatch):
+        calls = []
+        real_to_thread = artifact_blob_service.asyncio.to_thread
+
+        async def to_thread(fn, *args):
+            calls.append(fn)
+            return await real_to_thread(fn, *args)
+
+        monkeypatch.setattr(artifact_blob_service.asyncio, "to_thread", to_thread)
+        monkeypatch.setattr(artifact_blob_service, "PARALLEL_ENCODE_MIN_BYTES", 10)
+        refs = await ArtifactBlobService(db, store).store_bodies(["a" * 100, "b" * 100])
+        assert calls.count(artifact_blob_service._encode) == 2
+        assert [r.checksum for r in refs] == [
+            content_checksum(b"a" * 100), content_checksum(b"b" * 100)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_backfill_indexes_old_artifacts_once(self, db, stage, store):
+        db.add_all([
+            Artifact(pipeline_id=stage.pipeline_id, stage_id=stage.id, name=name,
+                     artifact_type=artifact_type, content=json.dumps(output), checksum="x")
+            for name, artifact_type, output in [
+                ("dev", ArtifactType.SOURCE_CODE, OUTPUT_V1),
+                ("empty", ArtifactType.TEST_SUITE, {"summary": "no files"}),
+                ("report", ArtifactType.SECURITY_REPORT, {"findings": []}),
+            ]
+        ])
+        await db.commit()
+
+        service = ArtifactFileService(db, store)
+        assert await service.index_unindexed() == 2
+        assert await service.index_unindexed() == 0
+        count = await db.scalar(select(func.count()).select_from(ArtifactFile))
+        assert count == 2
+
+    @pytest.mark.asyncio
+    async def test_deleting_the_artifact_releases_file_blobs(self, db, stage, store):
+        from app.api.v1.artifacts import delete_artifact
+
+        await _save_twice(db, stage)
+        first = (await db.execute(select(Artifact).order_by(Artifact.created_at))).scalars().first()
+        await delete_artifact(first.id, uuid.uuid4(), db)
+        util = await db.get(ArtifactBlob, content_checksum(b"X = 1\n"))
+        await db.refresh(util)
+        assert util.ref_count == 1
+
+
+# ── Endpoints ─────────────────────────────────────────────────────────────────
+
+class TestFileEndpoints:
+    @pytest.mark.asyncio
+    async def test_tree_lists_the_latest_version_of_each_path(self, db, stage, store):
+        from app.api.v1.pipelines import list_pipeline_files
+
+        await _save_twice(db, stage)
+        files = await list_pipeline_files(stage.pipeline_id, uuid.uuid4(), db)
+        assert [(f.path, f.language) for f in files] == [
+            ("Dockerfile", "dockerfile"), ("app/main.py", "python"), ("app/util.py", "python"),
+        ]
+        main = next(f for f in files if f.path == "app/main.py")
+        assert main.checksum == content_checksum(b"print(2)\n")
+
+    @pytest.mark.asyncio
+    async def test_get_file_by_path(self, db, stage, store):
+        from fastapi import HTTPException
+
+        from app.api.v1.pipelines import get_pipeline_file
+
+        await _save_twice(db, stage)
+        response = await get_pipeline_file(
+            stage.pipeline_id, "app/main.py", _request(), uuid.uuid4(), db
+        )
+        assert response.status_code == 200
+        assert response.media_type == "text/x-python"
+        assert b"".join([c async for c in response.body_iterator]) == b"print(2)\n"
+        checksum = content_checksum(b"print(2)\n")
+        assert response.headers["etag"] == f'"{checksum}"'
+
+        etag = response.headers["etag"]
+        response = await get_pipeline_file(
+            stage.pipeline_id, "app/main.py", _request(if_none_match=etag), uuid.uuid4(), db
+        )
+        assert response.status_code == 304
+
+        with pytest.raises(HTTPException) as exc:
+            await get_pipeline_file(stage.pipeline_id, "nope.py", _request(), uuid.uuid4(), db)
+        assert exc.value.status_code == 404
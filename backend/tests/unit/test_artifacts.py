@@ -8,6 +8,7 @@ import uuid
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
 
 from app.main import app
@@ -198,3 +199,71 @@ class TestChecksumLogic:
         h = hashlib.sha256(b"forge").hexdigest()
         assert len(h) == 64
         assert all(c in "0123456789abcdef" for c in h)
+
+
+# ── Deferred content ──────────────────────────────────────────────────────────
+
+class TestDeferredContent:
+    BODY = "x" * 10_000
+
+    @pytest_asyncio.fixture(loop_scope="function")
+    async def engine(self):
+        from sqlalchemy.ext.asyncio import create_async_engine
+
+        from app.db.models import Base
+        eng = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with eng.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        yield eng
+        await eng.dispose()
+
+    @pytest_asyncio.fixture(loop_scope="function")
+    async def seeded(self, engine):
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        from app.db.models import Artifact, ArtifactType
+        async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+            artifact = Artifact(
+                pipeline_id=uuid.uuid4(), stage_id=uuid.uuid4(),
+                artifact_type=ArtifactType.SOURCE_CODE, name="main.py",
+                content=self.BODY, size_bytes=len(self.BODY), checksum="c" * 64,
+            )
+            session.add(artifact)
+            await session.commit()
+            session.expunge_all()
+            yield session, artifact
+
+    @pytest.mark.asyncio
+    async def test_lists_never_select_the_body(self, engine, seeded):
+        from app.api.v1.artifacts import list_all_artifacts
+        from app.api.v1.pipelines import list_artifacts
+        from tests.unit.conftest import count_queries
+
+        session, artifact = seeded
+        with count_queries(engine) as counter:
+            everything = (await list_all_artifacts(uuid.uuid4(), None, 50, session)).items
+            by_pipeline = await list_artifacts(artifact.pipeline_id, uuid.uuid4(), session)
+        assert all("content" not in sql.split("FROM")[0] for sql in counter.statements)
+        for items in (everything, by_pipeline):
+            dumped = items[0].model_dump()
+            assert "content" not in dumped
+            assert dumped["size_bytes"] == len(self.BODY)
+            assert dumped["checksum"] == "c" * 64
+
+    @pytest.mark.asyncio
+    async def test_get_artifact_returns_the_body(self, seeded):
+        from app.api.v1.artifacts import get_artifact
+        session, artifact = seeded
+        read = await get_artifact(artifact.id, uuid.uuid4(), session)
+        assert read.content == self.BODY
+
+    @pytest.mark.asyncio
+    async def test_unloaded_body_raises_instead_of_lazy_loading(self, seeded):
+        from sqlalchemy import select
+        from sqlalchemy.exc import InvalidRequestError
+
+        from app.db.models import Artifact
+        session, artifact = seeded
+        loaded = (await session.execute(select(Artifact))).scalar_one()
+        with pytest.raises(InvalidRequestError):
+            _ = loaded.content
@@ -0,0 +1,86 @@
+"""
+Unit tests for core/batcher.py — the shared drain loop and spill file.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from app.core.batcher import BackgroundBatcher, SpillFile
+
+
+class _Collector(BackgroundBatcher):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.queued: list[int] = []
+        self.batches: list[list[int]] = []
+
+    def add(self, n: int) -> None:
+        self.queued.append(n)
+        self._kick()
+
+    def _pending(self) -> bool:
+        return bool(self.queued)
+
+    async def _drain(self) -> None:
+        await self._linger(len(self.queued))
+        batch, self.queued = self.queued[:self.batch_size], self.queued[self.batch_size:]
+        if batch:
+            self.batches.append(batch)
+
+
+class TestBackgroundBatcher:
+    @pytest.mark.asyncio
+    async def test_drains_in_batches_once_started(self):
+        collector = _Collector(batch_size=2, linger_s=0.01)
+        for n in range(5):
+            collector.add(n)
+        await asyncio.sleep(0.1)
+        assert collector.batches == [[0, 1], [2, 3], [4]]
+        await collector._stop_task()
+        assert collector._task is None
+
+    @pytest.mark.asyncio
+    async def test_starts_again_after_stopping(self):
+        collector = _Collector()
+        collector.add(1)
+        await collector._stop_task()
+        collector.add(2)
+        await asyncio.sleep(0.01)
+        assert [n for batch in collector.batches for n in batch] == [1, 2]
+        await collector._stop_task()
+
+
+class TestSpillFile:
+    def test_nothing_spilled_is_none(self, tmp_path):
+        assert SpillFile(tmp_path / "spill.ndjson").take() is None
+
+    def test_take_claims_and_finish_deletes(self, tmp_path):
+        spill = SpillFile(tmp_path / "spill.ndjson")
+        spill.append([{"n": 1}, {"n": 2}])
+        assert spill.take() == [{"n": 1}, {"n": 2}]
+        spill.append([{"n": 3}])   # a new spill starts behind the claimed one
+        spill.finish()
+        assert spill.take() == [{"n": 3}]
+        spill.finish()
+        assert not spill.exists()
+
+    def test_claimed_file_goes_first_and_keeps_the_rest(self, tmp_path):
+        spill = SpillFile(tmp_path / "spill.ndjson")
+        spill.append([{"n": 1}, {"n": 2}])
+        assert spill.take() == [{"n": 1}, {"n": 2}]
+        spill.keep([{"n": 2}])      # n=1 went out, then the sink failed
+        spill.append([{"n": 3}])
+        assert spill.take() == [{"n": 2}]
+        spill.finish()
+        assert spill.take() == [{"n": 3}]
+
+    def test_unreadable_lines_are_skipped_and_reported(self, tmp_path):
+        corrupt = []
+        path = tmp_path / "spill.ndjson"
+        path.write_text(json.dumps({"n": 1}) + "\n" + '{"n": ' + "\n")
+        spill = SpillFile(path, on_corrupt=lambda: corrupt.append(1))
+        assert spill.take() == [{"n": 1}]
+        assert corrupt == [1]
@@ -0,0 +1,369 @@
+"""
+Unit tests for the content-addressed artifact blob store (core/blob_store.py)
+and its reference counting (services/artifact_blob_service.py).
+"""
+from __future__ import annotations
+
+import json
+import uuid
+from datetime import timedelta
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import undefer
+from starlette.requests import Request
+
+from app.core.blob_store import (
+    LocalBlobStore,
+    blob_key,
+    blob_path,
+    compress,
+    content_checksum,
+    decompress,
+)
+from app.db.models import (
+    AgentDomain,
+    AgentLevel,
+    Artifact,
+    ArtifactBlob,
+    ArtifactType,
+    Base,
+    PipelineStage,
+    StageType,
+)
+from app.services.artifact_blob_service import ArtifactBlobService
+
+BODY = json.dumps({"files": {"main.py": "print('hello')\n" * 500}})
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LocalBlobStore(tmp_path / "blobs")
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def db():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+async def _ref_count(db, checksum: str) -> int | None:
+    result = await db.execute(
+        select(ArtifactBlob.ref_count).where(ArtifactBlob.checksum == checksum)
+    )
+    return result.scalar_one_or_none()
+
+
+# ── Encoding and keys ─────────────────────────────────────────────────────────
+
+class TestEncoding:
+    def test_compress_round_trip_shrinks_repetitive_bodies(self):
+        raw = BODY.encode()
+        blob = compress(raw)
+        assert blob.startswith(b"\x28\xb5\x2f\xfd")   # zstd frame magic
+        assert len(blob) < len(raw) // 10
+        assert decompress(blob) == raw
+
+    def test_keys_are_sharded_by_checksum_prefix(self):
+        checksum = content_checksum(b"abc")
+        assert blob_key(checksum) == f"{checksum[:2]}/{checksum[2:4]}/{checksum}"
+        assert blob_path(checksum) == f"blob://{blob_key(checksum)}"
+
+
+# ── LocalBlobStore ────────────────────────────────────────────────────────────
+
+class TestLocalBlobStore:
+    @pytest.mark.asyncio
+    async def test_put_get_delete(self, store):
+        checksum = content_checksum(b"body")
+        assert not await store.exists(checksum)
+        await store.put(checksum, b"blob")
+        assert await store.exists(checksum)
+        assert await store.get(checksum) == b"blob"
+        assert (store.root / blob_key(checksum)).is_file()
+        await store.delete(checksum)
+        assert not await store.exists(checksum)
+        await store.delete(checksum)   # idempotent
+
+    @pytest.mark.asyncio
+    async def test_missing_blob_raises_key_error(self, store):
+        with pytest.raises(KeyError):
+            await store.get("0" * 64)
+
+    @pytest.mark.asyncio
+    async def test_put_leaves_no_temp_files(self, store):
+        checksum = content_checksum(b"body")
+        await store.put(checksum, b"one")
+        await store.put(checksum, b"two")
+        shard = (store.root / blob_key(checksum)).parent
+        assert [p.name for p in shard.iterdir()] == [checksum]
+        assert await store.get(checksum) == b"two"
+
+
+# ── ArtifactBlobService ───────────────────────────────────────────────────────
+
+class TestArtifactBlobService:
+    @pytest.mark.asyncio
+    async def test_identical_bodies_are_stored_once(self, db, store):
+        service = ArtifactBlobService(db, store)
+        first = await service.store_body(BODY)
+        second = await service.store_body(BODY)
+        await db.commit()
+
+        assert first == second
+        assert first.checksum == content_checksum(BODY.encode())
+        assert first.size_bytes == len(BODY.encode())
+        assert await _ref_count(db, first.checksum) == 2
+        blob = await db.get(ArtifactBlob, first.checksum)
+        assert blob.stored_bytes == len(await store.get(first.checksum))
+        assert blob.stored_bytes < blob.size_bytes
+
+    @pytest.mark.asyncio
+    async def test_read_body_from_store_or_inline(self, db, store):
+        service = ArtifactBlobService(db, store)
+        ref = await service.store_body(BODY)
+        moved = Artifact(checksum=ref.checksum, file_path=ref.file_path, content=None)
+        inline = Artifact(checksum="c" * 64, content="inline")
+        assert await service.read_body(moved) == BODY
+        assert await service.read_body(inline) == "inline"
+
+    @pytest.mark.asyncio
+    async def test_blob_survives_until_last_reference_is_collected(self, db, store):
+        service = ArtifactBlobService(db, store)
+        ref = await service.store_body(BODY)
+        await service.store_body(BODY)
+        await db.commit()
+
+        await service.release(ref.checksum)
+        await db.commit()
+        assert await service.collect_garbage(grace=timedelta(0)) == 0
+        assert await store.exists(ref.checksum)
+
+        await service.release(ref.checksum)
+        await db.commit()
+        # Inside the grace period nothing is collected
+        assert await service.collect_garbage() == 0
+        assert await service.collect_garbage(grace=timedelta(0)) == 1
+        assert not await store.exists(ref.checksum)
+        assert await _ref_count(db, ref.checksum) is None
+
+    @pytest.mark.asyncio
+    async def test_store_body_revives_a_released_blob(self, db, store):
+        service = ArtifactBlobService(db, store)
+        ref = await service.store_body(BODY)
+        await service.release(ref.checksum)
+        await db.commit()
+
+        await service.store_body(BODY)
+        await db.commit()
+        assert await service.collect_garbage(grace=timedelta(0)) == 0
+        assert await _ref_count(db, ref.checksum) == 1
+
+    @pytest.mark.asyncio
+    async def test_move_inline_bodies_backfills_in_batches(self, db, store):
+        pipeline_id = uuid.uuid4()
+        for i in range(5):
+            db.add(Artifact(
+                pipeline_id=pipeline_id, stage_id=uuid.uuid4(),
+                artifact_type=ArtifactType.SOURCE_CODE, name=f"a{i}",
+                content=BODY if i % 2 else f"body {i}", checksum="stale", size_bytes=0,
+            ))
+        await db.commit()
+
+        service = ArtifactBlobService(db, store)
+        assert await service.move_inline_bodies(batch_size=3) == 3
+        assert await service.move_inline_bodies(batch_size=3) == 2
+        assert await service.move_inline_bodies(batch_size=3) == 0
+
+        result = await db.execute(select(Artifact).options(undefer(Artifact.content)))
+        artifacts = result.scalars().all()
+        assert all(a.content is None and a.file_path.startswith("blob://") for a in artifacts)
+        bodies = {a.name: await service.read_body(a) for a in artifacts}
+        assert bodies == {f"a{i}": BODY if i % 2 else f"body {i}" for i in range(5)}
+        assert await _ref_count(db, content_checksum(BODY.encode())) == 2
+
+
+# ── Integration with the pipeline engine and the API ──────────────────────────
+
+class TestArtifactBodiesInTheBlobStore:
+    @pytest_asyncio.fixture(loop_scope="function")
+    async def stage(self, db):
+        stage = PipelineStage(
+            pipeline_id=uuid.uuid4(), stage_type=StageType.DEVELOPMENT,
+            agent_domain=AgentDomain.DEVELOPMENT, agent_level=AgentLevel.EXECUTION,
+            sequence=4,
+        )
+        db.add(stage)
+        await db.flush()
+        return stage
+
+    @pytest.fixture
+    def configured_store(self, store, monkeypatch):
+        monkeypatch.setattr("app.core.blob_store._store", store)
+        return store
+
+    @pytest.mark.asyncio
+    async def test_save_artifact_moves_the_body_out(self, db, stage, configured_store):
+        from app.agents.pipeline_engine import PipelineStateMachine
+
+        output = {"files": {"main.py": "print('hello')"}}
+        engine = PipelineStateMachine(str(stage.pipeline_id), db)
+        await engine._save_artifact(stage, output)
+        await engine._save_artifact(stage, output)   # a retry producing the same output
+        await db.commit()
+
+        result = await db.execute(select(Artifact).options(undefer(Artifact.content)))
+        artifacts = result.scalars().all()
+        assert len(artifacts) == 2
+        body = json.dumps(output)
+        checksum = content_checksum(body.encode())
+        for artifact in artifacts:
+            assert artifact.content is None
+            assert artifact.checksum == checksum
+            assert artifact.file_path == blob_path(checksum)
+            assert artifact.size_bytes == len(body)
+        assert await _ref_count(db, checksum) == 2
+        assert decompress(await configured_store.get(checksum)).decode() == body
+
+    @pytest.mark.asyncio
+    async def test_api_reads_and_releases_blob_backed_artifacts(
+        self, db, stage, configured_store
+    ):
+        from app.agents.pipeline_engine import PipelineStateMachine
+        from app.api.v1.artifacts import delete_artifact, download_artifact, get_artifact
+
+        output = {"report": "ok"}
+        await PipelineStateMachine(str(stage.pipeline_id), db)._save_artifact(stage, output)
+        await db.commit()
+        artifact = (await db.execute(select(Artifact))).scalar_one()
+        db.expunge_all()
+
+        read = await get_artifact(artifact.id, uuid.uuid4(), db)
+        assert read.content == json.dumps(output)
+
+        request = Request({"type": "http", "method": "GET", "headers": []})
+        response = await download_artifact(artifact.id, request, uuid.uuid4(), db)
+        chunks = [chunk async for chunk in response.body_iterator]
+        assert b"".join(chunks) == json.dumps(output).encode()
+
+        await delete_artifact(artifact.id, uuid.uuid4(), db)
+        assert await _ref_count(db, artifact.checksum) == 0
+        assert await ArtifactBlobService(db).collect_garbage(grace=timedelta(0)) == 1
+
+
+# ── Delta-encoded versions ────────────────────────────────────────────────────
+
+def _version(n: int) -> str:
+    files = [{"path": f"m{i}.py", "content": f"def f{i}():\n    return {i}\n" * 40}
+             for i in range(100)]
+    files[n % 100]["content"] += f"# revision {n}\n"
+    return json.dumps({"files": files, "summary": f"revision {n}"})
+
+
+class TestDeltas:
+    @pytest.mark.asyncio
+    async def test_versions_are_stored_as_deltas_with_keyframes(
+        self, db, store, monkeypatch
+    ):
+        monkeypatch.setattr("app.core.config.settings.BLOB_DELTA_KEYFRAME_INTERVAL", 3)
+        service = ArtifactBlobService(db, store)
+        refs, base = [], None
+        for n in range(5):
+            ref = await service.store_body(_version(n), base=base)
+            refs.append(ref)
+            base = ref.checksum
+        await db.commit()
+
+        rows = [await db.get(ArtifactBlob, ref.checksum) for ref in refs]
+        assert [r.chain_depth for r in rows] == [0, 1, 2, 0, 1]
+        assert rows[1].base_checksum == refs[0].checksum
+        assert rows[3].base_checksum is None
+        assert rows[1].stored_bytes < rows[0].stored_bytes / 10
+        for n, ref in enumerate(refs):
+            moved = Artifact(checksum=ref.checksum, file_path=ref.file_path)
+            assert await service.read_body(moved) == _version(n)
+        # Each delta holds a reference on its base
+        assert [await _ref_count(db, ref.checksum) for ref in refs] == [2, 2, 1, 2, 1]
+
+    @pytest.mark.asyncio
+    async def test_unrelated_base_falls_back_to_a_full_blob(self, db, store):
+        service = ArtifactBlobService(db, store)
+        base = await service.store_body("completely different " * 10)
+        ref = await service.store_body(_version(1), base=base.checksum)
+        row = await db.get(ArtifactBlob, ref.checksum)
+        assert row.base_checksum is None and row.chain_depth == 0
+        assert await _ref_count(db, base.checksum) == 1
+
+    @pytest.mark.asyncio
+    async def test_bases_are_collected_after_their_deltas(self, db, store):
+        service = ArtifactBlobService(db, store)
+        base = await service.store_body(_version(0))
+        delta = await service.store_body(_version(1), base=base.checksum)
+        await db.commit()
+        await service.release(base.checksum)
+        await db.commit()
+        assert await service.collect_garbage(grace=timedelta(0)) == 0   # the delta needs it
+
+        await service.release(delta.checksum)
+        await db.commit()
+        assert await service.collect_garbage(grace=timedelta(0)) == 1
+        assert await service.collect_garbage(grace=timedelta(0)) == 1
+        assert not await store.exists(base.checksum)
+
+    @pytest.mark.asyncio
+    async def test_streamed_download_of_a_delta(self, db, store):
+        service = ArtifactBlobService(db, store)
+        base = await service.store_body(_version(0))
+        ref = await service.store_body(_version(1), base=base.checksum)
+        artifact = Artifact(checksum=ref.checksum, file_path=ref.file_path)
+        size, opener = await service.open_body(artifact)
+        with opener() as reader:
+            assert reader.read() == _version(1).encode()
+        assert size == len(_version(1))
+        # A delta frame is useless to a client on its own
+        assert await service.stored_path(artifact) is None
+        assert await service.stored_path(
+            Artifact(checksum=base.checksum, file_path=base.file_path)
+        ) is not None
+
+
+class TestArtifactVersions:
+    @pytest.mark.asyncio
+    async def test_reruns_become_versions_with_a_diff(self, db, store, monkeypatch):
+        from app.agents.pipeline_engine import PipelineStateMachine
+        from app.api.v1.artifacts import diff_artifact, list_artifact_versions
+
+        monkeypatch.setattr("app.core.blob_store._store", store)
+        stage = PipelineStage(
+            pipeline_id=uuid.uuid4(), stage_type=StageType.DEVELOPMENT,
+            agent_domain=AgentDomain.DEVELOPMENT, agent_level=AgentLevel.EXECUTION,
+            sequence=4,
+        )
+        db.add(stage)
+        await db.flush()
+        engine = PipelineStateMachine(str(stage.pipeline_id), db)
+        for n in range(3):
+            await engine._save_artifact(stage, json.loads(_version(n)))
+        await db.commit()
+
+        latest = (await db.execute(
+            select(Artifact).order_by(Artifact.version.desc())
+        )).scalars().first()
+        versions = await list_artifact_versions(latest.id, uuid.uuid4(), db)
+        assert [v.version for v in versions] == [1, 2, 3]
+        blob = await db.get(ArtifactBlob, latest.checksum)
+        assert blob.chain_depth == 2
+
+        diff = (await diff_artifact(latest.id, uuid.uuid4(), None, db)).body.decode()
+        assert "--- a/m2.py\n+++ b/m2.py\n" in diff
+        assert "+# revision 2\n" in diff
+        assert '-  "summary": "revision 1"\n+  "summary": "revision 2"\n' in diff
+        assert "-# revision 1\n" in diff and "revision 0" not in diff
+        full = (await diff_artifact(latest.id, uuid.uuid4(), 1, db)).body.decode()
+        assert "-# revision 0\n" in full and "+# revision 2\n" in full
@@ -0,0 +1,219 @@
+"""
+Unit tests for the Redis cache-aside layer (core/cache.py) and pattern deletes.
+"""
+from __future__ import annotations
+
+import asyncio
+import fnmatch
+import uuid
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from pydantic import BaseModel
+
+from app.core.cache import (
+    CachedView,
+    CacheInvalidator,
+    ResponseCache,
+    pipeline_scope,
+    project_pipelines_scope,
+)
+from app.core.events import PipelineEvent
+from app.core.redis_client import cache_delete_pattern
+
+
+class _Item(BaseModel):
+    id:   int
+    name: str
+
+
+VIEW = CachedView("item", _Item)
+
+
+class _FakeRedis:
+    """The handful of commands the cache uses, over a dict (expiry ignored)."""
+
+    def __init__(self) -> None:
+        self.data: dict[str, str] = {}
+
+    async def mget(self, *keys):
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value, nx=False, px=None, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    unlink = delete
+
+    async def scan_iter(self, match="*", count=None):
+        for key in list(self.data):
+            if fnmatch.fnmatchcase(key, match):
+                yield key
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, redis: _FakeRedis) -> None:
+        self.redis, self.calls = redis, []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+
+    async def execute(self):
+        return [await self.redis.set(*args, **kwargs) for args, kwargs in self.calls]
+
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = _FakeRedis()
+    monkeypatch.setattr("app.core.redis_client._redis", fake)
+    return fake
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache(ttl_seconds=60, lock_timeout_ms=1000, lock_wait_ms=100,
+                         reinvalidate_seconds=0)
+
+
+def _loader(name: str = "first") -> AsyncMock:
+    return AsyncMock(return_value=_Item(id=1, name=name))
+
+
+class TestResponseCache:
+    @pytest.mark.asyncio
+    async def test_second_read_is_a_hit(self, redis, cache):
+        load = _loader()
+        first = await cache.get_or_load(VIEW, (1,), ["item:1"], load)
+        second = await cache.get_or_load(VIEW, (1,), ["item:1"], load)
+        assert first == second == _Item(id=1, name="first")
+        load.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_invalidate_makes_dependent_entries_stale(self, redis, cache):
+        await cache.get_or_load(VIEW, (1,), ["item:1", "list:a"], _loader())
+        await cache.get_or_load(VIEW, (2,), ["item:2"], _loader())
+
+        await cache.invalidate("list:a")
+
+        load = _loader("second")
+        assert (await cache.get_or_load(VIEW, (1,), ["item:1", "list:a"], load)).name == "second"
+        load.assert_awaited_once()
+        untouched = _loader("second")
+        assert (await cache.get_or_load(VIEW, (2,), ["item:2"], untouched)).name == "first"
+        untouched.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_invalidation_during_a_fill_leaves_the_entry_stale(self, redis, cache):
+        async def load():
+            await cache.invalidate("item:1")     # a write commits mid-load
+            return _Item(id=1, name="old")
+
+        await cache.get_or_load(VIEW, (1,), ["item:1"], load)
+        fresh = _loader("new")
+        assert (await cache.get_or_load(VIEW, (1,), ["item:1"], fresh)).name == "new"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_load(self, redis, cache):
+        calls = 0
+
+        async def load():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return _Item(id=1, name="first")
+
+        results = await asyncio.gather(
+            *(cache.get_or_load(VIEW, (1,), ["item:1"], load) for _ in range(10))
+        )
+        assert calls == 1
+        assert {item.name for item in results} == {"first"}
+        assert not any(key.startswith("forge:cache-lock:") for key in redis.data)
+
+    @pytest.mark.asyncio
+    async def test_waits_for_the_pod_holding_the_fill_lock(self, redis, cache):
+        other_pod = ResponseCache(ttl_seconds=60, lock_timeout_ms=1000, lock_wait_ms=500,
+                                  reinvalidate_seconds=0)
+        started = asyncio.Event()
+
+        async def slow_load():
+            started.set()
+            await asyncio.sleep(0.05)
+            return _Item(id=1, name="first")
+
+        filling = asyncio.create_task(cache.get_or_load(VIEW, (1,), ["item:1"], slow_load))
+        await started.wait()
+        load = _loader("second")
+        assert (await other_pod.get_or_load(VIEW, (1,), ["item:1"], load)).name == "first"
+        load.assert_not_awaited()
+        await filling
+
+    @pytest.mark.asyncio
+    async def test_bypass_reloads_and_refreshes_the_entry(self, redis, cache):
+        await cache.get_or_load(VIEW, (1,), ["item:1"], _loader())
+        load = _loader("second")
+        assert (await cache.get_or_load(VIEW, (1,), ["item:1"], load, bypass=True)).name == "second"
+        assert (await cache.get_or_load(VIEW, (1,), ["item:1"], _loader())).name == "second"
+
+    @pytest.mark.asyncio
+    async def test_not_found_is_not_cached(self, redis, cache):
+        assert await cache.get_or_load(VIEW, (1,), ["item:1"], AsyncMock(return_value=None)) is None
+        assert not any(key.startswith("forge:cache:") for key in redis.data)
+
+    @pytest.mark.asyncio
+    async def test_loads_without_redis(self, cache, monkeypatch):
+        monkeypatch.setattr("app.core.redis_client._redis", None)
+        load = _loader()
+        assert (await cache.get_or_load(VIEW, (1,), ["item:1"], load)).name == "first"
+        load.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_invalidation_is_repeated_after_replica_lag(self, redis):
+        cache = ResponseCache(ttl_seconds=60, reinvalidate_seconds=0.01)
+        await cache.invalidate("item:1")
+        first = redis.data["forge:cache-v:item:1"]
+        await asyncio.sleep(0.05)
+        assert redis.data["forge:cache-v:item:1"] != first
+        await cache.close()
+
+
+class TestCacheInvalidator:
+    @pytest.mark.asyncio
+    async def test_local_event_invalidates_the_pipeline_and_its_project_list(self, cache):
+        pipeline_id, project_id = str(uuid.uuid4()), str(uuid.uuid4())
+        invalidator = CacheInvalidator(cache, bus=object())
+        invalidator._project_of[pipeline_id] = project_id
+
+        with patch.object(cache, "invalidate", AsyncMock()) as invalidate:
+            await invalidator.handle(PipelineEvent(pipeline_id, "stage_completed", {}))
+            invalidate.assert_awaited_once_with(
+                pipeline_scope(pipeline_id), project_pipelines_scope(project_id)
+            )
+
+            bridged = PipelineEvent(pipeline_id, "stage_completed", {}, origin="another-pod")
+            await invalidator.handle(bridged)
+            invalidate.assert_awaited_once()
+
+
+class TestCacheDeletePattern:
+    @pytest.mark.asyncio
+    async def test_deletes_matching_keys_in_batches(self, redis):
+        redis.keys = AsyncMock(side_effect=AssertionError("KEYS must not be used"))
+        redis.data.update({f"pipelines:{i}": "1" for i in range(7)})
+        redis.data["other"] = "1"
+
+        assert await cache_delete_pattern("pipelines:*", batch_size=3) == 7
+        assert list(redis.data) == ["other"]
@@ -0,0 +1,201 @@
+"""
+Unit tests for ranged and conditional downloads (core/downloads.py) and the
+artifact download endpoint built on them.
+"""
+from __future__ import annotations
+
+import io
+import json
+import uuid
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from starlette.requests import Request
+from starlette.responses import FileResponse
+
+from app.core.blob_store import LocalBlobStore, decompress
+from app.core.downloads import (
+    IMMUTABLE_CACHE_CONTROL,
+    RangeNotSatisfiableError,
+    iter_body,
+    parse_range,
+    serve_body,
+)
+from app.db.models import (
+    AgentDomain,
+    AgentLevel,
+    Artifact,
+    Base,
+    PipelineStage,
+    StageType,
+)
+
+BODY = bytes(range(256)) * 1024   # 256 KiB: several chunks
+
+
+def _request(**headers: str) -> Request:
+    raw = [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]
+    return Request({"type": "http", "method": "GET", "headers": raw})
+
+
+async def _read(response) -> bytes:
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+def _serve(body: bytes = BODY, **headers: str):
+    return serve_body(
+        _request(**headers), size=len(body), checksum="c0ffee",
+        opener=lambda: io.BytesIO(body), media_type="text/plain", filename="out.txt",
+    )
+
+
+class _ForwardOnly(io.RawIOBase):
+    """A non-seekable reader, like a zstd decompression stream."""
+
+    def __init__(self, data: bytes):
+        self._data = io.BytesIO(data)
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        return self._data.read(size)
+
+
+# ── Range parsing ─────────────────────────────────────────────────────────────
+
+class TestParseRange:
+    @pytest.mark.parametrize("header, expected", [
+        (None, None),
+        ("bytes=0-99", (0, 99)),
+        ("bytes=100-", (100, 999)),
+        ("bytes=-100", (900, 999)),
+        ("bytes=-5000", (0, 999)),
+        ("bytes=900-5000", (900, 999)),
+        ("bytes=0-1,5-6", None),     # multi-range → whole body
+        ("items=0-1", None),
+        ("bytes=5-1", None),
+        ("bytes=abc", None),
+    ])
+    def test_single_ranges(self, header, expected):
+        assert parse_range(header, 1000) == expected
+
+    @pytest.mark.parametrize("header, size", [("bytes=1000-", 1000), ("bytes=-0", 1000),
+                                              ("bytes=-1", 0)])
+    def test_unsatisfiable(self, header, size):
+        with pytest.raises(RangeNotSatisfiableError):
+            parse_range(header, size)
+
+    def test_forward_only_readers_skip_the_prefix(self):
+        chunks = list(iter_body(lambda: _ForwardOnly(BODY), 1000, 70_000, chunk_size=4096))
+        assert b"".join(chunks) == BODY[1000:71_000]
+        assert max(len(c) for c in chunks) == 4096
+
+
+# ── Responses ─────────────────────────────────────────────────────────────────
+
+class TestServeBody:
+    @pytest.mark.asyncio
+    async def test_full_body_is_streamed_in_chunks(self):
+        response = _serve()
+        assert response.status_code == 200
+        assert response.headers["content-length"] == str(len(BODY))
+        assert response.headers["etag"] == '"c0ffee"'
+        assert response.headers["accept-ranges"] == "bytes"
+        chunks = [chunk async for chunk in response.body_iterator]
+        assert len(chunks) == len(BODY) // (64 * 1024)
+        assert b"".join(chunks) == BODY
+
+    @pytest.mark.asyncio
+    async def test_range_returns_partial_content(self):
+        response = _serve(range="bytes=100-199")
+        assert response.status_code == 206
+        assert response.headers["content-range"] == f"bytes 100-199/{len(BODY)}"
+        assert response.headers["content-length"] == "100"
+        assert await _read(response) == BODY[100:200]
+
+    def test_range_past_the_end_is_416(self):
+        response = _serve(range=f"bytes={len(BODY)}-")
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(BODY)}"
+
+    @pytest.mark.asyncio
+    async def test_stale_if_range_sends_the_whole_body(self):
+        response = _serve(range="bytes=0-9", if_range='"other"')
+        assert response.status_code == 200
+        assert await _read(response) == BODY
+        assert _serve(range="bytes=0-9", if_range='"c0ffee"').status_code == 206
+
+    def test_matching_etag_is_304(self):
+        assert _serve(if_none_match='"abc", W/"c0ffee"').status_code == 304
+        assert _serve(if_none_match='"abc"').status_code == 200
+
+    def test_cache_control_depends_on_immutability(self):
+        assert _serve().headers["cache-control"] == "private, no-cache"
+        response = serve_body(
+            _request(), size=1, checksum="c", opener=lambda: io.BytesIO(b"x"),
+            media_type="text/plain", filename="x", immutable=True,
+        )
+        assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+
+# ── The artifact download endpoint ────────────────────────────────────────────
+
+class TestArtifactDownload:
+    @pytest_asyncio.fixture(loop_scope="function")
+    async def db(self):
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with async_sessionmaker(engine, expire_on_commit=False)() as session:
+            yield session
+        await engine.dispose()
+
+    @pytest_asyncio.fixture(loop_scope="function")
+    async def artifact(self, db, tmp_path, monkeypatch):
+        from app.agents.pipeline_engine import PipelineStateMachine
+
+        monkeypatch.setattr("app.core.blob_store._store", LocalBlobStore(tmp_path))
+        stage = PipelineStage(
+            pipeline_id=uuid.uuid4(), stage_type=StageType.DEVELOPMENT,
+            agent_domain=AgentDomain.DEVELOPMENT, agent_level=AgentLevel.EXECUTION,
+            sequence=4,
+        )
+        db.add(stage)
+        await db.flush()
+        output = {"files": {f"m{i}.py": f"x = {i}\n" * 200 for i in range(50)}}
+        await PipelineStateMachine(str(stage.pipeline_id), db)._save_artifact(stage, output)
+        await db.commit()
+        return (await db.execute(select(Artifact))).scalar_one()
+
+    @pytest.mark.asyncio
+    async def test_blob_backed_range_is_decompressed_on_the_fly(self, db, artifact):
+        from app.api.v1.artifacts import download_artifact
+
+        body = json.dumps({"files": {f"m{i}.py": f"x = {i}\n" * 200 for i in range(50)}})
+        response = await download_artifact(
+            artifact.id, _request(range="bytes=5000-5099"), uuid.uuid4(), db
+        )
+        assert response.status_code == 206
+        assert await _read(response) == body.encode()[5000:5100]
+
+        response = await download_artifact(
+            artifact.id, _request(if_none_match=f'"{artifact.checksum}"'), uuid.uuid4(), db
+        )
+        assert response.status_code == 304
+
+    @pytest.mark.asyncio
+    async def test_zstd_clients_get_the_stored_blob(self, db, artifact):
+        from app.api.v1.artifacts import download_artifact
+
+        response = await download_artifact(
+            artifact.id, _request(accept_encoding="gzip, zstd"), uuid.uuid4(), db
+        )
+        assert isinstance(response, FileResponse)
+        assert response.headers["content-encoding"] == "zstd"
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.headers["etag"] == f'"{artifact.checksum}.zstd"'
+        with open(response.path, "rb") as f:
+            assert json.loads(decompress(f.read()))["files"]["m7.py"] == "x = 7\n" * 200
@@ -0,0 +1,92 @@
+"""
+Unit tests for core/event_bridge.py — cross-pod EventBus fan-out.
+Transport loops are not exercised; payloads are fed straight into the bridge.
+"""
+from __future__ import annotations
+
+import pytest
+import pytest_asyncio
+
+from app.core.event_bridge import EventBridge
+from app.core.event_forwarder import event_to_record
+from app.core.events import EventBus, PipelineEvent, instance_id, pipeline_topic, workspace_topic
+
+
+def _payload(pipeline_id: str = "pipe-1", **overrides) -> dict:
+    event = PipelineEvent(
+        pipeline_id=pipeline_id,
+        event_type="stage_completed",
+        data={"score": 0.9},
+        stage_id="stage-1",
+        workspace_id="ws-1",
+        origin="other-pod",
+    )
+    value = event_to_record(event)["value"]
+    value.update(overrides)
+    return value
+
+
+@pytest.fixture(autouse=True)
+def no_redis(monkeypatch):
+    # Keep the bus's replay buffer in-memory only
+    monkeypatch.setattr("app.core.redis_client._redis", None)
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def bus():
+    b = EventBus()
+    yield b
+    await b.close()
+
+
+class TestEventBridge:
+    @pytest.mark.asyncio
+    async def test_remote_event_is_republished_locally(self, bus):
+        received = []
+
+        async def handler(event):
+            received.append(event)
+
+        bus.subscribe(handler, topics=[pipeline_topic("pipe-1")])
+        bridge = EventBridge(bus, backend="none")
+        payload = _payload()
+        await bridge._deliver(payload)
+        await bus.join()
+
+        assert len(received) == 1
+        event = received[0]
+        assert event.event_id == payload["event_id"]
+        assert event.stage_id == "stage-1"
+        assert event.data == {"score": 0.9}
+        assert event.origin == "other-pod"
+
+    @pytest.mark.asyncio
+    async def test_duplicates_are_dropped(self, bus):
+        bus.subscribe(_noop, topics=[pipeline_topic("pipe-1")])
+        bridge = EventBridge(bus, backend="none")
+        payload = _payload()
+        assert bridge.accept(payload) is not None
+        assert bridge.accept(payload) is None
+
+    @pytest.mark.asyncio
+    async def test_own_events_are_ignored(self, bus):
+        bus.subscribe(_noop, topics=[pipeline_topic("pipe-1")])
+        bridge = EventBridge(bus, backend="none")
+        assert bridge.accept(_payload(origin=instance_id())) is None
+
+    @pytest.mark.asyncio
+    async def test_unwatched_pipelines_are_skipped(self, bus):
+        bridge = EventBridge(bus, backend="none")
+        assert bridge.accept(_payload()) is None
+        bus.subscribe(_noop, topics=[workspace_topic("ws-1")])
+        assert bridge.accept(_payload()) is not None
+
+    @pytest.mark.asyncio
+    async def test_commands_without_event_id_are_skipped(self, bus):
+        bus.subscribe(_noop, topics=[pipeline_topic("pipe-1")])
+        bridge = EventBridge(bus, backend="none")
+        assert bridge.accept({"pipeline_id": "pipe-1", "event_type": "pipeline_queued"}) is None
+
+
+async def _noop(event):
+    pass
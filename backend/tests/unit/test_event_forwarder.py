@@ -0,0 +1,214 @@
+"""
+Unit tests for core/event_forwarder.py — batched, bounded EventBus → Kafka forwarding.
+The Kafka producer is mocked; spill files go to pytest's tmp_path.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.core.event_forwarder import KafkaEventForwarder
+from app.core.events import PipelineEvent
+
+
+def _event(pipeline_id: str = "pipe-1", n: int = 0) -> PipelineEvent:
+    return PipelineEvent(pipeline_id=pipeline_id, event_type="stage_started", data={"n": n})
+
+
+def _producer(fail: bool = False) -> MagicMock:
+    producer = MagicMock()
+
+    async def send(topic, value=None, key=None):
+        fut = asyncio.get_running_loop().create_future()
+        if fail:
+            fut.set_exception(ConnectionError("broker down"))
+        else:
+            fut.set_result(None)
+        return fut
+
+    producer.send = AsyncMock(side_effect=send)
+    return producer
+
+
+def _forwarder(tmp_path, **kw) -> KafkaEventForwarder:
+    kw.setdefault("linger_ms", 0)
+    return KafkaEventForwarder(spill_path=str(tmp_path / "spill.ndjson"), **kw)
+
+
+class TestKafkaEventForwarder:
+    @pytest.mark.asyncio
+    async def test_batch_preserves_per_key_order(self, tmp_path):
+        producer = _producer()
+        fwd = _forwarder(tmp_path, batch_size=100)
+        with patch("app.core.kafka_client.get_producer", return_value=producer):
+            for n in range(3):
+                fwd.enqueue(_event("pipe-b", n))
+                fwd.enqueue(_event("pipe-a", n))
+            await fwd.stop()
+        calls = producer.send.call_args_list
+        sent = [(c.kwargs["key"], c.kwargs["value"]["data"]["n"]) for c in calls]
+        assert [n for k, n in sent if k == "pipe-a"] == [0, 1, 2]
+        assert [n for k, n in sent if k == "pipe-b"] == [0, 1, 2]
+        assert not (tmp_path / "spill.ndjson").exists()
+
+    def test_buffer_is_bounded(self, tmp_path):
+        fwd = _forwarder(tmp_path, buffer_size=3)
+        fwd._ensure_task = MagicMock()
+        fwd._wakeup = asyncio.Event()
+        for n in range(5):
+            fwd.enqueue(_event(n=n))
+        assert fwd.depth == 3
+        assert fwd.dropped == 2
+        assert [e.data["n"] for e in fwd._buffer] == [2, 3, 4]
+
+    @pytest.mark.asyncio
+    async def test_receipts_settle_on_ack_spill_and_drop(self, tmp_path):
+        fwd = _forwarder(tmp_path, buffer_size=1)
+        events = [_event(n=n) for n in range(3)]
+        receipts = [fwd.acks.watch(e.event_id) for e in events]
+        with patch("app.core.kafka_client.get_producer", return_value=_producer()):
+            fwd.enqueue(events[0])
+            fwd.enqueue(events[1])   # the ring is full: n=0 is dropped
+            await fwd.stop()
+        with patch("app.core.kafka_client.get_producer", side_effect=RuntimeError):
+            fwd.enqueue(events[2])
+            await fwd.stop()
+        assert [r.result() for r in receipts] == [False, True, True]
+
+    @pytest.mark.asyncio
+    async def test_spills_when_broker_unreachable(self, tmp_path):
+        fwd = _forwarder(tmp_path)
+        with patch("app.core.kafka_client.get_producer", side_effect=RuntimeError("no kafka")):
+            fwd.enqueue(_event(n=1))
+            fwd.enqueue(_event(n=2))
+            await fwd.stop()
+        lines = (tmp_path / "spill.ndjson").read_text().splitlines()
+        assert [json.loads(line)["value"]["data"]["n"] for line in lines] == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_failed_delivery_futures_are_spilled(self, tmp_path):
+        fwd = _forwarder(tmp_path)
+        with patch("app.core.kafka_client.get_producer", return_value=_producer(fail=True)):
+            fwd.enqueue(_event())
+            await fwd.stop()
+        assert len((tmp_path / "spill.ndjson").read_text().splitlines()) == 1
+
+    @pytest.mark.asyncio
+    async def test_spill_replayed_before_new_events(self, tmp_path):
+        fwd = _forwarder(tmp_path)
+        with patch("app.core.kafka_client.get_producer", side_effect=RuntimeError):
+            fwd.enqueue(_event(n=1))
+            await fwd.stop()
+
+        producer = _producer()
+        fwd._retry_at = 0.0
+        with patch("app.core.kafka_client.get_producer", return_value=producer):
+            fwd.enqueue(_event(n=2))
+            await fwd.stop()
+        sent = [c.kwargs["value"]["data"]["n"] for c in producer.send.call_args_list]
+        assert sent == [1, 2]
+        assert not (tmp_path / "spill.ndjson").exists()
+
+    @pytest.mark.asyncio
+    async def test_stop_waits_for_in_flight_batch(self, tmp_path):
+        delivered = asyncio.Event()
+        producer = _producer()
+
+        async def slow_send(topic, value=None, key=None):
+            fut = asyncio.get_running_loop().create_future()
+            asyncio.get_running_loop().call_later(0.05, fut.set_result, None)
+            delivered.set()
+            return fut
+
+        producer.send = AsyncMock(side_effect=slow_send)
+        fwd = _forwarder(tmp_path)
+        with patch("app.core.kafka_client.get_producer", return_value=producer):
+            fwd.enqueue(_event(n=1))
+            await delivered.wait()   # batch popped, delivery future pending
+            await fwd.stop()
+        assert producer.send.await_count == 1
+        assert fwd.depth == 0
+        assert not (tmp_path / "spill.ndjson").exists()
+
+    @pytest.mark.asyncio
+    async def test_cancelled_send_puts_batch_back(self, tmp_path):
+        started = asyncio.Event()
+        producer = _producer()
+
+        async def hanging_send(topic, value=None, key=None):
+            started.set()
+            await asyncio.Event().wait()
+
+        producer.send = AsyncMock(side_effect=hanging_send)
+        fwd = _forwarder(tmp_path)
+        with patch("app.core.kafka_client.get_producer", return_value=producer):
+            fwd.enqueue(_event(n=1))
+            fwd.enqueue(_event(n=2))
+            await started.wait()
+            assert fwd.depth == 0
+            fwd._task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await fwd._task
+        assert fwd.depth == 2
+
+        producer = _producer()
+        with patch("app.core.kafka_client.get_producer", return_value=producer):
+            await fwd.stop()
+        sent = [c.kwargs["value"]["data"]["n"] for c in producer.send.call_args_list]
+        assert sent == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_truncated_spill_line_is_skipped(self, tmp_path):
+        spill = tmp_path / "spill.ndjson"
+        good = json.dumps({"topic": "t", "key": "pipe-1", "value": {"data": {"n": 1}}})
+        spill.write_text(good + "\n" + good[:20] + "\n")   # crashed mid-write
+
+        producer = _producer()
+        fwd = _forwarder(tmp_path)
+        with patch("app.core.kafka_client.get_producer", return_value=producer):
+            fwd.enqueue(_event(n=2))
+            await fwd.stop()
+        sent = [c.kwargs["value"]["data"]["n"] for c in producer.send.call_args_list]
+        assert sent == [1, 2]
+        assert not spill.exists() and not (tmp_path / "spill.replaying").exists()
+
+    @pytest.mark.asyncio
+    async def test_replay_left_by_a_crash_goes_first(self, tmp_path):
+        def record(n):
+            return json.dumps({"topic": "t", "key": "pipe-1", "value": {"data": {"n": n}}})
+
+        (tmp_path / "spill.replaying").write_text(record(1) + "\n")
+        (tmp_path / "spill.ndjson").write_text(record(2) + "\n")
+
+        producer = _producer()
+        fwd = _forwarder(tmp_path)
+        with patch("app.core.kafka_client.get_producer", return_value=producer):
+            fwd.enqueue(_event(n=3))
+            await fwd.stop()
+        sent = [c.kwargs["value"]["data"]["n"] for c in producer.send.call_args_list]
+        assert sent == [1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_failed_replay_keeps_the_rest_claimed(self, tmp_path):
+        fwd = _forwarder(tmp_path)
+        with patch("app.core.kafka_client.get_producer", side_effect=RuntimeError):
+            fwd.enqueue(_event(n=1))
+            await fwd.stop()
+
+        fwd._retry_at = 0.0
+        with patch("app.core.kafka_client.get_producer", side_effect=RuntimeError):
+            fwd.enqueue(_event(n=2))
+            await fwd.stop()
+        claimed = (tmp_path / "spill.replaying").read_text().splitlines()
+        assert [json.loads(line)["value"]["data"]["n"] for line in claimed] == [1]
+
+        producer = _producer()
+        fwd._retry_at = 0.0
+        with patch("app.core.kafka_client.get_producer", return_value=producer):
+            fwd.enqueue(_event(n=3))
+            await fwd.stop()
+        sent = [c.kwargs["value"]["data"]["n"] for c in producer.send.call_args_list]
+        assert sent == [1, 2, 3]
@@ -0,0 +1,226 @@
+"""
+Unit tests for core/event_store.py — batched EventStore writer.
+Runs against a private in-memory SQLite engine holding only the event_store table.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.event_store import EventStoreWriter
+from app.core.events import PipelineEvent
+from app.db.models import EventStore
+
+
+def _event(pipeline_id: str = "pipe-1", n: int = 0) -> PipelineEvent:
+    return PipelineEvent(pipeline_id=pipeline_id, event_type="stage_progress", data={"n": n})
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(EventStore.__table__.create)
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def factory():
+        async with maker() as session:
+            yield session
+            await session.commit()
+
+    factory.maker = maker
+    yield factory
+    await engine.dispose()
+
+
+async def _rows(session_factory) -> list[tuple[str, int, int]]:
+    async with session_factory.maker() as session:
+        result = await session.execute(
+            select(EventStore).order_by(EventStore.aggregate_id, EventStore.sequence_number)
+        )
+        return [(r.aggregate_id, r.sequence_number, r.event_data["n"]) for r in result.scalars()]
+
+
+class TestEventStoreWriter:
+    @pytest.mark.asyncio
+    async def test_sequences_are_gap_free_per_aggregate(self, session_factory):
+        writer = EventStoreWriter(batch_size=4, linger_ms=0, session_factory=session_factory)
+        for n in range(5):
+            await writer.append(_event("pipe-a", n))
+            await writer.append(_event("pipe-b", n))
+        await writer.stop()
+        rows = await _rows(session_factory)
+        assert [(a, s, n) for a, s, n in rows if a == "pipe-a"] == [
+            ("pipe-a", i + 1, i) for i in range(5)
+        ]
+        assert [s for a, s, _ in rows if a == "pipe-b"] == [1, 2, 3, 4, 5]
+        assert writer.written == 10
+
+    @pytest.mark.asyncio
+    async def test_resumes_sequence_from_existing_rows(self, session_factory):
+        first = EventStoreWriter(linger_ms=0, session_factory=session_factory)
+        await first.append(_event(n=0))
+        await first.stop()
+
+        second = EventStoreWriter(linger_ms=0, session_factory=session_factory)
+        await second.append(_event(n=1))
+        await second.stop()
+        assert [s for _, s, _ in await _rows(session_factory)] == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_stale_sequence_cache_is_recovered(self, session_factory):
+        writer = EventStoreWriter(linger_ms=0, session_factory=session_factory)
+        await writer.append(_event(n=0))
+        await writer.stop()
+
+        other = EventStoreWriter(linger_ms=0, session_factory=session_factory)
+        await other.append(_event(n=1))
+        await other.stop()
+
+        # writer still believes seq 2 is next — the unique constraint forces a re-read
+        await writer.append(_event(n=2))
+        await writer.stop()
+        assert [(s, n) for _, s, n in await _rows(session_factory)] == [(1, 0), (2, 1), (3, 2)]
+
+    @pytest.mark.asyncio
+    async def test_full_buffer_applies_backpressure_then_drops_oldest(self, session_factory):
+        writer = EventStoreWriter(
+            buffer_size=2, backpressure_timeout=0.05, session_factory=session_factory
+        )
+        writer._ensure_task = lambda: None   # no drain task: simulate a stalled DB
+        writer._wakeup = asyncio.Event()
+        await writer.append(_event(n=0))
+        await writer.append(_event(n=1))
+
+        loop = asyncio.get_running_loop()
+        t0 = loop.time()
+        await writer.append(_event(n=2))
+        assert loop.time() - t0 >= 0.04
+        assert writer.dropped == 1
+        assert [e.data["n"] for e in writer._buffer] == [1, 2]
+
+    @pytest.mark.asyncio
+    async def test_receipts_settle_when_written_or_dropped(self, session_factory):
+        writer = EventStoreWriter(buffer_size=1, backpressure_timeout=0, linger_ms=0,
+                                  session_factory=session_factory)
+        writer._ensure_task = lambda: None
+        writer._wakeup = asyncio.Event()
+        events = [_event(n=0), _event(n=1)]
+        receipts = [writer.acks.watch(e.event_id) for e in events]
+        await writer.append(events[0])
+        await writer.append(events[1])   # no room: n=0 is dropped
+        assert receipts[0].result() is False
+        assert not receipts[1].done()
+        assert await writer._flush_batch() is True
+        assert receipts[1].result() is True
+
+    @pytest.mark.asyncio
+    async def test_failed_write_is_retried_not_lost(self, session_factory):
+        calls = 0
+
+        @asynccontextmanager
+        async def flaky():
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise ConnectionError("db down")
+            async with session_factory() as session:
+                yield session
+
+        writer = EventStoreWriter(linger_ms=0, session_factory=flaky)
+        writer._buffer.append(_event(n=0))
+        assert await writer._flush_batch() is False
+        assert writer.depth == 1
+        assert await writer._flush_batch() is True
+        assert [n for _, _, n in await _rows(session_factory)] == [0]
+
+    @pytest.mark.asyncio
+    async def test_poison_event_is_dead_lettered_after_max_attempts(
+        self, session_factory, tmp_path
+    ):
+        dead_letter = tmp_path / "dead.ndjson"
+        writer = EventStoreWriter(
+            linger_ms=0, session_factory=session_factory,
+            max_attempts=3, dead_letter_path=str(dead_letter),
+        )
+        poison = PipelineEvent(
+            pipeline_id="pipe-1", event_type="stage_progress", data={"n": object()}
+        )
+        writer._buffer.extend([_event(n=0), poison, _event(n=2)])
+
+        assert await writer._flush_batch() is False
+        assert await writer._flush_batch() is False
+        assert writer.depth == 3
+        assert await writer._flush_batch() is True
+        assert writer.depth == 0
+        assert writer.dead_lettered == 1
+        assert [(s, n) for _, s, n in await _rows(session_factory)] == [(1, 0), (2, 2)]
+        [line] = dead_letter.read_text().splitlines()
+        entry = json.loads(line)
+        assert entry["event_id"] == poison.event_id
+        assert "object object" in entry["data"]["n"]
+
+    @pytest.mark.asyncio
+    async def test_stop_dead_letters_instead_of_dropping_the_buffer(
+        self, session_factory, tmp_path
+    ):
+        writer = EventStoreWriter(
+            linger_ms=0, session_factory=session_factory,
+            dead_letter_path=str(tmp_path / "dead.ndjson"),
+        )
+        writer._buffer.extend([
+            PipelineEvent(pipeline_id="pipe-1", event_type="x", data={"n": object()}),
+            _event(n=1),
+        ])
+        await writer.stop()
+        assert writer.dead_lettered == 1
+        assert [n for _, _, n in await _rows(session_factory)] == [1]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_write_is_put_back(self, session_factory):
+        started = asyncio.Event()
+
+        @asynccontextmanager
+        async def hanging():
+            started.set()
+            await asyncio.Event().wait()
+            yield
+
+        writer = EventStoreWriter(linger_ms=0, session_factory=hanging)
+        await writer.append(_event(n=0))
+        await writer.append(_event(n=1))
+        await started.wait()
+        assert writer.depth == 0
+        writer._task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await writer._task
+        assert [e.data["n"] for e in writer._buffer] == [0, 1]
+
+        writer._session_factory = session_factory
+        await writer.stop()
+        assert [n for _, _, n in await _rows(session_factory)] == [0, 1]
+
+    @pytest.mark.asyncio
+    async def test_stop_lets_the_in_flight_batch_finish(self, session_factory):
+        started = asyncio.Event()
+
+        @asynccontextmanager
+        async def slow():
+            started.set()
+            await asyncio.sleep(0.05)
+            async with session_factory() as session:
+                yield session
+
+        writer = EventStoreWriter(linger_ms=0, session_factory=slow)
+        await writer.append(_event(n=0))
+        await started.wait()
+        await writer.stop()
+        assert writer.written == 1
+        assert [n for _, _, n in await _rows(session_factory)] == [0]
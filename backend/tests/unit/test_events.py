@@ -0,0 +1,207 @@
+"""
+Unit tests for core/events.py — EventBus fan-out and subscriber overflow policies.
+"""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from app.core.events import (
+    WILDCARD,
+    EventBus,
+    OverflowPolicy,
+    PipelineEvent,
+    pipeline_topic,
+    workspace_topic,
+)
+
+
+def _event(event_type: str = "stage_started", pipeline_id: str = "pipe-1", **data):
+    return PipelineEvent(pipeline_id=pipeline_id, event_type=event_type, data=data)
+
+
+@pytest.fixture(autouse=True)
+def no_redis(monkeypatch):
+    # Keep the bus's replay buffer in-memory only
+    monkeypatch.setattr("app.core.redis_client._redis", None)
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def bus():
+    b = EventBus()
+    yield b
+    await b.close()
+
+
+class TestEventBusPublish:
+    @pytest.mark.asyncio
+    async def test_publish_delivers_to_all_subscribers(self, bus):
+        received_a, received_b = [], []
+
+        async def a(event):
+            received_a.append(event.event_type)
+
+        async def b(event):
+            received_b.append(event.event_type)
+
+        bus.subscribe(a)
+        bus.subscribe(b)
+        await bus.publish(_event("one"))
+        await bus.publish(_event("two"))
+        await bus.join()
+        assert received_a == ["one", "two"]
+        assert received_b == ["one", "two"]
+
+    @pytest.mark.asyncio
+    async def test_publish_does_not_wait_on_slow_subscriber(self, bus):
+        gate = asyncio.Event()
+
+        async def slow(event):
+            await gate.wait()
+
+        bus.subscribe(slow)
+        await asyncio.wait_for(bus.publish(_event()), timeout=0.5)
+        gate.set()
+
+    @pytest.mark.asyncio
+    async def test_handler_error_does_not_affect_others(self, bus):
+        received = []
+
+        async def broken(event):
+            raise RuntimeError("boom")
+
+        async def ok(event):
+            received.append(event)
+
+        bus.subscribe(broken)
+        bus.subscribe(ok)
+        await bus.publish(_event())
+        await bus.join()
+        assert len(received) == 1
+
+    @pytest.mark.asyncio
+    async def test_subscribe_is_idempotent_and_unsubscribe_stops_delivery(self, bus):
+        received = []
+
+        async def handler(event):
+            received.append(event)
+
+        first = bus.subscribe(handler)
+        assert bus.subscribe(handler) is first
+        bus.unsubscribe(handler)
+        bus.unsubscribe(handler)  # no-op
+        await bus.publish(_event())
+        await bus.join()
+        assert received == []
+        assert first.closed
+
+
+class TestTopicSubscriptions:
+    @pytest.mark.asyncio
+    async def test_pipeline_topic_only_receives_its_pipeline(self, bus):
+        received = []
+
+        async def handler(event):
+            received.append(event.pipeline_id)
+
+        bus.subscribe(handler, topics=[pipeline_topic("pipe-1")])
+        await bus.publish(_event(pipeline_id="pipe-1"))
+        await bus.publish(_event(pipeline_id="pipe-2"))
+        await bus.join()
+        assert received == ["pipe-1"]
+
+    @pytest.mark.asyncio
+    async def test_workspace_topic_uses_registered_pipeline(self, bus):
+        received = []
+
+        async def handler(event):
+            received.append(event.pipeline_id)
+
+        bus.subscribe(handler, topics=[workspace_topic("ws-1")])
+        bus.register_pipeline("pipe-1", "ws-1")
+        await bus.publish(_event(pipeline_id="pipe-1"))
+        await bus.publish(_event(pipeline_id="pipe-2"))
+        bus.release_pipeline("pipe-1")
+        await bus.publish(_event(pipeline_id="pipe-1"))
+        await bus.join()
+        assert received == ["pipe-1"]
+
+    @pytest.mark.asyncio
+    async def test_overlapping_topics_deliver_once(self, bus):
+        received = []
+
+        async def handler(event):
+            received.append(event)
+
+        bus.subscribe(handler, topics=[pipeline_topic("pipe-1"), WILDCARD])
+        await bus.publish(_event(pipeline_id="pipe-1"))
+        await bus.join()
+        assert len(received) == 1
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_removes_empty_topic_buckets(self, bus):
+        async def handler(event):
+            pass
+
+        bus.subscribe(handler, topics=[pipeline_topic("pipe-1")])
+        assert bus.has_subscribers(pipeline_topic("pipe-1"))
+        bus.unsubscribe(handler)
+        assert not bus.has_subscribers(pipeline_topic("pipe-1"))
+
+
+class TestOverflowPolicies:
+    @pytest.mark.asyncio
+    async def test_drop_oldest_keeps_newest(self, bus):
+        gate = asyncio.Event()
+        received = []
+
+        async def handler(event):
+            await gate.wait()
+            received.append(event.data["n"])
+
+        sub = bus.subscribe(handler, maxsize=2, policy=OverflowPolicy.DROP_OLDEST)
+        for n in range(5):
+            await bus.publish(_event(n=n))
+        await asyncio.sleep(0.05)
+        gate.set()
+        await bus.join()
+        # n=0 was already being handled; of the rest only the two newest survive
+        assert received == [0, 3, 4]
+        assert sub.dropped == 2
+
+    @pytest.mark.asyncio
+    async def test_coalesce_replaces_queued_event_with_same_key(self, bus):
+        gate = asyncio.Event()
+        received = []
+
+        async def handler(event):
+            await gate.wait()
+            received.append((event.event_type, event.data.get("n")))
+
+        bus.subscribe(handler, maxsize=10, policy=OverflowPolicy.COALESCE)
+        await bus.publish(_event("first"))
+        await asyncio.sleep(0.05)
+        for n in range(3):
+            await bus.publish(_event("progress", n=n))
+        await bus.publish(_event("other"))
+        await asyncio.sleep(0.05)
+        gate.set()
+        await bus.join()
+        assert received == [("first", None), ("progress", 2), ("other", None)]
+
+    @pytest.mark.asyncio
+    async def test_disconnect_closes_subscription_on_overflow(self, bus):
+        gate = asyncio.Event()
+
+        async def handler(event):
+            await gate.wait()
+
+        sub = bus.subscribe(handler, maxsize=1, policy=OverflowPolicy.DISCONNECT)
+        for _ in range(4):
+            await bus.publish(_event())
+        await asyncio.wait_for(sub.wait_closed(), timeout=1.0)
+        assert sub.closed
+        assert handler not in bus._subscriptions
+        gate.set()
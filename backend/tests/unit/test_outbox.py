@@ -0,0 +1,264 @@
+"""
+Unit tests for core/outbox.py — events committed with their state change, then relayed.
+Runs against a private in-memory SQLite engine holding only the event_outbox table.
+"""
+from __future__ import annotations
+
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.batcher import Acks
+from app.core.events import EventBus, PipelineEvent
+from app.core.outbox import OutboxRelay, stage_event
+from app.db.models import AgentDomain, AgentLevel, OutboxEvent, PipelineStatus, StageType
+
+
+def _event(event_type: str = "stage_started", pipeline_id: str = "pipe-1", **data):
+    return PipelineEvent(pipeline_id=pipeline_id, event_type=event_type, data=data)
+
+
+@pytest.fixture(autouse=True)
+def no_redis(monkeypatch):
+    # Keep the bus's replay buffer in-memory only
+    monkeypatch.setattr("app.core.redis_client._redis", None)
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def bus():
+    b = EventBus()
+    yield b
+    await b.close()
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(OutboxEvent.__table__.create)
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def factory():
+        async with maker() as session:
+            yield session
+
+    factory.maker = maker
+    yield factory
+    await engine.dispose()
+
+
+@pytest.fixture
+def relay(bus, session_factory, monkeypatch):
+    relay = OutboxRelay(bus=bus, session_factory=session_factory, batch_size=3,
+                        poll_interval_ms=10_000, ack_timeout_seconds=0.01)
+    monkeypatch.setattr("app.core.outbox._relay", relay)
+    return relay
+
+
+class _Sink:
+    """Takes events like the Kafka forwarder or the EventStore; tests settle the receipts."""
+
+    def __init__(self) -> None:
+        self.acks = Acks()
+        self.taken: list[str] = []
+
+    def enqueue(self, event: PipelineEvent) -> None:
+        self.taken.append(event.event_type)
+
+    async def append(self, event: PipelineEvent) -> None:
+        self.enqueue(event)
+
+
+@pytest.fixture
+def sinks(monkeypatch) -> tuple[_Sink, _Sink]:
+    kafka, store = _Sink(), _Sink()
+    monkeypatch.setattr("app.core.event_forwarder._forwarder", kafka)
+    monkeypatch.setattr("app.core.event_store._writer", store)
+    return kafka, store
+
+
+def _collect(bus) -> list[PipelineEvent]:
+    received: list[PipelineEvent] = []
+
+    async def handler(event):
+        received.append(event)
+
+    bus.subscribe(handler)
+    return received
+
+
+async def _rows(session_factory) -> list[OutboxEvent]:
+    async with session_factory.maker() as session:
+        return (await session.execute(select(OutboxEvent).order_by(OutboxEvent.id))).scalars().all()
+
+
+class TestStaging:
+    @pytest.mark.asyncio
+    async def test_events_are_only_relayed_once_committed(self, bus, relay, session_factory):
+        received = _collect(bus)
+        async with session_factory() as db:
+            stage_event(db, _event("doomed"))
+            await db.rollback()
+            stage_event(db, _event("stage_started", order=1))
+            stage_event(db, _event("stage_completed"))
+            await db.commit()
+
+        assert await relay.relay_once() == 2
+        await bus.join()
+        assert [e.event_type for e in received] == ["stage_started", "stage_completed"]
+        assert received[0].data == {"order": 1}
+        assert all(r.delivered_at is not None for r in await _rows(session_factory))
+        assert await relay.relay_once() == 0
+
+    @pytest.mark.asyncio
+    async def test_seq_follows_commit_order_not_delivery_order(self, bus, relay, session_factory):
+        received = _collect(bus)
+        async with session_factory() as db:
+            stage_event(db, _event("stage_started"))
+            await db.commit()
+        # Published directly before the relay got to run
+        await bus.publish(_event("agent_started"))
+        await relay.relay_once()
+        await bus.join()
+        assert [(e.event_type, e.seq) for e in received] == [
+            ("agent_started", 2), ("stage_started", 1),
+        ]
+        assert bus.replay.last_seq("pipe-1") == 2
+
+    @pytest.mark.asyncio
+    async def test_workspace_is_captured_when_staged(self, bus, relay, session_factory,
+                                                     monkeypatch):
+        monkeypatch.setattr(EventBus, "_instance", bus)
+        bus.register_pipeline("pipe-1", "ws-1")
+        async with session_factory() as db:
+            stage_event(db, _event())
+            await db.commit()
+        [row] = await _rows(session_factory)
+        assert row.payload["workspace_id"] == "ws-1"
+
+
+class TestRelay:
+    @pytest.mark.asyncio
+    async def test_batches_in_commit_order(self, bus, relay, session_factory):
+        received = _collect(bus)
+        async with session_factory() as db:
+            for n in range(5):
+                stage_event(db, _event("stage_progress", n=n))
+            await db.commit()
+        assert await relay.relay_once() == 3
+        assert await relay.relay_once() == 2
+        await bus.join()
+        assert [e.data["n"] for e in received] == [0, 1, 2, 3, 4]
+
+    @pytest.mark.asyncio
+    async def test_rows_are_delivered_once_every_sink_acknowledges(self, bus, relay, sinks,
+                                                                   session_factory):
+        kafka, store = sinks
+        received = _collect(bus)
+        async with session_factory() as db:
+            stage_event(db, _event("stage_started"))
+            stage_event(db, _event("stage_completed"))
+            await db.commit()
+        assert await relay.relay_once() == 0   # handed over, nothing acknowledged yet
+        started, completed = (r.event_id for r in await _rows(session_factory))
+
+        kafka.acks.settle([started, completed], True)
+        store.acks.settle([started], True)
+        store.acks.settle([completed], False)   # dropped: handed to the store again
+        assert await relay.relay_once() == 1
+        assert [r.delivered_at is not None for r in await _rows(session_factory)] == [True, False]
+
+        store.acks.settle([completed], True)
+        assert await relay.relay_once() == 1
+        assert all(r.delivered_at is not None for r in await _rows(session_factory))
+        await bus.join()
+        assert kafka.taken == ["stage_started", "stage_completed"]
+        assert store.taken == ["stage_started", "stage_completed", "stage_completed"]
+        assert [e.event_type for e in received] == ["stage_started", "stage_completed"]
+
+    @pytest.mark.asyncio
+    async def test_orphaned_rows_of_other_processes_are_adopted(self, bus, relay,
+                                                                session_factory):
+        received = _collect(bus)
+        now = datetime.utcnow()
+        async with session_factory.maker() as db:
+            for event_type, age in (("recent", 1), ("orphaned", 120)):
+                event = _event(event_type)
+                db.add(OutboxEvent(
+                    event_id=event.event_id, pipeline_id="pipe-1", event_type=event_type,
+                    payload={
+                        "pipeline_id": "pipe-1", "event_type": event_type, "data": {},
+                        "timestamp": event.timestamp.isoformat(), "event_id": event.event_id,
+                    },
+                    origin="other-pod", created_at=now - timedelta(seconds=age),
+                ))
+            await db.commit()
+        # The live process still owns its recent row
+        assert await relay.relay_once() == 1
+        await bus.join()
+        assert [e.event_type for e in received] == ["orphaned"]
+
+    @pytest.mark.asyncio
+    async def test_commit_wakes_the_running_relay(self, bus, relay, session_factory):
+        received = _collect(bus)
+        relay.start()
+        async with session_factory() as db:
+            stage_event(db, _event())
+            await db.commit()
+        for _ in range(100):
+            if received:
+                break
+            await asyncio.sleep(0.01)
+        await relay.stop()
+        assert [e.event_type for e in received] == ["stage_started"]
+
+    @pytest.mark.asyncio
+    async def test_prune_drops_old_delivered_rows(self, bus, relay, session_factory):
+        async with session_factory() as db:
+            stage_event(db, _event("old"))
+            stage_event(db, _event("new"))
+            await db.commit()
+        await relay.relay_once()
+        async with session_factory() as db:
+            old = (await db.execute(
+                select(OutboxEvent).where(OutboxEvent.event_type == "old")
+            )).scalar_one()
+            old.delivered_at -= timedelta(seconds=relay.retention_seconds + 1)
+            await db.commit()
+        assert await relay.prune() == 1
+        assert [r.event_type for r in await _rows(session_factory)] == ["new"]
+
+
+class TestEngine:
+    @pytest.mark.asyncio
+    async def test_stage_events_go_to_the_outbox_in_the_stage_transaction(self, relay):
+        from app.agents.pipeline_engine import PipelineStateMachine
+
+        db = MagicMock(commit=AsyncMock(), info={})
+        machine = PipelineStateMachine("pipe-1", db)
+        machine.event_bus = MagicMock(publish=AsyncMock())
+        stage = SimpleNamespace(
+            id=uuid.uuid4(), pipeline_id=uuid.uuid4(), stage_type=StageType.ARCHITECTURE,
+            agent_domain=AgentDomain.ARCHITECTURE, agent_level=AgentLevel.EXECUTION,
+            sequence=1, status=PipelineStatus.PENDING,
+        )
+        await machine._handle_stage_failure(
+            stage, SimpleNamespace(status=PipelineStatus.RUNNING), "LLM timeout"
+        )
+
+        machine.event_bus.publish.assert_not_awaited()
+        [row] = [c.args[0] for c in db.add.call_args_list]
+        assert row.event_type == "pipeline_failed"
+        assert row.payload["data"] == {"stage_type": StageType.ARCHITECTURE,
+                                       "error": "LLM timeout"}
+        assert [e.event_type for e in db.info["outbox_staged"]] == ["pipeline_failed"]
+        db.commit.assert_awaited_once()
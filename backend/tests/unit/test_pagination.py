@@ -0,0 +1,127 @@
+"""
+Unit tests for core/pagination.py — opaque cursors and keyset paging.
+"""
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import pytest_asyncio
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.pagination import cached_total, decode_cursor, encode_cursor, keyset_page
+from app.db.models import ApprovalRequest, Base, Pipeline
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def session():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, expire_on_commit=False)() as s:
+        yield s
+    await engine.dispose()
+
+
+async def _seed(session, project_id: uuid.UUID, n: int) -> list[Pipeline]:
+    base = datetime(2026, 1, 1)
+    # Pairs share a created_at, so ties must be broken by id
+    pipelines = [
+        Pipeline(project_id=project_id, triggered_by=project_id,
+                 created_at=base + timedelta(seconds=i // 2))
+        for i in range(n)
+    ]
+    session.add_all(pipelines)
+    await session.commit()
+    return pipelines
+
+
+class TestCursor:
+    def test_round_trip(self):
+        ts, row_id = datetime(2026, 3, 4, 5, 6, 7, 890), uuid.uuid4()
+        assert decode_cursor(encode_cursor(ts, row_id)) == (ts, row_id)
+
+    @pytest.mark.parametrize("cursor", ["garbage", "", encode_cursor.__name__])
+    def test_malformed_cursor_is_400(self, cursor):
+        with pytest.raises(HTTPException) as exc:
+            decode_cursor(cursor)
+        assert exc.value.status_code == 400
+
+
+class TestKeysetPage:
+    @pytest.mark.asyncio
+    async def test_pages_cover_every_row_once_newest_first(self, session):
+        project_id = uuid.uuid4()
+        await _seed(session, project_id, 11)
+        query = select(Pipeline).where(Pipeline.project_id == project_id)
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            rows, cursor = await keyset_page(
+                session, query, Pipeline.created_at, Pipeline.id, cursor, 4
+            )
+            pages += 1
+            seen.extend(rows)
+            if cursor is None:
+                break
+        assert pages == 3
+        assert len({p.id for p in seen}) == 11
+        keys = [(p.created_at, str(p.id)) for p in seen]
+        assert keys == sorted(keys, reverse=True)
+
+    @pytest.mark.asyncio
+    async def test_exact_fit_has_no_next_cursor(self, session):
+        project_id = uuid.uuid4()
+        await _seed(session, project_id, 4)
+        query = select(Pipeline).where(Pipeline.project_id == project_id)
+        rows, cursor = await keyset_page(session, query, Pipeline.created_at, Pipeline.id, None, 4)
+        assert len(rows) == 4 and cursor is None
+
+
+class TestListings:
+    @pytest.mark.asyncio
+    async def test_pending_approvals_carry_next_cursor_in_the_body(self, session):
+        from app.api.v1.pipelines import list_pending_approvals
+
+        some_id = uuid.uuid4()
+        session.add_all(
+            ApprovalRequest(stage_id=some_id, pipeline_id=some_id, requested_by=some_id,
+                            created_at=datetime(2026, 1, 1) + timedelta(seconds=i))
+            for i in range(3)
+        )
+        await session.commit()
+
+        first = await list_pending_approvals(some_id, None, 2, session)
+        assert len(first.items) == 2 and first.next_cursor
+        rest = await list_pending_approvals(some_id, first.next_cursor, 2, session)
+        assert len(rest.items) == 1 and rest.next_cursor is None
+        assert {a.id for a in first.items + rest.items} == {
+            a.id for a in (await session.execute(select(ApprovalRequest))).scalars()
+        }
+
+
+class TestCachedTotal:
+    @pytest.mark.asyncio
+    async def test_counts_and_caches(self, session, monkeypatch):
+        project_id = uuid.uuid4()
+        await _seed(session, project_id, 3)
+        redis = MagicMock(get=AsyncMock(return_value=None), set=AsyncMock())
+        monkeypatch.setattr("app.core.redis_client._redis", redis)
+
+        query = select(Pipeline).where(Pipeline.project_id == project_id)
+        assert await cached_total(session, query, "k") == 3
+        redis.set.assert_awaited_once()
+        redis.get = AsyncMock(return_value="42")
+        assert await cached_total(session, query, "k") == 42
+
+    @pytest.mark.asyncio
+    async def test_counts_without_redis(self, session, monkeypatch):
+        monkeypatch.setattr("app.core.redis_client._redis", None)
+        project_id = uuid.uuid4()
+        await _seed(session, project_id, 2)
+        query = select(Pipeline).where(Pipeline.project_id == project_id)
+        assert await cached_total(session, query, "k") == 2
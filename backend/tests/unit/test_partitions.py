@@ -0,0 +1,218 @@
+"""
+Unit tests for core/partitions.py — monthly partition maintenance and its SQLite fallback.
+"""
+from __future__ import annotations
+
+import re
+import uuid
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.partitions import (
+    PARTITIONED_TABLES,
+    PartitionMaintainer,
+    expired_months,
+    next_month,
+    partition_ddl,
+    partition_month,
+)
+from app.db.models import AuditAction, AuditLog, Base, EventStore
+
+AUDIT, EVENTS = PARTITIONED_TABLES
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def factory():
+        async with maker() as session:
+            yield session
+
+    yield factory
+    await engine.dispose()
+
+
+class TestPartitionLayout:
+    def test_months_roll_over_the_year(self):
+        assert next_month(date(2026, 12, 1)) == date(2027, 1, 1)
+        assert next_month(date(2026, 1, 1)) == date(2026, 2, 1)
+
+    def test_monthly_partition_ddl(self):
+        [create] = partition_ddl(AUDIT, date(2026, 12, 1))
+        assert create == (
+            "CREATE TABLE IF NOT EXISTS audit_logs_p202612 PARTITION OF audit_logs "
+            "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')"
+        )
+
+    def test_event_store_partitions_enforce_sequences(self):
+        create, unique = partition_ddl(EVENTS, None)
+        assert create.endswith("event_store_default PARTITION OF event_store DEFAULT")
+        assert unique == (
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_event_store_default_sequence "
+            "ON event_store_default (aggregate_id, sequence_number)"
+        )
+
+    def test_names_round_trip(self):
+        assert partition_month("audit_logs", "audit_logs_p202610") == date(2026, 10, 1)
+        assert partition_month("audit_logs", "audit_logs_default") is None
+        assert partition_month("audit_logs", "event_store_p202610") is None
+
+    def test_only_months_wholly_past_retention_expire(self, monkeypatch):
+        monkeypatch.setattr("app.core.config.settings.AUDIT_RETENTION_DAYS", 90)
+        names = ["audit_logs_default", "audit_logs_p202606", "audit_logs_p202607",
+                 "audit_logs_p202608"]
+        # Cutoff 2026-07-21: July still holds rows inside the 90 days
+        assert expired_months(names, AUDIT, date(2026, 10, 19)) == [date(2026, 6, 1)]
+
+    def test_zero_retention_keeps_everything(self, monkeypatch):
+        monkeypatch.setattr("app.core.config.settings.EVENT_STORE_RETENTION_DAYS", 0)
+        assert expired_months(["event_store_p200001"], EVENTS, date(2026, 10, 19)) == []
+
+
+class _FakePostgres:
+    """Session over a pretend PostgreSQL catalogue of audit_logs partitions.
+
+    Like PostgreSQL, it refuses to create a month while the attached DEFAULT
+    partition holds rows of that month. event_store has no partitions or rows.
+    """
+
+    def __init__(self, default_rows: list[datetime]) -> None:
+        self.bind = SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+        self.partitions: dict[str, list[datetime]] = {"audit_logs_default": default_rows}
+        self.default_attached = True
+        self.statements: list[str] = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def commit(self):
+        pass
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        self.statements.append(sql)
+        default = self.partitions["audit_logs_default"]
+        if params and "start" in params:
+            in_range = [t for t in default if params["start"] <= t < params["end"]]
+        if sql.startswith("SELECT pg_try_advisory_xact_lock"):
+            return SimpleNamespace(scalar=lambda: True)
+        if sql.startswith("SELECT c.relname"):
+            if params["table"] != "audit_logs":
+                return SimpleNamespace(all=lambda: [])
+            names = [(n,) for n in self.partitions
+                     if n != "audit_logs_default" or self.default_attached]
+            return SimpleNamespace(all=lambda: names)
+        if sql.startswith("SELECT 1 FROM"):
+            found = sql.startswith("SELECT 1 FROM audit_logs_default") and in_range
+            return SimpleNamespace(first=lambda: (1,) if found else None)
+        if created := re.match(r"CREATE TABLE IF NOT EXISTS (audit_logs_p(\d{4})(\d{2}))", sql):
+            start = datetime(int(created[2]), int(created[3]), 1)
+            end = datetime.combine(next_month(start.date()), datetime.min.time())
+            if self.default_attached and any(start <= t < end for t in default):
+                raise RuntimeError("updated partition constraint for default partition "
+                                   "would be violated by some row")
+            self.partitions.setdefault(created[1], [])
+        elif sql.startswith("ALTER TABLE audit_logs DETACH PARTITION audit_logs_default"):
+            self.default_attached = False
+        elif sql.startswith("ALTER TABLE audit_logs ATTACH PARTITION audit_logs_default"):
+            self.default_attached = True
+        elif sql.startswith("WITH moved AS"):
+            target = re.search(r"INSERT INTO (\w+)", sql)[1]
+            self.partitions[target] += in_range
+            self.partitions["audit_logs_default"] = [t for t in default if t not in in_range]
+            return SimpleNamespace(rowcount=len(in_range))
+        return SimpleNamespace(rowcount=0)
+
+
+class TestPostgresMaintenance:
+    @pytest.mark.asyncio
+    async def test_late_month_takes_over_rows_from_the_default(self, monkeypatch):
+        monkeypatch.setattr("app.core.config.settings.AUDIT_RETENTION_DAYS", 0)
+        # Written while November had no partition yet (the job ran late)
+        late = [datetime(2026, 11, 2, 8), datetime(2026, 11, 30, 23)]
+        db = _FakePostgres(default_rows=[datetime(2031, 1, 1), *late])
+
+        maintainer = PartitionMaintainer(session_factory=lambda: db, premake_months=1)
+        await maintainer.run_once(today=date(2026, 10, 19))
+
+        assert db.default_attached
+        assert db.partitions["audit_logs_p202610"] == []
+        assert db.partitions["audit_logs_p202611"] == late
+        assert db.partitions["audit_logs_default"] == [datetime(2031, 1, 1)]
+        # Only the month that needed it went through the detach / reattach
+        detaches = [s for s in db.statements if "DETACH PARTITION audit_logs_default" in s]
+        assert len(detaches) == 1
+
+    @pytest.mark.asyncio
+    async def test_existing_months_are_left_alone(self, monkeypatch):
+        monkeypatch.setattr("app.core.config.settings.AUDIT_RETENTION_DAYS", 0)
+        db = _FakePostgres(default_rows=[])
+        db.partitions["audit_logs_p202610"] = []
+
+        maintainer = PartitionMaintainer(session_factory=lambda: db, premake_months=0)
+        await maintainer.run_once(today=date(2026, 10, 19))
+
+        assert not any("audit_logs_p202610" in s for s in db.statements)
+
+
+class TestSqliteFallback:
+    @pytest.mark.asyncio
+    async def test_retention_is_applied_with_a_delete(self, session_factory, monkeypatch):
+        monkeypatch.setattr("app.core.config.settings.AUDIT_RETENTION_DAYS", 90)
+        monkeypatch.setattr("app.core.config.settings.EVENT_STORE_RETENTION_DAYS", 0)
+        now = datetime(2026, 10, 19, 12)
+        async with session_factory() as db:
+            for age in (1, 89, 91, 400):
+                db.add(AuditLog(action=AuditAction.CREATE, resource_type=f"age-{age}",
+                                timestamp=now - timedelta(days=age)))
+            db.add(EventStore(aggregate_id="p", aggregate_type="pipeline", event_type="x",
+                              event_data={}, sequence_number=1,
+                              occurred_at=now - timedelta(days=400)))
+            await db.commit()
+
+        maintainer = PartitionMaintainer(session_factory=session_factory)
+        assert await maintainer.run_once(today=now.date()) == {"audit_logs": 2, "event_store": 0}
+
+        async with session_factory() as db:
+            kept = (await db.execute(select(AuditLog.resource_type))).scalars().all()
+            assert sorted(kept) == ["age-1", "age-89"]
+            assert len((await db.execute(select(EventStore))).scalars().all()) == 1
+
+
+class TestAuditPagination:
+    @pytest.mark.asyncio
+    async def test_pages_and_time_bounds(self, session_factory):
+        from app.api.v1.routes import audit_log
+
+        start = datetime(2026, 9, 28)
+        async with session_factory() as db:
+            for day in range(6):
+                db.add(AuditLog(id=uuid.uuid4(), action=AuditAction.UPDATE,
+                                resource_type="projects", resource_id=str(day),
+                                timestamp=start + timedelta(days=day)))
+            await db.commit()
+
+        async with session_factory() as db:
+            seen, cursor = [], None
+            while True:
+                page = await audit_log(limit=2, cursor=cursor, event_type=None,
+                                       since=datetime(2026, 9, 29), until=datetime(2026, 10, 3),
+                                       db=db)
+                seen += [e["resource_id"] for e in page["events"]]
+                if not (cursor := page["next_cursor"]):
+                    break
+        assert seen == ["4", "3", "2", "1"]
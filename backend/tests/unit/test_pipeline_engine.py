@@ -0,0 +1,80 @@
+"""
+Unit tests for agents/pipeline_engine.py — stage execution and the events it publishes.
+The database session, agents and notifications are mocked.
+"""
+from __future__ import annotations
+
+import uuid
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.agents.pipeline_engine import PipelineStateMachine
+from app.db.models import AgentDomain, AgentLevel, PipelineStatus, StageType
+
+
+def _stage(stage_type: StageType, level: AgentLevel, sequence: int = 1) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=uuid.uuid4(), pipeline_id=uuid.uuid4(), stage_type=stage_type,
+        agent_domain=AgentDomain.ARCHITECTURE, agent_level=level, sequence=sequence,
+        status=PipelineStatus.PENDING, retry_count=0, rejection_reason=None,
+        agent_output=None, started_at=None, completed_at=None,
+    )
+
+
+@pytest.fixture
+def machine():
+    db = MagicMock()
+    db.commit = AsyncMock()
+    m = PipelineStateMachine("pipe-1", db)
+    m.event_bus = MagicMock(publish=AsyncMock())
+    m.notifications = MagicMock(
+        send_rejection_alert=AsyncMock(), send_failure_alert=AsyncMock()
+    )
+    return m
+
+
+def _published(machine) -> list[tuple[str, dict]]:
+    return [
+        (c.args[0].event_type, c.args[0].data) for c in machine.event_bus.publish.call_args_list
+    ]
+
+
+def _agent(output: dict | None = None, error: Exception | None = None) -> MagicMock:
+    agent = MagicMock()
+    agent.execute = AsyncMock(return_value=output, side_effect=error)
+    return agent
+
+
+class TestTerminalEvents:
+    @pytest.mark.asyncio
+    async def test_rejection_publishes_stage_rejected_and_pipeline_failed(self, machine):
+        stage = _stage(StageType.ARCHITECTURE_APPROVAL, AgentLevel.APPROVAL)
+        pipeline = SimpleNamespace(status=PipelineStatus.PENDING, stages=[stage])
+        project = SimpleNamespace(
+            name="p", requirements="", enabled_domains=[], deployment_enabled=False,
+            target_cloud="aws",
+        )
+        output = {"approved": False, "approval_notes": "missing threat model"}
+        with patch("app.agents.pipeline_engine.create_agent", return_value=_agent(output)):
+            await machine._run_stages(pipeline, project)
+
+        events = _published(machine)
+        kinds = [kind for kind, _ in events]
+        assert kinds == ["stage_started", "stage_rejected", "pipeline_failed"]
+        assert events[1][1]["reason"] == "missing threat model"
+        assert events[2][1]["error"] == "missing threat model"
+        assert pipeline.status == PipelineStatus.FAILED
+
+    @pytest.mark.asyncio
+    async def test_stage_failure_publishes_pipeline_failed(self, machine):
+        stage = _stage(StageType.ARCHITECTURE, AgentLevel.EXECUTION)
+        pipeline = SimpleNamespace(status=PipelineStatus.RUNNING)
+        await machine._handle_stage_failure(stage, pipeline, "LLM timeout")
+
+        assert _published(machine) == [
+            ("pipeline_failed", {"stage_type": StageType.ARCHITECTURE, "error": "LLM timeout"}),
+        ]
+        assert pipeline.status == PipelineStatus.FAILED
+        machine.notifications.send_failure_alert.assert_awaited_once()
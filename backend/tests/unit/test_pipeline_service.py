@@ -25,6 +25,14 @@ class TestPipelineService:
         session.get = AsyncMock()
         return session
 
+    @pytest.fixture(autouse=True)
+    def published(self):
+        """Approval events go to the EventBus; capture them instead."""
+        with patch(
+            "app.services.pipeline_service.publish_approval_event", new=AsyncMock()
+        ) as publish:
+            yield publish
+
     def _make_pipeline(self, status=PipelineStatus.RUNNING):
         p = MagicMock()
         p.id = uuid.uuid4()
@@ -151,6 +159,18 @@ class TestPipelineService:
         assert result.status == "rejected"
         assert result.decision == "rejected"
 
+    @pytest.mark.asyncio
+    async def test_decision_is_published(self, mock_session, published):
+        approval = self._make_approval(status="pending")
+        mock_session.get.side_effect = [approval, None]
+
+        from app.services.pipeline_service import PipelineService
+        await PipelineService(mock_session).approve(str(approval.id), "user-123")
+
+        published.assert_awaited_once_with(
+            mock_session, approval, "approval_decided", {"decision": "approved"}
+        )
+
     @pytest.mark.asyncio
     async def test_approve_already_decided_raises(self, mock_session):
         from fastapi import HTTPException
@@ -193,3 +213,37 @@ class TestPipelineService:
             await svc.get(str(uuid.uuid4()))
 
         assert exc_info.value.status_code == 404
+
+
+class TestApprovalEvents:
+    @pytest.mark.asyncio
+    async def test_published_unsequenced_and_tagged_with_workspace(self, monkeypatch):
+        from app.core.events import EventBus
+        from app.services.pipeline_service import publish_approval_event
+
+        monkeypatch.setattr("app.core.redis_client._redis", None)
+        bus = EventBus()
+        monkeypatch.setattr(EventBus, "_instance", bus)
+        received = []
+
+        async def handler(event):
+            received.append(event)
+
+        bus.subscribe(handler, topics=["approvals"])
+        workspace_id = str(uuid.uuid4())
+        approval = MagicMock(id=uuid.uuid4(), pipeline_id=uuid.uuid4(), stage_id=uuid.uuid4())
+        with patch(
+            "app.services.workspace_service.WorkspaceService.pipeline_workspace_id",
+            new=AsyncMock(return_value=workspace_id),
+        ):
+            await publish_approval_event(
+                MagicMock(), approval, "approval_decided", {"decision": "approved"}
+            )
+        await bus.join()
+
+        [event] = received
+        assert event.seq is None
+        assert event.workspace_id == workspace_id
+        assert event.data == {"approval_id": str(approval.id), "decision": "approved"}
+        assert bus.replay.last_seq(str(approval.pipeline_id)) == 0
+        await bus.close()
@@ -0,0 +1,157 @@
+"""
+Unit tests for core/projections.py — snapshots and projection rebuilds.
+Runs against a private in-memory SQLite engine holding only the event tables.
+"""
+from __future__ import annotations
+
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.projections import ProjectionEngine, decode_state
+from app.db.models import EventSnapshot, EventStore
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(EventStore.__table__.create)
+        await conn.run_sync(EventSnapshot.__table__.create)
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def factory():
+        async with maker() as session:
+            yield session
+            await session.commit()
+
+    yield factory
+    await engine.dispose()
+
+
+async def _append(session_factory, aggregate_id: str, events: list[tuple[str, dict]], start=1):
+    rows = [
+        {
+            "id": uuid.uuid4(),
+            "aggregate_id": aggregate_id,
+            "aggregate_type": "pipeline",
+            "event_type": event_type,
+            "event_data": data,
+            "sequence_number": start + i,
+            "occurred_at": datetime(2026, 1, 1),
+            "extra": {},
+        }
+        for i, (event_type, data) in enumerate(events)
+    ]
+    async with session_factory() as session:
+        await session.execute(insert(EventStore).values(rows))
+
+
+def _stage_events(n_stages: int) -> list[tuple[str, dict]]:
+    events = []
+    for i in range(n_stages):
+        stage = {"stage_id": f"s{i}", "stage_type": f"stage_{i}"}
+        events.append(("stage_started", stage))
+        events.append(("agent_started", {"stage_id": f"s{i}"}))
+        events.append(("stage_completed", {**stage, "status": "completed"}))
+    return events
+
+
+async def _snapshots(session_factory) -> list[tuple[str, int]]:
+    async with session_factory() as session:
+        result = await session.execute(
+            select(EventSnapshot.aggregate_id, EventSnapshot.sequence_number)
+            .order_by(EventSnapshot.aggregate_id)
+        )
+        return [tuple(r) for r in result.all()]
+
+
+class TestPipelineStateProjection:
+    @pytest.mark.asyncio
+    async def test_load_folds_all_events(self, session_factory):
+        await _append(session_factory, "pipe-1", [
+            *_stage_events(2), ("pipeline_completed", {"stage_id": None}),
+        ])
+        engine = ProjectionEngine(session_factory=session_factory, snapshot_every=100)
+        state, seq = await engine.load("pipe-1")
+        assert seq == 7
+        assert state["status"] == "completed"
+        assert state["agent_runs"] == 2
+        assert state["stages"]["s1"] == {
+            "attempts": 1, "stage_type": "stage_1", "status": "completed"
+        }
+
+    @pytest.mark.asyncio
+    async def test_rejection_and_failure_are_terminal(self, session_factory):
+        review = {"stage_id": "s1", "stage_type": "architecture_approval"}
+        await _append(session_factory, "pipe-1", [
+            *_stage_events(1),
+            ("stage_started", review),
+            ("stage_rejected", {**review, "reason": "missing threat model"}),
+            ("pipeline_failed", {**review, "error": "missing threat model"}),
+        ])
+        await _append(session_factory, "pipe-2", [
+            ("stage_started", {"stage_id": "s0", "stage_type": "architecture"}),
+            ("pipeline_failed", {"stage_id": "s0", "error": "LLM timeout"}),
+        ])
+        engine = ProjectionEngine(session_factory=session_factory, snapshot_every=100)
+
+        rejected, _ = await engine.load("pipe-1")
+        assert rejected["status"] == "failed"
+        assert rejected["error"] == "missing threat model"
+        assert rejected["completed_at"] is not None
+        assert rejected["stages"]["s1"]["status"] == "rejected"
+        assert rejected["stages"]["s1"]["reason"] == "missing threat model"
+
+        failed, _ = await engine.load("pipe-2")
+        assert failed["status"] == "failed"
+        assert failed["error"] == "LLM timeout"
+        assert failed["stages"]["s0"]["status"] == "failed"
+
+    @pytest.mark.asyncio
+    async def test_snapshot_taken_and_tail_applied_on_top(self, session_factory):
+        await _append(session_factory, "pipe-1", _stage_events(2))          # seq 1..6
+        engine = ProjectionEngine(session_factory=session_factory, snapshot_every=5)
+        await engine.load("pipe-1")
+        assert await _snapshots(session_factory) == [("pipe-1", 6)]
+
+        await _append(session_factory, "pipe-1", [("agent_failed", {})], start=7)
+        state, seq = await engine.load("pipe-1")
+        assert seq == 7
+        assert state["agent_failures"] == 1
+        assert state["agent_runs"] == 2           # folded from the snapshot
+        # One-event tail is below the interval: snapshot unchanged
+        assert await _snapshots(session_factory) == [("pipe-1", 6)]
+
+    @pytest.mark.asyncio
+    async def test_new_snapshot_replaces_older(self, session_factory):
+        await _append(session_factory, "pipe-1", _stage_events(2))
+        engine = ProjectionEngine(session_factory=session_factory, snapshot_every=3)
+        await engine.load("pipe-1")
+        await _append(session_factory, "pipe-1", _stage_events(1), start=7)
+        await engine.load("pipe-1")
+        assert await _snapshots(session_factory) == [("pipe-1", 9)]
+
+    @pytest.mark.asyncio
+    async def test_rebuild_all_processes_every_aggregate(self, session_factory):
+        for n in range(7):
+            await _append(session_factory, f"pipe-{n}", _stage_events(n + 1))
+        engine = ProjectionEngine(session_factory=session_factory, snapshot_every=6)
+        stats = await engine.rebuild_all(batch_size=3, concurrency=2)
+        assert stats.aggregates == 7
+        assert stats.events == sum(3 * (n + 1) for n in range(7))
+        assert stats.snapshots == 6   # pipe-0 has only 3 events
+
+        async with session_factory() as session:
+            result = await session.execute(
+                select(EventSnapshot).where(EventSnapshot.aggregate_id == "pipe-6")
+            )
+            snapshot = result.scalar_one()
+        assert snapshot.sequence_number == 21
+        assert decode_state(snapshot.state)["agent_runs"] == 7
@@ -0,0 +1,103 @@
+"""
+Query-count regression tests — listing endpoints must not issue one query
+per returned row.
+"""
+from __future__ import annotations
+
+import uuid
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api.v1.projects import get_project, list_projects
+from app.api.v1.workspaces import get_workspace, list_workspaces
+from app.db.models import Base, Pipeline, Project, Workspace, WorkspaceMember
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def engine():
+    eng = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with eng.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield eng
+    await eng.dispose()
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def session(engine):
+    async with async_sessionmaker(engine, expire_on_commit=False)() as s:
+        yield s
+
+
+def _workspace(owner_id: uuid.UUID, n: int) -> Workspace:
+    return Workspace(owner_id=owner_id, name=f"ws-{n}", slug=f"ws-{uuid.uuid4().hex[:8]}")
+
+
+class TestListingQueryCounts:
+    @pytest.mark.asyncio
+    async def test_list_workspaces(self, engine, session, assert_no_n_plus_one):
+        state: dict = {}
+
+        async def seed(n: int) -> None:
+            user_id = state["user"] = uuid.uuid4()
+            for i in range(n):
+                ws = _workspace(uuid.uuid4() if i % 2 else user_id, i)
+                session.add(ws)
+                await session.flush()
+                if i % 2:   # member, not owner
+                    session.add(WorkspaceMember(workspace_id=ws.id, user_id=user_id))
+                session.add(Project(workspace_id=ws.id, name="p", created_by=user_id))
+            await session.commit()
+
+        async def call() -> None:
+            state["result"] = await list_workspaces(state["user"], session)
+
+        await assert_no_n_plus_one(engine, seed, call)
+        assert len(state["result"]) == 10
+        assert {ws.project_count for ws in state["result"]} == {1}
+
+    @pytest.mark.asyncio
+    async def test_list_projects(self, engine, session, assert_no_n_plus_one):
+        state: dict = {}
+        user_id = uuid.uuid4()
+
+        async def seed(n: int) -> None:
+            ws = _workspace(user_id, n)
+            session.add(ws)
+            await session.flush()
+            state["workspace"] = ws.id
+            for i in range(n):
+                project = Project(workspace_id=ws.id, name=f"p{i}", created_by=user_id)
+                session.add(project)
+                await session.flush()
+                for _ in range(i % 3):
+                    session.add(Pipeline(project_id=project.id, triggered_by=user_id))
+            await session.commit()
+
+        async def call() -> None:
+            state["result"] = await list_projects(state["workspace"], user_id, session)
+
+        await assert_no_n_plus_one(engine, seed, call)
+        assert [p.pipeline_count for p in state["result"]] == [i % 3 for i in range(10)]
+
+    @pytest.mark.asyncio
+    async def test_single_reads_count_in_the_same_query(self, engine, session):
+        from tests.unit.conftest import count_queries
+
+        user_id = uuid.uuid4()
+        ws = _workspace(user_id, 0)
+        session.add(ws)
+        await session.flush()
+        project = Project(workspace_id=ws.id, name="p", created_by=user_id)
+        session.add(project)
+        await session.flush()
+        session.add_all([Pipeline(project_id=project.id, triggered_by=user_id) for _ in range(2)])
+        await session.commit()
+
+        with count_queries(engine) as counter:
+            workspace = await get_workspace(ws.id, user_id, session)
+            proj = await get_project(project.id, user_id, session)
+        assert counter.count == 2
+        assert workspace.project_count == 1
+        assert proj.pipeline_count == 2
@@ -0,0 +1,161 @@
+"""
+Unit tests for core/replay.py — per-pipeline seq numbers and WebSocket resume.
+Redis is switched off here, except for the stream fallback tests, which use a
+minimal in-memory stand-in for the replay stream.
+"""
+from __future__ import annotations
+
+import json
+
+import pytest
+import pytest_asyncio
+
+from app.core.events import EventBus, PipelineEvent
+from app.core.replay import ReplayBuffer
+
+
+def _event(event_type: str = "agent_started", pipeline_id: str = "pipe-1", **kw):
+    return PipelineEvent(pipeline_id=pipeline_id, event_type=event_type, data={}, **kw)
+
+
+@pytest.fixture(autouse=True)
+def no_redis(monkeypatch):
+    monkeypatch.setattr("app.core.redis_client._redis", None)
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def bus():
+    b = EventBus()
+    yield b
+    await b.close()
+
+
+class TestReplayBuffer:
+    @pytest.mark.asyncio
+    async def test_publish_assigns_monotonic_seq_per_pipeline(self, bus):
+        events = [_event(), _event(pipeline_id="pipe-2"), _event(), _event()]
+        for event in events:
+            await bus.publish(event)
+        assert [e.seq for e in events] == [1, 1, 2, 3]
+        assert bus.replay.last_seq("pipe-1") == 3
+
+    @pytest.mark.asyncio
+    async def test_since_returns_only_missed_events(self, bus):
+        for _ in range(5):
+            await bus.publish(_event())
+        missed = await bus.replay.since("pipe-1", 3)
+        assert [m["seq"] for m in missed] == [4, 5]
+        assert await bus.replay.since("pipe-1", 5) == []
+
+    @pytest.mark.asyncio
+    async def test_since_is_none_when_buffer_no_longer_reaches_back(self, bus):
+        bus.replay.maxlen = 3
+        bus.replay._pipelines.clear()
+        for _ in range(6):
+            await bus.publish(_event())
+        assert [m["seq"] for m in await bus.replay.since("pipe-1", 3)] == [4, 5, 6]
+        assert await bus.replay.since("pipe-1", 2) is None
+
+    @pytest.mark.asyncio
+    async def test_snapshot_folds_pipeline_state(self, bus):
+        await bus.publish(PipelineEvent(
+            pipeline_id="pipe-1", event_type="stage_started", stage_id="s1",
+            data={"stage_type": "architecture", "order": 1},
+        ))
+        await bus.publish(_event())
+        snapshot = await bus.replay.snapshot("pipe-1")
+        assert snapshot["type"] == "snapshot"
+        assert snapshot["seq"] == 2
+        assert snapshot["state"]["status"] == "running"
+        assert snapshot["state"]["current_stage"] == "architecture"
+        assert snapshot["state"]["agent_runs"] == 1
+
+    @pytest.mark.asyncio
+    async def test_bridged_events_keep_their_origin_seq(self, bus):
+        await bus.publish(_event(origin="other-pod", seq=41))
+        await bus.publish(_event(origin="other-pod", seq=42))
+        assert bus.replay.last_seq("pipe-1") == 42
+        assert [m["seq"] for m in await bus.replay.since("pipe-1", 41)] == [42]
+        # Joined mid-stream: the in-memory fold is incomplete, so it is not trusted
+        assert not bus.replay._pipelines["pipe-1"].complete
+
+    @pytest.mark.asyncio
+    async def test_running_pipeline_is_never_evicted(self):
+        bus = EventBus()
+        bus.replay.max_pipelines = 2
+        bus.register_pipeline("running", "ws-1")
+        await bus.publish(_event(pipeline_id="running"))
+        for n in range(5):
+            await bus.publish(_event(pipeline_id=f"finished-{n}"))
+
+        assert "running" in bus.replay._pipelines
+        assert len(bus.replay._pipelines) == 2
+        running = _event(pipeline_id="running")
+        await bus.publish(running)
+        assert running.seq == 2   # not restarted at 1
+
+        bus.release_pipeline("running")
+        for n in range(2):
+            await bus.publish(_event(pipeline_id=f"later-{n}"))
+        assert "running" not in bus.replay._pipelines
+        await bus.close()
+
+
+class _FakeStreamRedis:
+    """Just enough of redis.asyncio for ReplayBuffer.since(): XRANGE/XREVRANGE in a MULTI."""
+
+    def __init__(self, seqs: list[int]) -> None:
+        self.entries = [
+            (f"{seq}-0", {"m": json.dumps({"type": "agent_started", "seq": seq})})
+            for seq in seqs
+        ]
+        self.calls: list[tuple] = []
+
+    def pipeline(self, transaction: bool = True):
+        return self
+
+    def xrange(self, key, min="-", count=None):
+        start = int(min.split("-")[0])
+        self.calls.append([e for e in self.entries if int(e[0].split("-")[0]) >= start][:count])
+
+    def xrevrange(self, key, count=None):
+        self.calls.append(list(reversed(self.entries))[:count])
+
+    async def execute(self):
+        results, self.calls = self.calls, []
+        return results
+
+
+class TestReplayStreamFallback:
+    @pytest.fixture
+    def stream(self, monkeypatch):
+        def install(seqs):
+            fake = _FakeStreamRedis(seqs)
+            monkeypatch.setattr("app.core.redis_client._redis", fake)
+            return fake
+        return install
+
+    @pytest.mark.asyncio
+    async def test_range_reaching_the_tail_is_replayed(self, stream):
+        stream(range(1, 11))
+        replay = ReplayBuffer(maxlen=3)
+        assert [m["seq"] for m in await replay.since("pipe-1", 7)] == [8, 9, 10]
+        assert await replay.since("pipe-1", 10) == []
+
+    @pytest.mark.asyncio
+    async def test_untrimmed_stream_longer_than_maxlen_is_a_gap(self, stream):
+        # MAXLEN ~ left 10 entries behind a limit of 3: XRANGE COUNT 3 stops at seq 5
+        stream(range(1, 11))
+        assert await ReplayBuffer(maxlen=3).since("pipe-1", 2) is None
+
+    @pytest.mark.asyncio
+    async def test_trimmed_head_or_hole_is_a_gap(self, stream):
+        stream([5, 6, 7])
+        assert await ReplayBuffer(maxlen=10).since("pipe-1", 2) is None
+        stream([3, 4, 6, 7])
+        assert await ReplayBuffer(maxlen=10).since("pipe-1", 2) is None
+
+    @pytest.mark.asyncio
+    async def test_missing_stream_defers_to_snapshot(self, stream):
+        stream([])
+        assert await ReplayBuffer().since("pipe-1", 4) is None
@@ -0,0 +1,172 @@
+"""
+Unit tests for replica read routing and read-your-writes pins (core/replicas.py).
+"""
+from __future__ import annotations
+
+import time
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from starlette.requests import Request
+
+from app.core import database
+from app.core.replicas import Replica, ReplicaRouter, WritePin, consistency_key
+
+
+def _request(method: str = "GET", token: str | None = "token-a") -> Request:
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return Request({"type": "http", "method": method, "path": "/", "headers": headers})
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def engines():
+    made = [create_async_engine("sqlite+aiosqlite:///:memory:") for _ in range(3)]
+    yield made
+    for engine in made:
+        await engine.dispose()
+
+
+def _sessions(engine) -> async_sessionmaker:
+    return async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture
+def router(engines):
+    primary, one, two = engines
+    return ReplicaRouter(
+        _sessions(primary),
+        [Replica("one", _sessions(one)), Replica("two", _sessions(two))],
+        max_lag_s=5.0, eject_after=2, probe_interval_s=60, probe_timeout_s=1.0, pin_seconds=10,
+    )
+
+
+class _Unreachable:
+    """Stands in for a sessionmaker whose database is down."""
+
+    def __call__(self):
+        raise ConnectionRefusedError("replica down")
+
+
+class TestChoose:
+    def test_weight_prefers_current_fast_replicas(self, router):
+        current, lagging = router.replicas
+        current.latency_s, lagging.latency_s = 0.002, 0.002
+        lagging.lag_s = 4.0
+        assert current.weight == pytest.approx(5 * lagging.weight)
+        lagging.lag_s, lagging.latency_s = 0.0, 0.02
+        assert current.weight == pytest.approx(10 * lagging.weight)
+
+    def test_unhealthy_replicas_get_no_reads(self, router):
+        router.replicas[0].healthy = False
+        assert {router.choose() for _ in range(20)} == {router.replicas[1]}
+        router.replicas[1].healthy = False
+        assert router.choose() is None
+
+    def test_pinned_reads_need_a_replica_that_has_caught_up(self, router):
+        behind, ahead = router.replicas
+        behind.replay_lsn, ahead.replay_lsn = 50, 150
+        pin = WritePin(lsn=100, expires=time.monotonic() + 10)
+        assert {router.choose(pin) for _ in range(20)} == {ahead}
+        ahead.replay_lsn = 90
+        assert router.choose(pin) is None
+
+    def test_pin_without_lsn_reads_from_the_primary(self, router):
+        for replica in router.replicas:
+            replica.replay_lsn = 10**9
+        assert router.choose(WritePin(lsn=None, expires=time.monotonic() + 10)) is None
+
+
+class TestProbe:
+    @pytest.mark.asyncio
+    async def test_probe_measures_check_out_latency(self, router):
+        await router.probe()
+        for replica in router.replicas:
+            assert replica.healthy and replica.latency_s > 0 and replica.failures == 0
+
+    @pytest.mark.asyncio
+    async def test_failing_replica_is_ejected_and_readmitted(self, router):
+        down = router.replicas[0]
+        working = down.sessionmaker
+        down.sessionmaker = _Unreachable()
+        await router.probe()
+        assert down.healthy and down.failures == 1      # one blip is tolerated
+        await router.probe()
+        assert not down.healthy
+
+        down.sessionmaker = working
+        await router.probe()
+        assert down.healthy and down.failures == 0
+
+    @pytest.mark.asyncio
+    async def test_lagging_replica_is_ejected_until_it_catches_up(self, router):
+        states = AsyncMock(side_effect=[(10, 30.0), (10, 0.0), (20, 1.0), (20, 0.0)])
+        with patch.object(ReplicaRouter, "_replication_state", states):
+            await router.probe()
+            lagging, current = router.replicas
+            assert not lagging.healthy and lagging.lag_s == 30.0
+            assert current.healthy
+            await router.probe()
+        assert lagging.healthy and lagging.replay_lsn == 20
+
+
+class TestReadYourWrites:
+    def test_consistency_key_follows_the_bearer_token(self):
+        assert consistency_key(_request(token="a")) == consistency_key(_request(token="a"))
+        assert consistency_key(_request(token="a")) != consistency_key(_request(token="b"))
+        assert consistency_key(_request(token=None)) is None
+
+    @pytest.mark.asyncio
+    async def test_write_pins_reads_to_the_primary(self, router):
+        key = consistency_key(_request())
+        async with router.primary() as db:
+            await router.record_write(key, db)
+        pin = await router.pin_for(key)
+        assert pin is not None and pin.lsn is None    # SQLite reports no WAL position
+        assert router.choose(pin) is None
+
+    @pytest.mark.asyncio
+    async def test_expired_pin_is_forgotten(self, router):
+        router._remember("k", WritePin(lsn=None, expires=time.monotonic() - 1))
+        assert await router.pin_for("k") is None
+        assert "k" not in router._pins
+
+    @pytest.mark.asyncio
+    async def test_pin_written_by_another_pod_is_read_from_redis(self, router):
+        with patch("app.core.replicas.cache_get", AsyncMock(return_value="123")):
+            pin = await router.pin_for("k")
+        assert pin.lsn == 123
+
+
+class TestSessionDependencies:
+    @pytest.mark.asyncio
+    async def test_write_then_read_goes_to_the_primary(self, router, engines, monkeypatch):
+        primary, one, _ = engines
+        async with primary.begin() as conn:
+            await conn.execute(text("CREATE TABLE t (db TEXT)"))
+            await conn.execute(text("INSERT INTO t VALUES ('primary')"))
+        async with one.begin() as conn:
+            await conn.execute(text("CREATE TABLE t (db TEXT)"))
+            await conn.execute(text("INSERT INTO t VALUES ('replica')"))
+        router.replicas[1].healthy = False
+        monkeypatch.setattr(database, "_router", router)
+        monkeypatch.setattr(database, "_WriteSession", router.primary)
+
+        async def read(request) -> str:
+            deps = database.get_read_db(request)
+            db = await deps.__anext__()
+            value = (await db.execute(text("SELECT db FROM t"))).scalar_one()
+            await deps.aclose()
+            return value
+
+        assert await read(_request()) == "replica"
+
+        deps = database.get_write_db(_request("POST"))
+        await deps.__anext__()
+        with pytest.raises(StopAsyncIteration):
+            await deps.__anext__()
+
+        assert await read(_request()) == "primary"
+        assert await read(_request(token="someone-else")) == "replica"
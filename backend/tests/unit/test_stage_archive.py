@@ -0,0 +1,195 @@
+"""
+Unit tests for hot/cold tiering of stage payloads (services/stage_archive_service.py).
+"""
+from __future__ import annotations
+
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.blob_store import LocalBlobStore
+from app.db.models import (
+    AgentDomain,
+    AgentLevel,
+    ArtifactBlob,
+    Base,
+    Pipeline,
+    PipelineStage,
+    PipelineStatus,
+    StageType,
+)
+from app.services.stage_archive_service import StageArchiver, StageArchiveService
+
+OUTPUT = {"files": {"main.py": "print('hello')\n" * 200}}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = LocalBlobStore(tmp_path / "blobs")
+    monkeypatch.setattr("app.core.blob_store._store", store)
+    return store
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def session():
+        async with sessions() as db:
+            yield db
+
+    yield session
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def db(factory):
+    async with factory() as session:
+        yield session
+
+
+async def _pipeline(db, status: PipelineStatus, age_days: int, output=OUTPUT) -> uuid.UUID:
+    finished = datetime.utcnow() - timedelta(days=age_days)
+    pipeline = Pipeline(
+        project_id=uuid.uuid4(), triggered_by=uuid.uuid4(), status=status,
+        created_at=finished, completed_at=finished,
+    )
+    db.add(pipeline)
+    await db.flush()
+    db.add(PipelineStage(
+        pipeline_id=pipeline.id, stage_type=StageType.DEVELOPMENT,
+        agent_domain=AgentDomain.DEVELOPMENT, agent_level=AgentLevel.EXECUTION,
+        sequence=4, status=PipelineStatus.COMPLETED,
+        agent_output=output, input_data={"requirements": "todo app"}, output_data={},
+    ))
+    await db.commit()
+    return pipeline.id
+
+
+async def _stages(db, pipeline_id: uuid.UUID) -> list[PipelineStage]:
+    db.expire_all()
+    result = await db.execute(
+        select(PipelineStage).where(PipelineStage.pipeline_id == pipeline_id)
+    )
+    return list(result.scalars().all())
+
+
+async def _ref_count(db, checksum: str) -> int | None:
+    result = await db.execute(
+        select(ArtifactBlob.ref_count).where(ArtifactBlob.checksum == checksum)
+    )
+    return result.scalar_one_or_none()
+
+
+class TestStageArchiveService:
+    @pytest.mark.asyncio
+    async def test_archives_only_old_terminal_pipelines(self, db, store):
+        old = await _pipeline(db, PipelineStatus.COMPLETED, age_days=40)
+        recent = await _pipeline(db, PipelineStatus.COMPLETED, age_days=5)
+        running = await _pipeline(db, PipelineStatus.RUNNING, age_days=40)
+
+        assert await StageArchiveService(db).archive_batch(older_than_days=30) == 1
+
+        (stage,) = await _stages(db, old)
+        assert stage.agent_output is None and stage.input_data is None
+        assert stage.payload_checksum is not None
+        assert await store.exists(stage.payload_checksum)
+        assert (await db.get(Pipeline, old)).archived_at is not None
+        for pipeline in (recent, running):
+            (hot,) = await _stages(db, pipeline)
+            assert hot.payload_checksum is None and hot.agent_output == OUTPUT
+
+        # Nothing left to do on the next pass
+        assert await StageArchiveService(db).archive_batch(older_than_days=30) == 0
+
+    @pytest.mark.asyncio
+    async def test_payload_is_rehydrated_on_access(self, db, store):
+        pipeline = await _pipeline(db, PipelineStatus.FAILED, age_days=40)
+        service = StageArchiveService(db)
+        await service.archive_batch(older_than_days=30)
+
+        (stage,) = await _stages(db, pipeline)
+        payload = await service.payload(stage)
+        assert payload["agent_output"] == OUTPUT
+        assert payload["input_data"] == {"requirements": "todo app"}
+        assert payload["review_output"] is None
+        assert stage.agent_output is None   # read through, not written back
+
+    @pytest.mark.asyncio
+    async def test_identical_payloads_share_a_blob(self, db, store):
+        first = await _pipeline(db, PipelineStatus.COMPLETED, age_days=40)
+        second = await _pipeline(db, PipelineStatus.REJECTED, age_days=40)
+        await StageArchiveService(db).archive_batch(older_than_days=30)
+
+        checksums = [stage.payload_checksum
+                     for pipeline in (first, second) for stage in await _stages(db, pipeline)]
+        assert checksums[0] is not None and checksums[0] == checksums[1]
+        assert await _ref_count(db, checksums[0]) == 2
+
+    @pytest.mark.asyncio
+    async def test_restore_moves_payloads_back_and_releases_the_blob(self, db, store):
+        pipeline = await _pipeline(db, PipelineStatus.FAILED, age_days=40)
+        service = StageArchiveService(db)
+        await service.archive_batch(older_than_days=30)
+        (stage,) = await _stages(db, pipeline)
+        checksum = stage.payload_checksum
+
+        await service.restore(await db.get(Pipeline, pipeline))
+        await db.commit()
+
+        (stage,) = await _stages(db, pipeline)
+        assert stage.payload_checksum is None
+        assert stage.agent_output == OUTPUT
+        assert (await db.get(Pipeline, pipeline)).archived_at is None
+        assert await _ref_count(db, checksum) == 0
+
+
+class TestStageArchiveRoutes:
+    @pytest.mark.asyncio
+    async def test_payload_endpoint_reads_archived_stages(self, db, store):
+        from app.api.v1.pipelines import get_stage_payload
+
+        pipeline = await _pipeline(db, PipelineStatus.COMPLETED, age_days=40)
+        await StageArchiveService(db).archive_batch(older_than_days=30)
+        (stage,) = await _stages(db, pipeline)
+
+        read = await get_stage_payload(pipeline, stage.id, uuid.uuid4(), db)
+        assert read.archived is True
+        assert read.agent_output == OUTPUT
+
+    @pytest.mark.asyncio
+    async def test_retry_restores_archived_stages(self, db, store):
+        from app.api.v1.pipelines import retry_pipeline
+
+        pipeline = await _pipeline(db, PipelineStatus.FAILED, age_days=40)
+        await StageArchiveService(db).archive_batch(older_than_days=30)
+
+        with patch("app.api.v1.pipelines._run_pipeline", new=AsyncMock()):
+            read = await retry_pipeline(pipeline, uuid.uuid4(), db)
+
+        assert read.status == PipelineStatus.PENDING
+        (stage,) = await _stages(db, pipeline)
+        assert stage.payload_checksum is None and stage.agent_output == OUTPUT
+
+
+class TestStageArchiver:
+    @pytest.mark.asyncio
+    async def test_run_once_drains_every_batch(self, factory, db, store):
+        pipelines = [await _pipeline(db, PipelineStatus.COMPLETED, age_days=40)
+                     for _ in range(5)]
+
+        archiver = StageArchiver(factory, after_days=30, batch_size=2, interval_seconds=60)
+        assert await archiver.run_once() == 5
+        for pipeline in pipelines:
+            (stage,) = await _stages(db, pipeline)
+            assert stage.payload_checksum is not None
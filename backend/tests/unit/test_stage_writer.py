@@ -0,0 +1,174 @@
+"""
+Unit tests for agents/stage_writer.py — write-behind persistence of stage results.
+"""
+from __future__ import annotations
+
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.agents.stage_writer import StageResult, StageResultWriter, StageWriteError
+from app.db.models import (
+    AgentDomain,
+    AgentLevel,
+    Artifact,
+    ArtifactType,
+    Base,
+    PipelineStage,
+    PipelineStatus,
+    StageType,
+)
+
+PIPELINE_ID = uuid.uuid4()
+
+
+@pytest.fixture(autouse=True)
+def no_blob_store(monkeypatch):
+    monkeypatch.setattr("app.core.blob_store._store", None)
+    monkeypatch.setattr("app.core.config.settings.BLOB_STORE_BACKEND", "none")
+
+
+@pytest_asyncio.fixture(loop_scope="function")
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def factory():
+        async with maker() as session:
+            yield session
+
+    factory.maker = maker
+    yield factory
+    await engine.dispose()
+
+
+async def _stages(session_factory, *stage_types: StageType) -> list[PipelineStage]:
+    async with session_factory() as db:
+        stages = [
+            PipelineStage(
+                pipeline_id=PIPELINE_ID, stage_type=stage_type,
+                agent_domain=AgentDomain.ARCHITECTURE, agent_level=AgentLevel.EXECUTION,
+                sequence=n,
+            )
+            for n, stage_type in enumerate(stage_types, start=1)
+        ]
+        db.add_all(stages)
+        await db.commit()
+        return stages
+
+
+def _result(stage: PipelineStage, output: dict) -> StageResult:
+    return StageResult(
+        stage.id, stage.stage_type, output, PipelineStatus.COMPLETED, datetime(2026, 1, 1),
+    )
+
+
+class TestStageResultWriter:
+    @pytest.mark.asyncio
+    async def test_results_are_persisted_in_order_with_their_events(self, session_factory):
+        arch, review = await _stages(
+            session_factory, StageType.ARCHITECTURE, StageType.ARCHITECTURE_REVIEW
+        )
+        bus = MagicMock(publish=AsyncMock())
+        writer = StageResultWriter(str(PIPELINE_ID), bus, session_factory)
+        writer.submit(_result(arch, {"design": "v1"}))
+        writer.submit(_result(review, {"ok": True}))
+        assert writer.pending == 2
+        await writer.flush()
+
+        assert writer.pending == 0 and writer.written == 2
+        async with session_factory() as db:
+            rows = (await db.execute(select(PipelineStage).order_by(PipelineStage.sequence)))
+            assert [(s.status, s.agent_output) for s in rows.scalars()] == [
+                (PipelineStatus.COMPLETED, {"design": "v1"}),
+                (PipelineStatus.COMPLETED, {"ok": True}),
+            ]
+            [artifact] = (await db.execute(select(Artifact))).scalars()
+            assert artifact.artifact_type == ArtifactType.ARCHITECTURE_DOC
+        assert [
+            (c.args[0].event_type, c.args[0].stage_id) for c in bus.publish.call_args_list
+        ] == [("stage_completed", str(arch.id)), ("stage_completed", str(review.id))]
+
+    @pytest.mark.asyncio
+    async def test_a_failed_write_surfaces_at_the_barrier(self, session_factory):
+        [arch] = await _stages(session_factory, StageType.ARCHITECTURE)
+        writer = StageResultWriter(str(PIPELINE_ID), MagicMock(publish=AsyncMock()),
+                                   session_factory)
+        missing = SimpleNamespace(id=uuid.uuid4(), stage_type=StageType.DEVELOPMENT)
+        writer.submit(_result(missing, {}))
+        writer.submit(_result(arch, {}))
+        with pytest.raises(StageWriteError):
+            await writer.flush()
+        with pytest.raises(StageWriteError):
+            writer.submit(_result(arch, {}))
+        await writer.close()   # logs, does not raise
+        async with session_factory() as db:
+            assert (await db.get(PipelineStage, arch.id)).status == PipelineStatus.PENDING
+
+
+class TestEngineOverlap:
+    @pytest.mark.asyncio
+    async def test_next_agent_runs_while_the_previous_result_is_written(self):
+        from app.agents.pipeline_engine import PipelineStateMachine
+
+        db = MagicMock(commit=AsyncMock())
+        machine = PipelineStateMachine(str(PIPELINE_ID), db)
+        machine.event_bus = MagicMock(publish=AsyncMock())
+        order: list[str] = []
+        written = asyncio.Event()
+
+        async def slow_write(batch):
+            order.append("write_started")
+            await written.wait()
+            order.append("write_done")
+
+        machine.results = StageResultWriter(str(PIPELINE_ID), machine.event_bus)
+        machine.results._write = slow_write
+
+        async def approve(context):
+            # Only reachable if the engine did not wait for the write
+            order.append("approval_agent")
+            written.set()
+            return {"approved": True}
+
+        arch = PipelineStage(
+            id=uuid.uuid4(), pipeline_id=PIPELINE_ID, stage_type=StageType.ARCHITECTURE,
+            agent_domain=AgentDomain.ARCHITECTURE, agent_level=AgentLevel.EXECUTION, sequence=1,
+        )
+        approval = PipelineStage(
+            id=uuid.uuid4(), pipeline_id=PIPELINE_ID,
+            stage_type=StageType.ARCHITECTURE_APPROVAL, agent_domain=AgentDomain.ARCHITECTURE,
+            agent_level=AgentLevel.APPROVAL, sequence=2,
+        )
+        agents = {
+            StageType.ARCHITECTURE: MagicMock(execute=AsyncMock(return_value={"design": 1})),
+            StageType.ARCHITECTURE_APPROVAL: MagicMock(execute=approve),
+        }
+        pipeline = SimpleNamespace(status=PipelineStatus.PENDING, stages=[arch, approval])
+        project = SimpleNamespace(
+            name="p", requirements="", enabled_domains=[], deployment_enabled=False,
+            target_cloud="aws",
+        )
+        with (
+            patch("app.agents.pipeline_engine.create_agent",
+                  side_effect=lambda stage_type, *_: agents[stage_type]),
+            patch.object(machine, "_save_artifact", new=AsyncMock()),
+        ):
+            await asyncio.wait_for(machine._run_stages(pipeline, project), 5)
+
+        # The approval agent ran while the architecture result was still being written
+        assert order.index("approval_agent") < order.index("write_done") == len(order) - 1
+        assert arch.status == PipelineStatus.COMPLETED
+        assert approval.status == PipelineStatus.APPROVED
+        assert pipeline.status == PipelineStatus.COMPLETED
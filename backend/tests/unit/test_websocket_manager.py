@@ -0,0 +1,109 @@
+"""
+Unit tests for the WebSocket ConnectionManager — serialize-once fan-out,
+per-connection outbound queues, catch-up ordering and slow-consumer eviction.
+"""
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.api.v1 import websocket as ws_module
+from app.api.v1.websocket import Connection, ConnectionManager
+from app.core.events import EventBus, PipelineEvent
+
+
+class FakeSocket:
+    def __init__(self, gate: asyncio.Event | None = None) -> None:
+        self.sent: list[str] = []
+        self.gate = gate
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, frame: str) -> None:
+        if self.gate is not None:
+            await self.gate.wait()
+        self.sent.append(frame)
+
+
+@pytest.fixture
+def bus(monkeypatch):
+    monkeypatch.setattr("app.core.redis_client._redis", None)
+    b = EventBus()
+    monkeypatch.setattr(EventBus, "_instance", b)
+    return b
+
+
+class TestConnectionManager:
+    @pytest.mark.asyncio
+    async def test_event_is_encoded_once_for_all_connections(self, bus):
+        manager = ConnectionManager()
+        sockets = [FakeSocket() for _ in range(5)]
+        connections = [await manager.connect(s) for s in sockets]
+        for c in connections:
+            await manager.subscribe(c, "pipeline:pipe-1")
+
+        with patch.object(ws_module, "encode_frame", wraps=ws_module.encode_frame) as enc:
+            await bus.publish(PipelineEvent(pipeline_id="pipe-1", event_type="x", data={}))
+            await bus.join()
+            await asyncio.sleep(0.01)
+        assert enc.call_count == 1
+        frames = {s.sent[0] for s in sockets}
+        assert len(frames) == 1 and '"seq":1' in frames.pop()
+
+        for c in connections:
+            manager.disconnect(c)
+        assert not bus.has_subscribers("pipeline:pipe-1")
+        await asyncio.sleep(0)
+        await bus.close()
+
+    @pytest.mark.asyncio
+    async def test_slow_consumer_is_evicted_without_blocking_others(self):
+        manager = ConnectionManager()
+        manager._subscribe = lambda topic: None
+        slow_socket, fast_socket = FakeSocket(gate=asyncio.Event()), FakeSocket()
+        slow = await manager.connect(slow_socket, maxsize=3)
+        fast = await manager.connect(fast_socket)
+        for c in (slow, fast):
+            await manager.subscribe(c, "pipeline:pipe-1")
+
+        for n in range(10):
+            await manager.broadcast_to_pipeline("pipe-1", {"type": "x", "seq": n})
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+        assert len(fast_socket.sent) == 10
+        assert slow.evicted and slow.closed
+        await asyncio.wait_for(slow.wait_closed(), timeout=0.1)
+        fast.close()
+        await asyncio.sleep(0.01)
+
+    @pytest.mark.asyncio
+    async def test_frames_already_replayed_are_skipped(self):
+        socket = FakeSocket()
+        connection = Connection(socket)
+        connection.topics.add("pipeline:pipe-1")
+        connection.hold("pipeline:pipe-1")
+        for seq in (3, 4, 5):
+            connection.offer(f"live-{seq}", "pipeline:pipe-1", "pipe-1", seq)
+        connection.offer("control")
+        # Catch-up delivered up to seq 4; live 3 and 4 duplicate it
+        connection.release("pipeline:pipe-1", [
+            ("pipeline:pipe-1", "pipe-1", seq, f"replay-{seq}") for seq in (3, 4)
+        ], "pipe-1", 2)
+        connection.start()
+        await asyncio.sleep(0.01)
+        assert socket.sent == ["control", "replay-3", "replay-4", "live-5"]
+        connection.close()
+        await asyncio.sleep(0.01)
+
+    @pytest.mark.asyncio
+    async def test_idle_connection_sends_heartbeat(self):
+        socket = FakeSocket()
+        connection = Connection(socket, heartbeat=0.01)
+        connection.start()
+        await asyncio.sleep(0.03)
+        assert ws_module.HEARTBEAT_FRAME in socket.sent
+        connection.close()
+        await asyncio.sleep(0.01)
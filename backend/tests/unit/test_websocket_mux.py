@@ -0,0 +1,262 @@
+"""
+Unit tests for the multiplexed WebSocket stream — subscribe/unsubscribe
+commands, per-topic flow control and the approvals inbox topic.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import uuid
+from contextlib import asynccontextmanager
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api.v1 import websocket as ws_module
+from app.api.v1.websocket import (
+    Connection,
+    ConnectionManager,
+    authorize_topic,
+    handle_command,
+)
+from app.core.events import APPROVALS_TOPIC, EventBus, PipelineEvent
+from app.db.models import Base, Pipeline, Project, Workspace, WorkspaceMember
+
+
+class FakeSocket:
+    def __init__(self) -> None:
+        self.sent: list[dict] = []
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, frame: str) -> None:
+        self.sent.append(json.loads(frame))
+
+
+@pytest.fixture
+def bus(monkeypatch):
+    monkeypatch.setattr("app.core.redis_client._redis", None)
+    b = EventBus()
+    monkeypatch.setattr(EventBus, "_instance", b)
+    return b
+
+
+@pytest.fixture(autouse=True)
+def allow_all(monkeypatch):
+    """Authorise every topic; the user belongs to ws-1 only."""
+    async def authorize(user_id, topic):
+        return {"ws-1"}
+    monkeypatch.setattr(ws_module, "authorize_topic", authorize)
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    m = ConnectionManager()
+    monkeypatch.setattr(ws_module, "manager", m)
+    return m
+
+
+async def _drain(bus: EventBus) -> None:
+    await bus.join()
+    await asyncio.sleep(0.01)
+
+
+class TestMultiplexedStream:
+    @pytest.mark.asyncio
+    async def test_one_connection_receives_several_topics(self, bus, manager):
+        socket = FakeSocket()
+        connection = await manager.connect(socket, topic_maxsize=8)
+        for topic in ("pipeline:pipe-1", "workspace:ws-1", APPROVALS_TOPIC):
+            assert await handle_command(connection, {"op": "subscribe", "topic": topic}) is None
+
+        await bus.publish(PipelineEvent(pipeline_id="pipe-1", event_type="stage_started", data={}))
+        await bus.publish(PipelineEvent(
+            pipeline_id="pipe-2", event_type="stage_started", data={}, workspace_id="ws-1",
+        ))
+        await bus.publish(PipelineEvent(
+            pipeline_id="pipe-3", event_type="approval_decided", data={}, workspace_id="ws-1",
+        ))
+        # Another workspace's approval stays out of this user's inbox
+        await bus.publish(PipelineEvent(
+            pipeline_id="pipe-4", event_type="approval_requested", data={}, workspace_id="ws-2",
+        ))
+        await _drain(bus)
+
+        assert [m["topic"] for m in socket.sent if m["type"] == "subscribed"] == [
+            "pipeline:pipe-1", "workspace:ws-1", APPROVALS_TOPIC,
+        ]
+        events = [m for m in socket.sent if m["type"] != "subscribed"]
+        assert [e["pipeline_id"] for e in events] == ["pipe-1", "pipe-2", "pipe-3"]
+
+        manager.disconnect(connection)
+        assert not manager.active_connections
+        await asyncio.sleep(0.01)
+        await bus.close()
+
+    @pytest.mark.asyncio
+    async def test_overlapping_topics_deliver_each_event_once(self, bus, manager):
+        socket = FakeSocket()
+        connection = await manager.connect(socket)
+        await handle_command(connection, {"op": "subscribe", "topic": "pipeline:pipe-1"})
+        await handle_command(connection, {"op": "subscribe", "topic": "workspace:ws-1"})
+
+        await bus.publish(PipelineEvent(
+            pipeline_id="pipe-1", event_type="stage_started", data={}, workspace_id="ws-1",
+        ))
+        await _drain(bus)
+        assert [m.get("seq") for m in socket.sent if m["type"] == "stage_started"] == [1]
+
+        manager.disconnect(connection)
+        await asyncio.sleep(0.01)
+        await bus.close()
+
+    @pytest.mark.asyncio
+    async def test_subscribe_resumes_from_last_event_id(self, bus, manager):
+        for _ in range(4):
+            await bus.publish(PipelineEvent(pipeline_id="pipe-1", event_type="x", data={}))
+        socket = FakeSocket()
+        connection = await manager.connect(socket)
+        await handle_command(
+            connection, {"op": "subscribe", "topic": "pipeline:pipe-1", "last_event_id": 2},
+        )
+        await _drain(bus)
+        assert [m["type"] for m in socket.sent] == ["subscribed", "x", "x"]
+        assert [m["seq"] for m in socket.sent[1:]] == [3, 4]
+
+        manager.disconnect(connection)
+        await asyncio.sleep(0.01)
+        await bus.close()
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_stops_delivery(self, bus, manager):
+        socket = FakeSocket()
+        connection = await manager.connect(socket)
+        await handle_command(connection, {"op": "subscribe", "topic": "pipeline:pipe-1"})
+        reply = await handle_command(connection, {"op": "unsubscribe", "topic": "pipeline:pipe-1"})
+        assert reply == {"type": "unsubscribed", "topic": "pipeline:pipe-1"}
+        assert not bus.has_subscribers("pipeline:pipe-1")
+
+        await bus.publish(PipelineEvent(pipeline_id="pipe-1", event_type="x", data={}))
+        await _drain(bus)
+        assert [m["type"] for m in socket.sent] == ["subscribed"]
+
+        manager.disconnect(connection)
+        await asyncio.sleep(0.01)
+        await bus.close()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("message", [
+        ["subscribe"],
+        {"op": "watch", "topic": "pipeline:p"},
+        {"op": "subscribe", "topic": "*"},
+        {"op": "subscribe", "topic": "pipeline:"},
+        {"op": "subscribe", "topic": "pipeline:p", "last_event_id": "3"},
+    ])
+    async def test_invalid_commands_are_rejected(self, manager, message):
+        connection = Connection(FakeSocket())
+        reply = await handle_command(connection, message)
+        assert reply["type"] == "error"
+        assert not connection.topics
+
+    @pytest.mark.asyncio
+    async def test_subscription_limit(self, manager, monkeypatch):
+        monkeypatch.setattr("app.core.config.settings.WS_MAX_SUBSCRIPTIONS", 1)
+        manager._subscribe = lambda topic: None
+        connection = Connection(FakeSocket())
+        assert await handle_command(connection, {"op": "subscribe", "topic": "workspace:a"}) is None
+        reply = await handle_command(connection, {"op": "subscribe", "topic": "workspace:b"})
+        assert reply["message"] == "Too many subscriptions"
+
+
+class TestPerTopicFlowControl:
+    @pytest.mark.asyncio
+    async def test_lagging_topic_is_dropped_and_others_keep_flowing(self):
+        manager = ConnectionManager()
+        manager._subscribe = lambda topic: None
+        socket = FakeSocket()
+        connection = Connection(socket, topic_maxsize=3)
+        connection.on_overflow = manager.drop_subscription
+        await manager.subscribe(connection, "workspace:busy")
+        await manager.subscribe(connection, "workspace:quiet")
+
+        for n in range(5):
+            manager._fan_out("workspace:busy", "pipe-busy", n + 1, json.dumps({"type": "busy"}))
+        manager._fan_out("workspace:quiet", "pipe-quiet", 1, json.dumps({"type": "quiet"}))
+        connection.start()
+        await asyncio.sleep(0.01)
+
+        assert not connection.closed
+        assert connection.topics == {"workspace:quiet"}
+        assert [m["type"] for m in socket.sent] == ["busy"] * 3 + ["unsubscribed", "quiet"]
+        assert socket.sent[3]["reason"] == "slow_consumer"
+        connection.close()
+        await asyncio.sleep(0.01)
+
+
+class TestTopicAuthorization:
+    OWNER, MEMBER, OUTSIDER = (str(uuid.uuid4()) for _ in range(3))
+
+    @pytest_asyncio.fixture(loop_scope="function")
+    async def tenancy(self, monkeypatch):
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        maker = async_sessionmaker(engine, expire_on_commit=False)
+        ws = Workspace(id=uuid.uuid4(), name="ws", slug="ws", owner_id=uuid.UUID(self.OWNER))
+        project = Project(
+            id=uuid.uuid4(), workspace_id=ws.id, name="p", created_by=ws.owner_id,
+        )
+        pipeline = Pipeline(id=uuid.uuid4(), project_id=project.id, triggered_by=ws.owner_id)
+        async with maker() as session:
+            session.add_all([ws, project, pipeline, WorkspaceMember(
+                workspace_id=ws.id, user_id=uuid.UUID(self.MEMBER),
+            )])
+            await session.commit()
+
+        @asynccontextmanager
+        async def read_session():
+            async with maker() as session:
+                yield session
+
+        monkeypatch.setattr(ws_module, "read_session", read_session)
+        yield str(ws.id), str(pipeline.id)
+        await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_members_may_watch_their_workspace_and_pipelines(self, tenancy):
+        ws_id, pipeline_id = tenancy
+        for user in (self.OWNER, self.MEMBER):
+            assert await authorize_topic(user, f"workspace:{ws_id}") == {ws_id}
+            assert await authorize_topic(user, f"pipeline:{pipeline_id}") == {ws_id}
+
+    @pytest.mark.asyncio
+    async def test_outsiders_and_unknown_ids_are_refused(self, tenancy):
+        ws_id, pipeline_id = tenancy
+        assert await authorize_topic(self.OUTSIDER, f"workspace:{ws_id}") is None
+        assert await authorize_topic(self.OUTSIDER, f"pipeline:{pipeline_id}") is None
+        assert await authorize_topic(self.OWNER, f"pipeline:{uuid.uuid4()}") is None
+        assert await authorize_topic(self.OWNER, "workspace:not-a-uuid") is None
+        assert await authorize_topic(None, f"workspace:{ws_id}") is None
+
+    @pytest.mark.asyncio
+    async def test_forbidden_subscribe_is_refused_and_approvals_are_scoped(
+        self, tenancy, manager, monkeypatch
+    ):
+        monkeypatch.setattr(ws_module, "authorize_topic", authorize_topic)
+        manager._subscribe = lambda topic: None
+        ws_id, _ = tenancy
+        connection = Connection(FakeSocket())
+        connection.user_id = self.OUTSIDER
+        reply = await handle_command(connection, {"op": "subscribe", "topic": f"workspace:{ws_id}"})
+        assert reply["message"] == "Forbidden"
+        assert not connection.topics
+
+        approvals = {"op": "subscribe", "topic": APPROVALS_TOPIC}
+        assert await handle_command(connection, approvals) is None
+        assert connection.workspaces == set()
+        member = Connection(FakeSocket())
+        member.user_id = self.MEMBER
+        await handle_command(member, approvals)
+        assert member.workspaces == {ws_id}
@@ -112,24 +112,27 @@ export function useAgentMetrics(pollMs = POLL_METRICS) {
 // ── useAuditLog ───────────────────────────────────────────────────────────────
 
 /**
- * Paginated audit log.
+ * Cursor-paginated audit log, newest first.
+ * `loadMore()` appends the next page; `hasMore` is false once the last page
+ * (next_cursor === null) has been loaded.
  * @param {{ limit?: number, event_type?: string }} params
  */
 export function useAuditLog(params = {}) {
-  const [events,  setEvents]  = useState([]);
-  const [total,   setTotal]   = useState(0);
-  const [loading, setLoading] = useState(true);
-  const [error,   setError]   = useState(null);
+  const [events,     setEvents]     = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loading,    setLoading]    = useState(true);
+  const [error,      setError]      = useState(null);
 
   const { limit = 50, event_type } = params;
 
-  const fetch = useCallback(async (offset = 0) => {
+  const fetch = useCallback(async (cursor = null) => {
     setLoading(true);
     try {
       const { audit } = await import('../utils/api');
-      const result = await audit.list({ limit, offset, event_type });
-      setEvents(result.events || []);
-      setTotal(result.total || 0);
+      const result = await audit.list({ limit, cursor, event_type });
+      const page = result.events || [];
+      setEvents((prev) => (cursor ? [...prev, ...page] : page));
+      setNextCursor(result.next_cursor || null);
       setError(null);
     } catch (e) {
       setError(e.message);
@@ -138,9 +141,20 @@ export function useAuditLog(params = {}) {
     }
   }, [limit, event_type]);
 
-  useEffect(() => { fetch(0); }, [fetch]);
+  useEffect(() => { fetch(null); }, [fetch]);
+
+  const loadMore = useCallback(() => {
+    if (nextCursor) fetch(nextCursor);
+  }, [fetch, nextCursor]);
 
-  return { events, total, loading, error, fetchPage: fetch };
+  return {
+    events,
+    hasMore: nextCursor !== null,
+    loading,
+    error,
+    loadMore,
+    refresh: () => fetch(null),
+  };
 }
 
 export default useMetrics;
@@ -66,75 +66,116 @@ export function usePipeline(pipelineId) {
   return { pipeline, logs, loading, error, wsStatus, cancel, retry, clearLogs, refresh: fetch };
 }
 
+// ── Cursor-paginated lists ───────────────────────────────────────────────────
+
 /**
- * usePipelineList — lists pipelines for a project with optional polling.
+ * useCursorList — a newest-first list that follows next_cursor.
+ * `loadPage(cursor)` resolves to { items, next_cursor }; null loads nothing.
+ * Polling refreshes the first page only; pages appended by `loadMore()` are kept.
  */
-export function usePipelineList(projectId, pollMs = 0) {
-  const [items,   setItems]   = useState([]);
-  const [loading, setLoading] = useState(true);
-  const [error,   setError]   = useState(null);
-  const timer = useRef(null);
-
-  const fetch = useCallback(async () => {
-    if (!projectId) return;
+function useCursorList(loadPage, pollMs) {
+  const [head,       setHead]       = useState([]);   // first page
+  const [tail,       setTail]       = useState([]);   // pages appended by loadMore()
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loading,    setLoading]    = useState(true);
+  const [error,      setError]      = useState(null);
+  const paged = useRef(false);
+
+  const fetch = useCallback(async (cursor = null) => {
+    if (!loadPage) return;
     try {
-      const data = await pipelinesApi.list(projectId);
-      setItems(data);
+      const data = await loadPage(cursor);
+      const page = data.items || [];
+      if (cursor) {
+        paged.current = true;
+        setTail((prev) => [...prev, ...page]);
+      } else {
+        setHead(page);
+      }
+      // Once further pages are loaded, the last of them says where to go next
+      if (cursor || !paged.current) setNextCursor(data.next_cursor || null);
       setError(null);
     } catch (e) {
       setError(e.message);
     } finally {
       setLoading(false);
     }
-  }, [projectId]);
+  }, [loadPage]);
 
   useEffect(() => {
-    fetch();
+    paged.current = false;
+    setTail([]);
+    fetch(null);
     if (pollMs > 0) {
-      timer.current = setInterval(fetch, pollMs);
-      return () => clearInterval(timer.current);
+      const t = setInterval(() => fetch(null), pollMs);
+      return () => clearInterval(t);
     }
   }, [fetch, pollMs]);
 
+  const loadMore = useCallback(() => {
+    if (nextCursor) return fetch(nextCursor);
+  }, [fetch, nextCursor]);
+
+  const headIds = new Set(head.map((item) => item.id));
+  const items = [...head, ...tail.filter((item) => !headIds.has(item.id))];
+
+  const prepend = useCallback((item) => setHead((prev) => [item, ...prev]), []);
+
+  const remove = useCallback((id) => {
+    setHead((prev) => prev.filter((item) => item.id !== id));
+    setTail((prev) => prev.filter((item) => item.id !== id));
+  }, []);
+
+  return {
+    items,
+    hasMore: nextCursor !== null,
+    loading,
+    error,
+    loadMore,
+    prepend,
+    remove,
+    refresh: () => fetch(null),
+  };
+}
+
+/**
+ * usePipelineList — lists pipelines for a project with optional polling.
+ * `loadMore()` appends the next page; `hasMore` is false on the last one.
+ */
+export function usePipelineList(projectId, pollMs = 0) {
+  const loadPage = useCallback(
+    (cursor) => pipelinesApi.list(projectId, { cursor }),
+    [projectId],
+  );
+  const { items, hasMore, loading, error, loadMore, prepend, refresh } =
+    useCursorList(projectId ? loadPage : null, pollMs);
+
   const create = useCallback(async (data) => {
     const p = await pipelinesApi.create(projectId, data);
-    setItems((prev) => [p, ...prev]);
+    prepend(p);
     return p;
-  }, [projectId]);
+  }, [projectId, prepend]);
 
-  return { items, loading, error, create, refresh: fetch };
+  return { items, hasMore, loading, error, loadMore, create, refresh };
 }
 
 /**
  * usePendingApprovals — pending approval list with polling.
  */
 export function usePendingApprovals(pollMs = 15_000) {
-  const [approvals, setApprovals] = useState([]);
-  const [loading,   setLoading]   = useState(true);
-
-  const fetch = useCallback(async () => {
-    try {
-      const data = await approvalsApi.list();
-      setApprovals(data);
-    } catch { /* silent */ }
-    finally { setLoading(false); }
-  }, []);
-
-  useEffect(() => {
-    fetch();
-    const t = setInterval(fetch, pollMs);
-    return () => clearInterval(t);
-  }, [fetch, pollMs]);
+  const loadPage = useCallback((cursor) => approvalsApi.list({ cursor }), []);
+  const { items: approvals, hasMore, loading, loadMore, remove, refresh } =
+    useCursorList(loadPage, pollMs);
 
   const approve = useCallback(async (id, comment = '') => {
     await approvalsApi.approve(id, comment);
-    setApprovals((prev) => prev.filter((a) => a.id !== id));
-  }, []);
+    remove(id);
+  }, [remove]);
 
   const reject = useCallback(async (id, comment = '') => {
     await approvalsApi.reject(id, comment);
-    setApprovals((prev) => prev.filter((a) => a.id !== id));
-  }, []);
+    remove(id);
+  }, [remove]);
 
-  return { approvals, loading, approve, reject, refresh: fetch };
+  return { approvals, hasMore, loading, loadMore, approve, reject, refresh };
 }
@@ -142,13 +142,32 @@ describe('usePipeline', () => {
 describe('usePipelineList', () => {
   it('fetches list on mount', async () => {
     const fakeList = [{ id: 'p1' }, { id: 'p2' }];
-    pipelinesApi.list.mockResolvedValue(fakeList);
+    pipelinesApi.list.mockResolvedValue({ items: fakeList, next_cursor: null });
 
     const { getResult } = renderHook(() => usePipelineList('proj-1'));
     await waitFor(() => expect(getResult().loading).toBe(false));
 
-    expect(pipelinesApi.list).toHaveBeenCalledWith('proj-1');
+    expect(pipelinesApi.list).toHaveBeenCalledWith('proj-1', { cursor: null });
     expect(getResult().items).toEqual(fakeList);
+    expect(getResult().hasMore).toBe(false);
+  });
+
+  it('loadMore follows next_cursor and keeps loaded pages across refreshes', async () => {
+    pipelinesApi.list.mockImplementation(async (_, { cursor }) => (cursor
+      ? { items: [{ id: 'p2' }], next_cursor: null }
+      : { items: [{ id: 'p1' }], next_cursor: 'c1' }));
+
+    const { getResult } = renderHook(() => usePipelineList('proj-1'));
+    await waitFor(() => expect(getResult().hasMore).toBe(true));
+
+    await act(async () => { await getResult().loadMore(); });
+    expect(pipelinesApi.list).toHaveBeenLastCalledWith('proj-1', { cursor: 'c1' });
+    expect(getResult().items.map((p) => p.id)).toEqual(['p1', 'p2']);
+    expect(getResult().hasMore).toBe(false);
+
+    await act(async () => { await getResult().refresh(); });
+    expect(getResult().items.map((p) => p.id)).toEqual(['p1', 'p2']);
+    expect(getResult().hasMore).toBe(false);
   });
 
   it('sets error on failed fetch', async () => {
@@ -161,7 +180,7 @@ describe('usePipelineList', () => {
   });
 
   it('create prepends new pipeline to items', async () => {
-    pipelinesApi.list.mockResolvedValue([{ id: 'p1' }]);
+    pipelinesApi.list.mockResolvedValue({ items: [{ id: 'p1' }], next_cursor: null });
     pipelinesApi.create.mockResolvedValue({ id: 'p2' });
 
     const { getResult } = renderHook(() => usePipelineList('proj-1'));
@@ -179,7 +198,7 @@ describe('usePipelineList', () => {
 describe('usePendingApprovals', () => {
   it('fetches approvals on mount', async () => {
     const fakeApprovals = [{ id: 'a1' }, { id: 'a2' }];
-    approvalsApi.list.mockResolvedValue(fakeApprovals);
+    approvalsApi.list.mockResolvedValue({ items: fakeApprovals, next_cursor: null });
 
     const { getResult } = renderHook(() => usePendingApprovals());
     await waitFor(() => expect(getResult().loading).toBe(false));
@@ -188,7 +207,7 @@ describe('usePendingApprovals', () => {
   });
 
   it('approve removes item from list', async () => {
-    approvalsApi.list.mockResolvedValue([{ id: 'a1' }, { id: 'a2' }]);
+    approvalsApi.list.mockResolvedValue({ items: [{ id: 'a1' }, { id: 'a2' }], next_cursor: null });
     approvalsApi.approve.mockResolvedValue(null);
 
     const { getResult } = renderHook(() => usePendingApprovals());
@@ -201,7 +220,7 @@ describe('usePendingApprovals', () => {
   });
 
   it('reject removes item from list', async () => {
-    approvalsApi.list.mockResolvedValue([{ id: 'a1' }, { id: 'a2' }]);
+    approvalsApi.list.mockResolvedValue({ items: [{ id: 'a1' }, { id: 'a2' }], next_cursor: null });
     approvalsApi.reject.mockResolvedValue(null);
 
     const { getResult } = renderHook(() => usePendingApprovals());
@@ -4,6 +4,8 @@ import { getToken } from '../utils/api';
 
 /**
  * useWebSocket — connects to Forge's real-time log stream for a pipeline.
+ * On reconnect it resumes from the last received event `seq`, so the server
+ * replays only the missed events (or sends a `snapshot` frame).
  *
  * @param {string|null} pipelineId  — connect only when truthy
  * @param {function} onMessage      — called with each parsed event
@@ -17,6 +19,7 @@ export function useWebSocket(pipelineId, onMessage, options = {}) {
   const ws        = useRef(null);
   const retries   = useRef(0);
   const timer     = useRef(null);
+  const lastSeq   = useRef(null);
   const onMsg     = useRef(onMessage);
   const [status, setStatus] = useState('idle'); // idle | connecting | open | closed | error
 
@@ -27,7 +30,8 @@ export function useWebSocket(pipelineId, onMessage, options = {}) {
     if (!pipelineId) return;
 
     const token = getToken();
-    const url   = `${WS_BASE_URL}/pipelines/${pipelineId}?token=${token}`;
+    const resume = lastSeq.current !== null ? `&last_event_id=${lastSeq.current}` : '';
+    const url    = `${WS_BASE_URL}/pipelines/${pipelineId}?token=${token}${resume}`;
 
     setStatus('connecting');
     const socket = new WebSocket(url);
@@ -41,6 +45,7 @@ export function useWebSocket(pipelineId, onMessage, options = {}) {
     socket.onmessage = (e) => {
       try {
         const data = JSON.parse(e.data);
+        if (typeof data.seq === 'number') lastSeq.current = data.seq;
         onMsg.current?.(data);
       } catch {
         // ignore malformed frames
@@ -60,6 +65,7 @@ export function useWebSocket(pipelineId, onMessage, options = {}) {
 
   useEffect(() => {
     if (!pipelineId) return;
+    lastSeq.current = null;
     connect();
     return () => {
       clearTimeout(timer.current);
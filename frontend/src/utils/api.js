@@ -12,7 +12,7 @@ export function getToken() {
   return authToken;
 }
 
-async function request(method, path, body = null) {
+async function request(method, path, body = null, as = 'json') {
   const headers = { 'Content-Type': 'application/json' };
   if (authToken) headers['Authorization'] = `Bearer ${authToken}`;
 
@@ -27,7 +27,14 @@ async function request(method, path, body = null) {
     throw new Error(err.detail || 'Request failed');
   }
 
-  return res.status === 204 ? null : res.json();
+  return res.status === 204 ? null : res[as]();
+}
+
+// Drops null / empty params, so they are not sent as "undefined"
+function withQuery(path, params = {}) {
+  const defined = Object.entries(params).filter(([, v]) => v != null && v !== '');
+  const qs = new URLSearchParams(defined).toString();
+  return qs ? `${path}?${qs}` : path;
 }
 
 // ── Auth ─────────────────────────────────────────────────────────────────────
@@ -62,7 +69,9 @@ export const projects = {
 
 // ── Pipelines ─────────────────────────────────────────────────────────────────
 export const pipelines = {
-  list: (projectId) => request('GET', `/projects/${projectId}/pipelines`),
+  // params: { size, cursor } — pass the previous page's next_cursor as cursor
+  list: (projectId, params = {}) =>
+    request('GET', withQuery(`/projects/${projectId}/pipelines`, params)),
   get: (id) => request('GET', `/pipelines/${id}`),
   create: (projectId, data) => request('POST', `/projects/${projectId}/pipelines`, data),
   cancel: (id) => request('POST', `/pipelines/${id}/cancel`),
@@ -71,7 +80,8 @@ export const pipelines = {
 
 // ── Approvals ─────────────────────────────────────────────────────────────────
 export const approvals = {
-  list: () => request('GET', '/approvals/pending'),
+  // params: { size, cursor } — pass the previous page's next_cursor as cursor
+  list: (params = {}) => request('GET', withQuery('/approvals/pending', params)),
   approve: (id, comment) => request('POST', `/approvals/${id}/approve`, { comment }),
   reject: (id, comment) => request('POST', `/approvals/${id}/reject`, { comment }),
 };
@@ -81,6 +91,18 @@ export const artifacts = {
   list: (pipelineId) => request('GET', `/pipelines/${pipelineId}/artifacts`),
   get: (id) => request('GET', `/artifacts/${id}`),
   download: (id) => request('GET', `/artifacts/${id}/download`),
+  versions: (id) => request('GET', `/artifacts/${id}/versions`),
+  diff: (id, fromVersion) =>
+    request('GET', `/artifacts/${id}/diff${fromVersion ? `?from_version=${fromVersion}` : ''}`, null, 'text'),
+};
+
+// ── Generated files (per-file index of source / test artifacts) ──────────────
+const encodePath = (path) => path.split('/').map(encodeURIComponent).join('/');
+
+export const files = {
+  tree: (pipelineId) => request('GET', `/pipelines/${pipelineId}/files`),
+  get: (pipelineId, path) =>
+    request('GET', `/pipelines/${pipelineId}/files/${encodePath(path)}`, null, 'text'),
 };
 
 // ── Agents ────────────────────────────────────────────────────────────────────
@@ -98,8 +120,6 @@ export const metrics = {
 
 // ── Audit ─────────────────────────────────────────────────────────────────────
 export const audit = {
-  list: (params = {}) => {
-    const qs = new URLSearchParams(params).toString();
-    return request('GET', `/audit${qs ? `?${qs}` : ''}`);
-  },
+  // params: { limit, cursor, event_type } — pass the previous page's next_cursor as cursor
+  list: (params = {}) => request('GET', withQuery('/metrics/audit', params)),
 };
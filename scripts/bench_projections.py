@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Projection rebuild throughput benchmark.
+
+Seeds a throwaway event store with synthetic pipeline events, then times
+ProjectionEngine.rebuild_all() twice: cold (full replay, snapshots written)
+and warm (snapshot + empty tail).
+
+Usage:
+  cd backend
+  python ../scripts/bench_projections.py [--pipelines 2000] [--events 250]
+
+Uses an in-memory SQLite database unless BENCH_DATABASE_URL is set; the
+event_store / event_snapshots tables there are DROPPED and recreated.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+BENCH_DATABASE_URL = os.getenv("BENCH_DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("DATABASE_URL", BENCH_DATABASE_URL)
+
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.core.projections import ProjectionEngine  # noqa: E402
+from app.db.models import EventSnapshot, EventStore  # noqa: E402
+
+EVENT_CYCLE = ["stage_started", "agent_started", "agent_completed", "stage_completed"]
+
+
+def _rows(pipeline: int, events: int) -> list[dict]:
+    aggregate_id = f"bench-{pipeline:06d}"
+    return [
+        {
+            "id": uuid.uuid4(),
+            "aggregate_id": aggregate_id,
+            "aggregate_type": "pipeline",
+            "event_type": EVENT_CYCLE[i % len(EVENT_CYCLE)],
+            "event_data": {"stage_id": f"s{i // len(EVENT_CYCLE)}", "stage_type": "development",
+                           "status": "completed"},
+            "sequence_number": i + 1,
+            "occurred_at": datetime.utcnow(),
+            "extra": {},
+        }
+        for i in range(events)
+    ]
+
+
+async def main(pipelines: int, events: int, batch_size: int, concurrency: int) -> None:
+    engine = create_async_engine(BENCH_DATABASE_URL)
+    tables = [EventStore.__table__, EventSnapshot.__table__]
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda c: EventStore.metadata.drop_all(c, tables=tables))
+        await conn.run_sync(lambda c: EventStore.metadata.create_all(c, tables=tables))
+    maker = async_sessionmaker(engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def session_factory():
+        async with maker() as session:
+            yield session
+            await session.commit()
+
+    print(f"  Seeding {pipelines} pipelines × {events} events …")
+    per_insert = max(1, 2000 // events)
+    for start in range(0, pipelines, per_insert):
+        chunk = range(start, min(start + per_insert, pipelines))
+        rows = [row for p in chunk for row in _rows(p, events)]
+        async with session_factory() as session:
+            await session.execute(insert(EventStore).values(rows))
+
+    projections = ProjectionEngine(session_factory=session_factory)
+    for label in ("cold", "warm"):
+        stats = await projections.rebuild_all(batch_size=batch_size, concurrency=concurrency)
+        print(
+            f"  {label}: {stats.aggregates} aggregates, {stats.events} events, "
+            f"{stats.snapshots} snapshots in {stats.seconds:.2f}s "
+            f"→ {stats.events_per_second:,.0f} events/s, "
+            f"{stats.aggregates / stats.seconds:,.0f} aggregates/s"
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pipelines", type=int, default=2000)
+    parser.add_argument("--events", type=int, default=250)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(main(args.pipelines, args.events, args.batch_size, args.concurrency))
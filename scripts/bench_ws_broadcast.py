@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+WebSocket broadcast CPU benchmark.
+
+Measures process CPU per event when fanning one pipeline event out to N
+subscribers, comparing the old path (one EventBus subscription per socket,
+each building a dict and json.dumps-ing it) with ConnectionManager's
+serialize-once path (one encode, shared frame, per-connection outbound
+queues). Sockets are in-memory no-ops, so the numbers isolate server-side
+encoding and fan-out cost.
+
+Usage:
+  cd backend
+  python ../scripts/bench_ws_broadcast.py [--subscribers 1000 10000] [--events 200]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+from app.api.v1.websocket import ConnectionManager, encode_frame  # noqa: E402
+from app.core.events import EventBus, PipelineEvent, pipeline_topic  # noqa: E402
+from app.core.replay import event_message  # noqa: E402
+
+PAYLOAD = {
+    "stage_type": "development",
+    "status": "completed",
+    "summary": "x" * 512,
+    "files": [f"src/module_{i}.py" for i in range(20)],
+}
+
+
+class NullSocket:
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, frame: str) -> None:
+        pass
+
+    async def send_json(self, message: dict) -> None:
+        json.dumps(message)   # what Starlette's send_json does per call
+
+
+def _event(seq: int) -> PipelineEvent:
+    return PipelineEvent(
+        pipeline_id="bench", event_type="stage_completed", stage_id="s1", data=PAYLOAD,
+        seq=seq, origin="bench",   # foreign origin: skip Kafka/EventStore/replay side effects
+    )
+
+
+async def per_connection(subscribers: int, events: int) -> float:
+    """Previous design: one EventBus subscription per socket, each calling send_json."""
+    bus = EventBus()
+    for _ in range(subscribers):
+        socket = NullSocket()
+
+        async def handler(event: PipelineEvent, socket: NullSocket = socket) -> None:
+            await socket.send_json(event_message(event))
+
+        bus.subscribe(handler, topics=[pipeline_topic("bench")], maxsize=events + 1)
+
+    t0 = time.process_time()
+    for seq in range(events):
+        await bus.publish(_event(seq))
+        await asyncio.sleep(0)
+    await bus.join()
+    elapsed = (time.process_time() - t0) / events
+    await bus.close()
+    return elapsed
+
+
+async def serialize_once(subscribers: int, events: int) -> float:
+    manager = ConnectionManager()
+    manager._subscribe = lambda topic: None     # drive fan-out directly
+    connections = [
+        await manager.connect(NullSocket(), maxsize=events + 1) for _ in range(subscribers)
+    ]
+    for connection in connections:
+        await manager.subscribe(connection, pipeline_topic("bench"))
+
+    t0 = time.process_time()
+    for seq in range(events):
+        event = _event(seq)
+        manager._fan_out(
+            pipeline_topic("bench"), "bench", event.seq, encode_frame(event_message(event))
+        )
+        await asyncio.sleep(0)           # let writer tasks drain
+    while any(c._queue for c in connections):
+        await asyncio.sleep(0)
+    elapsed = (time.process_time() - t0) / events
+    for connection in connections:
+        manager.disconnect(connection)
+    return elapsed
+
+
+async def main(subscriber_counts: list[int], events: int) -> None:
+    print(f"  {'subscribers':>11}  {'per-connection':>16}  {'serialize-once':>16}  speed-up")
+    for n in subscriber_counts:
+        old = await per_connection(n, events)
+        new = await serialize_once(n, events)
+        print(f"  {n:>11,}  {old * 1000:>13.2f} ms  {new * 1000:>13.2f} ms  {old / new:>7.1f}×")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--events", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.subscribers, args.events))
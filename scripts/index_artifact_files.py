@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Artifact file index backfill — indexes generated files of existing artifacts.
+
+Run once after `alembic upgrade 005`. SOURCE_CODE / TEST_SUITE artifacts
+saved since then are indexed as they are written; this covers the ones
+saved before. Each batch commits on its own, so the script can be
+interrupted and re-run at any time; in PostgreSQL several copies may run
+side by side (rows are claimed with SKIP LOCKED).
+
+Usage:
+  cd backend
+  python ../scripts/index_artifact_files.py [--batch-size 100] [--max-batches N]
+
+Reads DATABASE_URL and BLOB_STORE_* from the environment / .env.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from app.core import database  # noqa: E402
+from app.services.artifact_file_service import ArtifactFileService  # noqa: E402
+
+
+async def main(batch_size: int, max_batches: int | None) -> int:
+    await database.init_db()
+    indexed = batches = 0
+    started = time.perf_counter()
+    try:
+        while max_batches is None or batches < max_batches:
+            async with database.write_session() as db:
+                count = await ArtifactFileService(db).index_unindexed(batch_size)
+            if not count:
+                break
+            indexed += count
+            batches += 1
+            rate = indexed / (time.perf_counter() - started)
+            print(f"  indexed {indexed:>9,} artifacts ({rate:,.0f}/s)")
+    finally:
+        await database.close_db()
+    print(f"Done: {indexed:,} artifacts indexed in {batches} batches")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--max-batches", type=int, default=None)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.batch_size, args.max_batches)))
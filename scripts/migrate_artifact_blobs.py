@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Artifact body backfill — moves inline Artifact.content into the blob store.
+
+Run once after `alembic upgrade 004`. Each batch commits on its own, so the
+script can be interrupted and re-run at any time; in PostgreSQL several
+copies may run side by side (rows are claimed with SKIP LOCKED). Once it
+reports 0 remaining, reclaim the space with VACUUM (FULL) artifacts.
+
+Usage:
+  cd backend
+  python ../scripts/migrate_artifact_blobs.py [--batch-size 500] [--max-batches N]
+
+Reads DATABASE_URL and BLOB_STORE_* from the environment / .env.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from app.core import database  # noqa: E402
+from app.core.blob_store import get_blob_store  # noqa: E402
+from app.services.artifact_blob_service import ArtifactBlobService  # noqa: E402
+
+
+async def main(batch_size: int, max_batches: int | None) -> int:
+    if get_blob_store() is None:
+        print("BLOB_STORE_BACKEND=none — nothing to migrate into", file=sys.stderr)
+        return 1
+    await database.init_db()
+    moved = batches = 0
+    started = time.perf_counter()
+    try:
+        while max_batches is None or batches < max_batches:
+            async with database.write_session() as db:
+                count = await ArtifactBlobService(db).move_inline_bodies(batch_size)
+            if not count:
+                break
+            moved += count
+            batches += 1
+            rate = moved / (time.perf_counter() - started)
+            print(f"  moved {moved:>9,} artifacts ({rate:,.0f}/s)")
+    finally:
+        await database.close_db()
+    print(f"Done: {moved:,} artifact bodies moved in {batches} batches")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--max-batches", type=int, default=None)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.batch_size, args.max_batches)))